@@ -22,6 +22,10 @@ CREATE SCHEMA IF NOT EXISTS notifications;
 -- Public Schema (Main API için)
 -- Public schema zaten var, ekstra bir şey yapmaya gerek yok
 
+-- Full-text arama extension'ları (setup_search_index komutu da kontrol eder)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
 -- Schema'lar için gerekli izinleri ver
 GRANT ALL ON SCHEMA products TO postgres;
 GRANT ALL ON SCHEMA inventory TO postgres;
@@ -8,4 +8,5 @@ class AppsConfig(AppConfig):
 
     def ready(self):
         import apps.signals  # noqa
+        import core.db_router  # noqa - search_path wrapper'ı (connection_created)
 
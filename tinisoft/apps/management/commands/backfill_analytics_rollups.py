@@ -0,0 +1,59 @@
+"""
+Django management command: Günlük analytics rollup'larını (SalesReport / ProductAnalytics) geçmişe dönük hesapla.
+
+Kullanım:
+    python manage.py backfill_analytics_rollups [--tenant <tenant_slug>] [--days 365]
+    python manage.py backfill_analytics_rollups --tenant avrupamutfak --from 2025-01-01 --to 2025-12-31
+
+--from verilmezse tenant'ın ilk siparişinin gününden (en fazla --days gün geriye) başlar.
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from apps.models import Tenant, Order
+from apps.services.analytics_rollup_service import AnalyticsRollupService
+from core.db_router import set_tenant_schema, clear_tenant_schema
+
+
+class Command(BaseCommand):
+    help = 'Günlük analytics rollup satırlarını geçmişe dönük yeniden hesaplar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=str, help='Tenant slug (verilmezse tüm aktif tenant\'lar)')
+        parser.add_argument('--from', dest='date_from', type=str, help='Başlangıç günü (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', type=str, help='Bitiş günü (YYYY-MM-DD, varsayılan: bugün)')
+        parser.add_argument('--days', type=int, default=365, help='--from yoksa en fazla kaç gün geriye gidilir')
+
+    def handle(self, *args, **options):
+        date_from = parse_date(options['date_from']) if options['date_from'] else None
+        date_to = parse_date(options['date_to']) if options['date_to'] else timezone.localdate()
+        if (options['date_from'] and not date_from) or not date_to:
+            raise CommandError('Tarihler YYYY-MM-DD formatında olmalı.')
+
+        if options['tenant']:
+            tenants = Tenant.objects.filter(slug=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant bulunamadı: {options['tenant']}")
+        else:
+            tenants = Tenant.objects.filter(status='active', is_deleted=False)
+
+        for tenant in tenants:
+            set_tenant_schema(f'tenant_{tenant.id}')
+            try:
+                start_day = date_from
+                if start_day is None:
+                    first_order = Order.objects.filter(tenant=tenant).aggregate(first=Min('created_at'))['first']
+                    earliest = date_to - timedelta(days=options['days'] - 1)
+                    start_day = max(timezone.localdate(first_order), earliest) if first_order else date_to
+                if start_day > date_to:
+                    self.stdout.write(f'{tenant.slug}: hesaplanacak gün yok')
+                    continue
+
+                count = AnalyticsRollupService.backfill(tenant, start_day, date_to)
+                self.stdout.write(self.style.SUCCESS(
+                    f'{tenant.slug}: {count} gün hesaplandı ({start_day} - {date_to})'
+                ))
+            finally:
+                clear_tenant_schema()
@@ -0,0 +1,97 @@
+"""
+Django management command to measure DB round-trips per request caused by tenant schema routing.
+Usage: python manage.py benchmark_search_path [--host magaza.tinisoft.com.tr] [--requests 200]
+
+İstekleri TenantMiddleware üzerinden (tek bir örnek sorgu çalıştıran view ile) geçirir ve
+istek başına gönderilen SQL ifadesi sayısını iki modda raporlar:
+- eager: eski davranış (ensure_connection + SET search_path + response'ta SET public)
+- lazy: core.db_router.search_path_execute_wrapper (connection başına schema takibi)
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory
+from core.db_router import (
+    search_path_execute_wrapper, get_search_path_stats, reset_search_path_stats,
+    get_tenant_schema, clear_tenant_schema,
+)
+from core.middleware import TenantMiddleware
+
+
+class EagerTenantMiddleware(TenantMiddleware):
+    """Karşılaştırma için eski (her istekte SET search_path) davranış."""
+
+    def process_request(self, request):
+        result = super().process_request(request)
+        if result is None and request.method != 'OPTIONS':
+            schema_name = get_tenant_schema()
+            connection.ensure_connection()
+            if getattr(connection, '_tenant_schema', None) != schema_name:
+                with connection.cursor() as cursor:
+                    if schema_name == 'public':
+                        cursor.execute('SET search_path TO public;')
+                    else:
+                        cursor.execute(f'SET search_path TO "{schema_name}", public;')
+                connection._tenant_schema = schema_name
+        return result
+
+    def process_response(self, request, response):
+        with connection.cursor() as cursor:
+            cursor.execute('SET search_path TO public;')
+        return super().process_response(request, response)
+
+
+class Command(BaseCommand):
+    help = 'Tenant schema routing için istek başına DB round-trip sayısını ölç (eager vs lazy)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='api.tinisoft.com.tr', help='İsteklerin Host header\'ı.')
+        parser.add_argument('--requests', type=int, default=200, help='Her mod için istek sayısı.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Benchmark sadece PostgreSQL ile çalışır.')
+
+        host = options['host']
+        total_requests = options['requests']
+        factory = RequestFactory()
+
+        def view(request):
+            # Tipik bir istekteki tek uygulama sorgusu
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1;')
+            return HttpResponse('ok')
+
+        statements = {'count': 0}
+
+        def counter(execute, sql, params, many, context):
+            statements['count'] += 1
+            return execute(sql, params, many, context)
+
+        connection.ensure_connection()
+        results = {}
+        for mode, middleware_class in (('eager', EagerTenantMiddleware), ('lazy', TenantMiddleware)):
+            lazy = mode == 'lazy'
+            if not lazy and search_path_execute_wrapper in connection.execute_wrappers:
+                connection.execute_wrappers.remove(search_path_execute_wrapper)
+            if lazy and search_path_execute_wrapper not in connection.execute_wrappers:
+                connection.execute_wrappers.append(search_path_execute_wrapper)
+            # Her mod aynı başlangıç durumundan başlasın
+            connection._search_path_schema = None
+            connection._tenant_schema = None
+            clear_tenant_schema()
+
+            middleware = middleware_class(view)
+            statements['count'] = 0
+            reset_search_path_stats()
+            with connection.execute_wrapper(counter):
+                for _ in range(total_requests):
+                    middleware(factory.get('/', HTTP_HOST=host))
+            wrapper_sets = get_search_path_stats()['set'] if lazy else 0
+            # Uygulama sorgusu (SELECT 1) istek başına 1; geri kalanı routing maliyeti
+            overhead = statements['count'] + wrapper_sets - total_requests
+            results[mode] = overhead / total_requests
+
+        self.stdout.write(f'Host: {host} | İstek: {total_requests}')
+        self.stdout.write(f"eager: istek başına {results['eager']:.2f} ek round-trip")
+        self.stdout.write(self.style.SUCCESS(f"lazy:  istek başına {results['lazy']:.2f} ek round-trip"))
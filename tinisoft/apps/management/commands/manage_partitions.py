@@ -0,0 +1,60 @@
+"""
+Django management command: analytics_events, activity_logs ve inventory_movements
+tablolarının aylık partition bakımı.
+
+Kullanım:
+    python manage.py manage_partitions                      # gelecek partition'lar + saklama politikası
+    python manage.py manage_partitions --dry-run            # sadece süresi dolan partition'ları listele
+    python manage.py manage_partitions --convert            # partition'sız tabloları dönüştür (tek seferlik)
+    python manage.py manage_partitions --convert --schema tenant_<id> --table analytics_events
+
+--convert tabloyu kopyalarken kilitler; büyük tablolarda bakım penceresinde çalıştırın.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.services.partition_service import PartitionService
+
+
+class Command(BaseCommand):
+    help = 'Append-only tabloların aylık partition\'larını oluşturur ve saklama politikasını uygular'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--convert', action='store_true', help='Partition\'sız tabloları partition\'lı yapıya çevir')
+        parser.add_argument('--schema', action='append', dest='schemas', help='Sadece bu schema (birden fazla verilebilir)')
+        parser.add_argument('--table', action='append', dest='tables', help='Sadece bu tablo (birden fazla verilebilir)')
+        parser.add_argument('--months-ahead', type=int, default=None, help='Önceden oluşturulacak ay sayısı')
+        parser.add_argument('--dry-run', action='store_true', help='Değişiklik yapmadan göster')
+
+    def handle(self, *args, **options):
+        tables = options['tables'] or PartitionService.get_tables()
+        unknown = set(tables) - set(PartitionService.get_tables())
+        if unknown:
+            raise CommandError(f"Partition tanımlı olmayan tablo: {', '.join(sorted(unknown))}")
+        schemas = options['schemas']
+
+        if options['convert']:
+            for table in tables:
+                for schema, is_partitioned in PartitionService.list_schemas(table):
+                    if (schemas and schema not in schemas) or is_partitioned:
+                        continue
+                    if options['dry_run']:
+                        self.stdout.write(f'{schema}.{table}: dönüştürülecek')
+                        continue
+                    count = PartitionService.convert_table(schema, table, months_ahead=options['months_ahead'])
+                    self.stdout.write(self.style.SUCCESS(f'{schema}.{table}: {count} aylık partition oluşturuldu'))
+
+        stats = PartitionService.maintain(
+            tables=tables,
+            schemas=schemas,
+            months_ahead=options['months_ahead'],
+            dry_run=options['dry_run'],
+        )
+        for name in stats['created']:
+            self.stdout.write(f'Oluşturuldu: {name}')
+        for name in stats['expired']:
+            verb = 'Süresi dolmuş' if options['dry_run'] else 'Saklama uygulandı'
+            self.stdout.write(f'{verb}: {name}')
+        for name in stats['skipped']:
+            self.stdout.write(self.style.WARNING(f'Partition\'sız (--convert gerekli): {name}'))
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(stats['created'])} partition oluşturuldu, {len(stats['expired'])} partition süresi doldu"
+        ))
@@ -0,0 +1,47 @@
+"""
+Django management command: Ürün görsellerinin boyut varyantlarını (thumbnail / listing / zoom, WebP + JPEG)
+üret, base64 olarak kaydedilmiş görselleri storage'a taşı.
+
+Kullanım:
+    python manage.py process_product_images [--tenant <tenant_slug>] [--include-failed]
+
+Görsel işleme pipeline'ı eklendikten sonra mevcut görselleri doldurmak veya kuyruğa
+eklenemeyen / başarısız olan görselleri yeniden işlemek için.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.models import Tenant, ProductImage
+from apps.services.image_processing_service import ImageProcessingService
+from core.db_router import set_tenant_schema, clear_tenant_schema
+
+
+class Command(BaseCommand):
+    help = 'Bekleyen ürün görsellerinin boyut varyantlarını üretir'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=str, help='Tenant slug (verilmezse tüm tenant\'lar)')
+        parser.add_argument(
+            '--include-failed',
+            action='store_true',
+            help='Daha önce başarısız olan görselleri de yeniden işle',
+        )
+
+    def handle(self, *args, **options):
+        if options['tenant']:
+            tenants = Tenant.objects.filter(slug=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant bulunamadı: {options['tenant']}")
+        else:
+            tenants = Tenant.objects.filter(is_deleted=False)
+
+        statuses = [ProductImage.ProcessingStatus.PENDING]
+        if options['include_failed']:
+            statuses.append(ProductImage.ProcessingStatus.FAILED)
+
+        for tenant in tenants:
+            set_tenant_schema(f'tenant_{tenant.id}')
+            try:
+                stats = ImageProcessingService.process_tenant(tenant, statuses=statuses)
+                summary = ', '.join(f'{status}: {count}' for status, count in sorted(stats.items())) or 'işlenecek görsel yok'
+                self.stdout.write(self.style.SUCCESS(f'{tenant.slug}: {summary}'))
+            finally:
+                clear_tenant_schema()
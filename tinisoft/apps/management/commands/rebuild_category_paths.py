@@ -0,0 +1,38 @@
+"""
+Django management command: Kategori materialized path'lerini (path / depth) parent ilişkisinden yeniden hesapla.
+
+Kullanım:
+    python manage.py rebuild_category_paths [--tenant <tenant_slug>]
+
+path alanı eklendikten sonra mevcut kategorileri doldurmak veya bozulmuş path'leri düzeltmek için.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.models import Tenant
+from apps.services.cache_service import CacheService
+from apps.services.category_tree_service import CategoryTreeService
+from core.db_router import set_tenant_schema, clear_tenant_schema
+
+
+class Command(BaseCommand):
+    help = 'Kategori path/depth alanlarını parent ilişkisinden yeniden hesaplar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=str, help='Tenant slug (verilmezse tüm tenant\'lar)')
+
+    def handle(self, *args, **options):
+        if options['tenant']:
+            tenants = Tenant.objects.filter(slug=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant bulunamadı: {options['tenant']}")
+        else:
+            tenants = Tenant.objects.filter(is_deleted=False)
+
+        for tenant in tenants:
+            set_tenant_schema(f'tenant_{tenant.id}')
+            try:
+                count = CategoryTreeService.rebuild_paths(tenant.id)
+                if count:
+                    CacheService.delete_category_tree(tenant.id)
+                self.stdout.write(self.style.SUCCESS(f'{tenant.slug}: {count} kategori güncellendi'))
+            finally:
+                clear_tenant_schema()
@@ -0,0 +1,48 @@
+"""
+Django management command: Ürünlerin denormalize listing alanlarını (min/max fiyat, stok, ana görsel)
+varyant ve görsellerden yeniden hesapla.
+
+Kullanım:
+    python manage.py repair_product_listing [--tenant <tenant_slug>] [--batch-size 500]
+
+listing_* alanları eklendikten sonra mevcut ürünleri doldurmak veya signal dışı
+(queryset update, raw SQL, import) değişikliklerden sonra tutarlılığı sağlamak için.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.models import Tenant
+from apps.services.cache_service import CacheService
+from apps.services.product_listing_service import ProductListingService
+from core.db_router import set_tenant_schema, clear_tenant_schema
+
+
+class Command(BaseCommand):
+    help = 'Ürün listing alanlarını varyant ve görsellerden yeniden hesaplar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=str, help='Tenant slug (verilmezse tüm tenant\'lar)')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ProductListingService.REFRESH_BATCH_SIZE,
+            help='Tek seferde hesaplanan ürün sayısı',
+        )
+
+    def handle(self, *args, **options):
+        if options['tenant']:
+            tenants = Tenant.objects.filter(slug=options['tenant'])
+            if not tenants.exists():
+                raise CommandError(f"Tenant bulunamadı: {options['tenant']}")
+        else:
+            tenants = Tenant.objects.filter(is_deleted=False)
+
+        for tenant in tenants:
+            set_tenant_schema(f'tenant_{tenant.id}')
+            try:
+                stats = ProductListingService.repair_tenant(tenant, batch_size=options['batch_size'])
+                if stats['fixed']:
+                    CacheService.invalidate_storefront(tenant.id)
+                self.stdout.write(self.style.SUCCESS(
+                    f"{tenant.slug}: {stats['fixed']}/{stats['checked']} ürün güncellendi"
+                ))
+            finally:
+                clear_tenant_schema()
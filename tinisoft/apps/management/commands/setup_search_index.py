@@ -0,0 +1,98 @@
+"""
+Django management command to set up the PostgreSQL full-text search index.
+Usage: python manage.py setup_search_index [--skip-backfill]
+
+Idempotent - her deploy'da tekrar çalıştırılabilir.
+- pg_trgm ve unaccent extension'larını kurar
+- Türkçe + unaccent text search konfigürasyonunu oluşturur
+- products.search_vector kolonunu güncelleyen trigger'ı kurar
+- SKU / isim için trigram GIN index'lerini oluşturur
+- Mevcut ürünlerin search_vector'ünü doldurur
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from apps.services.search_service import SEARCH_CONFIG, SEARCH_FOLD_FROM, SEARCH_FOLD_TO
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+SETUP_STATEMENTS = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm;',
+    'CREATE EXTENSION IF NOT EXISTS unaccent;',
+    # Türkçe kök bulma (turkish_stem) öncesi aksan temizliği (unaccent)
+    f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{SEARCH_CONFIG}') THEN
+            CREATE TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} (COPY = pg_catalog.turkish);
+            ALTER TEXT SEARCH CONFIGURATION {SEARCH_CONFIG}
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, turkish_stem;
+        END IF;
+    END
+    $$;
+    """,
+    # ı/İ/ş/ğ/ü/ö/ç katlaması - locale'den bağımsız (Python tarafı ile aynı tablo)
+    f"""
+    CREATE OR REPLACE FUNCTION tinisoft_search_normalize(value text) RETURNS text AS $$
+        SELECT lower(translate(coalesce(value, ''), '{SEARCH_FOLD_FROM}', '{SEARCH_FOLD_TO}'));
+    $$ LANGUAGE sql IMMUTABLE;
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('{SEARCH_CONFIG}', tinisoft_search_normalize(NEW.name)), 'A') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', tinisoft_search_normalize(
+                coalesce(NEW.sku, '') || ' ' || coalesce(NEW.brand, '') || ' ' ||
+                coalesce(NEW.meta_keywords, '') || ' ' || coalesce(NEW.tags::text, '')
+            )), 'B') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', tinisoft_search_normalize(NEW.description)), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    'DROP TRIGGER IF EXISTS products_search_vector_trigger ON products;',
+    """
+    CREATE TRIGGER products_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF name, sku, brand, meta_keywords, tags, description
+        ON products
+        FOR EACH ROW EXECUTE FUNCTION products_search_vector_update();
+    """,
+    # icontains sorguları UPPER(kolon) LIKE UPPER(...) ürettiği için index UPPER() üzerinde
+    'CREATE INDEX IF NOT EXISTS products_name_trgm_gin ON products USING gin (UPPER(name) gin_trgm_ops);',
+    'CREATE INDEX IF NOT EXISTS products_sku_trgm_gin ON products USING gin (UPPER(sku) gin_trgm_ops);',
+]
+
+# Trigger'ı tetiklemek için kolonu kendisine eşitle (search_vector boş olanlar)
+BACKFILL_STATEMENT = 'UPDATE products SET name = name WHERE search_vector IS NULL;'
+
+
+class Command(BaseCommand):
+    help = 'PostgreSQL full-text arama altyapısını kur (tsvector trigger + trigram index)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-backfill',
+            action='store_true',
+            help='Mevcut ürünlerin search_vector değerlerini doldurma.',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Full-text arama sadece PostgreSQL ile destekleniyor.')
+
+        self.stdout.write('Arama altyapısı kuruluyor...')
+        with connection.cursor() as cursor:
+            for statement in SETUP_STATEMENTS:
+                cursor.execute(statement)
+        self.stdout.write(self.style.SUCCESS('✓ Extension, konfigürasyon, trigger ve index\'ler hazır.'))
+
+        if options['skip_backfill']:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(BACKFILL_STATEMENT)
+            updated = cursor.rowcount
+        logger.info(f"[SEARCH] search_vector backfill completed | Products: {updated}")
+        self.stdout.write(self.style.SUCCESS(f'✓ {updated} ürünün arama vektörü güncellendi.'))
@@ -50,6 +50,7 @@ class ActivityLog(BaseModel):
     )
     
     class Meta:
+        # created_at'e göre aylık partition'lı tablo (bkz. PartitionService)
         db_table = 'activity_logs'
         ordering = ['-created_at']
         indexes = [
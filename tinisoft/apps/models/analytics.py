@@ -65,6 +65,7 @@ class AnalyticsEvent(BaseModel):
     url = models.URLField(max_length=1000, blank=True)
     
     class Meta:
+        # created_at'e göre aylık partition'lı tablo (bkz. PartitionService)
         db_table = 'analytics_events'
         ordering = ['-created_at']
         indexes = [
@@ -261,6 +261,12 @@ class Tenant(BaseModel):
         help_text="Depo çıkış sayfası için özel URL (örn: panel.karatekinrot.com). Boşsa ana domain kullanılır."
     )
     
+    # İşlem logu ayarları
+    activity_log_retention_limit = models.PositiveIntegerField(
+        default=1000,
+        help_text="Saklanacak en fazla işlem logu sayısı (eskiler periyodik temizlikte silinir)."
+    )
+    
     # Metadata
     activated_at = models.DateTimeField(null=True, blank=True)
     suspended_at = models.DateTimeField(null=True, blank=True)
@@ -123,131 +123,24 @@ class Cart(BaseModel):
             return f"Cart - {self.customer.email} ({self.tenant.name})"
         return f"Cart - Guest ({self.tenant.name})"
     
-    def calculate_totals(self):
-        """Sepet toplamlarını hesapla."""
-        items = self.items.filter(is_deleted=False)
-        TWOPLACES = Decimal('0.01')
+    def refresh_from_db(self, *args, **kwargs):
+        """DB'den yenilenen sepette önceki hesaplama sonucu (totals) geçersizdir."""
+        self.__dict__.pop('totals', None)
+        super().refresh_from_db(*args, **kwargs)
+    
+    def calculate_totals(self, currency_context=None):
+        """
+        Sepet toplamlarını hesapla ve kaydet.
+        Hesaplama CartTotalsService'te; sonuç (CartTotals) self.totals'a da atanır.
         
-        # Her hesaplamada ürün fiyatlarını güncelle (güncel kur ve fiyat için)
-        temp_subtotal = Decimal('0.00')
-        eligible_subtotal = Decimal('0.00') # Kupon ve ödeme için geçerli olan tutar
+        Args:
+            currency_context: Opsiyonel CurrencyContext (kurlar tüm kalemler için bir kez yüklenir)
         
-        for item in items:
-            # Ürün veya varyant fiyatını al
-            if item.variant:
-                base_price = item.variant.price
-                product_currency = item.product.currency or 'TRY'
-                is_available = item.variant.is_available(item.quantity)
-            else:
-                base_price = item.product.price
-                product_currency = item.product.currency or 'TRY'
-                is_available = item.product.is_available(item.quantity)
-            
-            cart_currency = self.currency or 'TRY'
-            
-            # Para birimi dönüşümü yap
-            if product_currency != cart_currency:
-                from apps.services.currency_service import CurrencyService
-                try:
-                    current_unit_price = CurrencyService.convert_amount(
-                        base_price,
-                        product_currency,
-                        cart_currency
-                    )
-                except Exception:
-                    current_unit_price = base_price
-            else:
-                current_unit_price = base_price
-            
-            # Item'ı güncelle (DB'ye yazmadan sadece toplama ekle)
-            item.unit_price = current_unit_price
-            item.total_price = current_unit_price * item.quantity
-            
-            # Tüm sepet toplamı (Görsel referans için)
-            temp_subtotal += item.total_price
-            
-            # Sadece seçili VE stokta olanları kupon/ödeme matrahına ekle
-            if item.is_selected and is_available:
-                eligible_subtotal += item.total_price
-            
-            # DB'deki snapshot'ı da güncelle
-            CartItem.objects.filter(id=item.id).update(
-                unit_price=item.unit_price,
-                total_price=item.total_price
-            )
-
-        self.subtotal = temp_subtotal
-        self.eligible_subtotal = eligible_subtotal.quantize(TWOPLACES)
-        
-        # Kargo ücreti hesaplama (eligible tutar üzerinden)
-        if self.shipping_method:
-            if self.shipping_method.free_shipping_threshold:
-                if eligible_subtotal >= self.shipping_method.free_shipping_threshold:
-                    self.shipping_cost = Decimal('0.00')
-                else:
-                    self.shipping_cost = self.shipping_method.price
-            else:
-                self.shipping_cost = self.shipping_method.price
-        else:
-            self.shipping_cost = Decimal('0.00')
-        
-        # Vergi hesaplama (Dinamik - Tenant bazlı, eligible tutar üzerinden)
-        from apps.models import Tax
-        active_tax = Tax.objects.filter(
-            tenant=self.tenant,
-            is_active=True,
-            is_deleted=False
-        ).order_by('-is_default', '-created_at').first()
-        
-        tax_rate = active_tax.rate if active_tax else Decimal('0.00')
-        tax_amount = eligible_subtotal * (tax_rate / Decimal('100'))
-        self.tax_amount = tax_amount
-        
-        # Vergi dahil tutar (Kupon bu tutar üzerinden hesaplanır)
-        eligible_subtotal_with_tax = eligible_subtotal + tax_amount
-        
-        # Kupon indirimi hesapla (VERGİ DAHİL tutar üzerinden!)
-        coupon_discount = Decimal('0.00')
-        if self.coupon:
-            try:
-                # Kupon geçerliliğini kontrol et (VERGİ DAHİL tutar üzerinden)
-                is_valid, msg = self.coupon.is_valid(
-                    customer_email=self.customer.email if self.customer else None,
-                    order_amount=eligible_subtotal_with_tax,
-                    target_currency=self.currency or 'TRY'
-                )
-                if is_valid:
-                    coupon_discount = self.coupon.calculate_discount(
-                        eligible_subtotal_with_tax,
-                        target_currency=self.currency or 'TRY'
-                    )
-                    # Ücretsiz kargo kontrolü
-                    if self.coupon.discount_type == self.coupon.DiscountType.FREE_SHIPPING:
-                        self.shipping_cost = Decimal('0.00')
-                else:
-                    logger.warning(f"[CART_CALC] Coupon {self.coupon.code} invalid for tax-inclusive amount {eligible_subtotal_with_tax}: {msg}")
-            except Exception as e:
-                logger.warning(f"[CART_CALC] Error calculating coupon discount: {e}")
-                pass
-        
-        self.discount_amount = coupon_discount
-        
-        # Yuvarlama
-        self.subtotal = self.subtotal.quantize(TWOPLACES)
-        self.shipping_cost = self.shipping_cost.quantize(TWOPLACES)
-        self.tax_amount = self.tax_amount.quantize(TWOPLACES)
-        self.discount_amount = self.discount_amount.quantize(TWOPLACES)
-        
-        # Ödenecek Toplamı hesapla (Sadece eligible ürünler + kargo + vergi - indirim)
-        gross_total = (eligible_subtotal + self.shipping_cost + self.tax_amount)
-        self.total = max(Decimal('0.00'), (gross_total - self.discount_amount)).quantize(TWOPLACES)
-        
-        logger.info(
-            f"[CART_CALC] Cart {self.id} | Total Subtotal: {self.subtotal} | "
-            f"Eligible Subtotal: {eligible_subtotal} | Total to Pay: {self.total}"
-        )
-        self.save()
-        return self.total
+        Returns:
+            Decimal: Ödenecek toplam
+        """
+        from apps.services.cart_totals_service import CartTotalsService
+        return CartTotalsService.calculate(self, currency_context=currency_context).total
 
 
 class CartItem(BaseModel):
@@ -113,26 +113,24 @@ class Tax(BaseModel):
         return amount * (self.rate / Decimal('100'))
     
     def save(self, *args, **kwargs):
-        """Save metodunu override et - Aktif olduğunda tüm ürünlerin KDV dahil fiyatlarını güncelle."""
-        # is_active veya rate değişip değişmediğini kontrol et
-        is_new = self.pk is None
+        """Save metodunu override et - KDV dahil fiyatları etkileyen değişiklikte repricing planla."""
+        # is_active, is_deleted, rate veya is_default değişip değişmediğini kontrol et
+        is_new = self.pk is None or self._state.adding
+        changed = False
         if not is_new:
-            try:
-                old_instance = Tax.objects.get(pk=self.pk)
-                active_changed = old_instance.is_active != self.is_active
-                rate_changed = old_instance.rate != self.rate
-            except Tax.DoesNotExist:
-                active_changed = False
-                rate_changed = False
-        else:
-            active_changed = False
-            rate_changed = False
+            old_values = Tax.objects.filter(pk=self.pk).values('is_active', 'is_deleted', 'rate', 'is_default').first()
+            if old_values is not None:
+                changed = (
+                    old_values['is_active'] != self.is_active
+                    or old_values['is_deleted'] != self.is_deleted
+                    or old_values['rate'] != self.rate
+                    or (self.is_active and old_values['is_default'] != self.is_default)
+                )
         
         super().save(*args, **kwargs)
         
-        # Eğer aktif edildiyse veya oran değiştiyse, tüm ürünlerin price_with_vat'ini güncelle
-        if (is_new and self.is_active) or (active_changed and self.is_active) or rate_changed:
-            # Background task olarak tüm ürünleri güncelle
-            from apps.tasks.product_task import update_all_products_price_with_vat
-            update_all_products_price_with_vat.delay(str(self.tenant.id))
-
+        # Aktif vergi eklendiyse veya aktif vergi seti değiştiyse price_with_vat'leri güncelle
+        # (art arda kayıtlar tek task çalıştırmasında birleştirilir)
+        if (is_new and self.is_active) or changed:
+            from apps.services.vat_repricing_service import VatRepricingService
+            VatRepricingService.schedule(self.tenant_id)
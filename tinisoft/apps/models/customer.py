@@ -108,29 +108,20 @@ class Customer(BaseModel):
         return f"{self.first_name} {self.last_name} ({self.tenant.name})"
     
     def update_statistics(self):
-        """Müşteri istatistiklerini güncelle."""
+        """
+        Müşteri istatistiklerini tam olarak yeniden hesapla (tek aggregate sorgusu).
+        Sipariş akışında istatistikler artımlı güncellenir (CustomerService.record_order_*).
+        """
         from .order import Order
+        from apps.services.customer_service import CustomerService
         
-        orders = Order.objects.filter(
-            tenant=self.tenant,
-            customer=self.user,
+        aggregates = Order.objects.filter(
+            tenant_id=self.tenant_id,
+            customer_id=self.user_id,
             is_deleted=False,
-        )
+        ).aggregate(**CustomerService.get_statistics_aggregates())
         
-        self.total_orders = orders.count()
-        
-        if self.total_orders > 0:
-            self.total_spent = sum(order.total for order in orders)
-            self.average_order_value = self.total_spent / self.total_orders
-            
-            # İlk ve son sipariş tarihleri
-            first_order = orders.order_by('created_at').first()
-            last_order = orders.order_by('-created_at').first()
-            
-            if first_order:
-                self.first_order_at = first_order.created_at
-            if last_order:
-                self.last_order_at = last_order.created_at
-        
-        self.save()
+        for field, value in CustomerService.build_statistics(aggregates).items():
+            setattr(self, field, value)
+        self.save(update_fields=CustomerService.STATISTICS_FIELDS + ['updated_at'])
 
@@ -105,6 +105,7 @@ class InventoryMovement(BaseModel):
     )
     
     class Meta:
+        # created_at'e göre aylık partition'lı tablo (bkz. PartitionService)
         db_table = 'inventory_movements'
         ordering = ['-created_at']
         indexes = [
@@ -145,6 +145,11 @@ class Order(BaseModel):
         related_name='orders',
     )
     tracking_number = models.CharField(max_length=100, blank=True)
+    cargo_status = models.CharField(max_length=100, blank=True, help_text="Kargo firmasından son alınan durum")
+    cargo_status_code = models.CharField(max_length=20, blank=True, help_text="Kargo firmasının durum kodu")
+    cargo_checked_at = models.DateTimeField(null=True, blank=True, help_text="Kargo durumunun son sorgulandığı zaman")
+    cargo_status_changed_at = models.DateTimeField(null=True, blank=True, help_text="Kargo durumunun son değiştiği zaman")
+    cargo_status_hash = models.CharField(max_length=64, blank=True, help_text="Son kargo sorgu cevabının hash'i (değişiklik tespiti)")
     shipped_at = models.DateTimeField(null=True, blank=True)
     delivered_at = models.DateTimeField(null=True, blank=True)
     
@@ -180,8 +185,11 @@ class Order(BaseModel):
         indexes = [
             models.Index(fields=['tenant', 'status']),
             models.Index(fields=['tenant', 'payment_status']),
+            models.Index(fields=['tenant', 'status', 'cargo_checked_at']),
+            models.Index(fields=['tenant', 'updated_at']),
             models.Index(fields=['order_number']),
             models.Index(fields=['customer_email']),
+            models.Index(fields=['tenant', 'customer_email', 'created_at']),  # Yeni müşteri (NOT EXISTS)
             models.Index(fields=['created_at']),
         ]
     
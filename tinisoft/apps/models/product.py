@@ -3,6 +3,8 @@ Gelişmiş ürün modelleri - Tenant-specific.
 Her tenant'ın kendi schema'sında ürün, varyant, opsiyon ve görsel tabloları olur.
 """
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from core.models import BaseModel
 
 
@@ -29,6 +31,10 @@ class Category(BaseModel):
     )
     is_active = models.BooleanField(default=True)
     sort_order = models.IntegerField(default=0, help_text="Sıralama (küçükten büyüğe)")
+    # Materialized path: kökten bu kategoriye kadar ID'ler ("<kök_hex>/.../<kendi_hex>/").
+    # save() içinde CategoryTreeService tarafından tutulur; alt ağaç tek sorguda bulunur.
+    path = models.CharField(max_length=2000, blank=True, default='', db_index=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False, help_text="Kök kategori: 0")
 
     class Meta:
         db_table = 'categories'
@@ -41,6 +47,23 @@ class Category(BaseModel):
     def __str__(self):
         return f"{self.name} ({self.tenant.name})"
 
+    def save(self, *args, **kwargs):
+        """Path/depth'i parent'a göre güncelle; kategori taşındıysa alt ağacın path'lerini de yeniden yaz."""
+        from django.db import transaction
+        from apps.services.category_tree_service import CategoryTreeService
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'parent', 'parent_id'} & set(update_fields):
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            old_path = CategoryTreeService.assign_path(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'path', 'depth'}
+            super().save(*args, **kwargs)
+            if old_path and old_path != self.path:
+                CategoryTreeService.move_subtree(self, old_path)
+
 
 class Brand(BaseModel):
     """
@@ -426,6 +449,50 @@ class Product(BaseModel):
         blank=True,
         help_text="Teknik özellikler (JSON list: [{'key': 'Başlık', 'value': 'Değer'}])"
     )
+    
+    # Full-text arama vektörü (PostgreSQL tsvector)
+    # DB trigger'ı tarafından güncellenir (bkz. setup_search_index komutu)
+    search_vector = SearchVectorField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Arama vektörü (otomatik - trigger ile güncellenir)"
+    )
+
+    # Listeleme için denormalize alanlar (ProductListingService tarafından tutulur).
+    # Varyant / görsel / stok değişikliklerinde signal'lar ile yenilenir; elle düzeltme için:
+    # python manage.py repair_product_listing
+    listing_min_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Listeleme min fiyatı (varyant varsa varyantların min fiyatı, yoksa price)"
+    )
+    listing_max_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Listeleme max fiyatı (varyant varsa varyantların max fiyatı, yoksa price)"
+    )
+    listing_stock_quantity = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text="Toplam gerçek stok (varyant varsa varyantların toplamı)"
+    )
+    listing_in_stock = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text="Satın alınabilir mi? (gerçek/sanal stok, backorder veya stok takibi yok)"
+    )
+    listing_primary_image_url = models.TextField(
+        blank=True,
+        editable=False,
+        help_text="Ana görsel URL'i (is_primary, yoksa ilk görsel)"
+    )
 
     class Meta:
         db_table = 'products'
@@ -435,8 +502,11 @@ class Product(BaseModel):
             models.Index(fields=['tenant', 'slug']),
             models.Index(fields=['tenant', 'is_visible']),
             models.Index(fields=['tenant', 'is_featured']),
+            models.Index(fields=['tenant', 'listing_min_price']),
+            models.Index(fields=['tenant', 'listing_in_stock']),
             models.Index(fields=['sku']),
             models.Index(fields=['sort_order']),
+            GinIndex(fields=['search_vector'], name='products_search_vector_gin'),
         ]
 
     def __str__(self):
@@ -502,6 +572,30 @@ class ProductImage(BaseModel):
     position = models.PositiveIntegerField(default=0)
     is_primary = models.BooleanField(default=False)
 
+    # Görsel işleme (ImageProcessingService)
+    class ProcessingStatus(models.TextChoices):
+        PENDING = 'pending', 'Bekliyor'
+        READY = 'ready', 'Hazır'
+        SKIPPED = 'skipped', 'Atlandı'  # SVG / animasyonlu görsel - orijinal kullanılır
+        FAILED = 'failed', 'Başarısız'
+
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        help_text="Orijinal görsel içeriğinin SHA-256 hash'i (tekrar yükleme tespiti)",
+    )
+    variants = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Boyut varyantları: {'thumbnail': {'webp': url, 'jpeg': url, 'width': int, 'height': int}, ...}",
+    )
+    processing_status = models.CharField(
+        max_length=20,
+        choices=ProcessingStatus.choices,
+        default=ProcessingStatus.PENDING,
+    )
+
     class Meta:
         db_table = 'product_images'
         ordering = ['position', 'created_at']
@@ -576,6 +670,14 @@ class ProductVariant(BaseModel):
         blank=True,
         help_text="İndirim yüzdesi (opsiyonel, örn: 25.00 = %25 indirim)"
     )
+    # KDV dahil fiyat (Tax modelinden otomatik hesaplanır)
+    price_with_vat = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="KDV dahil fiyat (tenant'ın aktif Tax'ından otomatik hesaplanır)"
+    )
 
     # Stok
     track_inventory = models.BooleanField(default=True)
@@ -642,11 +744,26 @@ class ProductVariant(BaseModel):
         
         return available_qty >= quantity
 
-    def save(self, *args, **kwargs):
-        """Save metodunu override et."""
+    def save(self, *args, tenant_id=None, **kwargs):
+        """
+        Save metodunu override et - KDV dahil fiyatı tenant'ın aktif Tax oranından hesapla.
+        tenant_id verilirse (veya product zaten yüklüyse) ürün satırı okunmaz.
+        """
         # Sanal stok girildiyse, otomatik olarak stoksuz satışa izin ver
         if self.virtual_stock_quantity is not None and self.virtual_stock_quantity > 0:
             self.allow_backorder = True
+        
+        if self.price is not None:
+            from apps.services.vat_repricing_service import VatRepricingService
+            from apps.services.cart_totals_service import CartTotalsService
+            tax_rate = CartTotalsService.get_active_tax_rate(tenant_id or self._get_tenant_id())
+            self.price_with_vat = self.price * VatRepricingService.get_multiplier(tax_rate)
             
         super().save(*args, **kwargs)
+    
+    def _get_tenant_id(self):
+        """Ürünün tenant_id'si: product yüklüyse ondan, değilse sadece tenant_id kolonu okunur."""
+        if ProductVariant.product.is_cached(self):
+            return self.product.tenant_id
+        return Product.objects.filter(id=self.product_id).values_list('tenant_id', flat=True).first()
 
@@ -52,6 +52,12 @@ class Webhook(BaseModel):
         db_index=True,
     )
     
+    # Teslim
+    batch_delivery = models.BooleanField(
+        default=False,
+        help_text="Aynı anda oluşan event'ler tek istekte {\"events\": [...]} olarak gönderilsin mi?"
+    )
+    
     # İstatistikler
     success_count = models.PositiveIntegerField(default=0)
     failure_count = models.PositiveIntegerField(default=0)
@@ -121,22 +121,16 @@ class HasStaffPermission(permissions.BasePermission):
                 if required not in sensitive_modules:
                     return True
             
-            # 5. YAZMA işlemleri veya HASSAS OKUMA - Redis Cache üzerinden yetki kontrolü
-            from apps.services.cache_service import CacheService
-            user_perms = CacheService.get_user_permissions(request.user.id)
-            
-            cache_hit = user_perms is not None
-            if user_perms is None:
-                # Cache'de yoksa veritabanından/user objesinden al ve Redis'e yaz
-                user_perms = request.user.staff_permissions or []
-                CacheService.set_user_permissions(request.user.id, user_perms)
+            # 5. YAZMA işlemleri veya HASSAS OKUMA - yetkiler principal cache'inden gelen
+            # user üzerinde (JWTAuthentication; kullanıcı değişince invalidate edilir)
+            user_perms = request.user.staff_permissions or []
             
             result = required in user_perms
             logger.info(
                 f"[PERM] Staff write permission check | "
                 f"User: {request.user.email} | Method: {request.method} | "
                 f"Required: '{required}' | User perms: {user_perms} | "
-                f"Cache hit: {cache_hit} | Result: {result}"
+                f"Result: {result}"
             )
             return result
             
@@ -118,8 +118,14 @@ class CartSerializer(serializers.Serializer):
                     })
             return result
         else:
-            # DB sepeti - normal serializer
-            return CartItemSerializer(obj.items.filter(is_deleted=False), many=True, context=self.context).data
+            # DB sepeti - calculate_totals az önce çalıştıysa kalemler zaten yüklü
+            totals = getattr(obj, 'totals', None)
+            if totals is not None:
+                items = totals.items
+            else:
+                from apps.services.cart_totals_service import CartTotalsService
+                items = CartTotalsService.load_items(obj)
+            return CartItemSerializer(items, many=True, context=self.context).data
     
     def get_shipping_method(self, obj):
         """Kargo yöntemini döndür."""
@@ -75,14 +75,17 @@ class OrderDetailSerializer(serializers.ModelSerializer):
             'status', 'status_display', 'payment_status', 'payment_status_display',
             'payment_method', 'payment_method_display',
             'subtotal', 'shipping_cost', 'tax_amount', 'discount_amount', 'total', 'currency',
-            'shipping_method', 'tracking_number',
+            'shipping_method', 'tracking_number', 'cargo_status', 'cargo_status_code', 'cargo_checked_at',
             'customer_note', 'admin_note',
             'items',
             'shipped_at', 'delivered_at',
             'ip_address', 'user_agent',
             'created_at', 'updated_at',
         ]
-        read_only_fields = ['id', 'order_number', 'created_at', 'updated_at']
+        read_only_fields = [
+            'id', 'order_number', 'cargo_status', 'cargo_status_code', 'cargo_checked_at',
+            'created_at', 'updated_at',
+        ]
     
     def get_customer(self, obj):
         """Müşteri bilgisini döndür."""
@@ -3,17 +3,16 @@ Product serializers.
 """
 from rest_framework import serializers
 from decimal import Decimal
+from django.db import models
+from django.db.models import Prefetch
 from apps.models import (
     Product, Category, Brand, ProductImage, ProductOption,
     ProductOptionValue, ProductVariant
 )
-from apps.services.currency_service import CurrencyService
+from apps.services.currency_service import CurrencyContext
+from apps.services.image_processing_service import ImageProcessingService
 from django.utils.html import strip_tags
-import base64
-import uuid
 import logging
-from django.core.files.base import ContentFile
-from django.core.files.storage import default_storage
 
 logger = logging.getLogger(__name__)
 
@@ -21,49 +20,47 @@ logger = logging.getLogger(__name__)
 def upload_base64_image(product, image_url):
     """
     Base64 formatındaki görseli storage'a yükler ve URL döndürür.
+    Dosya içerik hash'ine göre adreslenir; aynı görsel tekrar yazılmaz (ImageProcessingService).
     """
     if not image_url or not image_url.startswith('data:image'):
         return image_url
-        
+
     try:
-        # Base64 format: data:image/[format];base64,[data]
-        if ';base64,' in image_url:
-            format_part, imgstr = image_url.split(';base64,')
-            ext = format_part.split('/')[-1]
-        else:
-            return image_url
-            
-        if ext == 'svg+xml':
-            ext = 'svg'
-        
-        # uzantı temizliği
-        if ext == 'jpeg':
-            ext = 'jpg'
-            
-        data = base64.b64decode(imgstr)
-        
-        # Benzersiz dosya adı oluştur
-        filename = f"{uuid.uuid4()}.{ext}"
-        
-        # Tenant bazlı klasör yapısı: {tenant_id}/products/{product_id}/{filename}
-        # product.tenant might be a lazy relation, ensures ID is accesssed safely
-        if hasattr(product, 'tenant_id'):
-            tenant_id = str(product.tenant_id)
-        else:
-            tenant_id = str(product.tenant.id)
-            
-        file_path = f'{tenant_id}/products/{product.id}/{filename}'
-        
-        # Storage'a kaydet
-        saved_path = default_storage.save(file_path, ContentFile(data))
-        file_url = default_storage.url(saved_path)
-        
-        return file_url
+        return ImageProcessingService.upload_data_url(product.tenant_id, image_url)
     except Exception as e:
         logger.error(f"Base64 upload error: {e}")
         return image_url
 
 
+class CurrencyDisplayMixin:
+    """
+    display_* fiyat alanları için ortak yardımcılar.
+    Kurlar istek başına bir kez yüklenir (CurrencyContext), satır başına cache'e gidilmez.
+    """
+    
+    def _get_currency_context(self):
+        """Context'teki veya request'e bağlı kur snapshot'ı (request yoksa None)."""
+        currency_context = self.context.get('currency_context')
+        if currency_context is None:
+            request = self.context.get('request')
+            if not request:
+                return None
+            currency_context = CurrencyContext.for_request(request)
+        return currency_context
+    
+    def _display_amounts(self, amounts, from_currency):
+        """Tutarları kullanıcının seçtiği para birimine çevirip string olarak döndür (None -> None)."""
+        currency_context = self._get_currency_context()
+        converted = amounts
+        if currency_context is not None and currency_context.needs_conversion(from_currency):
+            try:
+                converted = currency_context.convert_many(amounts, from_currency)
+            except Exception:
+                # Hata durumunda orijinal fiyatları döndür
+                converted = amounts
+        return [None if amount is None else str(amount) for amount in converted]
+
+
 class BrandSerializer(serializers.ModelSerializer):
     """Brand serializer."""
     product_count = serializers.SerializerMethodField()
@@ -94,14 +91,30 @@ class CategorySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
     
+    # Context'te tenant başına kategori indeksi (CategoryTreeService.build_index) tutulur;
+    # iç içe serializer'lar aynı context'i paylaştığından ağaç tek seferde yüklenir.
+    TREE_INDEX_CONTEXT_KEY = 'category_tree_index'
+    
+    def _get_tree_index(self, obj):
+        from apps.services.category_tree_service import CategoryTreeService
+        
+        indexes = self.context.setdefault(self.TREE_INDEX_CONTEXT_KEY, {})
+        tenant_key = str(obj.tenant_id)
+        if tenant_key not in indexes:
+            indexes[tenant_key] = CategoryTreeService.build_index(obj.tenant_id)
+        return indexes[tenant_key]
+    
     def get_children(self, obj):
         """Alt kategorileri döndür."""
-        children = obj.children.filter(is_deleted=False, is_active=True)
-        return CategorySerializer(children, many=True).data
+        children = [
+            child for child in self._get_tree_index(obj)['children'].get(obj.id, [])
+            if child.is_active
+        ]
+        return CategorySerializer(children, many=True, context=self.context).data
     
     def get_product_count(self, obj):
         """Kategorideki ürün sayısı."""
-        return obj.products.filter(is_deleted=False, status='active').count()
+        return self._get_tree_index(obj)['product_counts'].get(obj.id, 0)
 
     def validate(self, attrs):
         """Döngüsel kategori kontrolü."""
@@ -137,30 +150,14 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class ProductImageSerializer(serializers.ModelSerializer):
     """Product image serializer."""
-    image_url = serializers.SerializerMethodField()
     
     class Meta:
         model = ProductImage
         fields = [
             'id', 'image_url', 'alt_text', 'position', 'is_primary',
-            'created_at',
+            'variants', 'processing_status', 'created_at',
         ]
-        read_only_fields = ['id', 'created_at']
-
-    def get_image_url(self, obj):
-        """
-        Görsel URL'ini döndür. Eğer veritabanında base64 varsa,
-        otomatik olarak storage'a yükle ve güncelle (Lazy Migration).
-        """
-        url = obj.image_url
-        if url and url.startswith('data:image'):
-            new_url = upload_base64_image(obj.product, url)
-            if new_url != url:
-                # DB'yi güncelle
-                obj.image_url = new_url
-                obj.save(update_fields=['image_url'])
-                return new_url
-        return url
+        read_only_fields = ['id', 'variants', 'processing_status', 'created_at']
 
 
 class ProductOptionValueSerializer(serializers.ModelSerializer):
@@ -182,7 +179,7 @@ class ProductOptionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class ProductVariantSerializer(serializers.ModelSerializer):
+class ProductVariantSerializer(CurrencyDisplayMixin, serializers.ModelSerializer):
     """Product variant serializer."""
     name = serializers.CharField(required=False, allow_blank=True)
     price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True)
@@ -193,14 +190,14 @@ class ProductVariantSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductVariant
         fields = [
-            'id', 'name', 'price', 'compare_at_price', 'compare_percentage',
+            'id', 'name', 'price', 'compare_at_price', 'compare_percentage', 'price_with_vat',
             'display_price', 'display_compare_at_price',
             'track_inventory', 'inventory_quantity',
             'allow_backorder', 'virtual_stock_quantity',
             'sku', 'barcode', 'option_values', 'is_default',
             'image_url', 'created_at',
         ]
-        read_only_fields = ['id', 'created_at', 'display_price', 'display_compare_at_price']
+        read_only_fields = ['id', 'created_at', 'price_with_vat', 'display_price', 'display_compare_at_price']
     
     def to_representation(self, instance):
         """Varyantın option value'larını detaylı göster (READ)."""
@@ -231,64 +228,30 @@ class ProductVariantSerializer(serializers.ModelSerializer):
     
     def get_display_price(self, obj):
         """Kullanıcının seçtiği para birimine göre fiyat göster."""
-        request = self.context.get('request')
-        if not request:
-            return str(obj.price)
-        
-        # Request'ten para birimi al (header'dan veya query param'dan)
-        target_currency = request.headers.get('X-Currency-Code') or request.query_params.get('currency', 'TRY')
-        target_currency = target_currency.upper()
-        
-        # Ürünün para birimini al (parent product'tan)
-        product = obj.product
-        from_currency = product.currency or 'TRY'
-        
-        # Aynı para birimiyse direkt döndür
-        if from_currency == target_currency:
-            return str(obj.price)
-        
-        # Para birimi dönüşümü yap
-        try:
-            converted_price = CurrencyService.convert_amount(
-                obj.price,
-                from_currency,
-                target_currency
-            )
-            return str(converted_price)
-        except Exception as e:
-            # Hata durumunda orijinal fiyatı döndür
-            return str(obj.price)
+        # Ürünün para birimi parent product'tan
+        return self._display_amounts([obj.price], obj.product.currency or 'TRY')[0]
     
     def get_display_compare_at_price(self, obj):
         """Kullanıcının seçtiği para birimine göre karşılaştırma fiyatı göster."""
         if not obj.compare_at_price:
             return None
-        
-        request = self.context.get('request')
-        if not request:
-            return str(obj.compare_at_price)
-        
-        target_currency = request.headers.get('X-Currency-Code') or request.query_params.get('currency', 'TRY')
-        target_currency = target_currency.upper()
-        
-        product = obj.product
-        from_currency = product.currency or 'TRY'
-        
-        if from_currency == target_currency:
-            return str(obj.compare_at_price)
-        
-        try:
-            converted_price = CurrencyService.convert_amount(
-                obj.compare_at_price,
-                from_currency,
-                target_currency
-            )
-            return str(converted_price)
-        except Exception:
-            return str(obj.compare_at_price)
+        return self._display_amounts([obj.compare_at_price], obj.product.currency or 'TRY')[0]
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListBatchSerializer(serializers.ListSerializer):
+    """
+    ProductListSerializer(many=True) için liste serializer'ı.
+    Sayfadaki tüm ürünlerin varyant grubu ürünlerini tek sorguda yükler.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        items = list(iterable)
+        self.child._variant_group_map = ProductListSerializer.build_variant_group_map(items)
+        return super().to_representation(items)
+
+
+class ProductListSerializer(CurrencyDisplayMixin, serializers.ModelSerializer):
     """Product list serializer (lightweight)."""
     primary_image = serializers.SerializerMethodField()
     images = serializers.SerializerMethodField()
@@ -357,156 +320,152 @@ class ProductListSerializer(serializers.ModelSerializer):
             'available_quantity', 'is_in_stock', 'variant_group_products', 'warehouse_qr_urls', 'created_at',
         ]
         read_only_fields = ['id', 'created_at', 'price_with_vat', 'display_price', 'display_compare_at_price', 'display_min_price', 'display_max_price']
+        list_serializer_class = ProductListBatchSerializer
+    
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Liste sayfası için gereken ilişkileri sayfa başına sabit sayıda sorguyla yükle.
+        - tenant / brand_item: JOIN (select_related)
+        - aktif görseller ve kategoriler: tek Prefetch sorgusu
+        - varyant min/max fiyatı: denormalize listing_min_price / listing_max_price kolonları
+        """
+        return queryset.select_related('tenant', 'brand_item').prefetch_related(
+            Prefetch(
+                'images',
+                queryset=ProductImage.objects.filter(is_deleted=False).order_by('position', 'created_at'),
+                to_attr='active_images',
+            ),
+            Prefetch(
+                'categories',
+                queryset=Category.objects.filter(is_deleted=False, is_active=True),
+                to_attr='active_categories',
+            ),
+        )
+    
+    @staticmethod
+    def build_variant_group_map(products):
+        """
+        Ürün listesindeki variant_group_sku'lar için grup ürünlerini tek sorguda getir.
+        Dönüş: {(tenant_id, variant_group_sku): [ {id, name, slug, price, sku}, ... ]}
+        """
+        group_keys = {(p.tenant_id, p.variant_group_sku) for p in products if p.variant_group_sku}
+        if not group_keys:
+            return {}
+        
+        rows = Product.objects.filter(
+            tenant_id__in={tenant_id for tenant_id, _ in group_keys},
+            variant_group_sku__in={sku for _, sku in group_keys},
+            is_deleted=False,
+            status='active'
+        ).values('id', 'name', 'slug', 'price', 'sku', 'tenant_id', 'variant_group_sku')
+        
+        group_map = {}
+        for row in rows:
+            key = (row.pop('tenant_id'), row.pop('variant_group_sku'))
+            if key in group_keys:
+                group_map.setdefault(key, []).append(row)
+        return group_map
+    
+    def _get_active_images(self, obj):
+        """Silinmemiş görseller (prefetch varsa oradan, yoksa tek sorgu ve satır bazlı memoize)."""
+        images = getattr(obj, 'active_images', None)
+        if images is None:
+            images = list(obj.images.filter(is_deleted=False).order_by('position', 'created_at'))
+            obj.active_images = images
+        return images
+    
+    def _get_variant_price_range(self, obj):
+        """Silinmemiş varyantların (min, max) fiyatı; varyant yoksa (None, None)."""
+        if obj.listing_min_price is not None:
+            # Denormalize kolonlar (ProductListingService) - varyant yoksa ürün fiyatını tutar
+            return obj.listing_min_price, obj.listing_max_price
+        price_range = getattr(obj, '_variant_price_range', None)
+        if price_range is None:
+            prices = [v.price for v in obj.variants.all() if not v.is_deleted]
+            price_range = (min(prices), max(prices)) if prices else (None, None)
+            obj._variant_price_range = price_range
+        return price_range
     
     def get_primary_image(self, obj):
         """Ana görseli döndür."""
-        image = obj.images.filter(is_primary=True, is_deleted=False).first()
-        if not image:
-            image = obj.images.filter(is_deleted=False).first()
+        if obj.listing_primary_image_url:
+            return obj.listing_primary_image_url
+        images = self._get_active_images(obj)
+        image = next((img for img in images if img.is_primary), None)
+        if not image and images:
+            image = images[0]
         
         if image:
-            # Lazy migration check
-            if image.image_url and image.image_url.startswith('data:image'):
-                new_url = upload_base64_image(obj, image.image_url)
-                if new_url != image.image_url:
-                    image.image_url = new_url
-                    image.save(update_fields=['image_url'])
-                return new_url
+            # Base64 görseller okuma yolunda dönüştürülmez (ImageProcessingService)
             return image.image_url
             
         return None
     
     def get_images(self, obj):
         """Tüm görselleri döndür (sıralı)."""
-        images = obj.images.filter(is_deleted=False).order_by('position', 'created_at')
-        return ProductImageSerializer(images, many=True).data
+        return ProductImageSerializer(self._get_active_images(obj), many=True).data
     
     def get_category_names(self, obj):
         """Kategori isimlerini döndür."""
-        return [cat.name for cat in obj.categories.filter(is_deleted=False, is_active=True)]
+        categories = getattr(obj, 'active_categories', None)
+        if categories is None:
+            categories = obj.categories.filter(is_deleted=False, is_active=True)
+        return [cat.name for cat in categories]
     
     def get_min_price(self, obj):
         """Minimum fiyat (varyant varsa varyantların min fiyatı)."""
         if obj.is_variant_product:
-            variants = obj.variants.filter(is_deleted=False)
-            if variants.exists():
-                return min(v.price for v in variants)
+            min_price, _ = self._get_variant_price_range(obj)
+            if min_price is not None:
+                return min_price
         return obj.price
     
     def get_max_price(self, obj):
         """Maximum fiyat (varyant varsa varyantların max fiyatı)."""
         if obj.is_variant_product:
-            variants = obj.variants.filter(is_deleted=False)
-            if variants.exists():
-                return max(v.price for v in variants)
+            _, max_price = self._get_variant_price_range(obj)
+            if max_price is not None:
+                return max_price
         return obj.price
     
+    def _get_display_prices(self, obj):
+        """
+        Satırın tüm display fiyatlarını tek seferde çevir (price, compare_at, min, max).
+        Dönüş: {'price': str, 'compare_at_price': str|None, 'min_price': str|None, 'max_price': str|None}
+        """
+        currency_context = self._get_currency_context()
+        cache_key = currency_context.target_currency if currency_context else None
+        cached = getattr(obj, '_display_prices', None)
+        if cached is not None and cached[0] == cache_key:
+            display_prices = cached[1]
+        else:
+            keys = ('price', 'compare_at_price', 'min_price', 'max_price')
+            amounts = [
+                obj.price,
+                obj.compare_at_price or None,
+                self.get_min_price(obj),
+                self.get_max_price(obj),
+            ]
+            display_prices = dict(zip(keys, self._display_amounts(amounts, obj.currency or 'TRY')))
+            obj._display_prices = (cache_key, display_prices)
+        return display_prices
+    
     def get_display_price(self, obj):
         """Kullanıcının seçtiği para birimine göre fiyat göster."""
-        request = self.context.get('request')
-        if not request:
-            return str(obj.price)
-        
-        target_currency = request.headers.get('X-Currency-Code') or request.query_params.get('currency', 'TRY')
-        target_currency = target_currency.upper()
-        
-        from_currency = obj.currency or 'TRY'
-        
-        if from_currency == target_currency:
-            return str(obj.price)
-        
-        try:
-            converted_price = CurrencyService.convert_amount(
-                obj.price,
-                from_currency,
-                target_currency
-            )
-            return str(converted_price)
-        except Exception:
-            return str(obj.price)
+        return self._get_display_prices(obj)['price']
     
     def get_display_compare_at_price(self, obj):
         """Kullanıcının seçtiği para birimine göre karşılaştırma fiyatı göster."""
-        if not obj.compare_at_price:
-            return None
-        
-        request = self.context.get('request')
-        if not request:
-            return str(obj.compare_at_price)
-        
-        target_currency = request.headers.get('X-Currency-Code') or request.query_params.get('currency', 'TRY')
-        target_currency = target_currency.upper()
-        
-        from_currency = obj.currency or 'TRY'
-        
-        if from_currency == target_currency:
-            return str(obj.compare_at_price)
-        
-        try:
-            converted_price = CurrencyService.convert_amount(
-                obj.compare_at_price,
-                from_currency,
-                target_currency
-            )
-            return str(converted_price)
-        except Exception:
-            return str(obj.compare_at_price)
+        return self._get_display_prices(obj)['compare_at_price']
     
     def get_display_min_price(self, obj):
         """Kullanıcının seçtiği para birimine göre minimum fiyat göster."""
-        min_price = self.get_min_price(obj)
-        if min_price is None:
-            return None
-        
-        request = self.context.get('request')
-        if not request:
-            return str(min_price)
-        
-        target_currency = request.headers.get('X-Currency-Code') or request.query_params.get('currency', 'TRY')
-        target_currency = target_currency.upper()
-        
-        from_currency = obj.currency or 'TRY'
-        
-        if from_currency == target_currency:
-            return str(min_price)
-        
-        try:
-            converted_price = CurrencyService.convert_amount(
-                Decimal(str(min_price)),
-                from_currency,
-                target_currency
-            )
-            return str(converted_price)
-        except Exception:
-            return str(min_price)
+        return self._get_display_prices(obj)['min_price']
     
     def get_display_max_price(self, obj):
         """Kullanıcının seçtiği para birimine göre maximum fiyat göster."""
-        max_price = self.get_max_price(obj)
-        if max_price is None:
-            return None
-        
-        request = self.context.get('request')
-        if not request:
-            return str(max_price)
-        
-        target_currency = request.headers.get('X-Currency-Code') or request.query_params.get('currency', 'TRY')
-        target_currency = target_currency.upper()
-        
-        from_currency = obj.currency or 'TRY'
-        
-        if from_currency == target_currency:
-            return str(max_price)
-        
-        try:
-            converted_price = CurrencyService.convert_amount(
-                Decimal(str(max_price)),
-                from_currency,
-                target_currency
-            )
-            return str(converted_price)
-        except Exception:
-            return str(max_price)
+        return self._get_display_prices(obj)['max_price']
         
     def get_brand_name(self, obj):
         """Marka bilgisini brand_item veya legacy brand alanından al."""
@@ -559,6 +518,14 @@ class ProductListSerializer(serializers.ModelSerializer):
         if not obj.variant_group_sku:
             return []
         
+        # Liste serializer'ı sayfa için toplu yüklediyse oradan al
+        group_map = getattr(self, '_variant_group_map', None)
+        if group_map is not None:
+            return [
+                dict(row) for row in group_map.get((obj.tenant_id, obj.variant_group_sku), [])
+                if row['id'] != obj.id
+            ]
+        
         # Aynı SKU grubundaki diğer ürünleri getir (kendisi hariç)
         variant_products = Product.objects.filter(
             tenant=obj.tenant,
@@ -580,7 +547,13 @@ class ProductListSerializer(serializers.ModelSerializer):
         default_url = f"{default_base}/inventory/quick-exit/product/{obj.id}{slug_qs}"
 
         # 2. Custom URL (Müşterinin kendi sitesi veya özel depo adresi)
-        custom_base = tenant.get_warehouse_base_url()
+        # Domain sorgusu liste boyunca tenant başına bir kez yapılır
+        if not hasattr(self, '_warehouse_base_urls'):
+            self._warehouse_base_urls = {}
+        base_urls = self._warehouse_base_urls
+        if obj.tenant_id not in base_urls:
+            base_urls[obj.tenant_id] = tenant.get_warehouse_base_url()
+        custom_base = base_urls[obj.tenant_id]
         custom_url = f"{custom_base}/inventory/quick-exit/product/{obj.id}{slug_qs}"
 
         # 3. Corrected URL (Seçili olan)
@@ -593,7 +566,7 @@ class ProductListSerializer(serializers.ModelSerializer):
         }
 
 
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductDetailSerializer(CurrencyDisplayMixin, serializers.ModelSerializer):
     """Product detail serializer (full)."""
     images = serializers.ListField(
         child=serializers.DictField(),
@@ -801,6 +774,8 @@ class ProductDetailSerializer(serializers.ModelSerializer):
                 if not image_data.get('image_url'):
                     continue
                 image_data['image_url'] = self._handle_image_url(product, image_data['image_url'])
+                for key in ImageProcessingService.MANAGED_FIELDS:
+                    image_data.pop(key, None)
                 if image_data.get('is_primary', False):
                     ProductImage.objects.filter(product=product, is_deleted=False).update(is_primary=False)
                 ProductImage.objects.create(product=product, **image_data)
@@ -868,15 +843,24 @@ class ProductDetailSerializer(serializers.ModelSerializer):
                         product_image = instance.images.get(id=image_id, is_deleted=False)
                         if image_data.get('is_primary', False):
                             instance.images.filter(is_deleted=False).exclude(id=image_id).update(is_primary=False)
+                        previous_url = product_image.image_url
                         for key, value in image_data.items():
-                            if key != 'id' and hasattr(product_image, key):
+                            if key != 'id' and key not in ImageProcessingService.MANAGED_FIELDS and hasattr(product_image, key):
                                 if key == 'image_url':
                                     value = self._handle_image_url(instance, value)
                                 setattr(product_image, key, value)
+                        # Görsel değiştiyse eski görselin varyantları kullanılmaz, yeniden üretilir
+                        image_changed = product_image.image_url != previous_url
+                        if image_changed:
+                            ImageProcessingService.reset_processing(product_image)
                         product_image.save()
+                        if image_changed:
+                            ImageProcessingService.schedule_processing([product_image])
                     except ProductImage.DoesNotExist: pass
                 else:
                     if not image_data.get('image_url'): continue
+                    for key in ImageProcessingService.MANAGED_FIELDS:
+                        image_data.pop(key, None)
                     image_data['image_url'] = self._handle_image_url(instance, image_data['image_url'])
                     if image_data.get('is_primary', False):
                         instance.images.filter(is_deleted=False).update(is_primary=False)
@@ -942,54 +926,14 @@ class ProductDetailSerializer(serializers.ModelSerializer):
     
     def get_display_price(self, obj):
         """Kullanıcının seçtiği para birimine göre fiyat göster."""
-        request = self.context.get('request')
-        if not request:
-            return str(obj.price)
-        
-        target_currency = request.headers.get('X-Currency-Code') or request.query_params.get('currency', 'TRY')
-        target_currency = target_currency.upper()
-        
-        from_currency = obj.currency or 'TRY'
-        
-        if from_currency == target_currency:
-            return str(obj.price)
-        
-        try:
-            converted_price = CurrencyService.convert_amount(
-                obj.price,
-                from_currency,
-                target_currency
-            )
-            return str(converted_price)
-        except Exception:
-            return str(obj.price)
+        return self._display_amounts([obj.price], obj.currency or 'TRY')[0]
     
     def get_display_compare_at_price(self, obj):
         """Kullanıcının seçtiği para birimine göre karşılaştırma fiyatı göster."""
         if not obj.compare_at_price:
             return None
-        
-        request = self.context.get('request')
-        if not request:
-            return str(obj.compare_at_price)
-        
-        target_currency = request.headers.get('X-Currency-Code') or request.query_params.get('currency', 'TRY')
-        target_currency = target_currency.upper()
-        
-        from_currency = obj.currency or 'TRY'
-        
-        if from_currency == target_currency:
-            return str(obj.compare_at_price)
-        
-        try:
-            converted_price = CurrencyService.convert_amount(
-                obj.compare_at_price,
-                from_currency,
-                target_currency
-            )
-            return str(converted_price)
-        except Exception:
-            return str(obj.compare_at_price)
+        return self._display_amounts([obj.compare_at_price], obj.currency or 'TRY')[0]
+    
     def get_available_quantity(self, obj):
         """Toplam mevcut stok miktarını döndür (gerçek + sanal)."""
         if not obj.track_inventory:
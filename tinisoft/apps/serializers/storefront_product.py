@@ -5,19 +5,27 @@ from apps.services.currency_service import CurrencyService
 class StorefrontImageSerializer(serializers.ModelSerializer):
     url = serializers.CharField(source='image_url')
     altText = serializers.CharField(source='alt_text', allow_blank=True)
+    width = serializers.SerializerMethodField()
+    height = serializers.SerializerMethodField()
+    variants = serializers.SerializerMethodField()
 
     class Meta:
         model = ProductImage
-        fields = ['url', 'altText', 'width', 'height']
+        fields = ['url', 'altText', 'width', 'height', 'variants']
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        # Default dimensions if not present (logic can be improved)
-        if 'width' not in data or not data['width']:
-            data['width'] = 800
-        if 'height' not in data or not data['height']:
-            data['height'] = 800
-        return data
+    def _get_largest_variant(self, obj):
+        sizes = [value for key, value in (obj.variants or {}).items() if key != 'original']
+        return max(sizes, key=lambda value: value.get('width', 0), default={})
+
+    def get_width(self, obj):
+        return self._get_largest_variant(obj).get('width') or 800
+
+    def get_height(self, obj):
+        return self._get_largest_variant(obj).get('height') or 800
+
+    def get_variants(self, obj):
+        """Boyut varyantları: {'thumbnail': {'webp', 'jpeg', 'width', 'height'}, ...}"""
+        return {key: value for key, value in (obj.variants or {}).items() if key != 'original'}
 
 
 class StorefrontCategorySerializer(serializers.ModelSerializer):
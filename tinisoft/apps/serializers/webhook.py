@@ -27,7 +27,7 @@ class WebhookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Webhook
         fields = [
-            'id', 'name', 'url', 'events', 'secret_key', 'status',
+            'id', 'name', 'url', 'events', 'secret_key', 'status', 'batch_delivery',
             'success_count', 'failure_count', 'last_triggered_at',
             'events_count', 'last_event', 'created_at', 'updated_at',
         ]
@@ -51,7 +51,7 @@ class WebhookCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Webhook
         fields = [
-            'name', 'url', 'events', 'status',
+            'name', 'url', 'events', 'status', 'batch_delivery',
         ]
     
     def validate_events(self, value):
@@ -10,8 +10,19 @@ from .payment_service import PaymentService
 from .customer_service import CustomerService
 from .inventory_service import InventoryService
 from .cache_service import CacheService
+from .tenant_cache_service import TenantCacheService
 from .search_service import SearchService
 from .loyalty_service import LoyaltyService
+from .product_export_service import ProductExportService
+from .webhook_service import WebhookService
+from .shipment_sync_service import ShipmentSyncService
+from .analytics_rollup_service import AnalyticsRollupService
+from .analytics_ingest_service import AnalyticsIngestService
+from .partition_service import PartitionService
+from .principal_cache_service import PrincipalCacheService
+from .category_tree_service import CategoryTreeService
+from .product_listing_service import ProductListingService
+from .image_processing_service import ImageProcessingService
 
 __all__ = [
     'AuthService',
@@ -26,6 +37,17 @@ __all__ = [
     'CustomerService',
     'InventoryService',
     'CacheService',
+    'TenantCacheService',
     'SearchService',
     'LoyaltyService',
+    'ProductExportService',
+    'WebhookService',
+    'ShipmentSyncService',
+    'AnalyticsRollupService',
+    'AnalyticsIngestService',
+    'PartitionService',
+    'PrincipalCacheService',
+    'CategoryTreeService',
+    'ProductListingService',
+    'ImageProcessingService',
 ]
@@ -1,4 +1,7 @@
+import json
+from django.db import DataError, IntegrityError, transaction
 from apps.models import ActivityLog
+from apps.utils.ip_utils import clean_ip_address
 import logging
 
 logger = logging.getLogger(__name__)
@@ -6,10 +9,21 @@ logger = logging.getLogger(__name__)
 class ActivityLogService:
     """
     Tenant bazlı işlem loglarını yöneten servis.
-    Limit: Her tenant için son 1000 işlem tutulur.
+    
+    Loglar istek sırasında Redis listesine eklenir, Celery beat ile toplu (bulk_create) yazılır.
+    Limit: Her tenant için son Tenant.activity_log_retention_limit (varsayılan 1000) işlem tutulur;
+    limit periyodik temizlikte (sweep) sadece yeni log yazılan tenant'lar için uygulanır.
     """
     
-    LIMIT = 1000
+    LIMIT = 1000  # Varsayılan saklama limiti (Tenant.activity_log_retention_limit)
+    MIN_LIMIT = 100
+    MAX_LIMIT = 100000
+    
+    QUEUE_KEY = 'activity_logs:queue'
+    DIRTY_TENANTS_KEY = 'activity_logs:dirty_tenants'  # Son temizlikten beri log yazılan tenant'lar
+    FLUSH_CHUNK_SIZE = 1000
+    MAX_CHUNKS_PER_RUN = 20
+    SWEEP_BATCH_SIZE = 500  # Bir temizlik çalıştırmasında en fazla işlenecek tenant
 
     @staticmethod
     def log(tenant, user, action, description, content_type=None, object_id=None, changes=None, ip_address=None):
@@ -44,50 +58,212 @@ class ActivityLogService:
                 logger.warning(f"[SECURITY] Unauthorized attempt blocked. User: {user.email}, Action: {action}, Module: {module}")
                 return False
 
-        from apps.tasks.activity_task import create_activity_log_task
-        
+        entry = ActivityLogService.build_entry(
+            tenant_id=str(tenant.id) if tenant else None,
+            user_id=user.id if user else None,
+            action=action,
+            description=description,
+            content_type=content_type,
+            object_id=object_id,
+            changes=changes,
+            ip_address=ip_address
+        )
         try:
-            # Task'ı tetikle
-            create_activity_log_task.delay(
-                tenant_id=str(tenant.id) if tenant else None,
-                user_id=user.id if user else None,
-                action=action,
-                description=description,
-                content_type=content_type,
-                object_id=object_id,
-                changes=changes,
-                ip_address=ip_address
-            )
+            ActivityLogService.enqueue([entry])
             return True
         except Exception as e:
-            logger.error(f"ActivityLog delay failed for tenant {tenant.slug if tenant else 'N/A'}: {str(e)}")
+            logger.error(f"ActivityLog enqueue failed for tenant {tenant.slug if tenant else 'N/A'}: {str(e)}")
             return None
 
     @staticmethod
-    def _cleanup_old_logs(tenant):
+    def build_entry(tenant_id, user_id, action, description, content_type=None, object_id=None, changes=None, ip_address=None):
+        """Kuyruğa yazılacak log kaydı (JSON uyumlu dict)."""
+        return {
+            'tenant_id': str(tenant_id) if tenant_id else None,
+            'user_id': str(user_id) if user_id else None,
+            'action': action,
+            'description': description,
+            'content_type': content_type or '',
+            'object_id': str(object_id) if object_id else None,
+            'changes': changes or {},
+            # CF-Connecting-IP / REMOTE_ADDR istemci kontrolünde olabilir - geçersizse boş bırak
+            'ip_address': clean_ip_address(ip_address),
+        }
+
+    @staticmethod
+    def enqueue(entries):
         """
-        Belirlenen limitin üzerindeki eski logları hard delete ile siler.
+        Log kayıtlarını Redis kuyruğuna ekle (tek RPUSH).
+        Redis erişilemezse kayıtlar doğrudan yazılır.
         """
+        from apps.services.cache_service import CacheService
+
+        entries = [entry for entry in entries if entry.get('tenant_id')]
+        if not entries:
+            return 0
         try:
-            # Toplam log sayısını kontrol et
-            count = ActivityLog.objects.filter(tenant=tenant).count()
-            
-            if count > ActivityLogService.LIMIT:
-                # Silinecek miktar
-                to_delete_count = count - ActivityLogService.LIMIT
-                
-                # En eski logların ID'lerini al
-                old_log_ids = ActivityLog.objects.filter(
-                    tenant=tenant
-                ).order_by('created_at')[:to_delete_count].values_list('id', flat=True)
-                
-                # Hard delete (BaseModel'de soft delete varsa onu bypass etmek için direkt models.Model üzerinden silme gerekebilir 
-                # ama şu an BaseModel'de özel bir delete override yoksa normal delete yeterli)
-                ActivityLog.objects.filter(id__in=list(old_log_ids)).delete()
-                
-                logger.info(f"Cleaned up {to_delete_count} old logs for tenant {tenant.slug}")
+            CacheService.get_redis().rpush(ActivityLogService.QUEUE_KEY, *[
+                json.dumps(entry, separators=(',', ':'), default=str) for entry in entries
+            ])
+        except Exception as e:
+            logger.warning(f"[ACTIVITY_LOG] Redis unavailable, writing {len(entries)} log(s) directly: {e}")
+            ActivityLogService.write_entries(entries)
+        return len(entries)
+
+    @staticmethod
+    def flush(max_chunks=None):
+        """
+        Kuyruktaki logları parça parça okuyup bulk_create ile yaz.
+        
+        Returns:
+            int: Yazılan log sayısı
+        """
+        from apps.services.cache_service import CacheService
+
+        client = CacheService.get_redis()
+        written = 0
+        for _ in range(max_chunks or ActivityLogService.MAX_CHUNKS_PER_RUN):
+            raw_items = client.lpop(ActivityLogService.QUEUE_KEY, ActivityLogService.FLUSH_CHUNK_SIZE)
+            if not raw_items:
+                break
+            entries = []
+            for raw in raw_items:
+                try:
+                    entries.append(json.loads(raw))
+                except ValueError:
+                    continue
+            try:
+                written += ActivityLogService.write_entries(entries)
+            except Exception as e:
+                # Geçici hata (bağlantı vb.) - parça kuyruğa geri konur, sonraki çalıştırmada tekrar
+                # denenir. Bozuk satırlar write_entries'te ayıklanır, buraya gelmez.
+                logger.error(f"[ACTIVITY_LOG] Flush failed, requeueing {len(entries)} log(s): {e}")
+                client.rpush(ActivityLogService.QUEUE_KEY, *[json.dumps(entry, default=str) for entry in entries])
+                break
+            if len(raw_items) < ActivityLogService.FLUSH_CHUNK_SIZE:
+                break
+        return written
+
+    @staticmethod
+    def write_entries(entries):
+        """
+        Log kayıtlarını tek bulk_create ile yaz ve tenant'ları temizlik listesine ekle.
+        
+        Returns:
+            int: Yazılan log sayısı
+        """
+        if not entries:
+            return 0
+        logs = [
+            ActivityLog(
+                tenant_id=entry['tenant_id'],
+                user_id=entry.get('user_id'),
+                action=entry['action'],
+                description=entry.get('description') or '',
+                content_type=entry.get('content_type') or '',
+                object_id=entry.get('object_id'),
+                changes=entry.get('changes') or {},
+                ip_address=clean_ip_address(entry.get('ip_address')),
+            )
+            for entry in entries
+        ]
+        try:
+            with transaction.atomic():
+                ActivityLog.objects.bulk_create(logs, batch_size=ActivityLogService.FLUSH_CHUNK_SIZE)
+            written = len(logs)
+        except (DataError, IntegrityError) as e:
+            # Parçada yazılamayan satır var - satır satır yaz, sadece bozuk satırları at
+            logger.warning(f"[ACTIVITY_LOG] Bulk write failed, writing {len(logs)} log(s) row by row: {e}")
+            written = ActivityLogService._write_rows(logs)
+        ActivityLogService.mark_dirty({log.tenant_id for log in logs})
+        return written
+
+    @staticmethod
+    def _write_rows(logs):
+        """Logları tek tek yaz; yazılamayan satırlar loglanıp atılır (parça kuyruğa geri konmaz)."""
+        written = 0
+        for log in logs:
+            try:
+                try:
+                    with transaction.atomic():
+                        log.save(force_insert=True)
+                except IntegrityError:
+                    # Log kuyruktayken silinmiş kullanıcı (FK) - kullanıcı bağlantısız yaz
+                    log.user_id = None
+                    with transaction.atomic():
+                        log.save(force_insert=True)
+                written += 1
+            except (DataError, IntegrityError) as e:
+                logger.error(
+                    f"[ACTIVITY_LOG] Dropping invalid log for tenant {log.tenant_id} (action={log.action}): {e}"
+                )
+        return written
+
+    @staticmethod
+    def mark_dirty(tenant_ids):
+        """Tenant'ları bir sonraki temizlik (sweep) çalıştırmasına ekle."""
+        from apps.services.cache_service import CacheService
+
+        tenant_ids = [str(tenant_id) for tenant_id in tenant_ids if tenant_id]
+        if not tenant_ids:
+            return
+        try:
+            CacheService.get_redis().sadd(ActivityLogService.DIRTY_TENANTS_KEY, *tenant_ids)
         except Exception as e:
-            logger.error(f"ActivityLog cleanup failed for tenant {tenant.slug}: {str(e)}")
+            logger.warning(f"[ACTIVITY_LOG] Could not mark tenants for retention sweep: {e}")
+
+    @staticmethod
+    def get_retention_limit(tenant):
+        limit = getattr(tenant, 'activity_log_retention_limit', None) or ActivityLogService.LIMIT
+        return max(ActivityLogService.MIN_LIMIT, min(limit, ActivityLogService.MAX_LIMIT))
+
+    @staticmethod
+    def cleanup_tenant(tenant, limit=None):
+        """
+        Tenant'ın limit dışında kalan en eski loglarını hard delete ile sil.
+        Sınır, limit'inci en yeni kaydın created_at'i ile belirlenir (COUNT yok, index ile tek satır okunur).
+        
+        Returns:
+            int: Silinen log sayısı
+        """
+        limit = limit or ActivityLogService.get_retention_limit(tenant)
+        cutoff = ActivityLog.objects.filter(tenant=tenant).order_by('-created_at').values_list(
+            'created_at', flat=True
+        )[limit - 1:limit].first()
+        if cutoff is None:
+            return 0
+        deleted, _ = ActivityLog.objects.filter(tenant=tenant, created_at__lt=cutoff).delete()
+        if deleted:
+            logger.info(f"Cleaned up {deleted} old logs for tenant {tenant.slug}")
+        return deleted
+
+    @staticmethod
+    def sweep(tenant_ids=None):
+        """
+        Saklama limitini tenant bazında uygula.
+        tenant_ids verilmezse son temizlikten beri log yazılan tenant'lar işlenir.
+        
+        Returns:
+            dict: {'tenants': int, 'deleted': int}
+        """
+        from apps.models import Tenant
+        from apps.services.cache_service import CacheService
+
+        if tenant_ids is None:
+            raw_ids = CacheService.get_redis().spop(
+                ActivityLogService.DIRTY_TENANTS_KEY, ActivityLogService.SWEEP_BATCH_SIZE
+            ) or []
+            tenant_ids = [raw.decode() if isinstance(raw, bytes) else raw for raw in raw_ids]
+
+        stats = {'tenants': 0, 'deleted': 0}
+        for tenant in Tenant.objects.filter(id__in=tenant_ids):
+            try:
+                stats['deleted'] += ActivityLogService.cleanup_tenant(tenant)
+                stats['tenants'] += 1
+            except Exception as e:
+                logger.error(f"ActivityLog cleanup failed for tenant {tenant.slug}: {str(e)}")
+                ActivityLogService.mark_dirty([tenant.id])
+        return stats
 
     @staticmethod
     def get_logs(tenant, user=None, action=None, content_type=None):
@@ -0,0 +1,301 @@
+"""
+Analytics ingest service - Storefront event'lerinin tamponlanarak (buffer) toplu yazılması.
+
+İstek yolunda DB'ye yazılmaz: event'ler doğrulanır, JSON olarak Redis listesine
+eklenir (tek pipeline) ve endpoint hemen 202 döner. Celery consumer'ı listeden
+FLUSH_CHUNK_SIZE'lık parçalar halinde okuyup tenant başına bulk_create ile yazar.
+
+Tenant başına limitler:
+- Dakikalık kota (ANALYTICS_EVENTS_PER_MINUTE) aşılınca düşük değerli event'ler
+  (sayfa/ürün görüntüleme, arama, filtre) ANALYTICS_OVERFLOW_SAMPLE_RATE oranında
+  örneklenir; örneklenen event'lere event_data['sample_rate'] yazılır.
+- Kuyrukta bekleyen event sayısı ANALYTICS_MAX_BACKLOG_PER_TENANT'ı aşarsa
+  yeni event kabul edilmez (backpressure, 429).
+Redis erişilemezse event'ler doğrudan bulk_create ile yazılır (kayıp olmaz).
+"""
+import json
+import random
+import uuid
+from django.conf import settings
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+from apps.models import AnalyticsEvent
+from apps.utils.ip_utils import clean_ip_address
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsBackpressure(Exception):
+    """Tenant'ın bekleyen event kuyruğu dolu."""
+
+
+class AnalyticsIngestService:
+    """Analytics event tamponlama ve toplu yazma iş mantığı."""
+
+    QUEUE_KEY = 'analytics:events'
+    RATE_KEY_PREFIX = 'analytics:rate'
+    BACKLOG_KEY_PREFIX = 'analytics:backlog'
+
+    MAX_BATCH_EVENTS = 100  # Tek istekte kabul edilen en fazla event
+    FLUSH_CHUNK_SIZE = 2000  # Consumer'ın tek seferde okuduğu / yazdığı event sayısı
+    MAX_CHUNKS_PER_RUN = 50  # Bir consumer çalıştırmasında en fazla okunacak parça
+    BACKLOG_TTL = 3600  # saniye
+
+    EVENT_TYPES = frozenset(AnalyticsEvent.EventType.values)
+    # Kota aşıldığında örneklenebilecek (kaybı kabul edilebilir) event tipleri
+    SAMPLED_EVENT_TYPES = frozenset([
+        AnalyticsEvent.EventType.PAGE_VIEW,
+        AnalyticsEvent.EventType.PRODUCT_VIEW,
+        AnalyticsEvent.EventType.SEARCH,
+        AnalyticsEvent.EventType.FILTER,
+    ])
+    FIELD_MAX_LENGTHS = {'session_id': 255, 'referrer': 1000, 'url': 1000}
+
+    # ------------------------------------------------------------------
+    # Ayarlar / Redis
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_events_per_minute():
+        return getattr(settings, 'ANALYTICS_EVENTS_PER_MINUTE', 6000)
+
+    @staticmethod
+    def get_overflow_sample_rate():
+        return getattr(settings, 'ANALYTICS_OVERFLOW_SAMPLE_RATE', 0.1)
+
+    @staticmethod
+    def get_max_backlog():
+        return getattr(settings, 'ANALYTICS_MAX_BACKLOG_PER_TENANT', 100000)
+
+    @staticmethod
+    def get_redis():
+        """Event kuyruğunun Redis client'ı (ANALYTICS_REDIS_URL yoksa cache Redis'i)."""
+        from apps.services.cache_service import CacheService
+
+        return CacheService.get_redis(getattr(settings, 'ANALYTICS_REDIS_URL', None))
+
+    @staticmethod
+    def _backlog_key(tenant_id):
+        return f'{AnalyticsIngestService.BACKLOG_KEY_PREFIX}:{tenant_id}'
+
+    # ------------------------------------------------------------------
+    # İstek yolu
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def parse_events(data):
+        """
+        İstek gövdesini event listesine çevir ve doğrula.
+        Tek event (dict), event listesi veya {"events": [...]} kabul edilir.
+
+        Returns:
+            tuple: (geçerli event listesi, hata listesi)
+        """
+        if isinstance(data, dict) and 'events' in data:
+            data = data['events']
+        raw_events = data if isinstance(data, list) else [data]
+        if len(raw_events) > AnalyticsIngestService.MAX_BATCH_EVENTS:
+            return [], [f'Tek istekte en fazla {AnalyticsIngestService.MAX_BATCH_EVENTS} event gönderilebilir.']
+
+        events = []
+        errors = []
+        for index, raw in enumerate(raw_events):
+            if not isinstance(raw, dict):
+                errors.append({'index': index, 'error': 'Event bir obje olmalı.'})
+                continue
+            event_type = raw.get('event_type')
+            if event_type not in AnalyticsIngestService.EVENT_TYPES:
+                errors.append({'index': index, 'error': f'Geçersiz event_type: {event_type}'})
+                continue
+            event_data = raw.get('event_data') or {}
+            if not isinstance(event_data, dict):
+                errors.append({'index': index, 'error': 'event_data bir obje olmalı.'})
+                continue
+            event = {'event_type': event_type, 'event_data': event_data}
+            for field, max_length in AnalyticsIngestService.FIELD_MAX_LENGTHS.items():
+                value = raw.get(field)
+                if value:
+                    event[field] = str(value)[:max_length]
+            events.append(event)
+        return events, errors
+
+    @staticmethod
+    def enqueue(tenant, events, context):
+        """
+        Event'leri Redis kuyruğuna ekle.
+
+        Args:
+            tenant: Tenant instance
+            events: parse_events çıktısı
+            context: İstekten gelen ortak alanlar (customer_id, ip_address, user_agent, referrer, url)
+
+        Returns:
+            dict: {'accepted': int, 'sampled_out': int}
+
+        Raises:
+            AnalyticsBackpressure: Tenant kuyruğu dolu
+        """
+        tenant_id = str(tenant.id)
+        try:
+            client = AnalyticsIngestService.get_redis()
+            minute = int(timezone.now().timestamp() // 60)
+            rate_key = f'{AnalyticsIngestService.RATE_KEY_PREFIX}:{tenant_id}:{minute}'
+            pipe = client.pipeline(transaction=False)
+            pipe.incrby(rate_key, len(events))
+            pipe.expire(rate_key, 120)
+            pipe.get(AnalyticsIngestService._backlog_key(tenant_id))
+            rate_count, _, backlog = pipe.execute()
+        except Exception as e:
+            logger.warning(f"[ANALYTICS] Redis unavailable, writing {len(events)} event(s) directly: {e}")
+            AnalyticsIngestService.write_events(tenant_id, [
+                AnalyticsIngestService._build_payload(tenant_id, event, context) for event in events
+            ])
+            return {'accepted': len(events), 'sampled_out': 0}
+
+        if int(backlog or 0) >= AnalyticsIngestService.get_max_backlog():
+            raise AnalyticsBackpressure(tenant_id)
+
+        sample_rate = None
+        if rate_count > AnalyticsIngestService.get_events_per_minute():
+            sample_rate = AnalyticsIngestService.get_overflow_sample_rate()
+
+        payloads = []
+        sampled_out = 0
+        for event in events:
+            if sample_rate is not None and event['event_type'] in AnalyticsIngestService.SAMPLED_EVENT_TYPES:
+                if random.random() >= sample_rate:
+                    sampled_out += 1
+                    continue
+                event['event_data'] = {**event['event_data'], 'sample_rate': sample_rate}
+            payloads.append(json.dumps(
+                AnalyticsIngestService._build_payload(tenant_id, event, context),
+                separators=(',', ':'), default=str,
+            ))
+
+        if payloads:
+            pipe = client.pipeline(transaction=False)
+            pipe.rpush(AnalyticsIngestService.QUEUE_KEY, *payloads)
+            pipe.incrby(AnalyticsIngestService._backlog_key(tenant_id), len(payloads))
+            # Consumer sayacı düşemeden durursa kalıcı backpressure olmasın
+            pipe.expire(AnalyticsIngestService._backlog_key(tenant_id), AnalyticsIngestService.BACKLOG_TTL)
+            pipe.execute()
+        return {'accepted': len(payloads), 'sampled_out': sampled_out}
+
+    @staticmethod
+    def _build_payload(tenant_id, event, context):
+        payload = {
+            'tenant_id': tenant_id,
+            **context,
+            **event,
+        }
+        # Geçersiz IP (istemci kontrolündeki başlık) inet kolonuna yazılamaz - boş bırak
+        payload['ip_address'] = clean_ip_address(payload.get('ip_address'))
+        return payload
+
+    # ------------------------------------------------------------------
+    # Consumer
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def flush(max_chunks=None):
+        """
+        Kuyruktaki event'leri parça parça okuyup DB'ye yaz.
+
+        Returns:
+            int: Yazılan event sayısı
+        """
+        client = AnalyticsIngestService.get_redis()
+        written = 0
+        for _ in range(max_chunks or AnalyticsIngestService.MAX_CHUNKS_PER_RUN):
+            raw_items = client.lpop(AnalyticsIngestService.QUEUE_KEY, AnalyticsIngestService.FLUSH_CHUNK_SIZE)
+            if not raw_items:
+                break
+
+            by_tenant = {}
+            for raw in raw_items:
+                try:
+                    payload = json.loads(raw)
+                except ValueError:
+                    continue
+                by_tenant.setdefault(payload.get('tenant_id'), []).append(payload)
+
+            for tenant_id, payloads in by_tenant.items():
+                try:
+                    written += AnalyticsIngestService.write_events(tenant_id, payloads)
+                except Exception as e:
+                    # Geçici hata (bağlantı vb.) - parça kuyruğa geri konur, sonraki çalıştırmada
+                    # tekrar denenir. Bozuk satırlar write_events'te ayıklanır, buraya gelmez.
+                    logger.error(f"[ANALYTICS] Flush failed for tenant {tenant_id}, requeueing {len(payloads)}: {e}")
+                    client.rpush(AnalyticsIngestService.QUEUE_KEY, *[json.dumps(p, default=str) for p in payloads])
+                    continue
+                client.decrby(AnalyticsIngestService._backlog_key(tenant_id), len(payloads))
+
+            if len(raw_items) < AnalyticsIngestService.FLUSH_CHUNK_SIZE:
+                break
+        return written
+
+    @staticmethod
+    def write_events(tenant_id, payloads):
+        """Bir tenant'ın event'lerini tek bulk_create ile yaz (tenant schema'sında)."""
+        from core.db_router import set_tenant_schema, get_tenant_schema
+
+        if not payloads:
+            return 0
+        previous_schema = get_tenant_schema()
+        set_tenant_schema(f'tenant_{tenant_id}')
+        try:
+            events = [AnalyticsIngestService._build_event(tenant_id, payload) for payload in payloads]
+            try:
+                with transaction.atomic():
+                    AnalyticsEvent.objects.bulk_create(events, batch_size=AnalyticsIngestService.FLUSH_CHUNK_SIZE)
+            except (DataError, IntegrityError) as e:
+                # Parçada yazılamayan satır var - satır satır yaz, sadece bozuk satırları at
+                logger.warning(f"[ANALYTICS] Bulk write failed for tenant {tenant_id}, writing row by row: {e}")
+                return AnalyticsIngestService._write_rows(tenant_id, events)
+            return len(events)
+        finally:
+            set_tenant_schema(previous_schema)
+
+    @staticmethod
+    def _write_rows(tenant_id, events):
+        """Event'leri tek tek yaz; yazılamayan satırlar loglanıp atılır (parça kuyruğa geri konmaz)."""
+        written = 0
+        for event in events:
+            try:
+                try:
+                    with transaction.atomic():
+                        event.save(force_insert=True)
+                except IntegrityError:
+                    # Event alındıktan sonra silinmiş kullanıcı (FK) - müşteri bağlantısız yaz
+                    event.customer_id = None
+                    with transaction.atomic():
+                        event.save(force_insert=True)
+                written += 1
+            except (DataError, IntegrityError) as e:
+                logger.error(
+                    f"[ANALYTICS] Dropping invalid event for tenant {tenant_id} "
+                    f"(type={event.event_type}, session={event.session_id}): {e}"
+                )
+        return written
+
+    @staticmethod
+    def _build_event(tenant_id, payload):
+        customer_id = payload.get('customer_id')
+        try:
+            customer_id = uuid.UUID(str(customer_id)) if customer_id else None
+        except ValueError:
+            customer_id = None
+        # created_at auto_now_add: yazma anı (kuyruk gecikmesi saniyeler mertebesinde)
+        event = AnalyticsEvent(
+            tenant_id=tenant_id,
+            event_type=payload['event_type'],
+            customer_id=customer_id,
+            session_id=payload.get('session_id', ''),
+            event_data=payload.get('event_data') or {},
+            ip_address=clean_ip_address(payload.get('ip_address')),
+            user_agent=payload.get('user_agent', ''),
+            referrer=payload.get('referrer', ''),
+            url=payload.get('url', ''),
+        )
+        return event
@@ -0,0 +1,428 @@
+"""
+Analytics rollup service - Günlük satış ve ürün özetlerinin (rollup) hesaplanması.
+
+Dashboard her açılışta sipariş geçmişinin tamamını taramak yerine, Celery job'unun
+tuttuğu günlük SalesReport (period=daily) ve ProductAnalytics satırlarını toplar;
+sadece bugünün verisi canlı hesaplanır. Böylece dashboard süresi sipariş geçmişinin
+boyutundan bağımsızdır.
+
+Artımlı güncelleme: son çalıştırmadan (watermark) bu yana güncellenen siparişlerin ve
+yeni event'lerin düştüğü günler "kirli" sayılır ve sadece o günler yeniden hesaplanır.
+Sipariş günü created_at'e göredir; sonradan teslim edilen bir sipariş kendi gününü
+yeniden hesaplatır. Hard delete edilen siparişlerin günleri post_delete signal'ı ile
+Redis'te işaretlenir (mark_day_dirty).
+"""
+import uuid
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, Max, OuterRef, Q, Sum
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from apps.models import AnalyticsEvent, SalesReport, ProductAnalytics, Order, OrderItem, Product
+from apps.services.cache_service import CacheService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsRollupService:
+    """Günlük analytics rollup iş mantığı."""
+
+    CACHE_PREFIX = 'analytics_rollup'
+    REVENUE_STATUSES = [Order.OrderStatus.DELIVERED]  # Gelir sayılan sipariş durumları
+    PRODUCT_EVENT_TYPES = [
+        AnalyticsEvent.EventType.PRODUCT_VIEW,
+        AnalyticsEvent.EventType.ADD_TO_CART,
+        AnalyticsEvent.EventType.REMOVE_FROM_CART,
+    ]
+    # Watermark yoksa (ilk çalıştırma / cache temizlenmiş) yeniden hesaplanacak gün sayısı.
+    # Daha eski geçmiş için backfill_analytics_rollups komutu kullanılır.
+    DEFAULT_LOOKBACK_DAYS = 2
+    WATERMARK_SAFETY_MARGIN = timedelta(minutes=5)  # Commit gecikmesindeki kayıtları kaçırmamak için
+
+    # ------------------------------------------------------------------
+    # Gün sınırları
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_day_bounds(day):
+        """Günün [başlangıç, bitiş) aralığı (settings.TIME_ZONE'a göre)."""
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+        return start, end
+
+    # ------------------------------------------------------------------
+    # Gün hesaplama
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def compute_sales(tenant, day):
+        """Günün satış özetini hesapla (DB'ye yazmaz)."""
+        start, end = AnalyticsRollupService.get_day_bounds(day)
+        orders = Order.objects.filter(tenant=tenant, is_deleted=False, created_at__gte=start, created_at__lt=end)
+        revenue_filter = Q(status__in=AnalyticsRollupService.REVENUE_STATUSES)
+
+        totals = orders.aggregate(
+            total_orders=Count('id'),
+            delivered_orders=Count('id', filter=revenue_filter),
+            total_revenue=Sum('total', filter=revenue_filter),
+            total_discounts=Sum('discount_amount', filter=revenue_filter),
+            total_shipping_cost=Sum('shipping_cost', filter=revenue_filter),
+            total_coupons_used=Count('id', filter=~Q(coupon_code='')),
+        )
+        total_products_sold = OrderItem.objects.filter(
+            order__in=orders.filter(revenue_filter)
+        ).aggregate(total=Sum('quantity'))['total'] or 0
+
+        # Yeni müşteri: mağazadaki ilk siparişi bu gün olan e-posta
+        # order_by(): Meta.ordering (created_at) DISTINCT'e girmesin
+        emails = orders.exclude(customer_email='').order_by().values('customer_email').distinct()
+        customer_count = emails.count()
+        # Korelasyonlu NOT EXISTS: e-posta başına (tenant, customer_email, created_at) index'inde
+        # tek arama - sipariş geçmişinin tamamı taranmaz
+        earlier_orders = Order.objects.filter(
+            tenant=tenant,
+            is_deleted=False,
+            customer_email=OuterRef('customer_email'),
+            created_at__lt=start,
+        )
+        new_customers = emails.filter(~Exists(earlier_orders)).count() if customer_count else 0
+
+        events = dict(
+            AnalyticsEvent.objects.filter(
+                tenant=tenant, created_at__gte=start, created_at__lt=end
+            ).values('event_type').annotate(count=Count('id')).values_list('event_type', 'count')
+        )
+
+        total_revenue = totals['total_revenue'] or Decimal('0.00')
+        delivered_orders = totals['delivered_orders']
+        return {
+            'total_orders': totals['total_orders'],
+            'total_revenue': total_revenue,
+            'total_products_sold': total_products_sold,
+            'average_order_value': (
+                (total_revenue / delivered_orders).quantize(Decimal('0.01')) if delivered_orders else Decimal('0.00')
+            ),
+            'new_customers': new_customers,
+            'returning_customers': customer_count - new_customers,
+            'total_discounts': totals['total_discounts'] or Decimal('0.00'),
+            'total_coupons_used': totals['total_coupons_used'],
+            'total_shipping_cost': totals['total_shipping_cost'] or Decimal('0.00'),
+            'metadata': {
+                'delivered_orders': delivered_orders,
+                'events': events,
+            },
+        }
+
+    @staticmethod
+    def compute_products(tenant, day):
+        """
+        Günün ürün bazlı özetini hesapla (DB'ye yazmaz).
+
+        Returns:
+            dict: {product_id: {'view_count', 'unique_viewers', 'add_to_cart_count',
+                                'remove_from_cart_count', 'sale_count', 'total_revenue'}}
+        """
+        start, end = AnalyticsRollupService.get_day_bounds(day)
+        stats = {}
+
+        def row(product_id):
+            return stats.setdefault(product_id, {
+                'view_count': 0, 'unique_viewers': 0, 'add_to_cart_count': 0,
+                'remove_from_cart_count': 0, 'sale_count': 0, 'total_revenue': Decimal('0.00'),
+            })
+
+        event_rows = AnalyticsEvent.objects.filter(
+            tenant=tenant,
+            created_at__gte=start,
+            created_at__lt=end,
+            event_type__in=AnalyticsRollupService.PRODUCT_EVENT_TYPES,
+        ).annotate(
+            event_product_id=KeyTextTransform('product_id', 'event_data'),
+        ).exclude(event_product_id__isnull=True).values('event_product_id', 'event_type').annotate(
+            count=Count('id'),
+            sessions=Count('session_id', distinct=True, filter=~Q(session_id='')),
+        )
+        event_counts = {}
+        for event_row in event_rows:
+            try:
+                product_id = uuid.UUID(str(event_row['event_product_id']))
+            except ValueError:
+                continue  # İstemciden gelen geçersiz product_id
+            counts = event_counts.setdefault((product_id, event_row['event_type']), {'count': 0, 'sessions': 0})
+            counts['count'] += event_row['count']
+            counts['sessions'] += event_row['sessions']
+
+        # Event'lerdeki ürün ID'leri istemciden gelir; sadece tenant'ın ürünleri alınır
+        known_ids = set(Product.objects.filter(
+            tenant=tenant, id__in={product_id for product_id, _ in event_counts}
+        ).values_list('id', flat=True)) if event_counts else set()
+
+        for (product_id, event_type), event_row in event_counts.items():
+            if product_id not in known_ids:
+                continue
+            product_stats = row(product_id)
+            if event_type == AnalyticsEvent.EventType.PRODUCT_VIEW:
+                product_stats['view_count'] += event_row['count']
+                product_stats['unique_viewers'] += event_row['sessions']
+            elif event_type == AnalyticsEvent.EventType.ADD_TO_CART:
+                product_stats['add_to_cart_count'] += event_row['count']
+            else:
+                product_stats['remove_from_cart_count'] += event_row['count']
+
+        sales = OrderItem.objects.filter(
+            order__tenant=tenant,
+            order__is_deleted=False,
+            order__created_at__gte=start,
+            order__created_at__lt=end,
+            order__status__in=AnalyticsRollupService.REVENUE_STATUSES,
+            product_id__isnull=False,
+        ).values('product_id').annotate(quantity=Sum('quantity'), revenue=Sum('total_price'))
+        for sale in sales:
+            product_stats = row(sale['product_id'])
+            product_stats['sale_count'] = sale['quantity'] or 0
+            product_stats['total_revenue'] = sale['revenue'] or Decimal('0.00')
+
+        return stats
+
+    @staticmethod
+    def _rate(numerator, denominator):
+        if not denominator:
+            return Decimal('0.00')
+        return min(
+            (Decimal(numerator) / Decimal(denominator) * Decimal('100')).quantize(Decimal('0.01')),
+            Decimal('999.99'),  # max_digits=5
+        )
+
+    @staticmethod
+    def rollup_day(tenant, day):
+        """Günün SalesReport ve ProductAnalytics satırlarını yeniden hesaplayıp yaz."""
+        sales = AnalyticsRollupService.compute_sales(tenant, day)
+        products = AnalyticsRollupService.compute_products(tenant, day)
+
+        with transaction.atomic():
+            SalesReport.objects.update_or_create(
+                tenant=tenant,
+                period=SalesReport.ReportPeriod.DAILY,
+                period_start=day,
+                defaults={'period_end': day, 'is_deleted': False, **sales},
+            )
+
+            ProductAnalytics.objects.filter(tenant=tenant, report_date=day).exclude(
+                product_id__in=list(products)
+            ).delete()
+            if products:
+                now = timezone.now()
+                rows = [
+                    ProductAnalytics(
+                        tenant=tenant,
+                        product_id=product_id,
+                        report_date=day,
+                        cart_conversion_rate=AnalyticsRollupService._rate(
+                            product_stats['add_to_cart_count'], product_stats['view_count']
+                        ),
+                        conversion_rate=AnalyticsRollupService._rate(
+                            product_stats['sale_count'], product_stats['view_count']
+                        ),
+                        updated_at=now,
+                        **product_stats,
+                    )
+                    for product_id, product_stats in products.items()
+                ]
+                ProductAnalytics.objects.bulk_create(
+                    rows,
+                    batch_size=1000,
+                    update_conflicts=True,
+                    unique_fields=['tenant', 'product', 'report_date'],
+                    update_fields=[
+                        'view_count', 'unique_viewers', 'add_to_cart_count', 'remove_from_cart_count',
+                        'sale_count', 'total_revenue', 'cart_conversion_rate', 'conversion_rate',
+                        'updated_at',
+                    ],
+                )
+        return sales
+
+    # ------------------------------------------------------------------
+    # Artımlı job / backfill
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _watermark_key(tenant_id):
+        return CacheService.get_cache_key(AnalyticsRollupService.CACHE_PREFIX, tenant_id, 'watermark')
+
+    @staticmethod
+    def get_watermark(tenant):
+        """
+        Son başarılı rollup'ın başlangıç zamanı.
+        Cache'te yoksa tenant'ın en son hesaplanan günlük satırının zamanı kullanılır.
+        """
+        value = cache.get(AnalyticsRollupService._watermark_key(tenant.id))
+        if value:
+            return parse_datetime(value)
+        return SalesReport.objects.filter(
+            tenant=tenant, period=SalesReport.ReportPeriod.DAILY
+        ).aggregate(last=Max('updated_at'))['last']
+
+    @staticmethod
+    def _deleted_days_key(tenant_id):
+        return f'{AnalyticsRollupService.CACHE_PREFIX}:deleted_days:{tenant_id}'
+
+    @staticmethod
+    def mark_day_dirty(tenant_id, created_at):
+        """
+        Hard delete edilen siparişin gününü bir sonraki rollup'a ekle
+        (silinen satır updated_at ile bulunamaz).
+        """
+        if not tenant_id or not created_at:
+            return
+        try:
+            CacheService.get_redis().sadd(
+                AnalyticsRollupService._deleted_days_key(tenant_id),
+                timezone.localdate(created_at).isoformat(),
+            )
+        except Exception as e:
+            logger.warning(f"[ANALYTICS_ROLLUP] Could not mark deleted order day for tenant {tenant_id}: {e}")
+
+    @staticmethod
+    def _get_deleted_days(tenant_id):
+        """Silinen siparişlerden işaretlenen günler: (günler, ham değerler)."""
+        try:
+            members = CacheService.get_redis().smembers(AnalyticsRollupService._deleted_days_key(tenant_id))
+        except Exception as e:
+            logger.warning(f"[ANALYTICS_ROLLUP] Could not read deleted order days for tenant {tenant_id}: {e}")
+            return set(), []
+        members = [member.decode() if isinstance(member, bytes) else member for member in members]
+        days = set()
+        for member in members:
+            try:
+                days.add(datetime.strptime(member, '%Y-%m-%d').date())
+            except ValueError:
+                continue
+        return days, members
+
+    @staticmethod
+    def get_dirty_days(tenant, since):
+        """since'ten sonra değişen sipariş ve event'lerin düştüğü günler (hard delete edilenler dahil)."""
+        order_days = Order.objects.filter(tenant=tenant, updated_at__gt=since).annotate(
+            day=TruncDate('created_at')
+        ).order_by().values_list('day', flat=True).distinct()
+        event_days = AnalyticsEvent.objects.filter(tenant=tenant, created_at__gt=since).annotate(
+            day=TruncDate('created_at')
+        ).order_by().values_list('day', flat=True).distinct()
+        deleted_days, _ = AnalyticsRollupService._get_deleted_days(tenant.id)
+        return set(order_days) | set(event_days) | deleted_days
+
+    @staticmethod
+    def rollup_tenant(tenant):
+        """
+        Watermark'tan bu yana değişen günleri yeniden hesapla.
+
+        Returns:
+            list: Yeniden hesaplanan günler
+        """
+        run_started_at = timezone.now()
+        today = timezone.localdate(run_started_at)
+        watermark = AnalyticsRollupService.get_watermark(tenant)
+        # Başarılı çalıştırmadan sonra temizlenir; hata olursa sonraki çalıştırmada tekrar işlenir
+        deleted_days, deleted_members = AnalyticsRollupService._get_deleted_days(tenant.id)
+
+        if watermark is None:
+            days = {today - timedelta(days=offset) for offset in range(AnalyticsRollupService.DEFAULT_LOOKBACK_DAYS)}
+            days |= deleted_days
+        else:
+            days = AnalyticsRollupService.get_dirty_days(
+                tenant, watermark - AnalyticsRollupService.WATERMARK_SAFETY_MARGIN
+            )
+            # Gün dönümünde dünün satırı son haliyle kapansın
+            if timezone.localdate(watermark) < today:
+                days.add(today - timedelta(days=1))
+
+        for day in sorted(days):
+            AnalyticsRollupService.rollup_day(tenant, day)
+
+        if deleted_members:
+            try:
+                CacheService.get_redis().srem(AnalyticsRollupService._deleted_days_key(tenant.id), *deleted_members)
+            except Exception as e:
+                logger.warning(f"[ANALYTICS_ROLLUP] Could not clear deleted order days for tenant {tenant.id}: {e}")
+        cache.set(AnalyticsRollupService._watermark_key(tenant.id), run_started_at.isoformat(), None)
+        return sorted(days)
+
+    @staticmethod
+    def backfill(tenant, start_day, end_day):
+        """[start_day, end_day] aralığındaki tüm günleri yeniden hesapla."""
+        day = start_day
+        count = 0
+        while day <= end_day:
+            AnalyticsRollupService.rollup_day(tenant, day)
+            day += timedelta(days=1)
+            count += 1
+        return count
+
+    # ------------------------------------------------------------------
+    # Dashboard
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_dashboard(tenant, days):
+        """
+        Son `days` günün (bugün dahil) dashboard özeti.
+        Geçmiş günler rollup satırlarından toplanır, bugün canlı hesaplanır.
+        """
+        today = timezone.localdate()
+        start_day = today - timedelta(days=max(days, 1) - 1)
+
+        reports = SalesReport.objects.filter(
+            tenant=tenant,
+            period=SalesReport.ReportPeriod.DAILY,
+            period_start__gte=start_day,
+            period_start__lt=today,
+            is_deleted=False,
+        ).values(
+            'total_orders', 'total_revenue', 'total_products_sold', 'new_customers', 'metadata'
+        )
+        today_sales = AnalyticsRollupService.compute_sales(tenant, today)
+
+        total_orders = today_sales['total_orders']
+        total_revenue = today_sales['total_revenue']
+        total_products_sold = today_sales['total_products_sold']
+        new_customers = today_sales['new_customers']
+        delivered_orders = today_sales['metadata']['delivered_orders']
+        events = dict(today_sales['metadata']['events'])
+        for report in reports:
+            metadata = report['metadata'] or {}
+            total_orders += report['total_orders']
+            total_revenue += report['total_revenue']
+            total_products_sold += report['total_products_sold']
+            new_customers += report['new_customers']
+            delivered_orders += metadata.get('delivered_orders', 0)
+            for event_type, count in (metadata.get('events') or {}).items():
+                events[event_type] = events.get(event_type, 0) + count
+
+        average_order_value = (
+            (total_revenue / delivered_orders).quantize(Decimal('0.01')) if delivered_orders else Decimal('0.00')
+        )
+        return {
+            'period': {
+                'days': days,
+                'date_from': AnalyticsRollupService.get_day_bounds(start_day)[0],
+                'date_to': timezone.now(),
+            },
+            'orders': {
+                'total': total_orders,
+                'total_revenue': str(total_revenue),
+                'average_order_value': str(average_order_value),
+                'total_products_sold': total_products_sold,
+            },
+            'customers': {
+                'new_customers': new_customers,
+            },
+            'events': [
+                {'event_type': event_type, 'count': count}
+                for event_type, count in sorted(events.items(), key=lambda item: -item[1])
+            ],
+        }
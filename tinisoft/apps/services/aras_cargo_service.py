@@ -2,10 +2,21 @@
 Aras Kargo XML/SOAP Service.
 Integration modelinden API bilgilerini alır ve kullanır.
 Aras Kargo XML Servisleri kullanır (SOAP).
+
+HTTP istekleri entegrasyon başına paylaşılan, keep-alive'lı requests.Session
+üzerinden gönderilir. Çözülmüş (decrypt) credential'lar process içinde cache'lenir,
+sık kullanılan SOAP envelope'ları hazır şablonlardan üretilir.
+track_shipments_bulk() çok sayıda gönderiyi sınırlı eşzamanlılıkla sorgular ve
+sonuçları siparişlere tek bulk_update ile yazar.
 """
+import os
+import threading
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, Optional, Any, List
+from xml.sax.saxutils import escape as xml_escape
 from django.utils import timezone
 from apps.models import IntegrationProvider, Order
 from django.db import models
@@ -14,6 +25,57 @@ from xml.dom import minidom
 
 logger = logging.getLogger(__name__)
 
+SOAP_ENVELOPE_NS = 'http://schemas.xmlsoap.org/soap/envelope/'
+
+# WCF servisleri (GetQueryDS vb.): loginInfo / queryInfo parametreleri XML string olarak gönderilir
+QUERY_ENVELOPE_TEMPLATE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    f'<soap:Envelope xmlns:soap="{SOAP_ENVELOPE_NS}" xmlns:tem="http://tempuri.org/">'
+    '<soap:Body><tem:{method}>'
+    '<tem:loginInfo>{login_info}</tem:loginInfo>'
+    '<tem:queryInfo>{query_info}</tem:queryInfo>'
+    '</tem:{method}></soap:Body></soap:Envelope>'
+)
+
+# ASMX servisleri (GetBarcode, GetOrderWithIntegrationCode): düz parametreler
+ASMX_ENVELOPE_TEMPLATE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<soap:Envelope xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xmlns:xsd="http://www.w3.org/2001/XMLSchema" '
+    f'xmlns:soap="{SOAP_ENVELOPE_NS}">'
+    '<soap:Body><{method} xmlns="http://tempuri.org/">{params}</{method}></soap:Body>'
+    '</soap:Envelope>'
+)
+
+LOGIN_INFO_TEMPLATE = (
+    '<LoginInfo>'
+    '<UserName>{username}</UserName>'
+    '<Password>{password}</Password>'
+    '<CustomerCode>{customer_code}</CustomerCode>'
+    '</LoginInfo>'
+)
+
+
+@lru_cache(maxsize=1)
+def _get_fernet():
+    from cryptography.fernet import Fernet
+    from apps.models.integration import get_encryption_key
+    return Fernet(get_encryption_key())
+
+
+@lru_cache(maxsize=256)
+def _decrypt_secret(encrypted_value: str) -> str:
+    """
+    Şifreli değeri çöz (ciphertext başına bir kez).
+    Aynı ciphertext her zaman aynı düz metne çözüldüğü için cache anahtarı ciphertext'tir;
+    credential değiştiğinde yeni ciphertext yeni bir kayıt olur.
+    """
+    try:
+        return _get_fernet().decrypt(encrypted_value.encode()).decode()
+    except Exception as e:
+        logger.error(f"Decryption error: {str(e)}")
+        raise ValueError(f"Şifre çözme hatası: {str(e)}")
+
 
 class ArasCargoService:
     """Aras Kargo XML/SOAP servisi."""
@@ -31,6 +93,15 @@ class ArasCargoService:
     DEFAULT_API_ENDPOINT = "http://customerservices.araskargo.com.tr/ArasCargoCustomerIntegrationService/ArasCargoIntegrationService.svc"
     DEFAULT_TEST_ENDPOINT = "https://customerservicestest.araskargo.com.tr/ArasCargoIntegrationService.svc"
     
+    # HTTP ayarları
+    REQUEST_TIMEOUT = 30  # saniye
+    POOL_MAXSIZE = 8  # Entegrasyon başına açık tutulan en fazla connection
+    BULK_TRACK_MAX_WORKERS = 8  # track_shipments_bulk eşzamanlı SOAP isteği limiti
+    
+    _sessions = {}
+    _sessions_pid = None
+    _sessions_lock = threading.Lock()
+    
     @staticmethod
     def get_integration(tenant) -> Optional[IntegrationProvider]:
         """Tenant için Aras Kargo entegrasyonunu getir."""
@@ -54,6 +125,57 @@ class ArasCargoService:
             logger.error(f"Error getting Aras Kargo integration: {str(e)}")
             return None
     
+    @staticmethod
+    def _get_api_key(integration: IntegrationProvider) -> str:
+        """API key'i çözerek döndür (process içi cache'li)."""
+        return _decrypt_secret(integration.api_key) if integration.api_key else ''
+    
+    @staticmethod
+    def _get_api_secret(integration: IntegrationProvider) -> str:
+        """API secret'ı çözerek döndür (process içi cache'li)."""
+        return _decrypt_secret(integration.api_secret) if integration.api_secret else ''
+    
+    @staticmethod
+    def get_session(integration: IntegrationProvider) -> requests.Session:
+        """
+        Entegrasyon başına paylaşılan requests.Session (keep-alive + connection pool).
+        Celery prefork child'ları parent'ın soketlerini paylaşmasın diye pid kontrol edilir.
+        """
+        pid = os.getpid()
+        key = str(integration.id)
+        with ArasCargoService._sessions_lock:
+            if ArasCargoService._sessions_pid != pid:
+                ArasCargoService._sessions = {}
+                ArasCargoService._sessions_pid = pid
+            session = ArasCargoService._sessions.get(key)
+            if session is None:
+                from requests.adapters import HTTPAdapter
+                
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=2,  # Entegrasyon başına query + setorder host'u
+                    pool_maxsize=ArasCargoService.POOL_MAXSIZE,
+                    max_retries=0,
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                ArasCargoService._sessions[key] = session
+            return session
+    
+    @staticmethod
+    def _post(integration: IntegrationProvider, url: str, soap_xml: str, soap_action: str) -> requests.Response:
+        """SOAP isteğini entegrasyonun paylaşılan session'ı ile gönder."""
+        headers = {
+            'Content-Type': 'text/xml; charset=utf-8',
+            'SOAPAction': soap_action,
+        }
+        return ArasCargoService.get_session(integration).post(
+            url=url,
+            data=soap_xml.encode('utf-8'),
+            headers=headers,
+            timeout=ArasCargoService.REQUEST_TIMEOUT
+        )
+    
     @staticmethod
     def _get_api_credentials(integration: IntegrationProvider, service_type: str = 'query') -> Dict[str, str]:
         """
@@ -71,14 +193,12 @@ class ArasCargoService:
             setorder_config = config.get('setorder', {})
             
             # SetOrder username: setorder.username > api_key
-            username = setorder_config.get('username') or integration.get_api_key() or ''
+            username = setorder_config.get('username') or ArasCargoService._get_api_key(integration) or ''
             
             # SetOrder password: setorder.password > api_secret
-            password = setorder_config.get('password') or integration.get_api_secret() or ''
+            password = setorder_config.get('password') or ArasCargoService._get_api_secret(integration) or ''
             
-            logger.info(f"SetOrder credentials - username: {username}, password: {'*' * len(password) if password else 'EMPTY'}")
-            logger.info(f"SetOrder config - setorder_config: {setorder_config}")
-            logger.info(f"SetOrder config - api_key from integration: {integration.get_api_key()[:20] if integration.get_api_key() else 'EMPTY'}...")
+            logger.debug(f"SetOrder credentials - username: {username}, password: {'SET' if password else 'EMPTY'}")
             
             return {
                 'user_name': username,  # SetOrder için user_name (Order içinde UserName)
@@ -93,8 +213,8 @@ class ArasCargoService:
             # Query servisleri için (GetQueryDS)
             query_config = config.get('query', {})
             return {
-                'username': query_config.get('username') or integration.get_api_key(),
-                'password': query_config.get('password') or integration.get_api_secret(),
+                'username': query_config.get('username') or ArasCargoService._get_api_key(integration),
+                'password': query_config.get('password') or ArasCargoService._get_api_secret(integration),
                 'customer_code': query_config.get('customer_code') or config.get('customer_code', ''),
                 'customer_username': config.get('customer_username', ''),  # Müşteri Kullanıcı Adı
                 'customer_password': config.get('customer_password', ''),  # Müşteri Şifre
@@ -119,7 +239,11 @@ class ArasCargoService:
         integration = ArasCargoService.get_integration(tenant)
         if not integration:
             return ''
-        
+        return ArasCargoService._build_tracking_url(integration, tracking_reference, tracking_type)
+    
+    @staticmethod
+    def _build_tracking_url(integration: IntegrationProvider, tracking_reference: str, tracking_type: str = 'order_number') -> str:
+        """Entegrasyon config'i ile takip URL'i oluştur (get_tracking_url'in DB sorgusuz hali)."""
         if tracking_type == 'tracking_number':
             # Format 1: Kargo Takip Numarası ile (13 haneli kod)
             # http://kargotakip.araskargo.com.tr/mainpage.aspx?code=3513773163316
@@ -184,19 +308,11 @@ class ArasCargoService:
         Returns:
             str: LoginInfo XML string
         """
-        login_info = ET.Element('LoginInfo')
-        
-        username = ET.SubElement(login_info, 'UserName')
-        username.text = credentials.get('username', '')
-        
-        password = ET.SubElement(login_info, 'Password')
-        password.text = credentials.get('password', '')
-        
-        customer_code = ET.SubElement(login_info, 'CustomerCode')
-        customer_code.text = credentials.get('customer_code', '')
-        
-        xml_str = ET.tostring(login_info, encoding='utf-8', method='xml')
-        return xml_str.decode('utf-8')
+        return LOGIN_INFO_TEMPLATE.format(
+            username=xml_escape(str(credentials.get('username') or '')),
+            password=xml_escape(str(credentials.get('password') or '')),
+            customer_code=xml_escape(str(credentials.get('customer_code') or '')),
+        )
     
     @staticmethod
     def _build_query_info_xml(query_type: int, query_params: Dict) -> str:
@@ -210,19 +326,28 @@ class ArasCargoService:
         Returns:
             str: QueryInfo XML string
         """
-        query_info = ET.Element('QueryInfo')
-        
-        query_type_elem = ET.SubElement(query_info, 'QueryType')
-        query_type_elem.text = str(query_type)
-        
-        # Diğer parametreleri ekle
-        for key, value in query_params.items():
-            if value is not None and value != '':
-                param = ET.SubElement(query_info, key)
-                param.text = str(value)
+        # Diğer parametreleri ekle (boş olanlar gönderilmez)
+        params = ''.join(
+            f'<{key}>{xml_escape(str(value))}</{key}>'
+            for key, value in query_params.items()
+            if value is not None and value != ''
+        )
+        return f'<QueryInfo><QueryType>{query_type}</QueryType>{params}</QueryInfo>'
+    
+    @staticmethod
+    def _build_asmx_envelope(service_method: str, params: List[tuple]) -> str:
+        """
+        ASMX servisleri için SOAP envelope (hazır şablondan).
         
-        xml_str = ET.tostring(query_info, encoding='utf-8', method='xml')
-        return xml_str.decode('utf-8')
+        Args:
+            service_method: Metod adı (GetBarcode, GetOrderWithIntegrationCode)
+            params: (parametre adı, değer) listesi - sırası korunur
+        """
+        body = ''.join(
+            f'<{name}>{xml_escape(str(value if value is not None else ""))}</{name}>'
+            for name, value in params
+        )
+        return ASMX_ENVELOPE_TEMPLATE.format(method=service_method, params=body)
     
     @staticmethod
     def _build_soap_envelope(service_method: str, credentials: Dict, data: Dict) -> str:
@@ -242,21 +367,8 @@ class ArasCargoService:
             str: SOAP XML string
         """
         # GetQueryDS ve SetDataXML için mevcut format (WSDL'e göre aynı format)
-        # SOAP Envelope oluştur
-        envelope = ET.Element('soap:Envelope')
-        envelope.set('xmlns:soap', 'http://schemas.xmlsoap.org/soap/envelope/')
-        envelope.set('xmlns:tem', 'http://tempuri.org/')
-        
-        # Body
-        body = ET.SubElement(envelope, 'soap:Body')
-        
-        # Service Method
-        method = ET.SubElement(body, f'tem:{service_method}')
-        
         # LoginInfo parametresi (XML string olarak)
         login_info_xml = ArasCargoService._build_login_info_xml(credentials)
-        login_info_param = ET.SubElement(method, 'tem:loginInfo')
-        login_info_param.text = login_info_xml
         
         # QueryInfo parametresi (XML string olarak)
         # SetDataXML için gönderi bilgileri, GetQueryDS için query parametreleri
@@ -270,14 +382,12 @@ class ArasCargoService:
             query_params = data.get('query_params', {})
             query_info_xml = ArasCargoService._build_query_info_xml(query_type, query_params)
         
-        query_info_param = ET.SubElement(method, 'tem:queryInfo')
-        query_info_param.text = query_info_xml
-        
-        # XML string'e çevir
-        xml_str = ET.tostring(envelope, encoding='utf-8', method='xml')
-        # Pretty print için minidom kullan
-        dom = minidom.parseString(xml_str)
-        return dom.toprettyxml(indent="  ", encoding='utf-8').decode('utf-8')
+        # Parametreler XML string olduğu için escape edilerek text olarak gömülür
+        return QUERY_ENVELOPE_TEMPLATE.format(
+            method=service_method,
+            login_info=xml_escape(login_info_xml),
+            query_info=xml_escape(query_info_xml),
+        )
     
     @staticmethod
     def _build_setorder_soap_envelope(shipment_data: Dict, credentials: Dict, order=None) -> str:
@@ -484,52 +594,19 @@ class ArasCargoService:
                 'data': dict
             }
         """
-        # SOAP Envelope oluştur
-        envelope = ET.Element('soap:Envelope')
-        envelope.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-        envelope.set('xmlns:xsd', 'http://www.w3.org/2001/XMLSchema')
-        envelope.set('xmlns:soap', 'http://schemas.xmlsoap.org/soap/envelope/')
-        
-        # Body
-        body = ET.SubElement(envelope, 'soap:Body')
-        
-        # GetOrderWithIntegrationCode
-        get_order = ET.SubElement(body, 'GetOrderWithIntegrationCode')
-        get_order.set('xmlns', 'http://tempuri.org/')
-        
-        # userName
-        user_name_elem = ET.SubElement(get_order, 'userName')
-        user_name_elem.text = str(credentials.get('username', '') or credentials.get('user_name', ''))
-        
-        # password
-        password_elem = ET.SubElement(get_order, 'password')
-        password_elem.text = str(credentials.get('password', ''))
-        
-        # integrationCode
-        integration_code_elem = ET.SubElement(get_order, 'integrationCode')
-        integration_code_elem.text = str(integration_code)
-        
-        # XML string'e çevir
-        xml_str = ET.tostring(envelope, encoding='utf-8', method='xml')
-        # Pretty print için minidom kullan
-        dom = minidom.parseString(xml_str)
-        soap_xml = dom.toprettyxml(indent="  ", encoding='utf-8').decode('utf-8')
-        
-        # SOAP Action header
-        headers = {
-            'Content-Type': 'text/xml; charset=utf-8',
-            'SOAPAction': '"http://tempuri.org/GetOrderWithIntegrationCode"',  # Tırnak içinde!
-        }
+        soap_xml = ArasCargoService._build_asmx_envelope('GetOrderWithIntegrationCode', [
+            ('userName', credentials.get('username', '') or credentials.get('user_name', '')),
+            ('password', credentials.get('password', '')),
+            ('integrationCode', integration_code),
+        ])
         
         try:
             logger.info(f"Aras Kargo GetOrderWithIntegrationCode request to {endpoint}")
             logger.debug(f"GetOrderWithIntegrationCode SOAP XML:\n{soap_xml}")
             
-            response = requests.post(
-                url=endpoint,
-                data=soap_xml.encode('utf-8'),
-                headers=headers,
-                timeout=30
+            response = ArasCargoService._post(
+                integration, endpoint, soap_xml,
+                '"http://tempuri.org/GetOrderWithIntegrationCode"'  # Tırnak içinde!
             )
             
             response.raise_for_status()
@@ -608,53 +685,17 @@ class ArasCargoService:
                 'data': dict
             }
         """
-        # SOAP Envelope oluştur
-        envelope = ET.Element('soap:Envelope')
-        envelope.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-        envelope.set('xmlns:xsd', 'http://www.w3.org/2001/XMLSchema')
-        envelope.set('xmlns:soap', 'http://schemas.xmlsoap.org/soap/envelope/')
-        
-        # Body
-        body = ET.SubElement(envelope, 'soap:Body')
-        
-        # GetBarcode
-        get_barcode = ET.SubElement(body, 'GetBarcode')
-        get_barcode.set('xmlns', 'http://tempuri.org/')
-        
-        # userName
-        user_name_elem = ET.SubElement(get_barcode, 'userName')
-        user_name_elem.text = str(credentials.get('username', '') or credentials.get('user_name', ''))
-        
-        # password
-        password_elem = ET.SubElement(get_barcode, 'password')
-        password_elem.text = str(credentials.get('password', ''))
-        
-        # invoiceKey
-        invoice_key_elem = ET.SubElement(get_barcode, 'invoiceKey')
-        invoice_key_elem.text = str(invoice_key)
-        
-        # XML string'e çevir
-        xml_str = ET.tostring(envelope, encoding='utf-8', method='xml')
-        # Pretty print için minidom kullan
-        dom = minidom.parseString(xml_str)
-        soap_xml = dom.toprettyxml(indent="  ", encoding='utf-8').decode('utf-8')
-        
-        # SOAP Action header
-        headers = {
-            'Content-Type': 'text/xml; charset=utf-8',
-            'SOAPAction': '"http://tempuri.org/GetBarcode"',
-        }
+        soap_xml = ArasCargoService._build_asmx_envelope('GetBarcode', [
+            ('userName', credentials.get('username', '') or credentials.get('user_name', '')),
+            ('password', credentials.get('password', '')),
+            ('invoiceKey', invoice_key),
+        ])
         
         try:
             logger.info(f"Aras Kargo GetBarcode request to {endpoint} with InvoiceKey: {invoice_key[:30]}...")
             logger.debug(f"GetBarcode SOAP XML:\n{soap_xml}")
             
-            response = requests.post(
-                url=endpoint,
-                data=soap_xml.encode('utf-8'),
-                headers=headers,
-                timeout=30
-            )
+            response = ArasCargoService._post(integration, endpoint, soap_xml, '"http://tempuri.org/GetBarcode"')
             
             response.raise_for_status()
             
@@ -844,23 +885,13 @@ class ArasCargoService:
         # SOAP XML oluştur
         soap_xml = ArasCargoService._build_setorder_soap_envelope(shipment_data, credentials, order)
         
-        # SOAP Action header (SetOrder için)
-        headers = {
-            'Content-Type': 'text/xml; charset=utf-8',
-            'SOAPAction': 'http://tempuri.org/SetOrder',
-        }
-        
+
         try:
             logger.info(f"Aras Kargo SetOrder request to {endpoint}")
             logger.info(f"SetOrder credentials being used - username: {credentials.get('username', '')[:30] if credentials.get('username') else 'EMPTY'}, password: {'*' * len(credentials.get('password', '')) if credentials.get('password') else 'EMPTY'}")
             logger.info(f"SOAP XML (full):\n{soap_xml}")
             
-            response = requests.post(
-                url=endpoint,
-                data=soap_xml.encode('utf-8'),
-                headers=headers,
-                timeout=30
-            )
+            response = ArasCargoService._post(integration, endpoint, soap_xml, 'http://tempuri.org/SetOrder')
             
             response.raise_for_status()
             
@@ -1076,7 +1107,8 @@ class ArasCargoService:
         integration: IntegrationProvider,
         service_method: str,
         data: Optional[Dict] = None,
-        credentials: Optional[Dict] = None
+        credentials: Optional[Dict] = None,
+        track_usage: bool = True
     ) -> Dict[str, Any]:
         """
         Aras Kargo SOAP/XML servisine istek gönder.
@@ -1085,6 +1117,8 @@ class ArasCargoService:
             integration: IntegrationProvider instance
             service_method: Service metod adı (GetQueryDS, CreateShipment, vb.)
             data: Method parametreleri
+            track_usage: False ise last_used_at / last_error kaydedilmez (DB'ye dokunmaz;
+                toplu sorgularda worker thread'lerinden çağrılır, kayıt çağıran tarafta yapılır)
         
         Returns:
             dict: API response
@@ -1106,22 +1140,12 @@ class ArasCargoService:
             # Diğer servisler için varsayılan format
             soap_action = f'http://tempuri.org/{service_method}'
         
-        headers = {
-            'Content-Type': 'text/xml; charset=utf-8',
-            'SOAPAction': soap_action,
-        }
-        
         try:
             logger.info(f"Aras Kargo SOAP request: {service_method} to {base_url}")
             # SOAP XML'i logla (debug için) - ilk 1500 karakter
             logger.debug(f"SOAP XML (first 1500 chars): {soap_xml[:1500]}")
             
-            response = requests.post(
-                url=base_url,
-                data=soap_xml.encode('utf-8'),
-                headers=headers,
-                timeout=30
-            )
+            response = ArasCargoService._post(integration, base_url, soap_xml, soap_action)
             
             response.raise_for_status()
             
@@ -1136,9 +1160,10 @@ class ArasCargoService:
             }
             
             # Son kullanım zamanını güncelle
-            integration.last_used_at = timezone.now()
-            integration.last_error = ''
-            integration.save(update_fields=['last_used_at', 'last_error'])
+            if track_usage:
+                integration.last_used_at = timezone.now()
+                integration.last_error = ''
+                integration.save(update_fields=['last_used_at', 'last_error'])
             
             logger.info(f"Aras Kargo SOAP response: {response.status_code}")
             return result
@@ -1152,14 +1177,14 @@ class ArasCargoService:
                 logger.error(f"{error_msg}\nResponse body: {response_text}")
                 
                 # Request SOAP XML'ini de logla (500 hatası için)
-                logger.error(f"Request SOAP XML: {soap_xml}")
                 logger.error(f"Request SOAP XML: {soap_xml[:1000]}")  # İlk 1000 karakter
             else:
                 logger.error(error_msg)
             
             # Hata kaydet
-            integration.last_error = error_msg
-            integration.save(update_fields=['last_error'])
+            if track_usage:
+                integration.last_error = error_msg
+                integration.save(update_fields=['last_error'])
             
             return {
                 'success': False,
@@ -1171,8 +1196,9 @@ class ArasCargoService:
             error_msg = f"Unexpected error in Aras Kargo SOAP: {str(e)}"
             logger.error(error_msg, exc_info=True)
             
-            integration.last_error = error_msg
-            integration.save(update_fields=['last_error'])
+            if track_usage:
+                integration.last_error = error_msg
+                integration.save(update_fields=['last_error'])
             
             return {
                 'success': False,
@@ -1269,10 +1295,7 @@ class ArasCargoService:
         # SetOrder servisi için field isimleri (ASMX servisi formatı)
         # IntegrationCode: En az 2, en fazla 32 karakter olmalı (Aras Kargo kısıtlaması)
         # IntegrationCode = Müşteri Özel Kodu (M.Ö.K) = order_number (unique per tenant)
-        integration_code = order.order_number[:32] if len(order.order_number) > 32 else order.order_number
-        if len(integration_code) < 2:
-            # Eğer order_number çok kısaysa, order ID'nin son kısmını kullan
-            integration_code = str(order.id)[:32] if len(str(order.id)) <= 32 else str(order.id)[-32:]
+        integration_code = ArasCargoService.get_integration_code(order)
         
         # InvoiceNumber: En fazla 20 karakter olmalı (Aras Kargo kısıtlaması)
         # Her sipariş için unique olmalı - order.id'nin son kısmını ekleyerek unique yapıyoruz
@@ -1547,6 +1570,17 @@ class ArasCargoService:
                 'error': 'Aras Kargo entegrasyonu bulunamadı veya aktif değil.',
             }
         
+        return ArasCargoService._track_with_integration(integration, tracking_reference, query_type)
+    
+    @staticmethod
+    def _track_with_integration(
+        integration: IntegrationProvider,
+        tracking_reference: str,
+        query_type: int = 1,
+        credentials: Optional[Dict] = None,
+        track_usage: bool = True
+    ) -> Dict[str, Any]:
+        """track_shipment'ın entegrasyonu önceden çözülmüş hali (track_shipments_bulk da kullanır)."""
         # Service metod adı (config'den al veya default)
         service_method = integration.config.get('track_shipment_method', 'GetQueryDS')
         
@@ -1557,7 +1591,6 @@ class ArasCargoService:
         
         # QueryType 2 (tarihe göre) için Date parametresi gerekli
         if query_type == 2:
-            from django.utils import timezone
             query_params = {
                 'Date': timezone.now().strftime('%Y-%m-%d'),
             }
@@ -1571,7 +1604,9 @@ class ArasCargoService:
         response = ArasCargoService._make_soap_request(
             integration=integration,
             service_method=service_method,
-            data=track_data
+            data=track_data,
+            credentials=credentials,
+            track_usage=track_usage
         )
         
         if response.get('success'):
@@ -1582,13 +1617,14 @@ class ArasCargoService:
             if tracking_reference:
                 # 13 haneli ise tracking_number tipi
                 if len(tracking_reference) == 13:
-                    tracking_url = ArasCargoService.get_tracking_url(tenant, tracking_reference, 'tracking_number')
+                    tracking_type = 'tracking_number'
                 # 20 haneli ise barcode tipi
                 elif len(tracking_reference) == 20:
-                    tracking_url = ArasCargoService.get_tracking_url(tenant, tracking_reference, 'barcode')
+                    tracking_type = 'barcode'
                 else:
                     # Diğer durumlarda order_number olarak dene
-                    tracking_url = ArasCargoService.get_tracking_url(tenant, tracking_reference, 'order_number')
+                    tracking_type = 'order_number'
+                tracking_url = ArasCargoService._build_tracking_url(integration, tracking_reference, tracking_type)
             
             return {
                 'success': True,
@@ -1605,6 +1641,109 @@ class ArasCargoService:
                 'error': response.get('error', 'Takip bilgisi alınamadı.'),
             }
     
+    @staticmethod
+    def get_integration_code(order: Order) -> str:
+        """
+        Siparişin Aras Kargo IntegrationCode'u (Müşteri Özel Kodu).
+        En az 2, en fazla 32 karakter: order_number; çok kısaysa order ID'nin son kısmı.
+        """
+        integration_code = order.order_number[:32]
+        if len(integration_code) < 2:
+            integration_code = str(order.id)[-32:]
+        return integration_code
+    
+    @staticmethod
+    def track_shipments_bulk(tenant, orders, max_workers: Optional[int] = None, persist: bool = True) -> Dict[str, Any]:
+        """
+        Birden fazla gönderiyi sınırlı eşzamanlılıkla sorgula ve sonuçları siparişlere yaz.
+        
+        SOAP istekleri worker thread'lerinde entegrasyonun paylaşılan session'ı üzerinden
+        gönderilir (thread'ler DB'ye dokunmaz). Sonuçlar ana thread'de tek bulk_update ile
+        kaydedilir, entegrasyonun last_used_at / last_error alanı bir kez güncellenir.
+        
+        Args:
+            tenant: Tenant instance
+            orders: Order listesi / queryset'i (IntegrationCode ile sorgulanır)
+            max_workers: Eşzamanlı istek sayısı (varsayılan BULK_TRACK_MAX_WORKERS)
+            persist: False ise siparişler değiştirilmez / kaydedilmez; sadece sonuçlar döner
+                (ShipmentSyncService değişiklik tespitini ve yazmayı kendisi yapar)
+        
+        Returns:
+            dict: {
+                'success': bool,
+                'results': {order_id: track_shipment sonucu},
+                'updated': int,
+                'failed': int
+            }
+        """
+        integration = ArasCargoService.get_integration(tenant)
+        if not integration:
+            return {
+                'success': False,
+                'error': 'Aras Kargo entegrasyonu bulunamadı veya aktif değil.',
+            }
+        
+        orders = list(orders)
+        if not orders:
+            return {'success': True, 'results': {}, 'updated': 0, 'failed': 0}
+        
+        # Credential'lar ve session ana thread'de bir kez hazırlanır
+        credentials = ArasCargoService._get_api_credentials(integration)
+        ArasCargoService.get_session(integration)
+        
+        def track(order):
+            return ArasCargoService._track_with_integration(
+                integration,
+                ArasCargoService.get_integration_code(order),
+                credentials=credentials,
+                track_usage=False
+            )
+        
+        workers = max(1, min(max_workers or ArasCargoService.BULK_TRACK_MAX_WORKERS, len(orders)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='aras-track') as executor:
+            results = list(executor.map(track, orders))
+        
+        now = timezone.now()
+        updated_orders = []
+        last_error = ''
+        for order, result in zip(orders, results):
+            if not result.get('success'):
+                last_error = result.get('error', '')
+                continue
+            if not persist:
+                updated_orders.append(order)
+                continue
+            order.cargo_status = str(result.get('status') or '')[:100]
+            order.cargo_status_code = str(result.get('status_code') or '')[:20]
+            order.cargo_checked_at = now
+            tracking_number = str(result.get('tracking_number') or '').strip()
+            if tracking_number and not order.tracking_number:
+                order.tracking_number = tracking_number[:100]
+            updated_orders.append(order)
+        
+        if updated_orders and persist:
+            Order.objects.bulk_update(
+                updated_orders,
+                ['cargo_status', 'cargo_status_code', 'cargo_checked_at', 'tracking_number'],
+                batch_size=500
+            )
+        
+        failed = len(orders) - len(updated_orders)
+        integration.last_used_at = now
+        integration.last_error = last_error if failed else ''
+        integration.save(update_fields=['last_used_at', 'last_error'])
+        
+        logger.info(
+            f"Aras Kargo bulk tracking for tenant {tenant.slug}: "
+            f"{len(updated_orders)} updated, {failed} failed ({workers} workers)"
+        )
+        return {
+            'success': True,
+            'results': {str(order.id): result for order, result in zip(orders, results)},
+            'updated': len(updated_orders),
+            'failed': failed,
+        }
+    
     @staticmethod
     def print_label(tenant, tracking_number: str) -> Dict[str, Any]:
         """
@@ -2,8 +2,12 @@
 Cache service - Redis cache yönetimi.
 İkas benzeri cache sistemi.
 """
+import hashlib
 import json
 import logging
+import os
+import threading
+import time
 from django.core.cache import cache
 from django.conf import settings
 
@@ -22,6 +26,8 @@ class CacheService:
     CACHE_PREFIX_ANALYTICS = 'analytics'
     CACHE_PREFIX_TENANT = 'tenant'
     CACHE_PREFIX_USER_PERMS = 'user_perms'
+    CACHE_PREFIX_FACETS = 'facets'
+    CACHE_PREFIX_STOREFRONT = 'storefront'
     
     # Cache timeout'ları (saniye)
     TIMEOUT_PRODUCT = 3600  # 1 saat
@@ -32,6 +38,34 @@ class CacheService:
     TIMEOUT_ANALYTICS = 300  # 5 dakika
     TIMEOUT_TENANT = 86400  # 24 saat (Tenant bilgileri nadir değişir)
     TIMEOUT_USER_PERMS = 3600  # 1 saat
+    TIMEOUT_FACETS = 1800  # 30 dakika (versiyon ile invalidate edilir)
+    TIMEOUT_STOREFRONT = 300  # 5 dakika (kur değişimleri için kısa tutuldu, değişiklikte versiyon ile invalidate edilir)
+    
+    _redis_clients = {}
+    _redis_pid = None
+    _redis_lock = threading.Lock()
+    
+    @staticmethod
+    def get_redis(url=None):
+        """
+        Ham Redis client'ı (liste / pipeline gibi cache API'sinde olmayan işlemler için).
+        Process ve URL başına tek client (kendi connection pool'u ile); fork sonrası yeniden oluşturulur.
+        """
+        url = url or settings.CACHES['default']['LOCATION']
+        pid = os.getpid()
+        client = CacheService._redis_clients.get(url) if CacheService._redis_pid == pid else None
+        if client is None:
+            with CacheService._redis_lock:
+                if CacheService._redis_pid != pid:
+                    CacheService._redis_clients = {}
+                    CacheService._redis_pid = pid
+                client = CacheService._redis_clients.get(url)
+                if client is None:
+                    import redis
+                    
+                    client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+                    CacheService._redis_clients[url] = client
+        return client
     
     @staticmethod
     def get_cache_key(prefix, tenant_id, *args):
@@ -39,6 +73,152 @@ class CacheService:
         key_parts = [prefix, str(tenant_id)] + [str(arg) for arg in args]
         return ':'.join(key_parts)
     
+    @staticmethod
+    def get_tenant_version(prefix, tenant_id):
+        """
+        Tenant bazlı cache versiyonunu al.
+        Versiyon key'e dahil edildiğinde, versiyonu artırmak eski tüm key'leri
+        tek işlemde geçersiz kılar (delete_pattern gerekmez).
+        """
+        cache_key = CacheService.get_cache_key(prefix, tenant_id, 'version')
+        version = cache.get(cache_key)
+        if version is None:
+            # Zaman damgası ile başlat: key düşse bile eski versiyon numarası tekrar kullanılmaz
+            cache.add(cache_key, int(time.time() * 1000), None)
+            version = cache.get(cache_key)
+        return version
+    
+    @staticmethod
+    def bump_tenant_version(prefix, tenant_id):
+        """Tenant bazlı cache versiyonunu artır (atomik INCR)."""
+        cache_key = CacheService.get_cache_key(prefix, tenant_id, 'version')
+        try:
+            return cache.incr(cache_key)
+        except ValueError:
+            # Key yoksa yeni bir versiyon ile başlat
+            version = int(time.time() * 1000)
+            cache.set(cache_key, version, None)
+            return version
+    
+    @staticmethod
+    def get_facets(tenant_id, scope):
+        """Facet (filtre seçenekleri) sonucunu cache'den al."""
+        version = CacheService.get_tenant_version(CacheService.CACHE_PREFIX_FACETS, tenant_id)
+        cache_key = CacheService.get_cache_key(
+            CacheService.CACHE_PREFIX_FACETS,
+            tenant_id,
+            version,
+            scope
+        )
+        return cache.get(cache_key)
+    
+    @staticmethod
+    def set_facets(tenant_id, scope, facet_data, timeout=None):
+        """Facet sonucunu cache'e kaydet."""
+        version = CacheService.get_tenant_version(CacheService.CACHE_PREFIX_FACETS, tenant_id)
+        cache_key = CacheService.get_cache_key(
+            CacheService.CACHE_PREFIX_FACETS,
+            tenant_id,
+            version,
+            scope
+        )
+        cache.set(
+            cache_key,
+            facet_data,
+            timeout or CacheService.TIMEOUT_FACETS
+        )
+    
+    @staticmethod
+    def invalidate_facets(tenant_id):
+        """Tenant'ın tüm facet cache'ini geçersiz kıl."""
+        CacheService.bump_tenant_version(CacheService.CACHE_PREFIX_FACETS, tenant_id)
+    
+    @staticmethod
+    def get_storefront_cache_key(tenant_id, request, view_name):
+        """
+        Public storefront response'u için cache key oluştur.
+        Key; tenant versiyonu, path, sıralı query parametreleri ve X-Currency-Code header'ını içerir.
+        Staff/owner kullanıcılar farklı veri gördüğü için (compare_at_price vb.) cache'lenmez -> None.
+        """
+        if request.method != 'GET':
+            return None
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated and (
+            user.is_staff or getattr(user, 'is_owner', False) or getattr(user, 'is_tenant_owner', False)
+        ):
+            return None
+        
+        query_string = '&'.join(
+            f'{key}={value}'
+            for key in sorted(request.query_params.keys())
+            for value in request.query_params.getlist(key)
+        )
+        currency = (request.headers.get('X-Currency-Code') or '').upper()
+        fingerprint = hashlib.md5(
+            f'{request.path}?{query_string}|{currency}'.encode('utf-8')
+        ).hexdigest()
+        version = CacheService.get_tenant_version(CacheService.CACHE_PREFIX_STOREFRONT, tenant_id)
+        return CacheService.get_cache_key(
+            CacheService.CACHE_PREFIX_STOREFRONT,
+            tenant_id,
+            version,
+            view_name,
+            fingerprint
+        )
+    
+    @staticmethod
+    def get_storefront_response(tenant_id, cache_key):
+        """Storefront response'unu cache'den al ve hit/miss sayacını güncelle."""
+        data = cache.get(cache_key)
+        CacheService._record_storefront_metric(tenant_id, 'hit' if data is not None else 'miss')
+        return data
+    
+    @staticmethod
+    def set_storefront_response(cache_key, response_data, timeout=None):
+        """Storefront response'unu cache'e kaydet."""
+        cache.set(
+            cache_key,
+            response_data,
+            timeout or CacheService.TIMEOUT_STOREFRONT
+        )
+    
+    @staticmethod
+    def invalidate_storefront(tenant_id):
+        """Tenant'ın tüm storefront response cache'ini geçersiz kıl (versiyon artırılır)."""
+        CacheService.bump_tenant_version(CacheService.CACHE_PREFIX_STOREFRONT, tenant_id)
+    
+    @staticmethod
+    def _record_storefront_metric(tenant_id, metric):
+        """Hit/miss sayacını artır (metrik hatası isteği bozmamalı)."""
+        cache_key = CacheService.get_cache_key(CacheService.CACHE_PREFIX_STOREFRONT, tenant_id, 'metrics', metric)
+        try:
+            cache.incr(cache_key)
+        except ValueError:
+            cache.add(cache_key, 0, None)
+            try:
+                cache.incr(cache_key)
+            except ValueError:
+                pass
+        except Exception as e:
+            logger.warning(f"Storefront cache metric error: {e}")
+    
+    @staticmethod
+    def get_storefront_cache_stats(tenant_id):
+        """Tenant'ın storefront cache hit/miss istatistikleri."""
+        keys = {
+            metric: CacheService.get_cache_key(CacheService.CACHE_PREFIX_STOREFRONT, tenant_id, 'metrics', metric)
+            for metric in ('hit', 'miss')
+        }
+        values = cache.get_many(list(keys.values()))
+        hits = values.get(keys['hit'], 0)
+        misses = values.get(keys['miss'], 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else 0.0,
+        }
+    
     @staticmethod
     def get_product(tenant_id, product_id):
         """Ürün cache'den al."""
@@ -76,20 +256,24 @@ class CacheService:
     @staticmethod
     def get_category_tree(tenant_id):
         """Kategori ağacı cache'den al."""
+        version = CacheService.get_tenant_version(CacheService.CACHE_PREFIX_CATEGORY, tenant_id)
         cache_key = CacheService.get_cache_key(
             CacheService.CACHE_PREFIX_CATEGORY,
             tenant_id,
-            'tree'
+            'tree',
+            version
         )
         return cache.get(cache_key)
     
     @staticmethod
     def set_category_tree(tenant_id, category_data, timeout=None):
         """Kategori ağacı cache'e kaydet."""
+        version = CacheService.get_tenant_version(CacheService.CACHE_PREFIX_CATEGORY, tenant_id)
         cache_key = CacheService.get_cache_key(
             CacheService.CACHE_PREFIX_CATEGORY,
             tenant_id,
-            'tree'
+            'tree',
+            version
         )
         cache.set(
             cache_key,
@@ -99,13 +283,8 @@ class CacheService:
     
     @staticmethod
     def delete_category_tree(tenant_id):
-        """Kategori ağacı cache'den sil."""
-        cache_key = CacheService.get_cache_key(
-            CacheService.CACHE_PREFIX_CATEGORY,
-            tenant_id,
-            'tree'
-        )
-        cache.delete(cache_key)
+        """Tenant'ın kategori ağacı cache'ini geçersiz kıl (versiyon artırılır)."""
+        CacheService.bump_tenant_version(CacheService.CACHE_PREFIX_CATEGORY, tenant_id)
     
     @staticmethod
     def get_cart(tenant_id, cart_id):
@@ -141,18 +320,6 @@ class CacheService:
         )
         cache.delete(cache_key)
     
-    @staticmethod
-    def get_tenant_by_host(host):
-        """Host (domain/subdomain) bilgisine göre tenant'ı cache'den al."""
-        cache_key = f"{CacheService.CACHE_PREFIX_TENANT}:host:{host}"
-        return cache.get(cache_key)
-
-    @staticmethod
-    def set_tenant_by_host(host, tenant_data, timeout=None):
-        """Host bilgisine göre tenant'ı cache'e kaydet."""
-        cache_key = f"{CacheService.CACHE_PREFIX_TENANT}:host:{host}"
-        cache.set(cache_key, tenant_data, timeout or CacheService.TIMEOUT_TENANT)
-
     @staticmethod
     def get_user_permissions(user_id):
         """Kullanıcı yetkilerini cache'den al."""
@@ -0,0 +1,237 @@
+"""
+Cart totals service - Sepet toplamlarının tek geçişte hesaplanması.
+
+Kalemler select_related ile tek sorguda yüklenir, fiyat/stok hesabı bellekte
+yapılır, sadece fiyatı değişen kalemler tek bulk_update ile yazılır.
+Sonuç (CartTotals) sepet view'ları ve OrderService tarafından ortak kullanılır.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from django.core.cache import cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+TWOPLACES = Decimal('0.01')
+
+
+class CartTotals:
+    """
+    Sepet hesaplama sonucu.
+
+    Attributes:
+        items: Hesaplanan CartItem listesi (her kalemde is_available ve line_total set edilir)
+        subtotal: Tüm kalemlerin toplamı
+        eligible_subtotal: Seçili ve stokta olan kalemlerin toplamı (kupon/ödeme matrahı)
+        shipping_cost, tax_rate, tax_amount, discount_amount, total
+        updated_items: Fiyat snapshot'ı değişip DB'ye yazılan kalem sayısı
+    """
+
+    def __init__(self, currency, items):
+        self.currency = currency
+        self.items = items
+        self.subtotal = Decimal('0.00')
+        self.eligible_subtotal = Decimal('0.00')
+        self.shipping_cost = Decimal('0.00')
+        self.tax_rate = Decimal('0.00')
+        self.tax_amount = Decimal('0.00')
+        self.discount_amount = Decimal('0.00')
+        self.total = Decimal('0.00')
+        self.updated_items = 0
+
+    @property
+    def eligible_items(self):
+        """Siparişe dahil edilebilecek (seçili ve stokta) kalemler."""
+        return [item for item in self.items if item.is_selected and item.is_available]
+
+    def as_dict(self):
+        return {
+            'currency': self.currency,
+            'subtotal': str(self.subtotal),
+            'eligible_subtotal': str(self.eligible_subtotal),
+            'shipping_cost': str(self.shipping_cost),
+            'tax_rate': str(self.tax_rate),
+            'tax_amount': str(self.tax_amount),
+            'discount_amount': str(self.discount_amount),
+            'total': str(self.total),
+        }
+
+
+class CartTotalsService:
+    """Sepet toplamı hesaplama iş mantığı."""
+
+    CACHE_PREFIX_TAX_RATE = 'tax_rate'
+    TIMEOUT_TAX_RATE = 3600  # 1 saat (Tax değişikliğinde signal ile silinir)
+
+    @staticmethod
+    def get_active_tax_rate(tenant_id):
+        """
+        Tenant'ın aktif vergi oranı (cache'li).
+        Varsayılan vergi önceliklidir; aktif vergi yoksa 0.
+        """
+        from apps.models import Tax
+
+        cache_key = f"{CartTotalsService.CACHE_PREFIX_TAX_RATE}:{tenant_id}"
+        cached_rate = cache.get(cache_key)
+        if cached_rate is not None:
+            return Decimal(cached_rate)
+
+        rate = Tax.objects.filter(
+            tenant_id=tenant_id,
+            is_active=True,
+            is_deleted=False
+        ).order_by('-is_default', '-created_at').values_list('rate', flat=True).first()
+        rate = rate if rate is not None else Decimal('0.00')
+        cache.set(cache_key, str(rate), CartTotalsService.TIMEOUT_TAX_RATE)
+        return rate
+
+    @staticmethod
+    def invalidate_tax_rate(tenant_id):
+        """Tenant'ın vergi oranı cache'ini sil."""
+        cache.delete(f"{CartTotalsService.CACHE_PREFIX_TAX_RATE}:{tenant_id}")
+
+    @staticmethod
+    def load_items(cart):
+        """Sepetin silinmemiş kalemlerini ürün ve varyantlarıyla tek sorguda yükle."""
+        return list(
+            cart.items.filter(is_deleted=False).select_related('product', 'variant').order_by('created_at')
+        )
+
+    @staticmethod
+    def calculate(cart, currency_context=None, items=None, persist=True):
+        """
+        Sepet toplamlarını hesapla.
+
+        Args:
+            cart: Cart instance
+            currency_context: Opsiyonel CurrencyContext (kurlar tüm kalemler için bir kez yüklenir)
+            items: Önceden yüklenmiş kalemler (yoksa load_items ile yüklenir)
+            persist: True ise değişen kalem snapshot'ları ve sepet toplamları kaydedilir
+
+        Returns:
+            CartTotals
+        """
+        from apps.services.currency_service import CurrencyContext
+        from apps.models import CartItem
+
+        cart_currency = cart.currency or 'TRY'
+        if currency_context is None or currency_context.target_currency != cart_currency.upper():
+            currency_context = CurrencyContext(cart_currency)
+        if items is None:
+            items = CartTotalsService.load_items(cart)
+
+        totals = CartTotals(cart_currency, items)
+        subtotal = Decimal('0.00')
+        eligible_subtotal = Decimal('0.00')  # Kupon ve ödeme için geçerli olan tutar
+        changed_items = []
+
+        # Her hesaplamada ürün fiyatlarını güncelle (güncel kur ve fiyat için)
+        for item in items:
+            if item.variant:
+                base_price = item.variant.price
+                item.is_available = item.variant.is_available(item.quantity)
+            else:
+                base_price = item.product.price
+                item.is_available = item.product.is_available(item.quantity)
+            product_currency = item.product.currency or 'TRY'
+
+            # Para birimi dönüşümü yap (kur snapshot'ı ile - kalem başına cache erişimi yok)
+            if product_currency != cart_currency:
+                try:
+                    unit_price = currency_context.convert(base_price, product_currency)
+                except Exception:
+                    unit_price = base_price
+            else:
+                unit_price = base_price
+
+            line_total = unit_price * item.quantity
+            item.line_total = line_total
+
+            # Tüm sepet toplamı (Görsel referans için)
+            subtotal += line_total
+            # Sadece seçili VE stokta olanları kupon/ödeme matrahına ekle
+            if item.is_selected and item.is_available:
+                eligible_subtotal += line_total
+
+            # DB snapshot'ı (2 hane) - sadece değişenler yazılır
+            unit_price = unit_price.quantize(TWOPLACES, rounding=ROUND_HALF_UP)
+            total_price = line_total.quantize(TWOPLACES, rounding=ROUND_HALF_UP)
+            if item.unit_price != unit_price or item.total_price != total_price:
+                item.unit_price = unit_price
+                item.total_price = total_price
+                changed_items.append(item)
+
+        if persist and changed_items:
+            CartItem.objects.bulk_update(changed_items, ['unit_price', 'total_price'])
+        totals.updated_items = len(changed_items)
+
+        totals.subtotal = subtotal
+        totals.eligible_subtotal = eligible_subtotal.quantize(TWOPLACES)
+
+        # Kargo ücreti hesaplama (eligible tutar üzerinden)
+        shipping_method = cart.shipping_method
+        if shipping_method:
+            if shipping_method.free_shipping_threshold and eligible_subtotal >= shipping_method.free_shipping_threshold:
+                totals.shipping_cost = Decimal('0.00')
+            else:
+                totals.shipping_cost = shipping_method.price
+
+        # Vergi hesaplama (Dinamik - Tenant bazlı, eligible tutar üzerinden)
+        totals.tax_rate = CartTotalsService.get_active_tax_rate(cart.tenant_id)
+        tax_amount = eligible_subtotal * (totals.tax_rate / Decimal('100'))
+        totals.tax_amount = tax_amount
+
+        # Vergi dahil tutar (Kupon bu tutar üzerinden hesaplanır)
+        eligible_subtotal_with_tax = eligible_subtotal + tax_amount
+
+        # Kupon indirimi hesapla (VERGİ DAHİL tutar üzerinden!)
+        coupon = cart.coupon
+        if coupon:
+            try:
+                # Kupon geçerliliğini kontrol et (VERGİ DAHİL tutar üzerinden)
+                is_valid, msg = coupon.is_valid(
+                    customer_email=cart.customer.email if cart.customer_id else None,
+                    order_amount=eligible_subtotal_with_tax,
+                    target_currency=cart_currency
+                )
+                if is_valid:
+                    totals.discount_amount = coupon.calculate_discount(
+                        eligible_subtotal_with_tax,
+                        target_currency=cart_currency
+                    )
+                    # Ücretsiz kargo kontrolü
+                    if coupon.discount_type == coupon.DiscountType.FREE_SHIPPING:
+                        totals.shipping_cost = Decimal('0.00')
+                else:
+                    logger.warning(f"[CART_CALC] Coupon {coupon.code} invalid for tax-inclusive amount {eligible_subtotal_with_tax}: {msg}")
+            except Exception as e:
+                logger.warning(f"[CART_CALC] Error calculating coupon discount: {e}")
+
+        # Yuvarlama
+        totals.subtotal = totals.subtotal.quantize(TWOPLACES)
+        totals.shipping_cost = totals.shipping_cost.quantize(TWOPLACES)
+        totals.tax_amount = totals.tax_amount.quantize(TWOPLACES)
+        totals.discount_amount = totals.discount_amount.quantize(TWOPLACES)
+
+        # Ödenecek Toplamı hesapla (Sadece eligible ürünler + kargo + vergi - indirim)
+        gross_total = eligible_subtotal + totals.shipping_cost + totals.tax_amount
+        totals.total = max(Decimal('0.00'), (gross_total - totals.discount_amount)).quantize(TWOPLACES)
+
+        logger.info(
+            f"[CART_CALC] Cart {cart.id} | Total Subtotal: {totals.subtotal} | "
+            f"Eligible Subtotal: {eligible_subtotal} | Total to Pay: {totals.total} | "
+            f"Updated items: {totals.updated_items}"
+        )
+
+        cart.subtotal = totals.subtotal
+        cart.eligible_subtotal = totals.eligible_subtotal
+        cart.shipping_cost = totals.shipping_cost
+        cart.tax_amount = totals.tax_amount
+        cart.discount_amount = totals.discount_amount
+        cart.total = totals.total
+        cart.totals = totals
+        if persist:
+            cart.save(update_fields=[
+                'subtotal', 'eligible_subtotal', 'shipping_cost', 'tax_amount',
+                'discount_amount', 'total', 'updated_at',
+            ])
+        return totals
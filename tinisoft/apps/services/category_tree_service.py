@@ -0,0 +1,199 @@
+"""
+Category tree service - Materialized path ile kategori hiyerarşisi ve cache'lenmiş kategori ağacı.
+
+Her kategori `path` alanında kökten kendisine kadar olan ID'leri tutar
+("<kök_hex>/<ara_hex>/<kendi_hex>/"). Böylece:
+- Bir kategorinin tüm alt kategorileri tek sorguda bulunur (path__startswith).
+- Kategori taşındığında alt ağacın path'leri tek UPDATE ile yeniden yazılır.
+Path'i boş kalmış (eski) kayıtlar ilk ihtiyaçta rebuild_paths ile tamamlanır.
+
+Tüm ağacın serialize edilmiş hali tenant başına versiyonlu cache'te tutulur; kategori,
+ürün veya ürün-kategori ilişkisi değiştiğinde versiyon artırılır (signals).
+"""
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Concat, Substr
+from apps.models import Category, Product
+from apps.services.cache_service import CacheService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryTreeService:
+    """Kategori hiyerarşisi iş mantığı."""
+
+    PATH_SEPARATOR = '/'
+
+    # ------------------------------------------------------------------
+    # Materialized path
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_segment(category_id):
+        return f'{category_id.hex}{CategoryTreeService.PATH_SEPARATOR}'
+
+    @staticmethod
+    def assign_path(category):
+        """
+        Kaydedilmek üzere olan kategorinin path ve depth alanlarını parent'a göre hesapla.
+
+        Returns:
+            str: Kategorinin DB'deki eski path'i (yeni kayıtta None)
+        """
+        old_path = None
+        if not category._state.adding:
+            old_path = Category.objects.filter(pk=category.pk).values_list('path', flat=True).first()
+
+        parent_path = ''
+        parent_depth = -1
+        if category.parent_id:
+            parent_path, parent_depth = CategoryTreeService._get_path_and_depth(category.parent_id, category.tenant_id)
+            if old_path and parent_path.startswith(old_path):
+                raise ValueError('Bir kategori kendi alt kategorisinin altına taşınamaz.')
+
+        category.path = parent_path + CategoryTreeService.get_segment(category.id)
+        category.depth = parent_depth + 1
+        return old_path
+
+    @staticmethod
+    def _get_path_and_depth(category_id, tenant_id):
+        row = Category.objects.filter(pk=category_id).values_list('path', 'depth').first()
+        if row and not row[0]:
+            # Path'i henüz hesaplanmamış (eski) ağaç - tenant'ı bir kez tamamla
+            CategoryTreeService.rebuild_paths(tenant_id)
+            row = Category.objects.filter(pk=category_id).values_list('path', 'depth').first()
+        return row or ('', -1)
+
+    @staticmethod
+    def move_subtree(category, old_path):
+        """Taşınan kategorinin alt ağacındaki path/depth'leri tek UPDATE ile yeniden yaz."""
+        depth_delta = category.depth - (old_path.count(CategoryTreeService.PATH_SEPARATOR) - 1)
+        return Category.objects.filter(
+            tenant_id=category.tenant_id,
+            path__startswith=old_path,
+        ).exclude(pk=category.pk).update(
+            path=Concat(
+                Value(category.path),
+                Substr('path', len(old_path) + 1),
+                output_field=CharField(),
+            ),
+            depth=F('depth') + depth_delta,
+        )
+
+    @staticmethod
+    def rebuild_paths(tenant_id):
+        """
+        Tenant'ın tüm kategori path'lerini parent ilişkisinden yeniden hesapla (tek sorgu + bulk_update).
+
+        Returns:
+            int: Güncellenen kategori sayısı
+        """
+        rows = Category.objects.filter(tenant_id=tenant_id).order_by().values_list('id', 'parent_id', 'path', 'depth')
+        parents = {}
+        current = {}
+        for category_id, parent_id, path, depth in rows:
+            parents[category_id] = parent_id
+            current[category_id] = (path, depth)
+
+        computed = {}
+        for category_id in parents:
+            # Hesaplanmış bir ataya (veya köke) kadar yukarı çık, sonra aşağı doğru doldur
+            chain = []
+            node = category_id
+            while node is not None and node not in computed and node in parents and node not in chain:
+                chain.append(node)
+                node = parents[node]
+            base_path, base_depth = computed.get(node, ('', -1))
+            for node in reversed(chain):
+                base_path += CategoryTreeService.get_segment(node)
+                base_depth += 1
+                computed[node] = (base_path, base_depth)
+
+        changed = [
+            Category(id=category_id, path=path, depth=depth)
+            for category_id, (path, depth) in computed.items()
+            if current[category_id] != (path, depth)
+        ]
+        if changed:
+            Category.objects.bulk_update(changed, ['path', 'depth'], batch_size=500)
+            logger.info(f"[CATEGORY_TREE] Rebuilt {len(changed)} category path(s) for tenant {tenant_id}")
+        return len(changed)
+
+    @staticmethod
+    def get_descendant_ids(category, include_self=True):
+        """
+        Kategorinin aktif alt kategorilerinin ID'leri (tek sorgu).
+        Pasif veya silinmiş bir kategorinin altındaki dallar dahil edilmez.
+        """
+        if not category.path:
+            CategoryTreeService.rebuild_paths(category.tenant_id)
+            category.path = Category.objects.filter(pk=category.pk).values_list('path', flat=True).first() or ''
+            if not category.path:
+                return [category.id] if include_self else []
+
+        rows = Category.objects.filter(
+            tenant_id=category.tenant_id,
+            path__startswith=category.path,
+        ).order_by('path').values_list('id', 'path', 'is_active', 'is_deleted')
+
+        ids = []
+        hidden_prefixes = []
+        for category_id, path, is_active, is_deleted in rows:
+            if category_id == category.id:
+                if include_self:
+                    ids.append(category_id)
+                continue
+            if any(path.startswith(prefix) for prefix in hidden_prefixes):
+                continue
+            if is_deleted or not is_active:
+                hidden_prefixes.append(path)
+                continue
+            ids.append(category_id)
+        return ids
+
+    # ------------------------------------------------------------------
+    # Ağaç / serialize
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def build_index(tenant_id):
+        """
+        Tenant'ın silinmemiş kategorilerini parent'a göre grupla ve aktif ürün sayılarını hesapla (2 sorgu).
+
+        Returns:
+            dict: {'children': {parent_id: [Category, ...]}, 'product_counts': {category_id: int}}
+        """
+        children = {}
+        for category in Category.objects.filter(tenant_id=tenant_id, is_deleted=False):
+            children.setdefault(category.parent_id, []).append(category)
+
+        product_counts = dict(
+            Product.categories.through.objects.filter(
+                category__tenant_id=tenant_id,
+                product__is_deleted=False,
+                product__status='active',
+            ).order_by().values('category_id').annotate(count=Count('product_id')).values_list('category_id', 'count')
+        )
+        return {'children': children, 'product_counts': product_counts}
+
+    @staticmethod
+    def get_tree(tenant_id):
+        """
+        Tenant'ın tüm kategori ağacı (CategorySerializer çıktısı, kök kategoriler listesi).
+        Cache'lenir; değişikliklerde CacheService.delete_category_tree ile geçersiz kılınır.
+        """
+        from apps.serializers.product import CategorySerializer
+
+        tree = CacheService.get_category_tree(tenant_id)
+        if tree is not None:
+            return tree
+
+        index = CategoryTreeService.build_index(tenant_id)
+        serializer = CategorySerializer(
+            index['children'].get(None, []),
+            many=True,
+            context={CategorySerializer.TREE_INDEX_CONTEXT_KEY: {str(tenant_id): index}},
+        )
+        tree = list(serializer.data)
+        CacheService.set_category_tree(tenant_id, tree)
+        return tree
@@ -12,6 +12,49 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def normalize_currency_code(code):
+    """Para birimi kodunu normalize et (TRL (legacy) -> TRY)."""
+    code = (code or 'TRY').upper()
+    return 'TRY' if code == 'TRL' else code
+
+
+def convert_with_rates(amount, from_currency, to_currency, rates):
+    """
+    Verilen kur tablosu ile dönüşüm yap (cache/HTTP erişimi yok).
+    
+    Args:
+        amount: Decimal tutar
+        from_currency: Normalize edilmiş kaynak para birimi kodu
+        to_currency: Normalize edilmiş hedef para birimi kodu
+        rates: get_tcmb_exchange_rates() çıktısı
+    
+    Returns:
+        Decimal: Dönüştürülmüş tutar
+    """
+    if from_currency == to_currency:
+        return amount
+    
+    # TRY'ye dönüştür (base currency)
+    if from_currency == 'TRY':
+        try_amount = amount
+    elif from_currency in rates:
+        # Yabancı para biriminden TRY'ye
+        try_amount = amount * rates[from_currency]
+    else:
+        logger.warning(f"Unknown from_currency: {from_currency}, returning original amount")
+        return amount
+    
+    # TRY'den hedef para birimine dönüştür
+    if to_currency == 'TRY':
+        return try_amount
+    elif to_currency in rates:
+        # TRY'den yabancı para birimine
+        return try_amount / rates[to_currency]
+    else:
+        logger.warning(f"Unknown to_currency: {to_currency}, returning TRY amount")
+        return try_amount
+
+
 class CurrencyService:
     """Para birimi dönüşüm servisi - TCMB API kullanarak."""
     
@@ -119,11 +162,8 @@ class CurrencyService:
         if not isinstance(amount, Decimal):
             amount = Decimal(str(amount))
         
-        # Normalizasyon: TRL (legacy) -> TRY
-        if from_currency == 'TRL':
-            from_currency = 'TRY'
-        if to_currency == 'TRL':
-            to_currency = 'TRY'
+        from_currency = normalize_currency_code(from_currency)
+        to_currency = normalize_currency_code(to_currency)
             
         # Aynı para birimiyse direkt döndür
         if from_currency == to_currency:
@@ -131,26 +171,7 @@ class CurrencyService:
         
         # TCMB kurlarını al
         rates = CurrencyService.get_tcmb_exchange_rates()
-        
-        # TRY'ye dönüştür (base currency)
-        if from_currency == 'TRY':
-            try_amount = amount
-        elif from_currency in rates:
-            # Yabancı para biriminden TRY'ye
-            try_amount = amount * rates[from_currency]
-        else:
-            logger.warning(f"Unknown from_currency: {from_currency}, returning original amount")
-            return amount
-        
-        # TRY'den hedef para birimine dönüştür
-        if to_currency == 'TRY':
-            return try_amount
-        elif to_currency in rates:
-            # TRY'den yabancı para birimine
-            return try_amount / rates[to_currency]
-        else:
-            logger.warning(f"Unknown to_currency: {to_currency}, returning TRY amount")
-            return try_amount
+        return convert_with_rates(amount, from_currency, to_currency, rates)
     
     @staticmethod
     def get_exchange_rate(from_currency, to_currency):
@@ -242,3 +263,73 @@ class CurrencyService:
                 currency.save(update_fields=['exchange_rate'])
                 logger.info(f"Updated exchange rate for {currency.code}: {currency.exchange_rate}")
 
+
+
+class CurrencyContext:
+    """
+    İstek bazlı kur snapshot'ı.
+    
+    TCMB kurları ilk dönüşümde bir kez yüklenir, hedef para birimi bir kez çözülür.
+    Serializer'lar ve sepet hesaplaması satır başına cache'e gitmek yerine bunu paylaşır.
+    """
+    
+    REQUEST_ATTR = '_currency_context'
+    
+    def __init__(self, target_currency='TRY', rates=None):
+        self.target_currency = normalize_currency_code(target_currency)
+        self._rates = rates
+    
+    @classmethod
+    def for_request(cls, request):
+        """
+        Request için context'i döndür (yoksa oluştur ve request üzerinde sakla).
+        Hedef para birimi X-Currency-Code header'ından veya ?currency= parametresinden alınır.
+        """
+        # DRF Request sarmalayıcısı her serializer çağrısında aynı olmayabilir - alttaki HttpRequest'i kullan
+        holder = getattr(request, '_request', request)
+        context = getattr(holder, cls.REQUEST_ATTR, None)
+        if context is None:
+            query_params = getattr(request, 'query_params', None) or getattr(request, 'GET', {})
+            target_currency = request.headers.get('X-Currency-Code') or query_params.get('currency', 'TRY')
+            context = cls(target_currency)
+            setattr(holder, cls.REQUEST_ATTR, context)
+        return context
+    
+    @property
+    def rates(self):
+        if self._rates is None:
+            self._rates = CurrencyService.get_tcmb_exchange_rates()
+        return self._rates
+    
+    def needs_conversion(self, from_currency):
+        return normalize_currency_code(from_currency) != self.target_currency
+    
+    def convert(self, amount, from_currency):
+        """Tek tutarı hedef para birimine çevir."""
+        return self.convert_many([amount], from_currency)[0]
+    
+    def convert_many(self, amounts, from_currency):
+        """
+        Aynı kaynak para birimindeki tutarları tek seferde hedef para birimine çevir.
+        None değerler None olarak kalır.
+        
+        Returns:
+            list: Dönüştürülmüş Decimal listesi (girdi ile aynı sırada)
+        """
+        from_currency = normalize_currency_code(from_currency)
+        if from_currency == self.target_currency:
+            return [
+                amount if amount is None or isinstance(amount, Decimal) else Decimal(str(amount))
+                for amount in amounts
+            ]
+        
+        rates = self.rates
+        converted = []
+        for amount in amounts:
+            if amount is None:
+                converted.append(None)
+                continue
+            if not isinstance(amount, Decimal):
+                amount = Decimal(str(amount))
+            converted.append(convert_with_rates(amount, from_currency, self.target_currency, rates))
+        return converted
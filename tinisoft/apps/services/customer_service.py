@@ -1,7 +1,15 @@
 """
 Customer service - Business logic for customers.
+
+Müşteri istatistikleri (total_orders, total_spent, average_order_value, first/last_order_at)
+artımlı tutulur: sipariş oluşturma, iptal ve iadede tek UPDATE ile F() delta uygulanır.
+Tam hesaplama tek aggregate sorgusu ile yapılır; gece çalışan reconciliation task'ı
+(apps.tasks.customer_task) olası sapmaları düzeltir.
 """
-from apps.models import Customer, User
+from decimal import Decimal
+from django.db.models import Count, DecimalField, F, Max, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from apps.models import Customer, User, Order
 import logging
 
 logger = logging.getLogger(__name__)
@@ -45,4 +53,124 @@ class CustomerService:
         """Müşteri istatistiklerini güncelle."""
         customer.update_statistics()
         logger.info(f"Customer statistics updated for {customer.user.email}")
+    
+    # İstatistiğe dahil edilmeyen siparişler (iptal / iade)
+    EXCLUDED_ORDER_STATUSES = [Order.OrderStatus.CANCELLED, Order.OrderStatus.REFUNDED]
+    EXCLUDED_PAYMENT_STATUSES = [Order.PaymentStatus.REFUNDED]
+    
+    @staticmethod
+    def counted_orders_q(prefix=''):
+        """Toplamlara (sipariş sayısı / harcama) dahil olan siparişlerin filtresi."""
+        return ~Q(**{f'{prefix}status__in': CustomerService.EXCLUDED_ORDER_STATUSES}) & ~Q(
+            **{f'{prefix}payment_status__in': CustomerService.EXCLUDED_PAYMENT_STATUSES}
+        )
+    
+    @staticmethod
+    def is_counted(order):
+        """Sipariş müşteri toplamlarına dahil mi?"""
+        return (
+            not order.is_deleted
+            and order.status not in CustomerService.EXCLUDED_ORDER_STATUSES
+            and order.payment_status not in CustomerService.EXCLUDED_PAYMENT_STATUSES
+        )
+    
+    @staticmethod
+    def _apply_delta(order, order_delta, spent_delta, placed_at=None):
+        """Müşteri satırına tek UPDATE ile delta uygula (satır okunmaz)."""
+        if not order.customer_id:
+            return 0
+        total_orders = Greatest(F('total_orders') + order_delta, Value(0))
+        total_spent = F('total_spent') + Value(spent_delta, output_field=DecimalField())
+        updates = {
+            'total_orders': total_orders,
+            'total_spent': total_spent,
+            # SET ifadeleri güncelleme öncesi değerleri görür - ortalama yeni toplamlardan hesaplanır
+            'average_order_value': total_spent / Greatest(total_orders, Value(1)),
+        }
+        if placed_at is not None:
+            updates['first_order_at'] = Coalesce(Least(F('first_order_at'), Value(placed_at)), Value(placed_at))
+            updates['last_order_at'] = Coalesce(Greatest(F('last_order_at'), Value(placed_at)), Value(placed_at))
+        return Customer.objects.filter(tenant_id=order.tenant_id, user_id=order.customer_id).update(**updates)
+    
+    @staticmethod
+    def record_order_created(order):
+        """Yeni sipariş: sayı +1, harcama +total, ilk/son sipariş tarihleri."""
+        counted = CustomerService.is_counted(order)
+        return CustomerService._apply_delta(
+            order,
+            1 if counted else 0,
+            order.total if counted else Decimal('0'),
+            placed_at=order.created_at,
+        )
+    
+    @staticmethod
+    def record_order_change(order, was_counted):
+        """
+        Sipariş iptal / iade (veya geri alınması) sonrası toplamları düzelt.
+        
+        Args:
+            order: Güncellenmiş Order
+            was_counted: Değişiklikten önce is_counted(order) sonucu
+        """
+        counted = CustomerService.is_counted(order)
+        if counted == was_counted:
+            return 0
+        sign = 1 if counted else -1
+        return CustomerService._apply_delta(order, sign, sign * order.total)
+    
+    @staticmethod
+    def get_statistics_aggregates():
+        """Müşteri istatistiklerinin aggregate ifadeleri (Order queryset'i üzerinde)."""
+        counted = CustomerService.counted_orders_q()
+        return {
+            'total_orders': Count('id', filter=counted),
+            'total_spent': Coalesce(Sum('total', filter=counted), Value(Decimal('0')), output_field=DecimalField()),
+            'first_order_at': Min('created_at'),
+            'last_order_at': Max('created_at'),
+        }
+    
+    @staticmethod
+    def build_statistics(aggregates):
+        """Aggregate sonucundan Customer alanları."""
+        total_orders = aggregates['total_orders'] or 0
+        total_spent = aggregates['total_spent'] or Decimal('0')
+        return {
+            'total_orders': total_orders,
+            'total_spent': total_spent,
+            'average_order_value': (total_spent / total_orders).quantize(Decimal('0.01')) if total_orders else Decimal('0'),
+            'first_order_at': aggregates['first_order_at'],
+            'last_order_at': aggregates['last_order_at'],
+        }
+    
+    STATISTICS_FIELDS = ['total_orders', 'total_spent', 'average_order_value', 'first_order_at', 'last_order_at']
+    
+    @staticmethod
+    def reconcile_tenant(tenant, batch_size=500):
+        """
+        Tenant'ın tüm müşteri istatistiklerini tek gruplu aggregate sorgusu ile yeniden hesapla,
+        sadece farklı olanları bulk_update ile yaz.
+        
+        Returns:
+            dict: {'checked': int, 'fixed': int}
+        """
+        rows = Order.objects.filter(
+            tenant=tenant, is_deleted=False, customer__isnull=False,
+        ).order_by().values('customer_id').annotate(**CustomerService.get_statistics_aggregates())
+        stats_by_user = {row['customer_id']: CustomerService.build_statistics(row) for row in rows}
+        empty = CustomerService.build_statistics({
+            'total_orders': 0, 'total_spent': Decimal('0'), 'first_order_at': None, 'last_order_at': None,
+        })
+        
+        checked = 0
+        changed = []
+        for customer in Customer.objects.filter(tenant=tenant).only('id', 'user_id', *CustomerService.STATISTICS_FIELDS).iterator(chunk_size=2000):
+            checked += 1
+            expected = stats_by_user.get(customer.user_id, empty)
+            if any(getattr(customer, field) != value for field, value in expected.items()):
+                for field, value in expected.items():
+                    setattr(customer, field, value)
+                changed.append(customer)
+        if changed:
+            Customer.objects.bulk_update(changed, CustomerService.STATISTICS_FIELDS, batch_size=batch_size)
+        return {'checked': checked, 'fixed': len(changed)}
 
@@ -5,8 +5,12 @@ import openpyxl
 import pandas as pd
 from django.utils.text import slugify
 from django.utils import timezone
+from django.db import transaction
 from decimal import Decimal, InvalidOperation
 from apps.models import Product, Category, ProductImage
+from apps.services.vat_repricing_service import VatRepricingService
+from apps.services.image_processing_service import ImageProcessingService
+from apps.services.product_listing_service import ProductListingService
 import logging
 from datetime import datetime
 
@@ -431,8 +435,14 @@ class ExcelImportService:
         'imagegrup10': 'image_group_10',
     }
     
+    # Toplu import'ta tek transaction'da yazılan satır sayısı
+    DEFAULT_CHUNK_SIZE = 500
+    
+    _compact_lookup = None
+    _product_field_names = None
+    
     @staticmethod
-    def import_products_from_excel(file_path, tenant, user=None):
+    def import_products_from_excel(file_path, tenant, user=None, update_existing=False):
         """
         Excel dosyasından ürünleri import et.
         
@@ -440,6 +450,7 @@ class ExcelImportService:
             file_path: Excel dosya yolu
             tenant: Tenant instance
             user: User instance (opsiyonel)
+            update_existing: SKU'su mevcut ürünle eşleşen satırlar o ürünü güncellesin (default: her satır yeni ürün)
         
         Returns:
             dict: {
@@ -450,11 +461,6 @@ class ExcelImportService:
                 'products': list
             }
         """
-        imported_count = 0
-        failed_count = 0
-        errors = []
-        products = []
-        
         try:
             # Excel dosyasını oku
             df = pd.read_excel(file_path, engine='openpyxl')
@@ -462,47 +468,368 @@ class ExcelImportService:
             # Kolon isimlerini logla (debug için)
             logger.info(f"Excel columns found: {list(df.columns)}")
             
-            # Kolon isimlerini normalize et (küçük harf, boşlukları ve özel karakterleri temizle)
-            # Örnek: "Image Name 1" -> "imagename1", "Image-Name-1" -> "imagename1"
-            df.columns = df.columns.str.lower().str.strip().str.replace(' ', '', regex=False).str.replace('-', '', regex=False).str.replace('_', '', regex=False)
-            
-            # Normalize edilmiş kolon isimlerini logla
-            logger.info(f"Normalized Excel columns: {list(df.columns)}")
-            
-            # Her satırı işle
-            for index, row in df.iterrows():
-                try:
-                    product_data = ExcelImportService._map_row_to_product_data(row, tenant)
-                    product = ExcelImportService._create_product(product_data, tenant, user)
-                    products.append(product)
-                    imported_count += 1
-                except Exception as e:
-                    failed_count += 1
-                    error_msg = f"Satır {index + 2}: {str(e)}"  # +2 çünkü Excel'de header var ve 0-based index
-                    errors.append(error_msg)
-                    logger.error(f"Product import error at row {index + 2}: {str(e)}")
-            
-            return {
-                'success': True,
-                'imported_count': imported_count,
-                'failed_count': failed_count,
-                'errors': errors,
-                'products': products
-            }
+            return ExcelImportService.bulk_import_dataframe(df, tenant, user=user, update_existing=update_existing)
         
         except Exception as e:
             logger.error(f"Excel import error: {str(e)}")
             return {
                 'success': False,
-                'imported_count': imported_count,
-                'failed_count': failed_count,
+                'imported_count': 0,
+                'failed_count': 0,
                 'errors': [f"Excel okuma hatası: {str(e)}"],
                 'products': []
             }
     
     @staticmethod
-    def _map_row_to_product_data(row, tenant):
-        """Excel satırını Product data dict'ine çevir."""
+    def normalize_dataframe(df):
+        """
+        Kolon isimlerini ve hücre değerlerini vektörel olarak normalize et.
+        
+        - Kolonlar küçük harfe çevrilir; FIELD_MAPPING'de birebir yoksa boşluk, '-' ve '_'
+          olmadan eşleştirilir (örn: "Image Name 1", "image_name_1" -> FIELD_MAPPING anahtarı)
+        - Metin hücreleri kırpılır, boş metinler NaN yapılır
+        - Tamamen boş satırlar atılır (index korunur, hata mesajlarındaki satır numaraları değişmez)
+        """
+        mapping = ExcelImportService.FIELD_MAPPING
+        lookup = ExcelImportService._get_compact_lookup()
+        
+        columns = df.columns.astype(str).str.strip().str.lower()
+        compact_columns = columns.str.replace(r'[\s\-_]', '', regex=True)
+        df.columns = [
+            column if column in mapping else lookup.get(compact_column, compact_column)
+            for column, compact_column in zip(columns, compact_columns)
+        ]
+        # Aynı alana eşlenen tekrar kolonlarda ilki kullanılır
+        duplicated = df.columns.duplicated()
+        if duplicated.any():
+            df = df.loc[:, ~duplicated].copy()
+        
+        for column in df.select_dtypes(include='object').columns:
+            values = df[column]
+            try:
+                stripped = values.str.strip()
+            except AttributeError:
+                continue  # Hiç metin içermeyen kolon (örn: tarih)
+            values = stripped.where(stripped.notna(), values)
+            df[column] = values.mask(values == '')
+        
+        return df.dropna(how='all')
+    
+    @staticmethod
+    def bulk_import_dataframe(df, tenant, user=None, chunk_size=None, progress_callback=None,
+                              update_existing=False):
+        """
+        DataFrame'deki ürünleri toplu import et.
+        
+        - Satırlar iterrows yerine dict olarak işlenir, sadece dosyada olan kolonlar eşlenir
+        - Mevcut slug'lar, SKU'lar ve kategoriler başta belleğe alınır; slug tekilleştirme
+          satır başına exists() sorgusu olmadan bellekte yapılır
+        - Varsayılan olarak her satır yeni ürün oluşturur. update_existing=True verilirse SKU'su
+          mevcut bir ürünle eşleşen satır o ürünü günceller, aynı SKU'lu satırlar tek ürüne birleşir
+        - Her chunk tek transaction'da bulk_create / bulk_update ile yazılır; görseller ve
+          kategori ilişkileri chunk başına tek bulk_create ile eklenir
+        
+        bulk_create / bulk_update Product.save() ve signal'leri çalıştırmaz: price_with_vat
+        tenant'ın aktif vergi oranıyla burada hesaplanır, cache invalidasyonu sonda bir kez yapılır.
+        
+        Args:
+            df: pandas DataFrame (read_excel çıktısı)
+            tenant: Tenant instance
+            user: User instance (opsiyonel)
+            chunk_size: Tek transaction'da yazılacak satır sayısı
+            progress_callback: callable(processed, total, imported, failed) - her chunk sonunda çağrılır
+            update_existing: SKU ile eşleşen mevcut ürünleri güncelle (upsert)
+        
+        Returns:
+            dict: import_products_from_excel ile aynı yapı
+        """
+        from apps.services.cache_service import CacheService
+        from apps.services.cart_totals_service import CartTotalsService
+        
+        chunk_size = chunk_size or ExcelImportService.DEFAULT_CHUNK_SIZE
+        
+        df = ExcelImportService.normalize_dataframe(df)
+        logger.info(f"Normalized Excel columns: {list(df.columns)}")
+        
+        # Mapping sırası korunur (sonraki eşleşme öncekini ezer)
+        present_columns = set(df.columns)
+        columns = [
+            (excel_col, model_field)
+            for excel_col, model_field in ExcelImportService.FIELD_MAPPING.items()
+            if excel_col in present_columns
+        ]
+        row_numbers = [index + 2 for index in df.index]  # +2 çünkü Excel'de header var ve 0-based index
+        records = df.to_dict('records')
+        total_rows = len(records)
+        
+        # Mevcut slug / SKU'lar ve kategoriler (tek sorgu)
+        existing_slugs = set()
+        sku_to_id = {}
+        existing_rows = Product.objects.filter(
+            tenant=tenant, is_deleted=False
+        ).order_by('created_at').values_list('id', 'slug', 'sku')
+        for product_id, slug, sku in existing_rows:
+            existing_slugs.add(slug)
+            if sku and update_existing:
+                sku_to_id.setdefault(sku, product_id)
+        category_cache = ExcelImportService._preload_categories(tenant)
+        tax_rate = CartTotalsService.get_active_tax_rate(tenant.id)
+        
+        imported_count = 0
+        failed_count = 0
+        errors = []
+        products = []
+        
+        for chunk_start in range(0, total_rows, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, total_rows)
+            
+            # 1) Satırları eşle
+            parsed_rows = []
+            for position in range(chunk_start, chunk_end):
+                try:
+                    product_data = ExcelImportService._map_row_to_product_data(
+                        records[position], tenant,
+                        columns=columns,
+                        category_cache=category_cache,
+                        apply_defaults=False
+                    )
+                    ExcelImportService._validate_product_fields(product_data)
+                    parsed_rows.append((row_numbers[position], product_data))
+                except Exception as e:
+                    failed_count += 1
+                    errors.append(f"Satır {row_numbers[position]}: {str(e)}")
+                    logger.error(f"Product import error at row {row_numbers[position]}: {str(e)}")
+            
+            # 2) Güncellenecek ürünleri ve mevcut görsellerini tek sorguda yükle
+            update_ids = {
+                sku_to_id[product_data['sku']]
+                for _, product_data in parsed_rows
+                if product_data.get('sku') in sku_to_id
+            }
+            existing_products = Product.objects.filter(
+                tenant=tenant, is_deleted=False
+            ).in_bulk(update_ids) if update_ids else {}
+            existing_images = {}
+            if existing_products:
+                image_rows = ProductImage.objects.filter(
+                    product_id__in=existing_products.keys(), is_deleted=False
+                ).values_list('product_id', 'image_url')
+                for product_id, image_url in image_rows:
+                    existing_images.setdefault(product_id, set()).add(image_url)
+            
+            # 3) Ürünleri bellekte oluştur / güncelle
+            entries = {}  # product id -> entry (aynı SKU'lu satırlar tek ürüne birleşir)
+            update_fields = set()
+            for row_number, product_data in parsed_rows:
+                product_data.pop('tenant', None)
+                product_data.pop('tax_rate', None)
+                category = product_data.pop('category', None)
+                image_urls = product_data.pop('image_urls', [])
+                primary_image_url = product_data.pop('primary_image_url', None)
+                
+                sku = product_data.get('sku')
+                product_id = sku_to_id.get(sku) if sku else None
+                entry = entries.get(product_id) if product_id else None
+                if entry is None and product_id in existing_products:
+                    entry = {
+                        'product': existing_products[product_id],
+                        'is_new': False,
+                        'rows': [],
+                        'image_urls': [],
+                        'known_images': existing_images.get(product_id, set()),
+                        'category_ids': set(),
+                    }
+                    entries[product_id] = entry
+                if entry is None:
+                    ExcelImportService._apply_defaults(product_data)
+                    product_data['slug'] = ExcelImportService._dedupe_slug(product_data['slug'], existing_slugs)
+                    product = Product(tenant=tenant)
+                    entry = {
+                        'product': product,
+                        'is_new': True,
+                        'rows': [],
+                        'image_urls': [],
+                        'known_images': set(),
+                        'category_ids': set(),
+                    }
+                    entries[product.id] = entry
+                    if sku and update_existing:
+                        sku_to_id[sku] = product.id
+                else:
+                    # Mevcut ürünün slug'ı (URL) korunur
+                    product_data.pop('slug', None)
+                
+                changed_fields = ExcelImportService._apply_product_data(entry['product'], product_data, tax_rate)
+                if not entry['is_new']:
+                    update_fields.update(changed_fields)
+                
+                entry['rows'].append(row_number)
+                if category:
+                    entry['category_ids'].add(category.id)
+                for image_url in ([primary_image_url] if primary_image_url else []) + image_urls:
+                    if image_url and image_url not in entry['known_images']:
+                        entry['known_images'].add(image_url)
+                        entry['image_urls'].append((image_url, image_url == primary_image_url))
+            
+            # 4) Chunk'ı yaz
+            chunk_entries = list(entries.values())
+            if chunk_entries:
+                update_fields.add('updated_at')
+                try:
+                    ExcelImportService._write_entries(chunk_entries, update_fields)
+                    written_entries = chunk_entries
+                except Exception as e:
+                    # Chunk'ta hatalı bir satır var: satır satır yazarak hatalıları ayıkla
+                    logger.warning(f"Bulk write failed for rows {chunk_start + 2}-{chunk_end + 1}, retrying row by row: {str(e)}")
+                    written_entries = []
+                    for entry in chunk_entries:
+                        try:
+                            ExcelImportService._write_entries([entry], update_fields)
+                            written_entries.append(entry)
+                        except Exception as row_error:
+                            failed_count += len(entry['rows'])
+                            for row_number in entry['rows']:
+                                errors.append(f"Satır {row_number}: {str(row_error)}")
+                                logger.error(f"Product import error at row {row_number}: {str(row_error)}")
+                            if entry['is_new']:
+                                product = entry['product']
+                                existing_slugs.discard(product.slug)
+                                if product.sku and sku_to_id.get(product.sku) == product.id:
+                                    del sku_to_id[product.sku]
+                
+                for entry in written_entries:
+                    imported_count += len(entry['rows'])
+                    products.append(entry['product'])
+            
+            if progress_callback:
+                progress_callback(chunk_end, total_rows, imported_count, failed_count)
+        
+        if products:
+            # bulk işlemler signal tetiklemediği için cache'ler bir kez geçersiz kılınır
+            CacheService.invalidate_facets(tenant.id)
+            CacheService.invalidate_storefront(tenant.id)
+        
+        logger.info(f"Excel import finished for tenant {tenant.id}: {imported_count} imported, {failed_count} failed, {total_rows} rows")
+        
+        return {
+            'success': True,
+            'imported_count': imported_count,
+            'failed_count': failed_count,
+            'errors': errors,
+            'products': products
+        }
+    
+    @staticmethod
+    def _get_compact_lookup():
+        """FIELD_MAPPING anahtarlarının boşluk/'-'/'_' olmadan hali -> anahtar."""
+        if ExcelImportService._compact_lookup is None:
+            lookup = {}
+            for excel_col in ExcelImportService.FIELD_MAPPING:
+                compact_col = excel_col.replace(' ', '').replace('-', '').replace('_', '')
+                lookup.setdefault(compact_col, excel_col)
+            ExcelImportService._compact_lookup = lookup
+        return ExcelImportService._compact_lookup
+    
+    @staticmethod
+    def _validate_product_fields(product_data):
+        """Product modelinde olmayan alan varsa hata ver (Product.objects.create ile aynı davranış)."""
+        if ExcelImportService._product_field_names is None:
+            ExcelImportService._product_field_names = frozenset(
+                field.name for field in Product._meta.concrete_fields
+            ) | {'category', 'image_urls', 'primary_image_url', 'tax_rate'}
+        unknown_fields = set(product_data) - ExcelImportService._product_field_names
+        if unknown_fields:
+            raise ValueError(f"Geçersiz alan(lar): {', '.join(sorted(unknown_fields))}")
+    
+    @staticmethod
+    def _dedupe_slug(base_slug, existing_slugs):
+        """Slug'ı bellekteki set'e göre tekilleştir (base, base-1, base-2, ...) ve set'e ekle."""
+        slug = base_slug
+        counter = 1
+        while slug in existing_slugs:
+            slug = f"{base_slug}-{counter}"
+            counter += 1
+        existing_slugs.add(slug)
+        return slug
+    
+    @staticmethod
+    def _apply_product_data(product, product_data, tax_rate):
+        """
+        Satır verisini Product instance'ına uygula, değişen alan isimlerini döndür.
+        Metadata mevcut metadata ile birleştirilir; price_with_vat Product.save() ile aynı kuralla hesaplanır.
+        """
+        changed_fields = set()
+        metadata = product_data.pop('metadata', None)
+        for field_name, value in product_data.items():
+            setattr(product, field_name, value)
+            changed_fields.add(field_name)
+        if metadata:
+            product.metadata = {**(product.metadata or {}), **metadata}
+            changed_fields.add('metadata')
+        
+        # Sanal stok girildiyse, otomatik olarak stoksuz satışa izin ver
+        if product.virtual_stock_quantity is not None and product.virtual_stock_quantity > 0:
+            product.allow_backorder = True
+            changed_fields.add('allow_backorder')
+        
+        product.price_with_vat = product.price * VatRepricingService.get_multiplier(tax_rate)
+        changed_fields.add('price_with_vat')
+        return changed_fields
+    
+    @staticmethod
+    def _write_entries(entries, update_fields):
+        """Ürünleri, görsellerini ve kategori ilişkilerini tek transaction'da toplu yaz."""
+        to_create = [entry['product'] for entry in entries if entry['is_new']]
+        to_update = [entry['product'] for entry in entries if not entry['is_new']]
+        
+        images = []
+        category_links = []
+        CategoryLink = Product.categories.through
+        for entry in entries:
+            product = entry['product']
+            # Mevcut ürüne eklenen görseller mevcut görsellerin arkasına sıralanır
+            position_offset = len(entry['known_images']) - len(entry['image_urls'])
+            has_primary = position_offset > 0
+            for idx, (image_url, is_primary) in enumerate(entry['image_urls']):
+                images.append(ProductImage(
+                    product=product,
+                    image_url=image_url,
+                    is_primary=not has_primary and (is_primary or idx == 0),
+                    position=position_offset + idx
+                ))
+                has_primary = has_primary or images[-1].is_primary
+            for category_id in entry['category_ids']:
+                category_links.append(CategoryLink(product_id=product.id, category_id=category_id))
+        
+        with transaction.atomic():
+            if to_create:
+                Product.objects.bulk_create(to_create)
+            if to_update:
+                now = timezone.now()
+                for product in to_update:
+                    product.updated_at = now
+                Product.objects.bulk_update(to_update, sorted(update_fields))
+            if images:
+                ProductImage.objects.bulk_create(images)
+                # bulk_create signal tetiklemez - varyant üretimini burada kuyruğa ekle
+                ImageProcessingService.schedule_processing(images)
+            # bulk_create / bulk_update signal tetiklemez - listing alanlarını commit sonrası yenile
+            ProductListingService.schedule_refresh([product.id for product in to_create + to_update])
+            if category_links:
+                CategoryLink.objects.bulk_create(category_links, ignore_conflicts=True)
+    
+    @staticmethod
+    def _map_row_to_product_data(row, tenant, columns=None, category_cache=None, apply_defaults=True):
+        """
+        Excel satırını Product data dict'ine çevir.
+
+        Args:
+            row: pandas Series veya dict (kolon -> değer)
+            tenant: Tenant instance
+            columns: Dosyada bulunan (excel_col, model_field) çiftleri (yoksa tüm FIELD_MAPPING denenir)
+            category_cache: Önceden yüklenmiş kategori dict'i (bkz. _preload_categories)
+            apply_defaults: False ise varsayılan değerler eklenmez (mevcut ürün güncellemesi için)
+        """
         product_data = {
             'tenant': tenant,
         }
@@ -514,7 +841,7 @@ class ExcelImportService:
         price_column_used = None
         
         for price_col in price_columns:
-            if price_col in row.index and pd.notna(row[price_col]) and row[price_col] != '':
+            if price_col in row and pd.notna(row[price_col]) and row[price_col] != '':
                 try:
                     value = row[price_col]
                     # 0 değerini de geçerli say (boş değilse)
@@ -543,8 +870,10 @@ class ExcelImportService:
             logger.info(f"Price set to: {price_value} from column: {price_column_used}")
         
         # Mapping yap
-        for excel_col, model_field in ExcelImportService.FIELD_MAPPING.items():
-            if excel_col in row.index and pd.notna(row[excel_col]):
+        if columns is None:
+            columns = ExcelImportService.FIELD_MAPPING.items()
+        for excel_col, model_field in columns:
+            if excel_col in row and pd.notna(row[excel_col]):
                 value = row[excel_col]
                 
                 # Değer tipine göre işle
@@ -593,7 +922,8 @@ class ExcelImportService:
                             # Hiyerarşik kategori oluştur
                             category = ExcelImportService._get_or_create_category_tree(
                                 tenant=tenant,
-                                category_path=category_path
+                                category_path=category_path,
+                                category_cache=category_cache
                             )
                             product_data['category'] = category
                 
@@ -764,20 +1094,11 @@ class ExcelImportService:
         if 'name' not in product_data or not product_data['name']:
             raise ValueError("Ürün adı zorunludur.")
         
-        if 'price' not in product_data:
-            product_data['price'] = Decimal('0.00')
-        
         if 'slug' not in product_data:
             product_data['slug'] = slugify(product_data['name'])
         
-        # Varsayılan değerler
-        product_data.setdefault('status', 'draft')
-        product_data.setdefault('is_visible', True)
-        product_data.setdefault('track_inventory', True)
-        product_data.setdefault('inventory_quantity', 0)
-        product_data.setdefault('sort_order', 0)
-        product_data.setdefault('currency', 'TRY')
-        # tax_rate ve tax_rate_active artık Product'ta yok, Tax modelinden alınıyor
+        if apply_defaults:
+            ExcelImportService._apply_defaults(product_data)
         
         # Uyumluluk bilgilerini metadata'ya ekle
         if 'compatibility' in product_data:
@@ -832,6 +1153,19 @@ class ExcelImportService:
         
         return product_data
     
+    @staticmethod
+    def _apply_defaults(product_data):
+        """Yeni oluşturulacak ürün için varsayılan değerleri ekle."""
+        product_data.setdefault('price', Decimal('0.00'))
+        product_data.setdefault('status', 'draft')
+        product_data.setdefault('is_visible', True)
+        product_data.setdefault('track_inventory', True)
+        product_data.setdefault('inventory_quantity', 0)
+        product_data.setdefault('sort_order', 0)
+        product_data.setdefault('currency', 'TRY')
+        # tax_rate ve tax_rate_active artık Product'ta yok, Tax modelinden alınıyor
+        return product_data
+    
     @staticmethod
     def _convert_decimals_to_string(obj):
         """Recursively convert Decimal values to string in dict/list."""
@@ -846,64 +1180,29 @@ class ExcelImportService:
         return obj
     
     @staticmethod
-    def _create_product(product_data, tenant, user=None):
-        """Product oluştur."""
-        from django.db import transaction
-        
-        with transaction.atomic():
-            # Kategoriyi ayır
-            category = product_data.pop('category', None)
-            image_urls = product_data.pop('image_urls', [])
-            primary_image_url = product_data.pop('primary_image_url', None)
-            
-            # tax_rate Product modelinde yok, metadata'da tutuluyor - eğer hala product_data'da varsa çıkar
-            product_data.pop('tax_rate', None)
-            
-            # Slug unique kontrolü
-            base_slug = product_data['slug']
-            slug = base_slug
-            counter = 1
-            while Product.objects.filter(tenant=tenant, slug=slug, is_deleted=False).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            product_data['slug'] = slug
-            
-            # Product oluştur
-            product = Product.objects.create(**product_data)
-            
-            # Kategori ekle
-            if category:
-                product.categories.add(category)
-            
-            # Görseller ekle
-            if primary_image_url:
-                ProductImage.objects.create(
-                    product=product,
-                    image_url=primary_image_url,
-                    is_primary=True,
-                    position=0
-                )
-            
-            if image_urls:
-                for idx, image_url in enumerate(image_urls):
-                    if image_url:  # Boş URL'leri atla
-                        ProductImage.objects.create(
-                            product=product,
-                            image_url=image_url,
-                            is_primary=(idx == 0 and not primary_image_url),
-                            position=idx
-                        )
-            
-            return product
+    def _preload_categories(tenant):
+        """
+        Tenant'ın tüm kategorilerini tek sorguda (parent_id, name) -> Category dict'ine yükle.
+        Import sırasında kategori yolları bu dict üzerinden çözülür, sadece eksikler oluşturulur.
+        """
+        category_cache = {}
+        categories = Category.objects.filter(tenant=tenant).only(
+            'id', 'tenant_id', 'name', 'slug', 'parent_id'
+        ).order_by('created_at')
+        for category in categories:
+            # get_or_create ile aynı: birden fazla eşleşme varsa ilk oluşturulan kullanılır
+            category_cache.setdefault((category.parent_id, category.name), category)
+        return category_cache
     
     @staticmethod
-    def _get_or_create_category_tree(tenant, category_path):
+    def _get_or_create_category_tree(tenant, category_path, category_cache=None):
         """
         Hiyerarşik kategori ağacı oluştur.
         
         Args:
             tenant: Tenant instance
             category_path: Kategori yolu (örn: "İçecek Ekipmanları>Soğuk İçecek Makineleri")
+            category_cache: _preload_categories ile yüklenen dict (verilirse sadece eksik seviyeler için sorgu atılır)
         
         Returns:
             Category: En alt seviye kategori
@@ -922,6 +1221,13 @@ class ExcelImportService:
         
         # Her seviyeyi oluştur
         for category_name in category_names:
+            if category_cache is not None:
+                cache_key = (parent.id if parent else None, category_name)
+                current_category = category_cache.get(cache_key)
+                if current_category is not None:
+                    parent = current_category
+                    continue
+            
             # Slug oluştur
             category_slug = slugify(category_name)
             
@@ -943,6 +1249,9 @@ class ExcelImportService:
                     defaults={'slug': category_slug}
                 )
             
+            if category_cache is not None:
+                category_cache[cache_key] = current_category
+            
             # Parent'ı güncelle (bir sonraki seviye için)
             parent = current_category
         
@@ -4,9 +4,8 @@ Excel'deki ImageName kolonlarından resim yollarını çıkarıp local'den bulur
 """
 import os
 from pathlib import Path
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-from apps.models import Product, ProductImage
+from apps.models import Product
+from apps.services.image_processing_service import ImageProcessingService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -104,27 +103,17 @@ class ImagePathService:
             # Dosya adı
             filename = os.path.basename(local_image_path)
             
-            # Storage'a kaydet - Tenant bazlı klasör yapısı: {tenant_id}/products/{product_id}/{filename}
-            tenant_id = str(product.tenant.id)
-            file_path = f'{tenant_id}/products/{product.id}/{filename}'
-            saved_path = default_storage.save(file_path, ContentFile(file_content))
-            file_url = default_storage.url(saved_path)
-            
             # Position belirle
             if position is None:
                 position = existing_images_count
             
-            # Primary belirle
-            if is_primary is None:
-                is_primary = (position == 0)
-            
-            # ProductImage oluştur
-            product_image = ProductImage.objects.create(
-                product=product,
-                image_url=file_url,
-                alt_text=product.name,
+            # İçerik hash'ine göre kaydet; aynı görsel üründe zaten varsa mevcut kayıt döner
+            product_image, _ = ImageProcessingService.add_product_image(
+                product,
+                file_content,
+                filename,
                 position=position,
-                is_primary=is_primary
+                is_primary=is_primary,
             )
             
             return product_image
@@ -0,0 +1,453 @@
+"""
+Image processing service - Ürün görselleri için içerik hash'i ile tekrar tespiti ve boyut varyantları.
+
+Yükleme:
+- Orijinal dosya içerik hash'ine göre adreslenen yola yazılır
+  ({tenant_id}/images/{hash[:2]}/{hash}.{ext}); aynı içerik storage'a ikinci kez yazılmaz.
+- Aynı ürüne aynı içerikli görsel tekrar yüklenirse yeni kayıt açılmaz.
+
+Varyantlar:
+- thumbnail / listing / zoom (IMAGE_VARIANT_SIZES) boyutları WebP + JPEG yedek olarak
+  commit sonrası Celery task'ında (IMAGE_PROCESSING_QUEUE) thread havuzunda üretilir ve
+  ProductImage.variants alanına yazılır.
+- Tenant'ta aynı hash'li görselin varyantları hazırsa yeniden üretilmez, kopyalanır.
+
+Okuma yolları (serializer'lar) görsel dönüştürmez. Base64 olarak kaydedilmiş eski görseller
+bu pipeline'da storage'a taşınır: python manage.py process_product_images
+"""
+import base64
+import binascii
+import hashlib
+import io
+import ipaddress
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from apps.models import Product, ProductImage
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXTENSION_ALIASES = {'jpeg': 'jpg', 'svg+xml': 'svg'}
+# Pillow ile işlenmeyen biçimler - varyant üretilmez, orijinal kullanılır
+PASSTHROUGH_EXTENSIONS = {'svg'}
+
+
+class PinnedHostAdapter(HTTPAdapter):
+    """
+    URL'deki doğrulanmış IP'ye bağlanır; TLS SNI ve sertifika doğrulaması orijinal host adıyla
+    yapılır. Host ikinci kez çözülmediği için DNS rebinding ile iç ağa bağlanılamaz.
+    """
+
+    def __init__(self, hostname, **kwargs):
+        self._hostname = hostname
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        # http bağlantılarında PoolManager bu anahtarları kendisi atar
+        kwargs['server_hostname'] = self._hostname
+        kwargs['assert_hostname'] = self._hostname
+        super().init_poolmanager(*args, **kwargs)
+
+
+class ImageProcessingService:
+    """Ürün görseli işleme iş mantığı."""
+
+    Status = ProductImage.ProcessingStatus
+    # Pipeline'ın yönettiği alanlar (istemciden gelen veriyle yazılmaz)
+    MANAGED_FIELDS = frozenset({'content_hash', 'variants', 'processing_status'})
+    MAX_REDIRECTS = 3
+
+    # ------------------------------------------------------------------
+    # Orijinal dosya
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def compute_hash(data):
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def normalize_extension(ext):
+        ext = (ext or '').lower().lstrip('.')
+        return EXTENSION_ALIASES.get(ext, ext) or 'jpg'
+
+    @staticmethod
+    def decode_data_url(value):
+        """'data:image/png;base64,...' -> (bytes, 'png'); base64 görsel değilse None."""
+        if not value or not value.startswith('data:image') or ';base64,' not in value:
+            return None
+        format_part, encoded = value.split(';base64,', 1)
+        try:
+            data = base64.b64decode(encoded)
+        except (binascii.Error, ValueError):
+            return None
+        return data, ImageProcessingService.normalize_extension(format_part.split('/')[-1])
+
+    @staticmethod
+    def _base_path(tenant_id, content_hash):
+        return f'{tenant_id}/images/{content_hash[:2]}/{content_hash}'
+
+    @staticmethod
+    def _save_if_missing(path, data):
+        """İçerik adresli dosyayı yaz (aynı yolda zaten varsa yazma). Returns: (path, url)"""
+        if not default_storage.exists(path):
+            path = default_storage.save(path, ContentFile(data))
+        return path, default_storage.url(path)
+
+    @staticmethod
+    def store_original(tenant_id, data, ext, content_hash=None):
+        """
+        Orijinal görseli içerik hash'ine göre adreslenen yola kaydet.
+
+        Returns:
+            dict: {'path': str, 'url': str}
+        """
+        content_hash = content_hash or ImageProcessingService.compute_hash(data)
+        path = f'{ImageProcessingService._base_path(tenant_id, content_hash)}.{ImageProcessingService.normalize_extension(ext)}'
+        path, url = ImageProcessingService._save_if_missing(path, data)
+        return {'path': path, 'url': url}
+
+    @staticmethod
+    def upload_data_url(tenant_id, value):
+        """Base64 görseli storage'a kaydet ve URL döndür (base64 değilse değeri aynen döndür)."""
+        decoded = ImageProcessingService.decode_data_url(value)
+        if decoded is None:
+            return value
+        data, ext = decoded
+        return ImageProcessingService.store_original(tenant_id, data, ext)['url']
+
+    # ------------------------------------------------------------------
+    # Yükleme
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def add_product_image(product, data, filename, alt_text=None, position=None, is_primary=None):
+        """
+        Yüklenen görsel içeriğini ürüne ekle. Varyantlar commit sonrası üretilir (signal).
+
+        Returns:
+            tuple: (ProductImage, created) - içerik üründe zaten varsa (mevcut görsel, False)
+        """
+        content_hash = ImageProcessingService.compute_hash(data)
+        # İçerik adresli yazım idempotent; storage yüklemesi kilit dışında yapılır
+        original = ImageProcessingService.store_original(
+            product.tenant_id, data, os.path.splitext(filename)[1], content_hash
+        )
+
+        with transaction.atomic():
+            # Aynı ürüne eşzamanlı yüklemeler ürün satırı kilidiyle sıralanır (kontrol + kayıt tek adım)
+            list(Product.objects.select_for_update().filter(id=product.id).values_list('id', flat=True))
+            existing = ProductImage.objects.filter(
+                product=product,
+                content_hash=content_hash,
+                is_deleted=False,
+            ).first()
+            if existing:
+                return existing, False
+
+            if position is None:
+                position = product.images.filter(is_deleted=False).count()
+            if is_primary is None:
+                is_primary = (position == 0)
+
+            variants, processing_status = ImageProcessingService._find_processed(product.tenant_id, content_hash)
+            if variants is None:
+                variants, processing_status = {}, ImageProcessingService.Status.PENDING
+            variants['original'] = original
+
+            image = ProductImage.objects.create(
+                product=product,
+                image_url=original['url'],
+                alt_text=product.name if alt_text is None else alt_text,
+                position=position,
+                is_primary=is_primary,
+                content_hash=content_hash,
+                variants=variants,
+                processing_status=processing_status,
+            )
+        return image, True
+
+    @staticmethod
+    def reset_processing(image):
+        """image_url değişen görselin eski varyantlarını temizle (kaydetmez; sonra schedule_processing)."""
+        image.content_hash = ''
+        image.variants = {}
+        image.processing_status = ImageProcessingService.Status.PENDING
+
+    @staticmethod
+    def _find_processed(tenant_id, content_hash, exclude_id=None):
+        """Tenant'ta aynı içerikli, işlenmiş bir görselin (variants, status) kopyası; yoksa (None, None)."""
+        queryset = ProductImage.objects.filter(
+            product__tenant_id=tenant_id,
+            content_hash=content_hash,
+            is_deleted=False,
+            processing_status__in=[ImageProcessingService.Status.READY, ImageProcessingService.Status.SKIPPED],
+        )
+        if exclude_id:
+            queryset = queryset.exclude(id=exclude_id)
+        row = queryset.values_list('variants', 'processing_status').first()
+        if row is None:
+            return None, None
+        return dict(row[0] or {}), row[1]
+
+    @staticmethod
+    def schedule_processing(images):
+        """Bekleyen görsellerin varyant üretimini commit sonrası kuyruğa ekle."""
+        jobs = [
+            [str(image.product.tenant_id), str(image.id)]
+            for image in images
+            if image.processing_status == ImageProcessingService.Status.PENDING
+        ]
+        if not jobs:
+            return
+
+        from apps.tasks.image_task import process_product_image_task
+
+        def enqueue():
+            for args in jobs:
+                try:
+                    process_product_image_task.apply_async(args=args, queue=settings.IMAGE_PROCESSING_QUEUE)
+                except Exception as e:
+                    # Kuyruk erişilemezse görsel pending kalır, process_product_images komutu tamamlar
+                    logger.error(f"[IMAGE_PROCESSING] Could not enqueue image {args[1]}: {e}")
+
+        transaction.on_commit(enqueue)
+
+    # ------------------------------------------------------------------
+    # Varyant üretimi
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def process_image(image, tenant_id):
+        """
+        Görselin orijinalini yükle, hash'le ve varyantlarını üretip kaydet.
+        Base64 image_url'ler storage URL'i ile değiştirilir.
+
+        Returns:
+            str: Görselin yeni processing_status değeri
+        """
+        try:
+            data, ext, original = ImageProcessingService._load_original(image, tenant_id)
+        except Exception as e:
+            logger.error(f"[IMAGE_PROCESSING] Could not load original of image {image.id}: {e}")
+            return ImageProcessingService._mark_failed(image)
+
+        content_hash = ImageProcessingService.compute_hash(data)
+        variants, processing_status = ImageProcessingService._find_processed(tenant_id, content_hash, exclude_id=image.id)
+        if variants is None:
+            if ext in PASSTHROUGH_EXTENSIONS:
+                variants, processing_status = {}, ImageProcessingService.Status.SKIPPED
+            else:
+                try:
+                    variants = ImageProcessingService.build_variants(tenant_id, content_hash, data)
+                except Exception as e:
+                    logger.error(f"[IMAGE_PROCESSING] Could not build variants of image {image.id}: {e}")
+                    return ImageProcessingService._mark_failed(image)
+                if variants is None:
+                    # Animasyonlu görsel - orijinal kullanılır
+                    variants, processing_status = {}, ImageProcessingService.Status.SKIPPED
+                else:
+                    processing_status = ImageProcessingService.Status.READY
+        variants['original'] = original
+
+        image.content_hash = content_hash
+        image.variants = variants
+        image.processing_status = processing_status
+        update_fields = ['content_hash', 'variants', 'processing_status']
+        if image.image_url.startswith('data:image'):
+            image.image_url = original['url']
+            update_fields.append('image_url')
+        image.save(update_fields=update_fields)
+        return processing_status
+
+    @staticmethod
+    def _mark_failed(image):
+        image.processing_status = ImageProcessingService.Status.FAILED
+        image.save(update_fields=['processing_status'])
+        return image.processing_status
+
+    @staticmethod
+    def _load_original(image, tenant_id):
+        """
+        Görselin orijinal içeriğini bul.
+
+        Returns:
+            tuple: (bytes, uzantı, {'path'?: str, 'url': str})
+        """
+        original = (image.variants or {}).get('original') or {}
+        if original.get('path'):
+            with default_storage.open(original['path'], 'rb') as f:
+                data = f.read()
+            return data, ImageProcessingService.normalize_extension(os.path.splitext(original['path'])[1]), original
+
+        decoded = ImageProcessingService.decode_data_url(image.image_url)
+        if decoded:
+            data, ext = decoded
+            return data, ext, ImageProcessingService.store_original(tenant_id, data, ext)
+
+        url = image.image_url or ''
+        ext = ImageProcessingService.normalize_extension(os.path.splitext(urlparse(url).path)[1])
+        if settings.MEDIA_URL and url.startswith(settings.MEDIA_URL):
+            path = url[len(settings.MEDIA_URL):]
+            if default_storage.exists(path):
+                with default_storage.open(path, 'rb') as f:
+                    data = f.read()
+                return data, ext, {'path': path, 'url': url}
+        if url.startswith(('http://', 'https://')):
+            # Harici URL (örn. Excel import) - image_url değişmez, import tekrar tespiti URL'e bakar
+            data, content_type = ImageProcessingService._download(url)
+            if content_type.startswith('image/'):
+                ext = ImageProcessingService.normalize_extension(content_type.split(';')[0].split('/')[-1])
+            return data, ext, {'url': url}
+        raise ValueError(f'Desteklenmeyen görsel kaynağı: {url[:100]}')
+
+    @staticmethod
+    def _is_public_address(ip):
+        """İstek atılabilecek adres mi? (private, loopback, link-local, reserved, multicast değil)"""
+        return ip.is_global and not ip.is_multicast
+
+    @staticmethod
+    def _resolve_public_address(url):
+        """
+        URL'in host'unu çöz; sadece public adreslere çözülüyorsa bağlanılacak adresi döndür
+        (tenant verisiyle iç ağa istek atılmasını engeller).
+
+        Returns:
+            tuple: (urlparse sonucu, ipaddress nesnesi)
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise ValueError(f'Geçersiz görsel URL\'i: {url[:100]}')
+        try:
+            addresses = socket.getaddrinfo(parsed.hostname, parsed.port or (443 if parsed.scheme == 'https' else 80))
+        except socket.gaierror as e:
+            raise ValueError(f'Görsel host\'u çözülemedi: {parsed.hostname}') from e
+        ips = [ipaddress.ip_address(address[4][0].split('%')[0]) for address in addresses]
+        if not ips or not all(ImageProcessingService._is_public_address(ip) for ip in ips):
+            raise ValueError(f'Görsel host\'u iç ağ adresine çözülüyor: {parsed.hostname}')
+        return parsed, ips[0]
+
+    @staticmethod
+    def _download(url):
+        """
+        Harici görseli indir: her istek (yönlendirmeler dahil) doğrulanmış IP'ye sabitlenir,
+        gövde akış halinde IMAGE_MAX_DOWNLOAD_BYTES ile sınırlanır.
+
+        Returns:
+            tuple: (bytes, content_type)
+        """
+        max_bytes = settings.IMAGE_MAX_DOWNLOAD_BYTES
+        for _ in range(ImageProcessingService.MAX_REDIRECTS + 1):
+            parsed, ip = ImageProcessingService._resolve_public_address(url)
+            port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+            host_literal = f'[{ip}]' if ip.version == 6 else str(ip)
+            pinned_url = parsed._replace(netloc=f'{host_literal}:{port}').geturl()
+            host_header = parsed.hostname if parsed.port is None else f'{parsed.hostname}:{parsed.port}'
+
+            with requests.Session() as session:
+                session.mount(f'{parsed.scheme}://', PinnedHostAdapter(parsed.hostname))
+                with session.get(
+                    pinned_url, headers={'Host': host_header}, timeout=settings.IMAGE_DOWNLOAD_TIMEOUT,
+                    stream=True, allow_redirects=False,
+                ) as response:
+                    if response.is_redirect:
+                        url = urljoin(url, response.headers.get('Location', ''))
+                        continue
+                    response.raise_for_status()
+                    content_length = response.headers.get('Content-Length')
+                    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+                        raise ValueError(f'Görsel boyutu sınırı aşıyor ({content_length} bayt)')
+                    buffer = io.BytesIO()
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        buffer.write(chunk)
+                        if buffer.tell() > max_bytes:
+                            raise ValueError(f'Görsel boyutu sınırı aşıyor (>{max_bytes} bayt)')
+                    return buffer.getvalue(), response.headers.get('Content-Type', '')
+        raise ValueError(f'Çok fazla yönlendirme: {url[:100]}')
+
+    @staticmethod
+    def build_variants(tenant_id, content_hash, data):
+        """
+        IMAGE_VARIANT_SIZES boyutlarında WebP + JPEG varyantlarını üret ve kaydet (thread havuzu).
+        Küçük görseller büyütülmez.
+
+        Returns:
+            dict: {boyut_adı: {'width', 'height', 'webp', 'jpeg'}} veya animasyonlu görselde None
+        """
+        from PIL import Image, ImageOps
+
+        with Image.open(io.BytesIO(data)) as source:
+            if getattr(source, 'is_animated', False):
+                return None
+            image = ImageOps.exif_transpose(source)
+            image.load()
+        image = ImageProcessingService._normalize_mode(image)
+        base_path = ImageProcessingService._base_path(tenant_id, content_hash)
+
+        def render(item):
+            name, max_size = item
+            resized = image.copy()
+            resized.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+            width, height = resized.size
+            _, webp_url = ImageProcessingService._save_if_missing(
+                f'{base_path}/{name}.webp', ImageProcessingService._encode(resized, 'WEBP')
+            )
+            _, jpeg_url = ImageProcessingService._save_if_missing(
+                f'{base_path}/{name}.jpg', ImageProcessingService._encode(resized, 'JPEG')
+            )
+            return name, {'width': width, 'height': height, 'webp': webp_url, 'jpeg': jpeg_url}
+
+        # Pillow resize / encode sırasında GIL'i bırakır; storage yüklemeleri de paralel yapılır
+        with ThreadPoolExecutor(max_workers=max(1, settings.IMAGE_PROCESSING_THREADS)) as executor:
+            return dict(executor.map(render, settings.IMAGE_VARIANT_SIZES.items()))
+
+    @staticmethod
+    def _normalize_mode(image):
+        """Palet / CMYK / 16-bit görselleri RGB veya (saydamlık varsa) RGBA'ya çevir."""
+        if image.mode in ('RGB', 'RGBA'):
+            return image
+        has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+        return image.convert('RGBA' if has_alpha else 'RGB')
+
+    @staticmethod
+    def _encode(image, image_format):
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        if image_format == 'JPEG':
+            if image.mode == 'RGBA':
+                # JPEG saydamlık desteklemez - beyaz zemine yerleştir
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            image.save(buffer, 'JPEG', quality=settings.IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+        else:
+            image.save(buffer, 'WEBP', quality=settings.IMAGE_WEBP_QUALITY, method=4)
+        return buffer.getvalue()
+
+    @staticmethod
+    def process_tenant(tenant, statuses=None):
+        """
+        Tenant'ın bekleyen (ve istenirse başarısız) görsellerini senkron işle (backfill komutu).
+
+        Returns:
+            dict: {status: adet}
+        """
+        statuses = statuses or [ImageProcessingService.Status.PENDING]
+        stats = {}
+        queryset = ProductImage.objects.filter(
+            product__tenant=tenant,
+            is_deleted=False,
+            processing_status__in=statuses,
+        ).order_by('created_at')
+        for image in queryset.iterator(chunk_size=100):
+            processing_status = ImageProcessingService.process_image(image, tenant.id)
+            stats[processing_status] = stats.get(processing_status, 0) + 1
+        return stats
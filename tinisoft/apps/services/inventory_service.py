@@ -47,7 +47,7 @@ class InventoryService:
         previous_quantity = 0
         
         if variant_id:
-            variant = ProductVariant.objects.get(id=variant_id, product__tenant=tenant)
+            variant = ProductVariant.objects.select_related('product').get(id=variant_id, product__tenant=tenant)
             product = variant.product
             previous_quantity = variant.inventory_quantity
             
@@ -59,7 +59,7 @@ class InventoryService:
             elif movement_type == InventoryMovement.MovementType.ADJUSTMENT:
                 variant.inventory_quantity = quantity
             
-            variant.save()
+            variant.save(tenant_id=tenant.id)
             new_quantity = variant.inventory_quantity
         else:
             product = Product.objects.get(id=product_id, tenant=tenant)
@@ -90,9 +90,179 @@ class InventoryService:
             created_by=created_by,
         )
         
+        from apps.services.webhook_service import WebhookService
+        WebhookService.dispatch(
+            tenant.id,
+            WebhookService.EVENT_INVENTORY_CHANGED,
+            WebhookService.inventory_payload(product.id, variant.id if variant else None, previous_quantity, new_quantity, reason=reason)
+        )
+        
         logger.info(
             f"Inventory adjusted: {product.name} "
             f"({previous_quantity} -> {new_quantity}) - {movement_type}"
         )
         return movement
 
+    
+    @staticmethod
+    def _plan_stock_usage(stock_item, order_quantity):
+        """
+        Sipariş miktarının gerçek ve sanal stoktan ne kadar düşüleceğini hesapla.
+        Önce gerçek stok, yetmezse sanal stok kullanılır.
+        
+        Returns:
+            tuple: (real_stock_used, virtual_stock_used)
+        """
+        if stock_item.inventory_quantity >= order_quantity:
+            # Gerçek stok yeterli
+            return order_quantity, 0
+        
+        # Gerçek stok yetmiyor, sanal stoktan düş
+        real_stock_used = stock_item.inventory_quantity
+        remaining_qty = order_quantity - real_stock_used
+        if not stock_item.allow_backorder:
+            return real_stock_used, 0
+        if stock_item.virtual_stock_quantity is not None:
+            # Limitli sanal stok varsa düş
+            return real_stock_used, min(remaining_qty, stock_item.virtual_stock_quantity)
+        # Sınırsız sanal stok
+        return real_stock_used, remaining_qty
+    
+    @staticmethod
+    def _apply_stock_decrements(model, decrements):
+        """
+        Kilitli satırlarda stoğu tek UPDATE ile düş (F() ifadeleri ile).
+        
+        Args:
+            model: Product veya ProductVariant
+            decrements: {id: (real_stock_used, virtual_stock_used)}
+        """
+        from django.db.models import Case, When, F, IntegerField
+        
+        if not decrements:
+            return
+        
+        updates = {
+            'inventory_quantity': Case(
+                *[When(id=pk, then=F('inventory_quantity') - real) for pk, (real, _) in decrements.items()],
+                default=F('inventory_quantity'),
+                output_field=IntegerField(),
+            ),
+        }
+        virtual_whens = [
+            When(id=pk, then=F('virtual_stock_quantity') - virtual)
+            for pk, (_, virtual) in decrements.items() if virtual
+        ]
+        if virtual_whens:
+            updates['virtual_stock_quantity'] = Case(
+                *virtual_whens,
+                default=F('virtual_stock_quantity'),
+                output_field=IntegerField(),
+            )
+        
+        updated = model.objects.filter(id__in=list(decrements.keys())).update(**updates)
+        if updated != len(decrements):
+            raise ValueError("Stok güncellenemedi, lütfen tekrar deneyin.")
+    
+    @staticmethod
+    def decrement_for_order(tenant, order, lines, created_by=None):
+        """
+        Sipariş kalemleri için stoğu kilitleyerek düş ve stok hareketlerini oluştur.
+        Transaction içinde çağrılmalıdır (OrderService.create_order_from_cart).
+        
+        Eşzamanlı siparişlerde overselling ve deadlock olmaması için:
+        - Ürün ve varyant satırları deterministik sırada (önce ürünler, sonra varyantlar; id sırasıyla)
+          select_for_update ile kilitlenir
+        - Stok kilitli güncel değerler üzerinden tekrar kontrol edilir
+        - Düşüm tablo başına tek UPDATE (F() ifadeleri), hareketler tek bulk_create ile yazılır
+        
+        Args:
+            tenant: Tenant instance
+            order: Order instance
+            lines: [(cart_item, order_item), ...]
+            created_by: User instance
+        
+        Returns:
+            list: Oluşturulan InventoryMovement kayıtları
+        """
+        from collections import defaultdict
+        
+        product_ids = sorted({cart_item.product_id for cart_item, _ in lines if not cart_item.variant_id}, key=str)
+        variant_ids = sorted({cart_item.variant_id for cart_item, _ in lines if cart_item.variant_id}, key=str)
+        
+        stock_fields = ('id', 'name', 'track_inventory', 'inventory_quantity', 'virtual_stock_quantity', 'allow_backorder')
+        locked_products = {
+            product.id: product
+            for product in Product.objects.select_for_update().filter(id__in=product_ids).order_by('id').only(*stock_fields)
+        }
+        locked_variants = {
+            variant.id: variant
+            for variant in ProductVariant.objects.select_for_update().filter(id__in=variant_ids).order_by('id').only(*stock_fields)
+        }
+        
+        # Aynı stok satırı birden fazla kalemde olabilir - toplam miktar üzerinden kontrol edilir
+        requested = defaultdict(int)
+        for cart_item, _ in lines:
+            key = ('variant', cart_item.variant_id) if cart_item.variant_id else ('product', cart_item.product_id)
+            requested[key] += cart_item.quantity
+        for (kind, pk), quantity in requested.items():
+            stock_item = (locked_variants if kind == 'variant' else locked_products).get(pk)
+            if stock_item is None:
+                raise ValueError("Siparişteki bir ürün artık mevcut değil.")
+            if not stock_item.is_available(quantity):
+                raise ValueError(f"'{stock_item.name}' ürünü için yeterli stok yok.")
+        
+        product_decrements = {}
+        variant_decrements = {}
+        movements = []
+        for cart_item, order_item in lines:
+            if cart_item.variant_id:
+                stock_item = locked_variants[cart_item.variant_id]
+                decrements = variant_decrements
+            else:
+                stock_item = locked_products[cart_item.product_id]
+                decrements = product_decrements
+            if not stock_item.track_inventory:
+                continue
+            
+            order_quantity = cart_item.quantity
+            previous_qty = stock_item.inventory_quantity
+            real_stock_used, virtual_stock_used = InventoryService._plan_stock_usage(stock_item, order_quantity)
+            
+            # Sınırsız sanal stokta (virtual_stock_quantity=None) sanal stok kolonu düşülmez
+            virtual_column_used = virtual_stock_used if stock_item.virtual_stock_quantity is not None else 0
+            
+            # Kilitli instance'ı güncel tut (aynı satır tekrar gelirse ve hareket kaydı için)
+            stock_item.inventory_quantity -= real_stock_used
+            if virtual_column_used:
+                stock_item.virtual_stock_quantity -= virtual_column_used
+            prev_real, prev_virtual = decrements.get(stock_item.id, (0, 0))
+            decrements[stock_item.id] = (prev_real + real_stock_used, prev_virtual + virtual_column_used)
+            
+            movements.append(InventoryMovement(
+                tenant=tenant,
+                product_id=cart_item.product_id,
+                variant_id=cart_item.variant_id,
+                movement_type=InventoryMovement.MovementType.OUT,
+                quantity=order_quantity,
+                previous_quantity=previous_qty,
+                new_quantity=stock_item.inventory_quantity,
+                order=order,
+                order_item=order_item,
+                reason=f'Sipariş (Gerçek: {real_stock_used}, Sanal: {virtual_stock_used})',
+                created_by=created_by,
+            ))
+        
+        InventoryService._apply_stock_decrements(Product, product_decrements)
+        InventoryService._apply_stock_decrements(ProductVariant, variant_decrements)
+        if movements:
+            InventoryMovement.objects.bulk_create(movements)
+        
+        if product_decrements or variant_decrements:
+            # Queryset update signal tetiklemez - public stok bilgisini ve listing alanlarını commit sonrası yenile
+            from apps.services.cache_service import CacheService
+            from apps.services.product_listing_service import ProductListingService
+            transaction.on_commit(lambda: CacheService.invalidate_storefront(tenant.id))
+            ProductListingService.schedule_refresh({cart_item.product_id for cart_item, _ in lines})
+        
+        return movements
@@ -6,7 +6,7 @@ from django.db import transaction
 from decimal import Decimal, ROUND_HALF_UP
 import uuid
 import logging
-from apps.models import Order, OrderItem, Cart, CartItem, InventoryMovement
+from apps.models import Order, OrderItem, Cart, CartItem
 
 logger = logging.getLogger(__name__)
 
@@ -51,15 +51,18 @@ class OrderService:
         Returns:
             Order: Oluşturulan sipariş
         """
-        # Sepet kontrolü - sepet boş mu?
-        all_cart_items = cart.items.filter(is_deleted=False)
-        if not all_cart_items.exists():
+        from apps.services.cart_totals_service import CartTotalsService
+        
+        # Sepet kontrolü - sepet boş mu? (kalemler ürün/varyantlarıyla tek sorguda)
+        all_cart_items = CartTotalsService.load_items(cart)
+        if not all_cart_items:
             raise ValueError("Sepet boş.")
         
         # Seçili item'ları filtrele
         if selected_cart_item_ids:
-            cart_items = all_cart_items.filter(id__in=selected_cart_item_ids)
-            if not cart_items.exists():
+            selected_ids = {str(item_id) for item_id in selected_cart_item_ids}
+            cart_items = [item for item in all_cart_items if str(item.id) in selected_ids]
+            if not cart_items:
                 raise ValueError("Seçili sepet kalemleri bulunamadı.")
         else:
             # Seçim yapılmamışsa tüm sepet
@@ -111,15 +114,8 @@ class OrderService:
             else:
                 selected_shipping_cost = shipping_method.price
         
-        # Vergi hesaplama (Dinamik - Tenant bazlı)
-        from apps.models import Tax
-        active_tax = Tax.objects.filter(
-            tenant=cart.tenant,
-            is_active=True,
-            is_deleted=False
-        ).order_by('-is_default', '-created_at').first()
-        
-        tax_rate = active_tax.rate if active_tax else Decimal('0.00')
+        # Vergi hesaplama (Dinamik - Tenant bazlı, sepet hesaplamasıyla aynı cache'li oran)
+        tax_rate = CartTotalsService.get_active_tax_rate(cart.tenant_id)
         selected_tax_amount = selected_subtotal * (tax_rate / Decimal('100'))
         
         # Kupon indirimi hesapla (seçili item'lara göre)
@@ -205,137 +201,65 @@ class OrderService:
             user_agent=request.META.get('HTTP_USER_AGENT', '') if request else '',
         )
         
-        # Sipariş kalemlerini oluştur
+        # Ürün ana görselleri (tüm kalemler için tek sorgu)
+        from apps.models import ProductImage
+        primary_image_urls = {}
+        for product_id, image_url in ProductImage.objects.filter(
+            product_id__in={cart_item.product_id for cart_item in cart_items},
+            is_deleted=False,
+        ).order_by('product_id', '-is_primary', 'position', 'created_at').values_list('product_id', 'image_url'):
+            primary_image_urls.setdefault(product_id, image_url)
+        
+        # Sipariş kalemlerini oluştur (ürün bilgileri snapshot olarak)
+        order_items = []
         for cart_item in cart_items:
-            # Ürün bilgilerini snapshot olarak kaydet
-            product_name = cart_item.product.name
-            variant_name = cart_item.variant.name if cart_item.variant else ''
-            product_sku = cart_item.variant.sku if cart_item.variant else cart_item.product.sku
-            product_image_url = ''
-            
-            # Ana görseli al
-            primary_image = cart_item.product.images.filter(is_primary=True, is_deleted=False).first()
-            if not primary_image:
-                primary_image = cart_item.product.images.filter(is_deleted=False).first()
-            if primary_image:
-                product_image_url = primary_image.image_url
-            
+            product_image_url = primary_image_urls.get(cart_item.product_id) or ''
             # Varyant görseli varsa onu kullan
             if cart_item.variant and cart_item.variant.image_url:
                 product_image_url = cart_item.variant.image_url
             
-            order_item = OrderItem.objects.create(
+            order_items.append(OrderItem(
                 order=order,
                 product=cart_item.product,
                 variant=cart_item.variant,
-                product_name=product_name,
-                variant_name=variant_name,
-                product_sku=product_sku,
+                product_name=cart_item.product.name,
+                variant_name=cart_item.variant.name if cart_item.variant else '',
+                product_sku=cart_item.variant.sku if cart_item.variant else cart_item.product.sku,
                 quantity=cart_item.quantity,
                 unit_price=cart_item.unit_price,
-                total_price=cart_item.total_price,
+                # OrderItem.save() ile aynı: bulk_create save() çağırmaz
+                total_price=cart_item.unit_price * cart_item.quantity,
                 product_image_url=product_image_url,
-            )
-            
-            # Stok düşür (gerçek stok önce, sonra sanal stok)
-            if cart_item.variant:
-                if cart_item.variant.track_inventory:
-                    previous_qty = cart_item.variant.inventory_quantity
-                    order_quantity = cart_item.quantity
-                    
-                    # Önce gerçek stoktan düş
-                    if cart_item.variant.inventory_quantity >= order_quantity:
-                        # Gerçek stok yeterli
-                        cart_item.variant.inventory_quantity -= order_quantity
-                        real_stock_used = order_quantity
-                        virtual_stock_used = 0
-                    else:
-                        # Gerçek stok yetmiyor, sanal stoktan düş
-                        real_stock_used = cart_item.variant.inventory_quantity
-                        remaining_qty = order_quantity - real_stock_used
-                        cart_item.variant.inventory_quantity = 0
-                        
-                        # Sanal stok varsa düş
-                        if cart_item.variant.allow_backorder:
-                            if cart_item.variant.virtual_stock_quantity is not None:
-                                # Limitli sanal stok varsa düş
-                                virtual_stock_used = min(remaining_qty, cart_item.variant.virtual_stock_quantity)
-                                cart_item.variant.virtual_stock_quantity -= virtual_stock_used
-                            else:
-                                # Sınırsız sanal stok
-                                virtual_stock_used = remaining_qty
-                        else:
-                            virtual_stock_used = 0
-                    
-                    cart_item.variant.save()
-                    
-                    # Stok hareketi kaydet
-                    InventoryMovement.objects.create(
-                        tenant=cart.tenant,
-                        product=cart_item.product,
-                        variant=cart_item.variant,
-                        movement_type=InventoryMovement.MovementType.OUT,
-                        quantity=order_quantity,
-                        previous_quantity=previous_qty,
-                        new_quantity=cart_item.variant.inventory_quantity,
-                        order=order,
-                        order_item=order_item,
-                        reason=f'Sipariş (Gerçek: {real_stock_used}, Sanal: {virtual_stock_used})',
-                        created_by=customer_user,
-                    )
-            else:
-                if cart_item.product.track_inventory:
-                    previous_qty = cart_item.product.inventory_quantity
-                    order_quantity = cart_item.quantity
-                    
-                    # Önce gerçek stoktan düş
-                    if cart_item.product.inventory_quantity >= order_quantity:
-                        # Gerçek stok yeterli
-                        cart_item.product.inventory_quantity -= order_quantity
-                        real_stock_used = order_quantity
-                        virtual_stock_used = 0
-                    else:
-                        # Gerçek stok yetmiyor, sanal stoktan düş
-                        real_stock_used = cart_item.product.inventory_quantity
-                        remaining_qty = order_quantity - real_stock_used
-                        cart_item.product.inventory_quantity = 0
-                        
-                        # Sanal stok varsa düş
-                        if cart_item.product.allow_backorder:
-                            if cart_item.product.virtual_stock_quantity is not None:
-                                # Limitli sanal stok varsa düş
-                                virtual_stock_used = min(remaining_qty, cart_item.product.virtual_stock_quantity)
-                                cart_item.product.virtual_stock_quantity -= virtual_stock_used
-                            else:
-                                # Sınırsız sanal stok
-                                virtual_stock_used = remaining_qty
-                        else:
-                            virtual_stock_used = 0
-                    
-                    cart_item.product.save()
-                    
-                    # Stok hareketi kaydet
-                    InventoryMovement.objects.create(
-                        tenant=cart.tenant,
-                        product=cart_item.product,
-                        variant=None,
-                        movement_type=InventoryMovement.MovementType.OUT,
-                        quantity=order_quantity,
-                        previous_quantity=previous_qty,
-                        new_quantity=cart_item.product.inventory_quantity,
-                        order=order,
-                        order_item=order_item,
-                        reason=f'Sipariş (Gerçek: {real_stock_used}, Sanal: {virtual_stock_used})',
-                        created_by=customer_user,
-                    )
-        
-        # Müşteri istatistiklerini güncelle
+            ))
+        OrderItem.objects.bulk_create(order_items)
+        
+        # Stok düşür (kilitli, gerçek stok önce, sonra sanal stok) ve stok hareketlerini kaydet
+        from apps.services.inventory_service import InventoryService
+        inventory_movements = InventoryService.decrement_for_order(
+            cart.tenant,
+            order,
+            list(zip(cart_items, order_items)),
+            created_by=customer_user,
+        )
+        
+        # Müşteri istatistiklerini güncelle (tek UPDATE, sipariş geçmişinden bağımsız)
         if customer_user:
-            try:
-                customer_profile = customer_user.customer_profile
-                customer_profile.update_statistics()
-            except:
-                pass  # Customer profile yoksa skip
+            from apps.services.customer_service import CustomerService
+            CustomerService.record_order_created(order)
+        
+        # Webhook event'leri (commit sonrası teslim edilir)
+        from apps.services.webhook_service import WebhookService
+        WebhookService.dispatch_many(
+            cart.tenant_id,
+            [(WebhookService.EVENT_ORDER_CREATED, WebhookService.order_payload(order))] + [
+                (WebhookService.EVENT_INVENTORY_CHANGED, WebhookService.inventory_payload(
+                    movement.product_id, movement.variant_id,
+                    movement.previous_quantity, movement.new_quantity,
+                    reason=f'order:{order_number}'
+                ))
+                for movement in inventory_movements
+            ]
+        )
         
         logger.info(f"Order created: {order_number} for tenant {cart.tenant.name}")
         return order
@@ -369,8 +293,10 @@ class OrderService:
     def update_order_status(order, new_status, admin_user=None):
         """Sipariş durumunu güncelle."""
         from apps.services.email_service import EmailService
+        from apps.services.customer_service import CustomerService
         
         old_status = order.status
+        was_counted = CustomerService.is_counted(order)
         order.status = new_status
         
         # Durum değişikliklerine göre tarihleri güncelle
@@ -383,6 +309,16 @@ class OrderService:
         
         logger.info(f"Order {order.order_number} status changed: {old_status} -> {new_status}")
         
+        if old_status != new_status:
+            CustomerService.record_order_change(order, was_counted)
+            
+            from apps.services.webhook_service import WebhookService
+            WebhookService.dispatch(
+                order.tenant_id,
+                WebhookService.EVENT_ORDER_STATUS_CHANGED,
+                WebhookService.order_payload(order, previous_status=old_status)
+            )
+        
         # Email gönder (asenkron olarak)
         try:
             if new_status == Order.OrderStatus.CONFIRMED:
@@ -408,7 +344,10 @@ class OrderService:
             new_status: Yeni ödeme durumu (pending, paid, etc.)
             payment_method: (Opsiyonel) Ödeme yöntemi (credit_card, bank_transfer, etc.)
         """
+        from apps.services.customer_service import CustomerService
+        
         old_status = order.payment_status
+        was_counted = CustomerService.is_counted(order)
         order.payment_status = new_status
         
         # Eğer ödeme yöntemi verildiyse onu da güncelle
@@ -417,6 +356,16 @@ class OrderService:
             
         order.save()
         
+        if old_status != new_status:
+            CustomerService.record_order_change(order, was_counted)
+            
+            from apps.services.webhook_service import WebhookService
+            WebhookService.dispatch(
+                order.tenant_id,
+                WebhookService.EVENT_ORDER_PAYMENT_STATUS_CHANGED,
+                WebhookService.order_payload(order, previous_payment_status=old_status)
+            )
+        
         # Ödeme tamamlandığında sadakat puanı kazandır
         if new_status == Order.PaymentStatus.PAID and old_status != Order.PaymentStatus.PAID:
             from apps.services.loyalty_service import LoyaltyService
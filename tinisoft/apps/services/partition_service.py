@@ -0,0 +1,401 @@
+"""
+Partition service - Append-only tabloların aylık PostgreSQL range partitioning'i.
+
+analytics_events, activity_logs ve inventory_movements tabloları created_at'e göre
+aylık partition'lara bölünür (RANGE). ORM erişimi değişmez; created_at aralık
+sorguları sadece ilgili ayların partition'larını tarar (partition pruning).
+
+- Primary key (id, created_at) olur (partition key PK'da bulunmak zorunda);
+  Django tarafında id tek başına primary key olarak kalır (uuid4).
+- Aralık dışı kalan kayıtlar için bir DEFAULT partition bulunur; insert asla hata vermez.
+- Bakım (Celery beat, günlük): gelecek aylar için partition'ları önceden oluştur,
+  saklama süresi dolan partition'ları sil (drop) veya arşivle (detach + rename).
+
+Tablolar her tenant schema'sında ayrı bulunduğundan işlemler schema bazında yapılır.
+Mevcut (partition'sız) tablonun dönüştürülmesi tek seferlik bir işlemdir:
+    python manage.py manage_partitions --convert
+"""
+from datetime import date, timezone as dt_timezone
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.models import AnalyticsEvent, ActivityLog, InventoryMovement
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionService:
+    """Aylık partition oluşturma, dönüştürme ve saklama (retention) iş mantığı."""
+
+    MODELS = [AnalyticsEvent, ActivityLog, InventoryMovement]
+    PARTITION_KEY = 'created_at'
+
+    ACTION_DROP = 'drop'
+    ACTION_ARCHIVE = 'archive'
+    ARCHIVE_PREFIX = 'archived_'
+
+    DEFAULT_PREMAKE_MONTHS = 3
+    # Tablo başına saklama politikası (months=0: süresiz sakla)
+    DEFAULT_RETENTION = {
+        'analytics_events': {'months': 13, 'action': ACTION_DROP},
+        'activity_logs': {'months': 12, 'action': ACTION_DROP},
+        'inventory_movements': {'months': 24, 'action': ACTION_ARCHIVE},
+    }
+
+    # ------------------------------------------------------------------
+    # Ayarlar / yardımcılar
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_premake_months():
+        return getattr(settings, 'PARTITION_PREMAKE_MONTHS', PartitionService.DEFAULT_PREMAKE_MONTHS)
+
+    @staticmethod
+    def get_retention(table):
+        """Tablonun saklama politikası: {'months': int, 'action': 'drop' | 'archive'}."""
+        policy = dict(PartitionService.DEFAULT_RETENTION.get(table, {'months': 0, 'action': PartitionService.ACTION_DROP}))
+        policy.update(getattr(settings, 'PARTITION_RETENTION', {}).get(table, {}))
+        return policy
+
+    @staticmethod
+    def get_tables():
+        return [model._meta.db_table for model in PartitionService.MODELS]
+
+    @staticmethod
+    def get_model(table):
+        for model in PartitionService.MODELS:
+            if model._meta.db_table == table:
+                return model
+        raise ValueError(f'Partition tanımlı olmayan tablo: {table}')
+
+    @staticmethod
+    def month_start(value):
+        return date(value.year, value.month, 1)
+
+    @staticmethod
+    def add_months(month, count):
+        index = month.year * 12 + month.month - 1 + count
+        return date(index // 12, index % 12 + 1, 1)
+
+    @staticmethod
+    def partition_name(table, month):
+        return f'{table}_p{month.year:04d}_{month.month:02d}'
+
+    @staticmethod
+    def parse_partition_month(table, name):
+        """Partition adından ayı çıkar (bizim adlandırmamıza uymuyorsa None)."""
+        prefix = f'{table}_p'
+        if not name.startswith(prefix):
+            return None
+        try:
+            year, month = name[len(prefix):].split('_')
+            return date(int(year), int(month), 1)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _bound(month):
+        return f"'{month:%Y-%m-%d} 00:00:00+00'"
+
+    @staticmethod
+    def _bounds_sql(month):
+        next_month = PartitionService.add_months(month, 1)
+        return f'FROM ({PartitionService._bound(month)}) TO ({PartitionService._bound(next_month)})'
+
+    @staticmethod
+    def _qualified(schema, name):
+        quote = connection.ops.quote_name
+        return f'{quote(schema)}.{quote(name)}'
+
+    # ------------------------------------------------------------------
+    # Katalog sorguları
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def list_schemas(table):
+        """
+        Tabloyu içeren schema'lar.
+
+        Returns:
+            list: [(schema, is_partitioned)]
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT n.nspname, c.relkind = 'p'
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.relname = %s AND c.relkind IN ('r', 'p')
+                ORDER BY n.nspname
+                """,
+                [table],
+            )
+            return cursor.fetchall()
+
+    @staticmethod
+    def list_partitions(schema, table):
+        """Parent tabloya bağlı partition adları."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT child.relname
+                FROM pg_inherits i
+                JOIN pg_class parent ON parent.oid = i.inhparent
+                JOIN pg_class child ON child.oid = i.inhrelid
+                JOIN pg_namespace n ON n.oid = parent.relnamespace
+                WHERE n.nspname = %s AND parent.relname = %s
+                ORDER BY child.relname
+                """,
+                [schema, table],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    # ------------------------------------------------------------------
+    # Partition oluşturma
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def create_partition(schema, table, month):
+        """
+        Ayın partition'ını oluştur (varsa dokunma).
+        DEFAULT partition'a düşmüş o aya ait kayıtlar yeni partition'a taşınır.
+
+        Returns:
+            bool: Yeni partition oluşturuldu mu
+        """
+        name = PartitionService.partition_name(table, month)
+        parent = PartitionService._qualified(schema, table)
+        partition = PartitionService._qualified(schema, name)
+        default = PartitionService._qualified(schema, f'{table}_default')
+        bounds = PartitionService._bounds_sql(month)
+        start = PartitionService._bound(month)
+        end = PartitionService._bound(PartitionService.add_months(month, 1))
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SELECT to_regclass(%s)', [partition])
+            if cursor.fetchone()[0] is not None:
+                return False
+
+            cursor.execute('SELECT to_regclass(%s)', [default])
+            has_default = cursor.fetchone()[0] is not None
+            needs_move = False
+            if has_default:
+                cursor.execute(
+                    f'SELECT 1 FROM {default} WHERE created_at >= {start} AND created_at < {end} LIMIT 1'
+                )
+                needs_move = cursor.fetchone() is not None
+
+            if not needs_move:
+                cursor.execute(f'CREATE TABLE {partition} PARTITION OF {parent} FOR VALUES {bounds}')
+            else:
+                # Kayıtları DEFAULT'tan ayrı tabloya taşı, sonra partition olarak bağla
+                cursor.execute(f'CREATE TABLE {partition} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+                cursor.execute(
+                    f'WITH moved AS (DELETE FROM {default} WHERE created_at >= {start} AND created_at < {end} '
+                    f'RETURNING *) INSERT INTO {partition} SELECT * FROM moved'
+                )
+                cursor.execute(f'ALTER TABLE {parent} ATTACH PARTITION {partition} FOR VALUES {bounds}')
+                logger.warning(f"[PARTITION] Moved rows from {schema}.{table}_default into {name}")
+        logger.info(f"[PARTITION] Created {schema}.{name}")
+        return True
+
+    @staticmethod
+    def ensure_partitions(schema, table, months_ahead=None, today=None):
+        """
+        İçinde bulunulan ay ve sonraki months_ahead ay için partition'ları oluştur.
+
+        Returns:
+            list: Oluşturulan partition adları
+        """
+        if months_ahead is None:
+            months_ahead = PartitionService.get_premake_months()
+        current = PartitionService.month_start(today or timezone.now().astimezone(dt_timezone.utc))
+        created = []
+        for offset in range(months_ahead + 1):
+            month = PartitionService.add_months(current, offset)
+            if PartitionService.create_partition(schema, table, month):
+                created.append(PartitionService.partition_name(table, month))
+        return created
+
+    # ------------------------------------------------------------------
+    # Saklama (retention)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_expired_partitions(schema, table, today=None):
+        """Saklama süresi tamamen dolmuş partition'lar: [(ad, ay)]."""
+        months = PartitionService.get_retention(table)['months']
+        if not months:
+            return []
+        current = PartitionService.month_start(today or timezone.now().astimezone(dt_timezone.utc))
+        cutoff = PartitionService.add_months(current, -months)
+        expired = []
+        for name in PartitionService.list_partitions(schema, table):
+            month = PartitionService.parse_partition_month(table, name)
+            # Partition'ın bitişi cutoff'tan önceyse içindeki tüm kayıtlar süresi dolmuştur
+            if month is not None and PartitionService.add_months(month, 1) <= cutoff:
+                expired.append((name, month))
+        return expired
+
+    @staticmethod
+    def apply_retention(schema, table, today=None, dry_run=False):
+        """
+        Süresi dolmuş partition'ları politikaya göre sil veya arşivle.
+        Arşivleme: partition ayrılır (DETACH) ve 'archived_' önekiyle aynı schema'da saklanır.
+
+        Returns:
+            list: İşlem yapılan partition adları
+        """
+        action = PartitionService.get_retention(table)['action']
+        parent = PartitionService._qualified(schema, table)
+        processed = []
+        for name, _month in PartitionService.get_expired_partitions(schema, table, today=today):
+            processed.append(name)
+            if dry_run:
+                continue
+            partition = PartitionService._qualified(schema, name)
+            with transaction.atomic(), connection.cursor() as cursor:
+                if action == PartitionService.ACTION_ARCHIVE:
+                    cursor.execute(f'ALTER TABLE {parent} DETACH PARTITION {partition}')
+                    cursor.execute(
+                        f'ALTER TABLE {partition} RENAME TO '
+                        f'{connection.ops.quote_name(PartitionService.ARCHIVE_PREFIX + name)}'
+                    )
+                else:
+                    cursor.execute(f'DROP TABLE {partition}')
+            logger.info(f"[PARTITION] Retention {action}: {schema}.{name}")
+        return processed
+
+    # ------------------------------------------------------------------
+    # Dönüştürme (tek seferlik)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def convert_table(schema, table, months_ahead=None):
+        """
+        Partition'sız tabloyu aylık partition'lı tabloya dönüştür (tek transaction).
+
+        Mevcut kayıtlar kopyalanır; işlem süresince tablo kilitlidir.
+        Büyük tablolarda bakım penceresinde çalıştırılmalıdır.
+
+        Returns:
+            int: Oluşturulan partition sayısı
+        """
+        from core.db_router import set_tenant_schema, get_tenant_schema
+
+        model = PartitionService.get_model(table)
+        if months_ahead is None:
+            months_ahead = PartitionService.get_premake_months()
+        quote = connection.ops.quote_name
+        parent = PartitionService._qualified(schema, table)
+        legacy_name = f'{table}_legacy'
+        legacy = PartitionService._qualified(schema, legacy_name)
+
+        previous_schema = get_tenant_schema()
+        # Index / FK DDL'i şema adı olmadan üretilir - search_path tenant schema'sı olmalı
+        set_tenant_schema(schema)
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                        "WHERE conrelid = %s::regclass AND contype = 'f'",
+                        [parent],
+                    )
+                    foreign_keys = cursor.fetchall()
+                    cursor.execute(f'SELECT MIN(created_at), MAX(created_at) FROM {parent}')
+                    first_created, last_created = cursor.fetchone()
+
+                    cursor.execute(f'ALTER TABLE {parent} RENAME TO {quote(legacy_name)}')
+                    cursor.execute(
+                        f'CREATE TABLE {parent} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+                        f'PARTITION BY RANGE ({quote(PartitionService.PARTITION_KEY)})'
+                    )
+                    cursor.execute(
+                        f'CREATE TABLE {PartitionService._qualified(schema, table + "_default")} '
+                        f'PARTITION OF {parent} DEFAULT'
+                    )
+
+                    now = timezone.now().astimezone(dt_timezone.utc)
+                    month = PartitionService.month_start(
+                        first_created.astimezone(dt_timezone.utc) if first_created else now
+                    )
+                    last_month = PartitionService.add_months(
+                        PartitionService.month_start(max(last_created or now, now).astimezone(dt_timezone.utc)),
+                        months_ahead,
+                    )
+                    partition_count = 0
+                    while month <= last_month:
+                        partition = PartitionService._qualified(schema, PartitionService.partition_name(table, month))
+                        cursor.execute(
+                            f'CREATE TABLE {partition} PARTITION OF {parent} '
+                            f'FOR VALUES {PartitionService._bounds_sql(month)}'
+                        )
+                        partition_count += 1
+                        month = PartitionService.add_months(month, 1)
+
+                    # Index'ler veri kopyalandıktan sonra oluşturulur (daha hızlı)
+                    cursor.execute(f'INSERT INTO {parent} SELECT * FROM {legacy}')
+                    cursor.execute(f'DROP TABLE {legacy}')
+                    cursor.execute(
+                        f'ALTER TABLE {parent} ADD CONSTRAINT {quote(table + "_pkey")} '
+                        f'PRIMARY KEY (id, {quote(PartitionService.PARTITION_KEY)})'
+                    )
+
+                with connection.schema_editor(atomic=False) as editor:
+                    for statement in editor._model_indexes_sql(model):
+                        editor.execute(statement)
+
+                with connection.cursor() as cursor:
+                    for constraint_name, definition in foreign_keys:
+                        cursor.execute(f'ALTER TABLE {parent} ADD CONSTRAINT {quote(constraint_name)} {definition}')
+        finally:
+            set_tenant_schema(previous_schema)
+
+        logger.info(f"[PARTITION] Converted {schema}.{table} into {partition_count} monthly partition(s)")
+        return partition_count
+
+    @staticmethod
+    def convert_schema(schema, months_ahead=None):
+        """Schema'daki partition'sız tabloları dönüştür (yeni tenant schema'ları için)."""
+        converted = []
+        for table in PartitionService.get_tables():
+            for table_schema, is_partitioned in PartitionService.list_schemas(table):
+                if table_schema == schema and not is_partitioned:
+                    PartitionService.convert_table(schema, table, months_ahead=months_ahead)
+                    converted.append(table)
+        return converted
+
+    # ------------------------------------------------------------------
+    # Bakım
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def maintain(tables=None, schemas=None, months_ahead=None, dry_run=False, today=None):
+        """
+        Partition'lı tüm tablolar için gelecek partition'ları oluştur ve saklama politikasını uygula.
+        Partition'sız (henüz dönüştürülmemiş) tablolar atlanır.
+
+        Returns:
+            dict: {'created': [...], 'expired': [...], 'skipped': [...]} ('schema.tablo' adları)
+        """
+        stats = {'created': [], 'expired': [], 'skipped': []}
+        for table in tables or PartitionService.get_tables():
+            for schema, is_partitioned in PartitionService.list_schemas(table):
+                if schemas and schema not in schemas:
+                    continue
+                if not is_partitioned:
+                    stats['skipped'].append(f'{schema}.{table}')
+                    continue
+                try:
+                    if not dry_run:
+                        created = PartitionService.ensure_partitions(
+                            schema, table, months_ahead=months_ahead, today=today
+                        )
+                        stats['created'].extend(f'{schema}.{name}' for name in created)
+                    expired = PartitionService.apply_retention(schema, table, today=today, dry_run=dry_run)
+                    stats['expired'].extend(f'{schema}.{name}' for name in expired)
+                except Exception as e:
+                    logger.error(f"[PARTITION] Maintenance failed for {schema}.{table}: {e}", exc_info=True)
+        return stats
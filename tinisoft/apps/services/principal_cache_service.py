@@ -0,0 +1,321 @@
+"""
+JWT principal cache'i - iki katmanlı (process içi LRU + Redis).
+
+Her authenticated istek token'daki user_id ile kullanıcıyı çözer; bu yol DB'ye
+gitmemeli. Kullanıcının yetkilendirme için gereken alanlarından oluşan kompakt
+bir kayıt (principal) tutulur ve sorgusuz User instance'ına çevrilir
+(Model.from_db - kayıtta olmayan alanlar deferred, erişilirse yüklenir).
+
+Invalidasyon (apps.signals.clear_user_cache):
+- Kullanıcının Redis kaydı silinir (commit sonrası tekrar).
+- Global versiyon artırılır; her process versiyonu en fazla
+  VERSION_CHECK_INTERVAL saniyede bir okur ve değiştiyse yerel LRU'yu boşaltır.
+- Kullanıcının değişiklik zamanı yazılır; bu zamandan önce üretilmiş token'lardaki
+  gömülü yetki claim'leri (JWT_EMBED_PRINCIPAL) kullanılmaz.
+"""
+import copy
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+_NOT_FOUND = object()
+
+
+class PrincipalCacheService:
+    """Kullanıcı (principal) çözümleme için katmanlı cache ve token revocation listesi."""
+
+    CACHE_PREFIX = 'principal'
+    VERSION_KEY = 'principal:version'
+    CHANGED_AT_PREFIX = 'principal:changed_at'
+    REVOKED_JTI_PREFIX = 'jwt:revoked'
+    REVOKED_BEFORE_PREFIX = 'jwt:revoked_before'
+
+    # Principal kaydındaki alanlar (yetkilendirme ve loglama için yeterli)
+    FIELD_NAMES = (
+        'id', 'username', 'email', 'first_name', 'last_name', 'phone',
+        'role', 'tenant_id', 'staff_permissions', 'is_active', 'is_staff', 'is_superuser',
+    )
+    # Sadece bu alanları güncelleyen kayıtlar (örn. login zamanı) principal'ı değiştirmez
+    IGNORED_UPDATE_FIELDS = frozenset({'last_login'})
+
+    LOCAL_MAX_ENTRIES = 4096
+    LOCAL_TTL = 30  # saniye
+    LOCAL_NOT_FOUND_TTL = 5
+    VERSION_CHECK_INTERVAL = 2  # saniye - invalidasyonun diğer worker'lara ulaşma süresi
+    TIMEOUT_REDIS = 3600  # 1 saat
+    TIMEOUT_CHANGED_AT = 7 * 24 * 3600  # En uzun token ömründen uzun olmalı
+
+    _local = OrderedDict()
+    _lock = threading.Lock()
+    _version = None
+    _version_checked_at = 0.0
+    _schema_hash = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get(user_id):
+        """
+        user_id'ye göre User döndür (yerel LRU -> Redis -> DB). Bulunamazsa None.
+        Dönen instance'ın tenant'ı da cache'ten doldurulur (request.user.tenant sorgusuz).
+        """
+        try:
+            user_id = str(uuid.UUID(str(user_id)))
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+        version = PrincipalCacheService._current_version()
+        record = PrincipalCacheService._local_get(user_id, version)
+        if record is _NOT_FOUND:
+            return None
+
+        if record is None:
+            redis_key = PrincipalCacheService._redis_key(user_id)
+            try:
+                record = cache.get(redis_key)
+            except Exception as e:
+                logger.warning(f"[PRINCIPAL_CACHE] Redis read failed: {e}")
+                record = None
+
+            if record is None:
+                user = PrincipalCacheService._load(user_id)
+                if user is None:
+                    PrincipalCacheService._local_set(
+                        user_id, _NOT_FOUND, version, PrincipalCacheService.LOCAL_NOT_FOUND_TTL
+                    )
+                    return None
+                record = PrincipalCacheService._to_record(user)
+                try:
+                    cache.set(redis_key, record, PrincipalCacheService.TIMEOUT_REDIS)
+                except Exception as e:
+                    logger.warning(f"[PRINCIPAL_CACHE] Redis write failed: {e}")
+            PrincipalCacheService._local_set(user_id, record, version, PrincipalCacheService.LOCAL_TTL)
+
+        return PrincipalCacheService._to_user(record)
+
+    @staticmethod
+    def invalidate(user_id):
+        """Kullanıcının principal kaydını tüm process'lerde geçersiz kıl."""
+        PrincipalCacheService._invalidate(user_id)
+        # Transaction içindeyse: commit'ten önce eski satırı okuyan istekler tekrar cache'lemesin
+        transaction.on_commit(lambda: PrincipalCacheService._invalidate(user_id))
+
+    @staticmethod
+    def get_claims(user):
+        """Token'a gömülecek principal claim'leri."""
+        return {
+            'role': user.role,
+            'tenant_id': str(user.tenant_id) if user.tenant_id else None,
+            'staff_permissions': list(user.staff_permissions or []),
+            'is_active': user.is_active,
+        }
+
+    @staticmethod
+    def from_claims(payload):
+        """
+        Token'daki gömülü claim'lerden sorgusuz User oluştur (claim yoksa None).
+        Çağıran önce is_token_current ile claim'lerin güncel olduğunu kontrol etmelidir.
+        """
+        claims = payload.get('principal')
+        user_id = payload.get('user_id')
+        if not isinstance(claims, dict) or not user_id:
+            return None
+        record = {
+            'id': uuid.UUID(user_id),
+            'username': payload.get('username') or '',
+            'email': payload.get('email') or '',
+            'role': claims.get('role'),
+            'tenant_id': uuid.UUID(claims['tenant_id']) if claims.get('tenant_id') else None,
+            'staff_permissions': list(claims.get('staff_permissions') or []),
+            'is_active': bool(claims.get('is_active')),
+        }
+        return PrincipalCacheService._build_user(list(record.keys()), list(record.values()))
+
+    # ------------------------------------------------------------------
+    # Token revocation (JWT_EMBED_PRINCIPAL modunda kontrol edilir)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def revoke_token(payload):
+        """Tek bir token'ı (jti) süresi dolana kadar iptal listesine ekle."""
+        jti = payload.get('jti')
+        if not jti:
+            return False
+        ttl = max(int(payload.get('exp', 0) - time.time()), 1)
+        cache.set(f'{PrincipalCacheService.REVOKED_JTI_PREFIX}:{jti}', 1, ttl)
+        return True
+
+    @staticmethod
+    def revoke_user_tokens(user_id):
+        """Kullanıcının şu ana kadar üretilmiş tüm token'larını iptal et."""
+        cache.set(
+            f'{PrincipalCacheService.REVOKED_BEFORE_PREFIX}:{user_id}',
+            time.time(),
+            PrincipalCacheService.TIMEOUT_CHANGED_AT,
+        )
+
+    @staticmethod
+    def is_token_revoked(payload, state=None):
+        state = state if state is not None else PrincipalCacheService.get_token_state(payload)
+        if state.get('revoked'):
+            return True
+        revoked_before = state.get('revoked_before')
+        return revoked_before is not None and payload.get('iat', 0) < revoked_before
+
+    @staticmethod
+    def is_token_current(payload, state=None):
+        """Token iptal edilmemiş ve kullanıcı token üretildikten sonra değişmemiş mi?"""
+        state = state if state is not None else PrincipalCacheService.get_token_state(payload)
+        if PrincipalCacheService.is_token_revoked(payload, state):
+            return False
+        changed_at = state.get('changed_at')
+        return changed_at is None or payload.get('iat', 0) >= changed_at
+
+    @staticmethod
+    def get_token_state(payload):
+        """Revocation ve değişiklik zamanı key'lerini tek Redis çağrısında oku."""
+        user_id = payload.get('user_id')
+        keys = {
+            'revoked': f"{PrincipalCacheService.REVOKED_JTI_PREFIX}:{payload.get('jti')}",
+            'revoked_before': f'{PrincipalCacheService.REVOKED_BEFORE_PREFIX}:{user_id}',
+            'changed_at': f'{PrincipalCacheService.CHANGED_AT_PREFIX}:{user_id}',
+        }
+        try:
+            values = cache.get_many(list(keys.values()))
+        except Exception as e:
+            # Redis yoksa gömülü claim'lere güvenilmez (principal cache -> DB)
+            logger.warning(f"[PRINCIPAL_CACHE] Token state read failed: {e}")
+            return {'changed_at': float('inf')}
+        return {name: values.get(key) for name, key in keys.items()}
+
+    # ------------------------------------------------------------------
+    # Katmanlar
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _invalidate(user_id):
+        try:
+            cache.delete(PrincipalCacheService._redis_key(user_id))
+            cache.set(f'{PrincipalCacheService.CHANGED_AT_PREFIX}:{user_id}', time.time(),
+                      PrincipalCacheService.TIMEOUT_CHANGED_AT)
+            try:
+                version = cache.incr(PrincipalCacheService.VERSION_KEY)
+            except ValueError:
+                version = int(time.time() * 1000)
+                cache.set(PrincipalCacheService.VERSION_KEY, version, None)
+        except Exception as e:
+            logger.warning(f"[PRINCIPAL_CACHE] Invalidation failed for user {user_id}: {e}")
+            version = None
+
+        with PrincipalCacheService._lock:
+            PrincipalCacheService._local.clear()
+            PrincipalCacheService._version = version
+            PrincipalCacheService._version_checked_at = time.monotonic()
+
+    @staticmethod
+    def _current_version():
+        """Global versiyonu döndür (Redis'e en fazla VERSION_CHECK_INTERVAL'da bir gidilir)."""
+        now = time.monotonic()
+        if (
+            PrincipalCacheService._version is not None
+            and now - PrincipalCacheService._version_checked_at < PrincipalCacheService.VERSION_CHECK_INTERVAL
+        ):
+            return PrincipalCacheService._version
+
+        try:
+            version = cache.get(PrincipalCacheService.VERSION_KEY)
+            if version is None:
+                cache.add(PrincipalCacheService.VERSION_KEY, int(time.time() * 1000), None)
+                version = cache.get(PrincipalCacheService.VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"[PRINCIPAL_CACHE] Version read failed: {e}")
+            version = PrincipalCacheService._version
+
+        with PrincipalCacheService._lock:
+            if version != PrincipalCacheService._version:
+                PrincipalCacheService._local.clear()
+                PrincipalCacheService._version = version
+            PrincipalCacheService._version_checked_at = now
+        return version
+
+    @staticmethod
+    def _local_get(user_id, version):
+        with PrincipalCacheService._lock:
+            entry = PrincipalCacheService._local.get(user_id)
+            if entry is None:
+                return None
+            expires_at, entry_version, record = entry
+            if entry_version != version or expires_at < time.monotonic():
+                del PrincipalCacheService._local[user_id]
+                return None
+            PrincipalCacheService._local.move_to_end(user_id)
+            return record
+
+    @staticmethod
+    def _local_set(user_id, record, version, ttl):
+        with PrincipalCacheService._lock:
+            PrincipalCacheService._local[user_id] = (time.monotonic() + ttl, version, record)
+            PrincipalCacheService._local.move_to_end(user_id)
+            while len(PrincipalCacheService._local) > PrincipalCacheService.LOCAL_MAX_ENTRIES:
+                PrincipalCacheService._local.popitem(last=False)
+
+    @staticmethod
+    def _redis_key(user_id):
+        # Şema hash'i: FIELD_NAMES değiştiğinde eski tuple'lar yanlış eşleşmesin
+        if PrincipalCacheService._schema_hash is None:
+            PrincipalCacheService._schema_hash = hashlib.md5(
+                ','.join(PrincipalCacheService.FIELD_NAMES).encode('utf-8')
+            ).hexdigest()[:8]
+        return f'{PrincipalCacheService.CACHE_PREFIX}:{PrincipalCacheService._schema_hash}:{user_id}'
+
+    # ------------------------------------------------------------------
+    # Kayıt <-> model
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _to_record(user):
+        return tuple(getattr(user, name) for name in PrincipalCacheService.FIELD_NAMES)
+
+    @staticmethod
+    def _to_user(record):
+        values = [
+            copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+            for value in record
+        ]
+        return PrincipalCacheService._build_user(PrincipalCacheService.FIELD_NAMES, values)
+
+    @staticmethod
+    def _build_user(field_names, values):
+        """
+        Sorgusuz User instance'ı (Model.from_db). Kayıtta olmayan alanlar deferred'dır:
+        erişilirse yüklenir, save() sadece yüklü alanları yazar (parola vb. ezilmez).
+        """
+        from apps.models import User
+        from apps.services.tenant_cache_service import TenantCacheService
+
+        # from_db değerleri model alan sırasında bekler
+        by_name = dict(zip(field_names, values))
+        ordered_names = [f.attname for f in User._meta.concrete_fields if f.attname in by_name]
+        user = User.from_db(DEFAULT_DB_ALIAS, ordered_names, [by_name[name] for name in ordered_names])
+        if user.tenant_id:
+            try:
+                User.tenant.field.set_cached_value(user, TenantCacheService.get(id=user.tenant_id))
+            except Exception:
+                pass  # Silinmiş tenant: user.tenant erişilirse DB'den yüklenir
+        return user
+
+    @staticmethod
+    def _load(user_id):
+        from apps.models import User
+        return User.objects.filter(id=user_id).only(*PrincipalCacheService.FIELD_NAMES).first()
+
@@ -0,0 +1,176 @@
+"""
+Product export service - Ürün kataloğunu sabit bellekle dışa aktarma.
+
+Ürünler model instance'ı ve serializer yerine values() ile sadece gereken
+kolonlar seçilerek, server-side cursor (iterator) üzerinden okunur.
+CSV / NDJSON satır satır stream edilir, XLSX openpyxl write-only modunda
+Celery task'ında dosyaya yazılır. Bellek kullanımı katalog boyutundan bağımsızdır.
+"""
+import csv
+import json
+import os
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from apps.models import Product, Category, ProductImage
+from core.db_router import set_tenant_schema, clear_tenant_schema
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Echo:
+    """csv.writer için yazılan satırı geri döndüren pseudo-buffer."""
+
+    def write(self, value):
+        return value
+
+
+class ProductExportService:
+    """Ürün export iş mantığı (CSV / NDJSON stream, XLSX dosya)."""
+
+    # Export kolonları (başlıklar Excel import FIELD_MAPPING anahtarlarıyla uyumlu)
+    EXPORT_FIELDS = [
+        'id', 'name', 'slug', 'sku', 'barcode', 'variant_group_sku', 'brand',
+        'price', 'compare_at_price', 'price_with_vat', 'buying_price', 'currency',
+        'inventory_quantity', 'track_inventory', 'status', 'is_visible', 'is_featured',
+        'weight', 'desi', 'created_at', 'updated_at',
+    ]
+    ANNOTATED_FIELDS = ['categories', 'primary_image_url']
+
+    ITERATOR_CHUNK_SIZE = 2000
+    FORMATS = ('csv', 'ndjson', 'xlsx')
+    EXPORT_DIR_NAME = 'temp_exports'
+    EXPORT_FILE_MAX_AGE = 24 * 3600  # Eski export dosyaları 1 gün sonra silinir
+
+    @staticmethod
+    def get_headers():
+        return ProductExportService.EXPORT_FIELDS + ProductExportService.ANNOTATED_FIELDS
+
+    @staticmethod
+    def get_rows_queryset(tenant, product_ids=None):
+        """
+        Export satırlarının queryset'i (dict döner).
+        Kategori isimleri ve ana görsel correlated subquery ile aynı sorguda gelir.
+        """
+        categories = Category.objects.filter(
+            products=OuterRef('pk'),
+            is_deleted=False,
+        ).order_by('name').values('name')
+        primary_image = ProductImage.objects.filter(
+            product=OuterRef('pk'),
+            is_deleted=False,
+        ).order_by('-is_primary', 'position').values('image_url')[:1]
+
+        queryset = Product.objects.filter(tenant=tenant, is_deleted=False)
+        if product_ids:
+            queryset = queryset.filter(id__in=product_ids)
+
+        return queryset.annotate(
+            categories_list=ArraySubquery(categories),
+            primary_image_url=Subquery(primary_image),
+        ).order_by('created_at', 'id').values(
+            *ProductExportService.EXPORT_FIELDS, 'categories_list', 'primary_image_url'
+        )
+
+    @staticmethod
+    def iter_rows(tenant, product_ids=None, chunk_size=None, schema_name=None):
+        """
+        Export satırlarını sırayla üret (server-side cursor, chunk_size satırlık fetch).
+        Her satır get_headers() sırasında düz değer listesidir.
+
+        schema_name: StreamingHttpResponse gövdesi TenantMiddleware schema'yı temizledikten
+        sonra tüketilir; verilirse sorgular bu schema'da çalıştırılır.
+        """
+        if schema_name:
+            set_tenant_schema(schema_name)
+        try:
+            queryset = ProductExportService.get_rows_queryset(tenant, product_ids)
+            fields = ProductExportService.EXPORT_FIELDS
+            for row in queryset.iterator(chunk_size=chunk_size or ProductExportService.ITERATOR_CHUNK_SIZE):
+                values = [ProductExportService._to_plain(row[field]) for field in fields]
+                values.append(', '.join(name for name in (row['categories_list'] or []) if name))
+                values.append(row['primary_image_url'] or '')
+                yield values
+        finally:
+            if schema_name:
+                clear_tenant_schema()
+
+    @staticmethod
+    def _to_plain(value):
+        """Değeri CSV / JSON / XLSX'e yazılabilir düz tipe çevir."""
+        if value is None:
+            return ''
+        if isinstance(value, Decimal):
+            return str(value)
+        if isinstance(value, datetime):
+            return timezone.localtime(value).isoformat() if timezone.is_aware(value) else value.isoformat()
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return value
+
+    @staticmethod
+    def stream_csv(tenant, product_ids=None, schema_name=None):
+        """CSV satırlarını üret (UTF-8 BOM ile - Excel Türkçe karakterleri doğru açsın)."""
+        writer = csv.writer(_Echo())
+        yield '\ufeff' + writer.writerow(ProductExportService.get_headers())
+        for values in ProductExportService.iter_rows(tenant, product_ids, schema_name=schema_name):
+            yield writer.writerow(values)
+
+    @staticmethod
+    def stream_ndjson(tenant, product_ids=None, schema_name=None):
+        """Her satırı ayrı bir JSON objesi olarak üret (newline-delimited JSON)."""
+        headers = ProductExportService.get_headers()
+        for values in ProductExportService.iter_rows(tenant, product_ids, schema_name=schema_name):
+            yield json.dumps(dict(zip(headers, values)), ensure_ascii=False) + '\n'
+
+    @staticmethod
+    def get_export_dir(tenant_id):
+        return os.path.join(settings.BASE_DIR, ProductExportService.EXPORT_DIR_NAME, str(tenant_id))
+
+    @staticmethod
+    def write_xlsx(tenant, product_ids=None):
+        """
+        Ürünleri XLSX dosyasına yaz (openpyxl write-only: satırlar bellekte tutulmaz).
+
+        Returns:
+            tuple: (dosya yolu, satır sayısı)
+        """
+        from openpyxl import Workbook
+
+        export_dir = ProductExportService.get_export_dir(tenant.id)
+        os.makedirs(export_dir, exist_ok=True)
+        ProductExportService.cleanup_old_exports(export_dir)
+
+        timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+        file_path = os.path.join(export_dir, f'products_{timestamp}_{str(uuid.uuid4())[:8]}.xlsx')
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Ürünler')
+        sheet.append(ProductExportService.get_headers())
+        row_count = 0
+        for values in ProductExportService.iter_rows(tenant, product_ids):
+            sheet.append(values)
+            row_count += 1
+        workbook.save(file_path)
+
+        logger.info(f"Product XLSX export written: {file_path} ({row_count} rows) for tenant {tenant.id}")
+        return file_path, row_count
+
+    @staticmethod
+    def cleanup_old_exports(export_dir):
+        """EXPORT_FILE_MAX_AGE'den eski export dosyalarını sil."""
+        threshold = timezone.now().timestamp() - ProductExportService.EXPORT_FILE_MAX_AGE
+        for file_name in os.listdir(export_dir):
+            file_path = os.path.join(export_dir, file_name)
+            try:
+                if os.path.isfile(file_path) and os.path.getmtime(file_path) < threshold:
+                    os.unlink(file_path)
+            except OSError as e:
+                logger.warning(f"Could not delete old export file {file_path}: {str(e)}")
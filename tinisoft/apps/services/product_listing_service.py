@@ -0,0 +1,213 @@
+"""
+Product listing service - Ürün listeleme için denormalize alanların hesaplanması.
+
+Product üzerindeki listing_* alanları (min/max fiyat, toplam stok, stok durumu, ana görsel)
+varyant ve görsellerden türetilir. Böylece listeleme, fiyat sıralaması ve stok filtresi
+JOIN / alt sorgu / distinct() olmadan indeksli kolonlar üzerinden çalışır.
+
+Tutarlılık:
+- Product / ProductVariant / ProductImage / InventoryMovement signal'ları ürünü
+  schedule_refresh ile işaretler; yenileme transaction commit'inden sonra, ürün başına
+  bir kez yapılır.
+- Queryset update / bulk_create kullanan yollar (sipariş stok düşümü, Excel import, toplu
+  güncelleme) schedule_refresh'i kendileri çağırır.
+- Kaçan değişiklikler için: python manage.py repair_product_listing (deploy adımı olarak elle;
+  REPAIR_PRODUCT_LISTING_ON_START=True ile backend başlangıcında)
+"""
+import threading
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from apps.models import Product, ProductVariant, ProductImage
+import logging
+
+logger = logging.getLogger(__name__)
+
+_pending = threading.local()
+
+
+class ProductListingService:
+    """Ürün listeleme alanları iş mantığı."""
+
+    LISTING_FIELDS = [
+        'listing_min_price',
+        'listing_max_price',
+        'listing_stock_quantity',
+        'listing_in_stock',
+        'listing_primary_image_url',
+    ]
+    REFRESH_BATCH_SIZE = 500
+
+    # ------------------------------------------------------------------
+    # Hesaplama
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _available_q(prefix=''):
+        """Satın alınabilir stok koşulu (Product.is_available / serializer is_in_stock ile aynı)."""
+        return (
+            Q(**{f'{prefix}track_inventory': False})
+            | Q(**{f'{prefix}inventory_quantity__gt': 0})
+            | Q(**{f'{prefix}virtual_stock_quantity__gt': 0})
+            | Q(**{f'{prefix}allow_backorder': True})
+        )
+
+    @staticmethod
+    def compute(product_ids):
+        """
+        Ürünlerin listing alanlarını varyant ve görsellerden hesapla (3 sorgu).
+
+        Returns:
+            dict: {product_id: {listing alanı: değer}} (silinmiş/bulunmayan ürünler hariç)
+        """
+        product_ids = list(product_ids)
+        if not product_ids:
+            return {}
+
+        products = Product.objects.filter(id__in=product_ids).order_by().values(
+            'id', 'is_variant_product', 'price', 'track_inventory',
+            'inventory_quantity', 'virtual_stock_quantity', 'allow_backorder',
+        )
+        variant_stats = {
+            row['product_id']: row
+            for row in ProductVariant.objects.filter(
+                product_id__in=product_ids,
+                is_deleted=False,
+            ).order_by().values('product_id').annotate(
+                min_price=Min('price'),
+                max_price=Max('price'),
+                stock=Sum('inventory_quantity'),
+                available=Count('id', filter=ProductListingService._available_q()),
+            )
+        }
+        # Ürün başına ana görsel: is_primary önce, sonra position / created_at (DISTINCT ON)
+        primary_images = {
+            product_id: (image_url, variants)
+            for product_id, image_url, variants in ProductImage.objects.filter(
+                product_id__in=product_ids,
+                is_deleted=False,
+            ).order_by('product_id', '-is_primary', 'position', 'created_at').distinct('product_id').values_list(
+                'product_id', 'image_url', 'variants'
+            )
+        }
+
+        results = {}
+        for product in products:
+            stats = variant_stats.get(product['id']) if product['is_variant_product'] else None
+            if stats:
+                min_price, max_price = stats['min_price'], stats['max_price']
+                stock = stats['stock'] or 0
+                in_stock = stats['available'] > 0
+            else:
+                min_price = max_price = product['price']
+                stock = product['inventory_quantity']
+                in_stock = (
+                    not product['track_inventory']
+                    or product['inventory_quantity'] > 0
+                    or (product['virtual_stock_quantity'] or 0) > 0
+                    or product['allow_backorder']
+                )
+            image_url, variants = primary_images.get(product['id']) or ('', None)
+            # Listeleme boyutlu WebP varyantı hazırsa onu kullan (ImageProcessingService)
+            image_url = ((variants or {}).get('listing') or {}).get('webp') or image_url or ''
+            if image_url.startswith('data:image'):
+                # Base64 görseller görsel işleme pipeline'ında storage'a taşınır, kolona yazılmaz
+                image_url = ''
+            results[product['id']] = {
+                'listing_min_price': min_price,
+                'listing_max_price': max_price,
+                'listing_stock_quantity': stock,
+                'listing_in_stock': in_stock,
+                'listing_primary_image_url': image_url,
+            }
+        return results
+
+    @staticmethod
+    def refresh(product_ids):
+        """
+        Ürünlerin listing alanlarını yeniden hesapla, değişenleri bulk_update ile yaz.
+        bulk_update signal tetiklemez (yenileme döngüsü ve gereksiz cache invalidation olmaz).
+
+        Returns:
+            int: Güncellenen ürün sayısı
+        """
+        product_ids = list(product_ids)
+        updated = 0
+        for start in range(0, len(product_ids), ProductListingService.REFRESH_BATCH_SIZE):
+            batch = product_ids[start:start + ProductListingService.REFRESH_BATCH_SIZE]
+            computed = ProductListingService.compute(batch)
+            if not computed:
+                continue
+            current = {
+                row['id']: row
+                for row in Product.objects.filter(id__in=list(computed)).order_by().values(
+                    'id', *ProductListingService.LISTING_FIELDS
+                )
+            }
+            changed = []
+            for product_id, values in computed.items():
+                row = current.get(product_id)
+                if row is None or all(row[field] == value for field, value in values.items()):
+                    continue
+                changed.append(Product(id=product_id, **values))
+            if changed:
+                Product.objects.bulk_update(changed, ProductListingService.LISTING_FIELDS)
+                updated += len(changed)
+        return updated
+
+    # ------------------------------------------------------------------
+    # Commit sonrası yenileme
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def schedule_refresh(product_ids):
+        """
+        Ürünleri commit sonrası yenilenmek üzere işaretle.
+        Aynı transaction'da aynı ürün için gelen çağrılar tek yenilemede birleşir.
+        """
+        product_ids = {product_id for product_id in product_ids if product_id}
+        if not product_ids:
+            return
+        pending = getattr(_pending, 'product_ids', None)
+        if pending is None:
+            pending = _pending.product_ids = set()
+        pending.update(product_ids)
+        # İlk çalışan callback bekleyen tüm ürünleri yeniler, sonrakiler boş geçer.
+        # Rollback olan transaction'ın ürünleri sonraki yenilemeye kalır (yeniden hesaplama zararsız).
+        transaction.on_commit(ProductListingService._flush_pending)
+
+    @staticmethod
+    def _flush_pending():
+        product_ids = getattr(_pending, 'product_ids', None)
+        if not product_ids:
+            return
+        _pending.product_ids = set()
+        try:
+            ProductListingService.refresh(product_ids)
+        except Exception as e:
+            logger.error(f"[PRODUCT_LISTING] Refresh failed for {len(product_ids)} product(s): {e}")
+
+    # ------------------------------------------------------------------
+    # Sorgu yardımcıları
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def order_by_price(queryset, descending=False):
+        """Listeleme fiyatına göre sırala ((tenant, listing_min_price) indeksi ile)."""
+        return queryset.order_by('-listing_min_price' if descending else 'listing_min_price')
+
+    @staticmethod
+    def repair_tenant(tenant, batch_size=None):
+        """
+        Tenant'ın tüm ürünlerinin listing alanlarını yeniden hesapla (repair komutu).
+
+        Returns:
+            dict: {'checked': int, 'fixed': int}
+        """
+        batch_size = batch_size or ProductListingService.REFRESH_BATCH_SIZE
+        product_ids = list(
+            Product.objects.filter(tenant=tenant, is_deleted=False).order_by('id').values_list('id', flat=True)
+        )
+        fixed = 0
+        for start in range(0, len(product_ids), batch_size):
+            fixed += ProductListingService.refresh(product_ids[start:start + batch_size])
+        return {'checked': len(product_ids), 'fixed': fixed}
@@ -2,17 +2,108 @@
 Search service - Ürün arama ve filtreleme optimizasyonu.
 İkas benzeri arama sistemi.
 """
-from django.db.models import Q, Count, Avg, Max, Min
+import re
+import time
+from decimal import Decimal
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Q, F, Count, Avg, Max, Min
+from django.db.models.fields.json import KeyTextTransform
 from django.db.models.functions import Coalesce
 from apps.models import Product, Category, ProductAttribute, ProductAttributeValue, ProductAttributeMapping
+from apps.services.cache_service import CacheService
+from apps.services.product_listing_service import ProductListingService
 import logging
 
 logger = logging.getLogger(__name__)
 
+# PostgreSQL text search konfigürasyonu (setup_search_index komutu oluşturur)
+SEARCH_CONFIG = 'tinisoft_turkish'
+
+# Türkçe karakter katlaması - DB'deki tinisoft_search_normalize() ile birebir aynı olmalı
+SEARCH_FOLD_FROM = 'İIıŞşĞğÜüÖöÇç'
+SEARCH_FOLD_TO = 'iiissgguuoocc'
+_SEARCH_FOLD_TABLE = str.maketrans(SEARCH_FOLD_FROM, SEARCH_FOLD_TO)
+
+# Process bazlı cache: full-text altyapısı kurulu mu? (None = henüz kontrol edilmedi)
+# Kuruluysa process ömrü boyunca tutulur; kurulu değilse setup_search_index sonradan
+# çalıştırılabileceği için FULL_TEXT_RECHECK_INTERVAL saniye sonra tekrar kontrol edilir.
+FULL_TEXT_RECHECK_INTERVAL = 60  # saniye
+_full_text_available = None
+_full_text_checked_at = 0.0
+
+
+def normalize_search_text(text):
+    """Arama metnini DB tarafıyla aynı şekilde normalize et (ı/İ/ş/ğ katlaması + lower)."""
+    return (text or '').translate(_SEARCH_FOLD_TABLE).lower()
+
 
 class SearchService:
     """Search business logic."""
     
+    @staticmethod
+    def is_full_text_available():
+        """
+        Full-text arama altyapısı (trigger + text search config) kurulu mu?
+        Olumlu sonuç process ömrü boyunca, olumsuz sonuç FULL_TEXT_RECHECK_INTERVAL saniye cache'lenir.
+        """
+        global _full_text_available, _full_text_checked_at
+        if _full_text_available:
+            return True
+        if connection.vendor != 'postgresql':
+            return False
+        if _full_text_available is not None and time.monotonic() - _full_text_checked_at < FULL_TEXT_RECHECK_INTERVAL:
+            return False
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = %s) "
+                    "AND EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'products_search_vector_trigger')",
+                    [SEARCH_CONFIG],
+                )
+                _full_text_available = bool(cursor.fetchone()[0])
+        except Exception as e:
+            logger.warning(f"[SEARCH] Full-text availability check failed: {e}")
+            _full_text_available = False
+        _full_text_checked_at = time.monotonic()
+        if not _full_text_available:
+            logger.warning("[SEARCH] Full-text index not installed, using icontains fallback (run setup_search_index)")
+        return _full_text_available
+    
+    @staticmethod
+    def build_search_query(query):
+        """
+        Kullanıcı sorgusundan prefix destekli tsquery oluştur.
+        Örn: "kahve makin" -> kahve:* & makin:*
+        """
+        terms = re.findall(r'\w+', normalize_search_text(query))
+        if not terms:
+            return None
+        raw_query = ' & '.join(f'{term}:*' for term in terms)
+        return SearchQuery(raw_query, search_type='raw', config=SEARCH_CONFIG)
+    
+    @staticmethod
+    def _apply_full_text_search(queryset, query):
+        """
+        tsvector + trigram ile metin araması.
+        JOIN olmadığı için distinct() gerekmez; relevance sıralaması için search_rank eklenir.
+        """
+        search_query = SearchService.build_search_query(query)
+        if search_query is None:
+            return queryset.annotate(search_rank=TrigramWordSimilarity(query, 'name')).filter(
+                Q(name__icontains=query) | Q(sku__icontains=query)
+            )
+        
+        # name/sku icontains -> UPPER() trigram GIN index'i ile karşılanır (kelime içi / SKU parçası)
+        return queryset.filter(
+            Q(search_vector=search_query) |
+            Q(name__icontains=query) |
+            Q(sku__icontains=query)
+        ).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query) + TrigramWordSimilarity(query, 'name'),
+        )
+    
     @staticmethod
     def search_products(tenant, query, filters=None, ordering=None, limit=None):
         """
@@ -22,7 +113,7 @@ class SearchService:
             tenant: Tenant instance
             query: Arama sorgusu
             filters: Filtreler dict (category, price_range, attributes, vb.)
-            ordering: Sıralama (price_asc, price_desc, newest, popularity)
+            ordering: Sıralama (relevance, price_asc, price_desc, newest, popularity)
             limit: Sonuç limiti
         
         Returns:
@@ -36,14 +127,20 @@ class SearchService:
         )
         
         # Metin araması
+        full_text = False
         if query:
-            queryset = queryset.filter(
-                Q(name__icontains=query) |
-                Q(description__icontains=query) |
-                Q(sku__icontains=query) |
-                Q(tags__icontains=query) |
-                Q(meta_keywords__icontains=query)
-            ).distinct()
+            if SearchService.is_full_text_available():
+                queryset = SearchService._apply_full_text_search(queryset, query)
+                full_text = True
+            else:
+                # Fallback: full-text altyapısı kurulu değilse eski icontains araması
+                queryset = queryset.filter(
+                    Q(name__icontains=query) |
+                    Q(description__icontains=query) |
+                    Q(sku__icontains=query) |
+                    Q(tags__icontains=query) |
+                    Q(meta_keywords__icontains=query)
+                ).distinct()
         
         # Filtreler
         if filters:
@@ -61,12 +158,9 @@ class SearchService:
             if 'max_price' in filters:
                 queryset = queryset.filter(price__lte=filters['max_price'])
             
-            # Stok durumu
+            # Stok durumu (denormalize listing_in_stock - JOIN / distinct gerekmez)
             if 'in_stock' in filters and filters['in_stock']:
-                queryset = queryset.filter(
-                    Q(inventory_quantity__gt=0) |
-                    Q(is_variant_product=True, variants__inventory_quantity__gt=0)
-                ).distinct()
+                queryset = queryset.filter(listing_in_stock=True)
             
             # Özellikler (attributes)
             if 'attributes' in filters:
@@ -138,11 +232,16 @@ class SearchService:
                             queryset = queryset.filter(metadata__brand__in=brands)
         
         # Sıralama
-        if ordering:
+        if ordering == 'relevance':
+            if full_text:
+                queryset = queryset.order_by('-search_rank', '-created_at')
+            else:
+                queryset = queryset.order_by('-created_at')
+        elif ordering:
             if ordering == 'price_asc':
-                queryset = queryset.order_by('price')
+                queryset = ProductListingService.order_by_price(queryset)
             elif ordering == 'price_desc':
-                queryset = queryset.order_by('-price')
+                queryset = ProductListingService.order_by_price(queryset, descending=True)
             elif ordering == 'newest':
                 queryset = queryset.order_by('-created_at')
             elif ordering == 'popularity':
@@ -208,10 +307,112 @@ class SearchService:
         
         return suggestions[:limit]
     
+    # Fiyat aralığı facet'i için bucket sayısı
+    PRICE_BUCKET_COUNT = 5
+    
+    @staticmethod
+    def compute_facets(tenant, products):
+        """
+        Verilen ürün kümesi için tüm facet'leri (özellik, marka, fiyat) sayılarıyla hesapla.
+        Attribute sayısından bağımsız olarak sabit sayıda sorgu çalışır (gruplanmış sorgular).
+        
+        Args:
+            tenant: Tenant instance
+            products: Filtrelenmiş Product QuerySet
+        
+        Returns:
+            dict: price_range, attributes ve brands facet'leri
+        """
+        # JOIN'lerden gelen tekrarları önlemek için ürün kümesini ID alt sorgusu olarak kullan
+        product_ids = products.order_by().values('id')
+        base = Product.objects.filter(id__in=product_ids)
+        
+        # 1) Özellik facet'leri - tek GROUP BY (attribute, value)
+        attribute_rows = ProductAttributeMapping.objects.filter(
+            product_id__in=product_ids,
+            attribute__tenant=tenant,
+            attribute__is_filterable=True,
+            attribute__is_deleted=False,
+        ).values(
+            'attribute__slug', 'attribute__name', 'attribute__position',
+            'value__slug', 'value__value', 'value__color_code', 'value__image_url', 'value__position',
+        ).annotate(
+            count=Count('product_id', distinct=True),
+        ).order_by('attribute__position', 'attribute__name', 'value__position', 'value__value')
+        
+        attribute_options = {}
+        for row in attribute_rows:
+            option = attribute_options.setdefault(row['attribute__slug'], {
+                'name': row['attribute__name'],
+                'values': [],
+            })
+            option['values'].append({
+                'slug': row['value__slug'],
+                'value': row['value__value'],
+                'color_code': row['value__color_code'],
+                'image_url': row['value__image_url'],
+                'count': row['count'],
+            })
+        
+        # 2) Marka facet'i (search_products'daki brand filtresi metadata.brand kullanır)
+        brand_rows = base.annotate(
+            brand_value=KeyTextTransform('brand', 'metadata'),
+        ).exclude(
+            brand_value__isnull=True,
+        ).exclude(
+            brand_value='',
+        ).values('brand_value').annotate(
+            count=Count('id'),
+        ).order_by('-count', 'brand_value')
+        brands = [{'value': row['brand_value'], 'count': row['count']} for row in brand_rows]
+        
+        # 3) Fiyat aralığı + bucket sayıları
+        price_stats = base.aggregate(
+            min_price=Min('price'),
+            max_price=Max('price'),
+            total=Count('id'),
+        )
+        min_price = price_stats['min_price'] or Decimal('0')
+        max_price = price_stats['max_price'] or Decimal('0')
+        
+        buckets = []
+        if price_stats['total'] and max_price > min_price:
+            step = (max_price - min_price) / SearchService.PRICE_BUCKET_COUNT
+            bounds = [min_price + step * i for i in range(SearchService.PRICE_BUCKET_COUNT)] + [max_price]
+            bucket_aggregates = {}
+            for i in range(SearchService.PRICE_BUCKET_COUNT):
+                # Son bucket üst sınırı dahil eder
+                upper = Q(price__lte=bounds[i + 1]) if i == SearchService.PRICE_BUCKET_COUNT - 1 else Q(price__lt=bounds[i + 1])
+                bucket_aggregates[f'bucket_{i}'] = Count('id', filter=Q(price__gte=bounds[i]) & upper)
+            bucket_counts = base.aggregate(**bucket_aggregates)
+            buckets = [
+                {
+                    'min': float(round(bounds[i], 2)),
+                    'max': float(round(bounds[i + 1], 2)),
+                    'count': bucket_counts[f'bucket_{i}'],
+                }
+                for i in range(SearchService.PRICE_BUCKET_COUNT)
+            ]
+        elif price_stats['total']:
+            buckets = [{'min': float(min_price), 'max': float(max_price), 'count': price_stats['total']}]
+        
+        return {
+            'price_range': {
+                'min': float(min_price),
+                'max': float(max_price),
+                'buckets': buckets,
+            },
+            'attributes': attribute_options,
+            'brands': brands,
+            'total': price_stats['total'],
+        }
+    
     @staticmethod
     def get_filter_options(tenant, category_id=None):
         """
-        Filtreleme seçeneklerini getir.
+        Filtreleme seçeneklerini getir (değer başına ürün sayılarıyla).
+        Sonuç tenant bazlı facet versiyonu ile cache'lenir; ürün, özellik eşleştirmesi
+        veya kategori değiştiğinde versiyon artırılır (bkz. apps/signals.py).
         
         Args:
             tenant: Tenant instance
@@ -220,6 +421,10 @@ class SearchService:
         Returns:
             dict: Filtre seçenekleri
         """
+        cached = CacheService.get_facets(tenant.id, category_id or 'all')
+        if cached is not None:
+            return cached
+        
         # Ürünleri al
         products = Product.objects.filter(
             tenant=tenant,
@@ -231,51 +436,6 @@ class SearchService:
         if category_id:
             products = products.filter(categories__id=category_id)
         
-        # Fiyat aralığı
-        price_stats = products.aggregate(
-            min_price=Min('price'),
-            max_price=Max('price'),
-        )
-        
-        # Filtrelenebilir özellikler
-        filterable_attributes = ProductAttribute.objects.filter(
-            tenant=tenant,
-            is_filterable=True,
-            is_deleted=False,
-        )
-        
-        attribute_options = {}
-        for attr in filterable_attributes:
-            # Bu attribute'a sahip ürünlerin value'larını al
-            mappings = ProductAttributeMapping.objects.filter(
-                product__in=products,
-                attribute=attr,
-            ).values_list('value_id', flat=True).distinct()
-            
-            values = ProductAttributeValue.objects.filter(
-                id__in=mappings,
-                attribute=attr,
-            ).order_by('position', 'value')
-            
-            if values.exists():
-                attribute_options[attr.slug] = {
-                    'name': attr.name,
-                    'values': [
-                        {
-                            'slug': v.slug,
-                            'value': v.value,
-                            'color_code': v.color_code,
-                            'image_url': v.image_url,
-                        }
-                        for v in values
-                    ],
-                }
-        
-        return {
-            'price_range': {
-                'min': float(price_stats['min_price'] or 0),
-                'max': float(price_stats['max_price'] or 0),
-            },
-            'attributes': attribute_options,
-        }
-
+        options = SearchService.compute_facets(tenant, products)
+        CacheService.set_facets(tenant.id, category_id or 'all', options)
+        return options
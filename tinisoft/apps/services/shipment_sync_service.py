@@ -0,0 +1,225 @@
+"""
+Shipment sync service - Kargo durumlarının arka planda toplu senkronizasyonu.
+
+Celery beat ile periyodik çalışır (bkz. apps.tasks.shipment_task):
+- Sadece teslim edilmemiş (terminal olmayan) gönderiler sorgulanır.
+- Yoklama aralığı gönderinin son değişikliğinden bu yana geçen süreye göre artar;
+  hiç sorgulanmamış ve yakın zamanda hareket görmüş gönderiler önce sorgulanır.
+- Kargo cevabı hash'lenir; cevap değişmemişse sadece cargo_checked_at güncellenir.
+- Değişen kargo alanları tek bulk_update ile yazılır. Sipariş durumu geçişleri kilitli,
+  güncel satır üzerinden OrderService.update_order_status ile yapılır (webhook, e-posta).
+"""
+import hashlib
+import json
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from apps.models import Order
+from apps.services.aras_cargo_service import ArasCargoService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ShipmentSyncService:
+    """Kargo durumu senkronizasyonu iş mantığı."""
+
+    BATCH_SIZE = 200  # Tenant başına bir çalıştırmada sorgulanan en fazla gönderi
+
+    # Sorgulanan (terminal olmayan) sipariş durumları
+    POLLED_STATUSES = [Order.OrderStatus.PROCESSING, Order.OrderStatus.SHIPPED]
+
+    # (son değişiklikten bu yana geçen süre üst sınırı, yoklama aralığı)
+    POLL_TIERS = [
+        (timedelta(days=2), timedelta(hours=1)),
+        (timedelta(days=7), timedelta(hours=4)),
+        (timedelta(days=14), timedelta(hours=12)),
+    ]
+    STALE_POLL_INTERVAL = timedelta(days=1)  # POLL_TIERS'tan eski gönderiler günde bir
+    MAX_SHIPMENT_AGE = timedelta(days=60)  # Bundan eski siparişler artık sorgulanmaz
+
+    # Teslim edildi durumu (config'de 'delivered_status_codes' ile kod bazlı da tanımlanabilir)
+    DELIVERED_KEYWORDS = ('TESLİM EDİLDİ', 'TESLIM EDILDI')
+
+    @staticmethod
+    def get_due_orders(tenant, now=None, limit=None):
+        """
+        Yoklama zamanı gelmiş gönderiler (öncelik sırasıyla).
+
+        Öncelik: hiç sorgulanmamışlar, sonra son değişikliği en yeni olanlar.
+        """
+        now = now or timezone.now()
+        queryset = Order.objects.filter(
+            tenant=tenant,
+            is_deleted=False,
+            status__in=ShipmentSyncService.POLLED_STATUSES,
+            created_at__gte=now - ShipmentSyncService.MAX_SHIPMENT_AGE,
+        ).exclude(tracking_number='').annotate(
+            last_change=Coalesce('cargo_status_changed_at', 'shipped_at', 'created_at'),
+        )
+
+        due = Q(cargo_checked_at__isnull=True)
+        newer_bound = None
+        for max_age, interval in ShipmentSyncService.POLL_TIERS:
+            tier = Q(last_change__gte=now - max_age)
+            if newer_bound is not None:
+                tier &= Q(last_change__lt=now - newer_bound)
+            due |= tier & Q(cargo_checked_at__lt=now - interval)
+            newer_bound = max_age
+        due |= Q(last_change__lt=now - newer_bound) & Q(
+            cargo_checked_at__lt=now - ShipmentSyncService.STALE_POLL_INTERVAL
+        )
+
+        return queryset.filter(due).order_by(
+            F('cargo_checked_at').asc(nulls_first=True), '-last_change'
+        )[:limit or ShipmentSyncService.BATCH_SIZE]
+
+    @staticmethod
+    def compute_hash(result):
+        """Kargo cevabının değişiklik tespiti için hash'i (sadece anlamlı alanlar)."""
+        payload = {
+            'status': result.get('status') or '',
+            'status_code': result.get('status_code') or '',
+            'tracking_number': result.get('tracking_number') or '',
+            'events': result.get('events') or [],
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def map_order_status(integration, result):
+        """
+        Kargo cevabından sipariş durumunu türet.
+
+        Returns:
+            str | None: Order.OrderStatus değeri (bilinmiyorsa None)
+        """
+        status_text = str(result.get('status') or '').upper()
+        status_code = str(result.get('status_code') or '').strip()
+        delivered_codes = [str(code) for code in (integration.config or {}).get('delivered_status_codes', [])]
+
+        if (status_code and status_code in delivered_codes) or any(
+            keyword in status_text for keyword in ShipmentSyncService.DELIVERED_KEYWORDS
+        ):
+            return Order.OrderStatus.DELIVERED
+        if status_text or status_code:
+            # Kargo gönderiyi sistemine almış
+            return Order.OrderStatus.SHIPPED
+        return None
+
+    @staticmethod
+    def sync_tenant(tenant, limit=None):
+        """
+        Tenant'ın yoklama zamanı gelmiş gönderilerini sorgula ve siparişleri güncelle.
+
+        Returns:
+            dict: {'checked', 'changed', 'unchanged', 'failed', 'transitions'}
+        """
+        stats = {'checked': 0, 'changed': 0, 'unchanged': 0, 'failed': 0, 'transitions': 0}
+        integration = ArasCargoService.get_integration(tenant)
+        if not integration:
+            return stats
+
+        now = timezone.now()
+        orders = list(ShipmentSyncService.get_due_orders(tenant, now=now, limit=limit))
+        if not orders:
+            return stats
+
+        response = ArasCargoService.track_shipments_bulk(tenant, orders, persist=False)
+        if not response.get('success'):
+            logger.warning(f"[SHIPMENT_SYNC] Tracking failed for tenant {tenant.slug}: {response.get('error')}")
+            return stats
+        results = response['results']
+        stats['checked'] = len(orders)
+
+        checked_ids = []  # Cevabı değişmeyen veya sorgusu başarısız olanlar
+        changed_orders = []
+        tracking_numbers = {}
+        transitions = []  # (order_id, yeni durum)
+        for order in orders:
+            result = results.get(str(order.id)) or {}
+            if not result.get('success'):
+                # Hatalı gönderi bir sonraki aralıkta tekrar denenir (sürekli sorgulanmaz)
+                stats['failed'] += 1
+                checked_ids.append(order.id)
+                continue
+
+            status_hash = ShipmentSyncService.compute_hash(result)
+            if status_hash == order.cargo_status_hash:
+                stats['unchanged'] += 1
+                checked_ids.append(order.id)
+                continue
+
+            order.cargo_status = str(result.get('status') or '')[:100]
+            order.cargo_status_code = str(result.get('status_code') or '')[:20]
+            order.cargo_status_hash = status_hash
+            order.cargo_status_changed_at = now
+            order.cargo_checked_at = now
+            order.updated_at = now
+            tracking_number = str(result.get('tracking_number') or '').strip()
+            if tracking_number and not order.tracking_number:
+                tracking_numbers[order.id] = tracking_number[:100]
+
+            new_status = ShipmentSyncService.map_order_status(integration, result)
+            if new_status and new_status != order.status:
+                # Durum sadece ileri gider (teslim edilmiş sipariş tekrar kargoya dönmez)
+                if new_status == Order.OrderStatus.DELIVERED or order.status == Order.OrderStatus.PROCESSING:
+                    transitions.append((order.id, new_status))
+            changed_orders.append(order)
+
+        stats['changed'] = len(changed_orders)
+
+        with transaction.atomic():
+            if checked_ids:
+                Order.objects.filter(id__in=checked_ids).update(cargo_checked_at=now)
+            if changed_orders:
+                # Sadece senkronizasyonun sahip olduğu kargo alanları yazılır; kargo sorgusu
+                # sürerken admin'in yaptığı durum değişiklikleri (iptal, iade) ezilmez
+                Order.objects.bulk_update(changed_orders, [
+                    'cargo_status', 'cargo_status_code', 'cargo_status_hash', 'cargo_status_changed_at',
+                    'cargo_checked_at', 'updated_at',
+                ], batch_size=500)
+            for order_id, tracking_number in tracking_numbers.items():
+                Order.objects.filter(id=order_id, tracking_number='').update(tracking_number=tracking_number)
+
+        # Her geçiş kendi transaction'ında: bir siparişin hatası diğerlerini geri almaz
+        for order_id, new_status in transitions:
+            try:
+                with transaction.atomic():
+                    if ShipmentSyncService._apply_transition(order_id, new_status, now):
+                        stats['transitions'] += 1
+            except Exception as e:
+                logger.error(f"[SHIPMENT_SYNC] Status transition failed for order {order_id}: {e}")
+
+        logger.info(
+            f"[SHIPMENT_SYNC] Tenant {tenant.slug}: {stats['checked']} checked, {stats['changed']} changed, "
+            f"{stats['unchanged']} unchanged, {stats['failed']} failed, {stats['transitions']} status transitions"
+        )
+        return stats
+
+    @staticmethod
+    def _apply_transition(order_id, new_status, now):
+        """
+        Sipariş durumunu kilitli, güncel satır üzerinden OrderService ile ilerlet
+        (müşteri istatistikleri, webhook ve bilgilendirme e-postası dahil).
+        Sipariş bu arada sorgulanan durumlardan çıktıysa (iptal, iade vb.) dokunulmaz.
+
+        Returns:
+            bool: Durum değiştirildi mi?
+        """
+        from apps.services.order_service import OrderService
+
+        order = Order.objects.select_for_update().filter(
+            id=order_id,
+            status__in=ShipmentSyncService.POLLED_STATUSES,
+        ).first()
+        if order is None or order.status == new_status:
+            return False
+        if new_status != Order.OrderStatus.DELIVERED and order.status != Order.OrderStatus.PROCESSING:
+            return False
+        if not order.shipped_at:
+            order.shipped_at = now
+        OrderService.update_order_status(order, new_status)
+        return True
@@ -0,0 +1,261 @@
+"""
+Tenant çözümleme cache'i - iki katmanlı (process içi LRU + Redis).
+
+Her istek host / slug / id ile tenant çözdüğü için bu yol ağ gidiş-dönüşü
+yapmamalı. Process içi LRU kısa TTL ile tutulur; Redis'te pickle'lanmış
+model yerine tenant'ın kolon değerlerinden oluşan kompakt bir tuple saklanır.
+
+Worker'lar arası invalidasyon: Redis'teki global versiyon key'i.
+Tenant/Domain değiştiğinde versiyon artırılır; her process versiyonu en fazla
+VERSION_CHECK_INTERVAL saniyede bir okur ve değiştiyse yerel LRU'yu boşaltır.
+"""
+import copy
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+_NOT_FOUND = object()
+
+
+class TenantCacheService:
+    """Tenant çözümleme (host / slug / subdomain / id) için katmanlı cache."""
+
+    CACHE_PREFIX = 'tenant:resolve'
+    VERSION_KEY = 'tenant:resolve:version'
+
+    LOCAL_MAX_ENTRIES = 1024
+    LOCAL_TTL = 30  # saniye
+    LOCAL_NOT_FOUND_TTL = 5  # Bulunamayan host/slug'lar (bot trafiği) için kısa negatif cache
+    VERSION_CHECK_INTERVAL = 2  # saniye - invalidasyonun diğer worker'lara ulaşma süresi
+    TIMEOUT_REDIS = 3600  # 1 saat
+
+    _local = OrderedDict()
+    _lock = threading.Lock()
+    _version = None
+    _version_checked_at = 0.0
+    _field_names = None
+    _schema_hash = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_by_host(host):
+        """
+        Host'a göre tenant'ı döndür (subdomain veya custom domain). Bulunamazsa None.
+        """
+        if not host:
+            return None
+        return TenantCacheService._resolve('host', host, TenantCacheService._load_by_host)
+
+    @staticmethod
+    def get(slug=None, id=None, subdomain=None):
+        """
+        Tenant.objects.get(..., is_deleted=False) karşılığı (cache'li).
+        ORM ile aynı şekilde bulunamazsa Tenant.DoesNotExist fırlatır.
+        """
+        from apps.models import Tenant
+
+        tenant = None
+        if id:
+            try:
+                tenant_id = str(uuid.UUID(str(id)))
+            except (ValueError, TypeError, AttributeError):
+                raise Tenant.DoesNotExist(f'Geçersiz tenant id: {id}')
+            tenant = TenantCacheService._resolve('id', tenant_id, TenantCacheService._load_by_id)
+        elif slug:
+            tenant = TenantCacheService._resolve('slug', slug, TenantCacheService._load_by_slug)
+        elif subdomain:
+            tenant = TenantCacheService._resolve('subdomain', subdomain, TenantCacheService._load_by_subdomain)
+
+        if tenant is None:
+            raise Tenant.DoesNotExist('Tenant matching query does not exist.')
+        return tenant
+
+    @staticmethod
+    def invalidate():
+        """
+        Tüm tenant çözümleme cache'ini geçersiz kıl (Tenant/Domain değişikliğinde).
+        Redis key'leri versiyon içerdiği için eski kayıtlar okunmaz, TTL ile düşer.
+        """
+        try:
+            version = cache.incr(TenantCacheService.VERSION_KEY)
+        except ValueError:
+            version = int(time.time() * 1000)
+            cache.set(TenantCacheService.VERSION_KEY, version, None)
+        except Exception as e:
+            logger.warning(f"[TENANT_CACHE] Version bump failed: {e}")
+            version = None
+
+        with TenantCacheService._lock:
+            TenantCacheService._local.clear()
+            TenantCacheService._version = version
+            TenantCacheService._version_checked_at = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Katmanlar
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _resolve(kind, value, loader):
+        """Yerel LRU -> Redis -> DB sırasıyla tenant'ı çöz."""
+        version = TenantCacheService._current_version()
+        local_key = (kind, value)
+
+        record = TenantCacheService._local_get(local_key, version)
+        if record is _NOT_FOUND:
+            return None
+        if record is not None:
+            return TenantCacheService._to_tenant(record)
+
+        redis_key = TenantCacheService._redis_key(version, kind, value)
+        try:
+            record = cache.get(redis_key)
+        except Exception as e:
+            logger.warning(f"[TENANT_CACHE] Redis read failed: {e}")
+            record = None
+
+        if record is None:
+            tenant = loader(value)
+            if tenant is None:
+                TenantCacheService._local_set(local_key, _NOT_FOUND, version, TenantCacheService.LOCAL_NOT_FOUND_TTL)
+                return None
+            record = TenantCacheService._to_record(tenant)
+            try:
+                cache.set(redis_key, record, TenantCacheService.TIMEOUT_REDIS)
+            except Exception as e:
+                logger.warning(f"[TENANT_CACHE] Redis write failed: {e}")
+
+        TenantCacheService._local_set(local_key, record, version, TenantCacheService.LOCAL_TTL)
+        return TenantCacheService._to_tenant(record)
+
+    @staticmethod
+    def _current_version():
+        """Global versiyonu döndür (Redis'e en fazla VERSION_CHECK_INTERVAL'da bir gidilir)."""
+        now = time.monotonic()
+        if (
+            TenantCacheService._version is not None
+            and now - TenantCacheService._version_checked_at < TenantCacheService.VERSION_CHECK_INTERVAL
+        ):
+            return TenantCacheService._version
+
+        try:
+            version = cache.get(TenantCacheService.VERSION_KEY)
+            if version is None:
+                cache.add(TenantCacheService.VERSION_KEY, int(time.time() * 1000), None)
+                version = cache.get(TenantCacheService.VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"[TENANT_CACHE] Version read failed: {e}")
+            version = TenantCacheService._version
+
+        with TenantCacheService._lock:
+            if version != TenantCacheService._version:
+                TenantCacheService._local.clear()
+                TenantCacheService._version = version
+            TenantCacheService._version_checked_at = now
+        return version
+
+    @staticmethod
+    def _local_get(local_key, version):
+        with TenantCacheService._lock:
+            entry = TenantCacheService._local.get(local_key)
+            if entry is None:
+                return None
+            expires_at, entry_version, record = entry
+            if entry_version != version or expires_at < time.monotonic():
+                del TenantCacheService._local[local_key]
+                return None
+            TenantCacheService._local.move_to_end(local_key)
+            return record
+
+    @staticmethod
+    def _local_set(local_key, record, version, ttl):
+        with TenantCacheService._lock:
+            TenantCacheService._local[local_key] = (time.monotonic() + ttl, version, record)
+            TenantCacheService._local.move_to_end(local_key)
+            while len(TenantCacheService._local) > TenantCacheService.LOCAL_MAX_ENTRIES:
+                TenantCacheService._local.popitem(last=False)
+
+    @staticmethod
+    def _redis_key(version, kind, value):
+        # Şema hash'i: Tenant'a kolon eklendiğinde eski tuple'lar yanlış eşleşmesin
+        TenantCacheService._get_field_names()
+        return f"{TenantCacheService.CACHE_PREFIX}:{version}:{TenantCacheService._schema_hash}:{kind}:{value}"
+
+    # ------------------------------------------------------------------
+    # Kayıt <-> model
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _get_field_names():
+        if TenantCacheService._field_names is None:
+            from apps.models import Tenant
+            field_names = tuple(field.attname for field in Tenant._meta.concrete_fields)
+            TenantCacheService._schema_hash = hashlib.md5(','.join(field_names).encode('utf-8')).hexdigest()[:8]
+            TenantCacheService._field_names = field_names
+        return TenantCacheService._field_names
+
+    @staticmethod
+    def _to_record(tenant):
+        """Tenant instance'ını kolon değerlerinden oluşan immutable tuple'a çevir."""
+        return tuple(getattr(tenant, name) for name in TenantCacheService._get_field_names())
+
+    @staticmethod
+    def _to_tenant(record):
+        """
+        Kayıttan sorgusuz Tenant instance'ı oluştur (Model.from_db).
+        Her çağrı yeni instance döndürür; JSON alanları kopyalanır ki
+        bir isteğin değişikliği cache'teki kayda sızmasın.
+        """
+        from apps.models import Tenant
+        values = [
+            copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+            for value in record
+        ]
+        return Tenant.from_db(DEFAULT_DB_ALIAS, TenantCacheService._get_field_names(), values)
+
+    # ------------------------------------------------------------------
+    # DB loader'ları
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _load_by_host(host):
+        from apps.models import Tenant, Domain
+
+        # Subdomain kontrolü (tinisoft ana domain'i için) - örn: ates.tinisoft.com.tr -> ates
+        if '.tinisoft.com.tr' in host:
+            tenant = Tenant.objects.filter(subdomain=host.split('.')[0], is_deleted=False).first()
+            if tenant:
+                return tenant
+
+        # Custom domain kontrolü
+        domain = Domain.objects.filter(
+            domain_name=host, is_deleted=False
+        ).select_related('tenant').first()
+        if domain and not domain.tenant.is_deleted:
+            return domain.tenant
+        return None
+
+    @staticmethod
+    def _load_by_id(tenant_id):
+        from apps.models import Tenant
+        return Tenant.objects.filter(id=tenant_id, is_deleted=False).first()
+
+    @staticmethod
+    def _load_by_slug(slug):
+        from apps.models import Tenant
+        return Tenant.objects.filter(slug=slug, is_deleted=False).first()
+
+    @staticmethod
+    def _load_by_subdomain(subdomain):
+        from apps.models import Tenant
+        return Tenant.objects.filter(subdomain=subdomain, is_deleted=False).first()
@@ -5,6 +5,7 @@ Klasör yapısı: themes/{domain}/images/, themes/{domain}/videos/
 """
 
 import boto3
+import hashlib
 import os
 from django.conf import settings
 from uuid import uuid4
@@ -64,9 +65,9 @@ class ThemeMediaService:
                 'type': 'image/jpeg'
             }
         """
-        # Dosya adı
+        # Dosya adı - özel ad yoksa içerik hash'i (aynı görsel tekrar yüklenmez)
         ext = os.path.splitext(file.name)[1].lower()
-        filename = custom_filename if custom_filename else f"{uuid4()}{ext}"
+        filename = custom_filename if custom_filename else f"{self._content_hash(file)}{ext}"
         
         # S3 path
         s3_path = f"themes/{tenant_domain}/images/{filename}"
@@ -76,16 +77,17 @@ class ThemeMediaService:
         
         # Upload
         try:
-            self.s3_client.upload_fileobj(
-                file,
-                self.bucket_name,
-                s3_path,
-                ExtraArgs={
-                    'ContentType': content_type,
-                    'ACL': 'public-read',  # Public access
-                    'CacheControl': 'max-age=31536000'  # 1 yıl cache
-                }
-            )
+            if custom_filename or not self._exists(s3_path):
+                self.s3_client.upload_fileobj(
+                    file,
+                    self.bucket_name,
+                    s3_path,
+                    ExtraArgs={
+                        'ContentType': content_type,
+                        'ACL': 'public-read',  # Public access
+                        'CacheControl': 'max-age=31536000'  # 1 yıl cache
+                    }
+                )
             
             # Public URL
             url = f"{self.public_url}/{s3_path}"
@@ -101,6 +103,23 @@ class ThemeMediaService:
         except Exception as e:
             raise Exception(f"Upload failed: {str(e)}")
     
+    @staticmethod
+    def _content_hash(file):
+        """Dosya içeriğinin SHA-256 hash'i (dosya imleci başa alınır)."""
+        digest = hashlib.sha256()
+        for chunk in file.chunks():
+            digest.update(chunk)
+        file.seek(0)
+        return digest.hexdigest()
+    
+    def _exists(self, s3_path):
+        """Aynı içerikli dosya daha önce yüklenmiş mi?"""
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_path)
+            return True
+        except Exception:
+            return False
+    
     def upload_video(self, file, tenant_domain, custom_filename=None):
         """
         Video yükle
@@ -0,0 +1,171 @@
+"""
+VAT repricing service - KDV dahil fiyatların küme bazlı (set-based) güncellenmesi.
+
+Tax değişikliğinde ürün ve varyantların price_with_vat alanı satır satır değil,
+tek bir UPDATE ... SET price_with_vat = ROUND(price * çarpan, 2) ile güncellenir.
+Büyük tenant'larda kilit süresini kısa tutmak için UPDATE'ler primary key
+aralıklarına bölünür; zaten doğru olan satırlar yazılmaz.
+
+Art arda Tax kayıtları (örn. admin'de birkaç vergi düzenlemesi) tek çalıştırmada
+birleştirilir: vergi versiyonu her kayıtta artırılır, bekleyen bir çalıştırma varsa
+yeni task kuyruğa eklenmez. Task, uygulanmış versiyonu saklar ve aynı versiyon için
+tekrar çalışmaz.
+"""
+from decimal import Decimal
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DecimalField, F, Value
+from django.db.models.functions import Round
+from apps.services.cache_service import CacheService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class VatRepricingService:
+    """KDV dahil fiyat güncelleme iş mantığı."""
+
+    CACHE_PREFIX = 'vat_reprice'
+    COALESCE_DELAY = 10  # saniye - bu süre içindeki Tax kayıtları tek çalıştırmada birleşir
+    PENDING_TIMEOUT = 600  # Worker task'ı hiç almazsa bekleyen işaret 10 dakikada düşer
+    CHUNK_SIZE = 5000  # Tek UPDATE'te güncellenecek en fazla satır
+
+    @staticmethod
+    def get_multiplier(tax_rate):
+        """KDV çarpanı: 1 + oran / 100 (oran yoksa veya 0 ise 1)."""
+        if tax_rate and tax_rate > 0:
+            return Decimal('1') + (Decimal(tax_rate) / Decimal('100'))
+        return Decimal('1')
+
+    @staticmethod
+    def get_active_tax(tenant_id):
+        """Tenant'ın aktif ve varsayılan Tax'ı (cache'siz - repricing kesin değeri kullanır)."""
+        from apps.models import Tax
+        return Tax.objects.filter(
+            tenant_id=tenant_id,
+            is_active=True,
+            is_deleted=False
+        ).order_by('-is_default', '-created_at').first()
+
+    # ------------------------------------------------------------------
+    # Planlama (coalescing)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _pending_key(tenant_id):
+        return CacheService.get_cache_key(VatRepricingService.CACHE_PREFIX, tenant_id, 'pending')
+
+    @staticmethod
+    def _applied_key(tenant_id):
+        return CacheService.get_cache_key(VatRepricingService.CACHE_PREFIX, tenant_id, 'applied')
+
+    @staticmethod
+    def schedule(tenant_id):
+        """
+        Tax değişikliği sonrası repricing planla.
+        Vergi versiyonunu artırır; transaction commit'inden sonra bekleyen çalıştırma yoksa
+        COALESCE_DELAY gecikmeli task kuyruğa eklenir. Bekleyen işareti de commit sonrası
+        konur: rollback olan transaction sonraki Tax kayıtlarının planlanmasını engellemez.
+        """
+        tenant_id = str(tenant_id)
+        try:
+            CacheService.bump_tenant_version(VatRepricingService.CACHE_PREFIX, tenant_id)
+        except Exception as e:
+            logger.warning(f"[VAT_REPRICE] Version bump failed for tenant {tenant_id}: {e}")
+        transaction.on_commit(lambda: VatRepricingService._enqueue(tenant_id))
+
+    @staticmethod
+    def _enqueue(tenant_id):
+        """Bekleyen çalıştırma yoksa repricing task'ını kuyruğa ekle (commit sonrası)."""
+        from apps.tasks.product_task import update_all_products_price_with_vat
+
+        try:
+            scheduled = cache.add(
+                VatRepricingService._pending_key(tenant_id), 1, VatRepricingService.PENDING_TIMEOUT
+            )
+        except Exception as e:
+            # Cache erişilemezse coalescing olmadan çalıştır
+            logger.warning(f"[VAT_REPRICE] Coalescing unavailable for tenant {tenant_id}: {e}")
+            scheduled = True
+
+        if scheduled:
+            update_all_products_price_with_vat.apply_async(
+                args=[tenant_id], countdown=VatRepricingService.COALESCE_DELAY
+            )
+
+    @staticmethod
+    def begin_run(tenant_id):
+        """
+        Task başında çağrılır: bekleyen işareti kaldırır (bundan sonraki Tax kayıtları yeni
+        çalıştırma planlar) ve çalıştırılacak versiyonu döndürür.
+        Versiyon zaten uygulanmışsa None döner.
+        """
+        cache.delete(VatRepricingService._pending_key(tenant_id))
+        version = CacheService.get_tenant_version(VatRepricingService.CACHE_PREFIX, tenant_id)
+        if cache.get(VatRepricingService._applied_key(tenant_id)) == version:
+            return None
+        return version
+
+    @staticmethod
+    def mark_applied(tenant_id, version):
+        cache.set(VatRepricingService._applied_key(tenant_id), version, None)
+
+    # ------------------------------------------------------------------
+    # Repricing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def reprice_tenant(tenant_id, tax_rate, chunk_size=None):
+        """
+        Tenant'ın tüm ürün ve varyantlarının price_with_vat alanını küme bazlı güncelle.
+
+        Returns:
+            tuple: (güncellenen ürün sayısı, güncellenen varyant sayısı)
+        """
+        from apps.models import Product, ProductVariant
+
+        multiplier = VatRepricingService.get_multiplier(tax_rate)
+        chunk_size = chunk_size or VatRepricingService.CHUNK_SIZE
+
+        updated_products = VatRepricingService._reprice_queryset(
+            Product.objects.filter(tenant_id=tenant_id, is_deleted=False),
+            multiplier, chunk_size
+        )
+        updated_variants = VatRepricingService._reprice_queryset(
+            ProductVariant.objects.filter(product__tenant_id=tenant_id, is_deleted=False),
+            multiplier, chunk_size
+        )
+
+        if updated_products or updated_variants:
+            # update() signal tetiklemez; listelenen KDV dahil fiyatlar değişti
+            CacheService.invalidate_storefront(tenant_id)
+        return updated_products, updated_variants
+
+    @staticmethod
+    def _reprice_queryset(queryset, multiplier, chunk_size):
+        """
+        price_with_vat = ROUND(price * multiplier, 2) - primary key aralıkları halinde.
+        Her aralık tek UPDATE'tir; değeri zaten doğru olan satırlar dışarıda bırakılır.
+        """
+        if multiplier == Decimal('1'):
+            new_value = F('price')
+        else:
+            new_value = Round(
+                F('price') * Value(multiplier, output_field=DecimalField()),
+                2,
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            )
+
+        updated_count = 0
+        last_pk = None
+        while True:
+            remaining = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            # Aralığın üst sınırı: kalan satırların chunk_size'ıncı pk'sı (yoksa son aralık)
+            upper_bound = list(
+                remaining.order_by('pk').values_list('pk', flat=True)[chunk_size - 1:chunk_size]
+            )
+            window = remaining.filter(pk__lte=upper_bound[0]) if upper_bound else remaining
+            updated_count += window.exclude(price_with_vat=new_value).update(price_with_vat=new_value)
+            if not upper_bound:
+                return updated_count
+            last_pk = upper_bound[0]
@@ -0,0 +1,363 @@
+"""
+Webhook service - Domain event'lerinin webhook'lara asenkron teslimi.
+
+Akış:
+- Servisler / signal'ler dispatch() ile event üretir. Tenant'ta bu event'e abone aktif
+  webhook yoksa (cache'li kontrol) hiçbir şey yapılmaz.
+- Event'ler transaction commit'inden sonra Celery'ye verilir (geri alınan işlem event üretmez).
+  dispatch_many() ile birlikte üretilen event'ler tek task'ta taşınır.
+- Teslim webhook başına ayrı task'ta yapılır: process başına tek, keep-alive'lı
+  connection pool'lu HTTP session; endpoint başına eşzamanlılık limiti; başarısız
+  event'ler exponential backoff ile tekrar denenir; batch_delivery açık webhook'lara
+  birden fazla event tek POST ile gönderilir.
+- WebhookEvent log'u bulk_create ile, sayaçlar F() ile atomik güncellenir.
+"""
+import hashlib
+import hmac
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from apps.services.cache_service import CacheService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def generate_webhook_signature(secret_key, body):
+    """Webhook signature oluştur (HMAC-SHA256, gönderilen body üzerinden)."""
+    if not isinstance(body, (bytes, str)):
+        body = WebhookService.encode_body(body)
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hmac.new(secret_key.encode('utf-8'), body, hashlib.sha256).hexdigest()
+
+
+class WebhookService:
+    """Webhook event dispatch ve teslim iş mantığı."""
+
+    # Event tipleri
+    EVENT_ORDER_CREATED = 'order.created'
+    EVENT_ORDER_STATUS_CHANGED = 'order.status_changed'
+    EVENT_ORDER_PAYMENT_STATUS_CHANGED = 'order.payment_status_changed'
+    EVENT_PRODUCT_CREATED = 'product.created'
+    EVENT_PRODUCT_UPDATED = 'product.updated'
+    EVENT_PRODUCT_DELETED = 'product.deleted'
+    EVENT_INVENTORY_CHANGED = 'inventory.changed'
+
+    CACHE_PREFIX_SUBSCRIPTIONS = 'webhook_subs'
+    CACHE_PREFIX_SLOTS = 'webhook_slots'
+    TIMEOUT_SUBSCRIPTIONS = 3600  # Webhook değişikliğinde signal ile silinir
+
+    # Teslim ayarları
+    CONNECT_TIMEOUT = 3  # saniye
+    READ_TIMEOUT = 10  # saniye
+    POOL_CONNECTIONS = 20  # Pool'da tutulacak farklı host sayısı
+    POOL_MAXSIZE = 10  # Host başına açık bağlantı
+    MAX_CONCURRENCY_PER_ENDPOINT = 2  # Bir webhook'a aynı anda en fazla kaç teslim task'ı
+    SLOT_TIMEOUT = 120  # Çöken worker'ın tuttuğu slot en fazla bu kadar kilitli kalır
+    BUSY_RETRY_DELAY = 3  # Slot yoksa task bu kadar saniye sonra tekrar kuyruğa alınır
+    MAX_ATTEMPTS = 6  # İlk deneme + 5 tekrar
+    BACKOFF_BASE = 30  # saniye - 30, 60, 120, 240, 480
+    BATCH_SIZE = 50  # batch_delivery açıkken tek POST'taki en fazla event
+
+    _session = None
+    _session_pid = None
+    _session_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def dispatch(tenant_id, event_type, data):
+        """Tek bir domain event'i üret (commit sonrası teslim edilir)."""
+        WebhookService.dispatch_many(tenant_id, [(event_type, data)])
+
+    @staticmethod
+    def dispatch_many(tenant_id, events):
+        """
+        Birlikte oluşan event'leri üret; hepsi tek task ile teslim sürecine girer.
+
+        Args:
+            tenant_id: Tenant ID
+            events: [(event_type, data), ...]
+        """
+        if not tenant_id or not events:
+            return
+        try:
+            subscriptions = WebhookService.get_subscriptions(tenant_id)
+            envelopes = [
+                WebhookService.build_event(event_type, data)
+                for event_type, data in events
+                if WebhookService.matches(subscriptions, event_type)
+            ]
+        except Exception as e:
+            # Webhook altyapısındaki hata asıl işlemi bozmamalı
+            logger.error(f"[WEBHOOK] Dispatch error for tenant {tenant_id}: {e}")
+            return
+        if not envelopes:
+            return
+
+        from apps.tasks.webhook_task import dispatch_webhook_events_task
+        tenant_id = str(tenant_id)
+        transaction.on_commit(lambda: dispatch_webhook_events_task.delay(tenant_id, envelopes))
+
+    @staticmethod
+    def build_event(event_type, data):
+        """Event zarfı (JSON serializable)."""
+        return json.loads(json.dumps({
+            'id': str(uuid.uuid4()),
+            'type': event_type,
+            'created_at': timezone.now().isoformat(),
+            'data': data,
+        }, cls=DjangoJSONEncoder))
+
+    @staticmethod
+    def matches(subscriptions, event_type):
+        """Event tipi aboneliklerden biriyle eşleşiyor mu? ('*' ve 'order.*' desteklenir)"""
+        if not subscriptions:
+            return False
+        return (
+            '*' in subscriptions
+            or event_type in subscriptions
+            or f"{event_type.split('.')[0]}.*" in subscriptions
+        )
+
+    @staticmethod
+    def get_subscriptions(tenant_id):
+        """Tenant'ın aktif webhook'larının dinlediği event tipleri (cache'li)."""
+        from apps.models import Webhook
+
+        cache_key = CacheService.get_cache_key(WebhookService.CACHE_PREFIX_SUBSCRIPTIONS, tenant_id)
+        subscriptions = cache.get(cache_key)
+        if subscriptions is None:
+            subscriptions = set()
+            for events in Webhook.objects.filter(
+                tenant_id=tenant_id,
+                status=Webhook.WebhookStatus.ACTIVE,
+                is_deleted=False,
+            ).values_list('events', flat=True):
+                subscriptions.update(event for event in (events or []) if isinstance(event, str))
+            subscriptions = frozenset(subscriptions)
+            cache.set(cache_key, subscriptions, WebhookService.TIMEOUT_SUBSCRIPTIONS)
+        return subscriptions
+
+    @staticmethod
+    def invalidate_subscriptions(tenant_id):
+        cache.delete(CacheService.get_cache_key(WebhookService.CACHE_PREFIX_SUBSCRIPTIONS, tenant_id))
+
+    # ------------------------------------------------------------------
+    # Event payload'ları
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def order_payload(order, **extra):
+        payload = {
+            'id': str(order.id),
+            'order_number': order.order_number,
+            'status': order.status,
+            'payment_status': order.payment_status,
+            'payment_method': order.payment_method,
+            'currency': order.currency,
+            'subtotal': str(order.subtotal),
+            'shipping_cost': str(order.shipping_cost),
+            'tax_amount': str(order.tax_amount),
+            'discount_amount': str(order.discount_amount),
+            'total': str(order.total),
+            'customer_email': order.customer_email,
+            'created_at': order.created_at.isoformat() if order.created_at else None,
+        }
+        payload.update(extra)
+        return payload
+
+    @staticmethod
+    def product_payload(product):
+        return {
+            'id': str(product.id),
+            'name': product.name,
+            'slug': product.slug,
+            'sku': product.sku,
+            'status': product.status,
+            'is_visible': product.is_visible,
+            'price': str(product.price),
+            'currency': product.currency,
+            'inventory_quantity': product.inventory_quantity,
+        }
+
+    @staticmethod
+    def inventory_payload(product_id, variant_id, previous_quantity, new_quantity, reason=''):
+        return {
+            'product_id': str(product_id) if product_id else None,
+            'variant_id': str(variant_id) if variant_id else None,
+            'previous_quantity': previous_quantity,
+            'new_quantity': new_quantity,
+            'reason': reason,
+        }
+
+    # ------------------------------------------------------------------
+    # HTTP teslim
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_session():
+        """
+        Process başına tek requests.Session (keep-alive + connection pool).
+        Celery prefork child'ları parent'ın soketlerini paylaşmasın diye pid kontrol edilir.
+        """
+        pid = os.getpid()
+        if WebhookService._session is None or WebhookService._session_pid != pid:
+            with WebhookService._session_lock:
+                if WebhookService._session is None or WebhookService._session_pid != pid:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=WebhookService.POOL_CONNECTIONS,
+                        pool_maxsize=WebhookService.POOL_MAXSIZE,
+                        max_retries=0,  # Tekrar denemeler task seviyesinde (backoff ile)
+                    )
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    WebhookService._session = session
+                    WebhookService._session_pid = pid
+        return WebhookService._session
+
+    @staticmethod
+    def encode_body(body):
+        """İmzalanan ve gönderilen body aynı byte'lar olsun diye tek yerde serialize edilir."""
+        return json.dumps(body, sort_keys=True, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8')
+
+    @staticmethod
+    def send(webhook, event_type, body):
+        """
+        Webhook URL'ine tek POST gönder.
+
+        Returns:
+            dict: request_headers, request_body, response_status, response_body,
+                  response_time_ms, is_success, error_message
+        """
+        import requests
+
+        raw_body = WebhookService.encode_body(body)
+        headers = {
+            'Content-Type': 'application/json',
+            'X-Webhook-Signature': generate_webhook_signature(webhook.secret_key, raw_body),
+            'X-Webhook-Event': event_type,
+        }
+        result = {
+            'request_headers': headers,
+            'request_body': raw_body.decode('utf-8'),
+            'response_status': None,
+            'response_body': '',
+            'response_time_ms': None,
+            'is_success': False,
+            'error_message': '',
+        }
+
+        start_time = time.time()
+        try:
+            response = WebhookService.get_session().post(
+                webhook.url,
+                data=raw_body,
+                headers=headers,
+                timeout=(WebhookService.CONNECT_TIMEOUT, WebhookService.READ_TIMEOUT),
+            )
+            result['response_status'] = response.status_code
+            result['response_body'] = response.text[:1000]  # İlk 1000 karakter
+            result['is_success'] = 200 <= response.status_code < 300
+        except requests.exceptions.RequestException as e:
+            result['error_message'] = str(e)
+        result['response_time_ms'] = int((time.time() - start_time) * 1000)
+        return result
+
+    @staticmethod
+    def deliver(webhook, events, attempt=0):
+        """
+        Event'leri webhook'a gönder, log'ları tek bulk_create ile yaz, sayaçları F() ile güncelle.
+
+        Returns:
+            list: Başarısız event'ler (tekrar denenecek)
+        """
+        from apps.models import Webhook, WebhookEvent
+
+        if webhook.batch_delivery and len(events) > 1:
+            requests_to_send = [
+                ('batch', {'events': events[start:start + WebhookService.BATCH_SIZE]}, events[start:start + WebhookService.BATCH_SIZE])
+                for start in range(0, len(events), WebhookService.BATCH_SIZE)
+            ]
+        else:
+            requests_to_send = [(event['type'], event, [event]) for event in events]
+
+        logs = []
+        failed_events = []
+        for event_type, body, request_events in requests_to_send:
+            result = WebhookService.send(webhook, event_type, body)
+            if not result['is_success']:
+                failed_events.extend(request_events)
+            for event in request_events:
+                logs.append(WebhookEvent(
+                    webhook=webhook,
+                    event_type=event['type'],
+                    payload=event,
+                    request_url=webhook.url,
+                    request_method='POST',
+                    retry_count=attempt,
+                    **result
+                ))
+
+        WebhookEvent.objects.bulk_create(logs)
+        success_count = len(events) - len(failed_events)
+        Webhook.objects.filter(id=webhook.id).update(
+            success_count=F('success_count') + success_count,
+            failure_count=F('failure_count') + len(failed_events),
+            last_triggered_at=timezone.now(),
+        )
+        return failed_events
+
+    @staticmethod
+    def get_retry_delay(attempt):
+        """Exponential backoff (+%10 jitter - aynı anda düşen endpoint'e yük bindirmemek için)."""
+        delay = WebhookService.BACKOFF_BASE * (2 ** attempt)
+        return int(delay + random.uniform(0, delay * 0.1))
+
+    # ------------------------------------------------------------------
+    # Endpoint başına eşzamanlılık limiti (cache sayacı ile semafor)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def acquire_slot(webhook_id):
+        """Webhook için teslim slotu al. Limit doluysa False."""
+        cache_key = CacheService.get_cache_key(WebhookService.CACHE_PREFIX_SLOTS, webhook_id)
+        try:
+            cache.add(cache_key, 0, WebhookService.SLOT_TIMEOUT)
+            try:
+                current = cache.incr(cache_key)
+            except ValueError:
+                cache.set(cache_key, 1, WebhookService.SLOT_TIMEOUT)
+                current = 1
+            if current > WebhookService.MAX_CONCURRENCY_PER_ENDPOINT:
+                WebhookService.release_slot(webhook_id)
+                return False
+        except Exception as e:
+            # Cache yoksa limit uygulanamaz, teslim engellenmez
+            logger.warning(f"[WEBHOOK] Concurrency slot unavailable for {webhook_id}: {e}")
+        return True
+
+    @staticmethod
+    def release_slot(webhook_id):
+        cache_key = CacheService.get_cache_key(WebhookService.CACHE_PREFIX_SLOTS, webhook_id)
+        try:
+            cache.decr(cache_key)
+        except ValueError:
+            pass  # Slot key'i zaman aşımıyla düşmüş
+        except Exception as e:
+            logger.warning(f"[WEBHOOK] Concurrency slot release failed for {webhook_id}: {e}")
@@ -1,15 +1,222 @@
 """
 Signals for the apps module.
 """
-from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from apps.models import User
+from apps.models import (
+    User, Tenant, Domain, Product, Category, Brand, ProductImage, ProductVariant,
+    ProductAttribute, ProductAttributeValue, ProductAttributeMapping, Tax, Webhook,
+    InventoryMovement, Order
+)
 from apps.services.cache_service import CacheService
+from apps.services.tenant_cache_service import TenantCacheService
+from apps.services.principal_cache_service import PrincipalCacheService
+from apps.services.cart_totals_service import CartTotalsService
+from apps.services.product_listing_service import ProductListingService
+from apps.services.image_processing_service import ImageProcessingService
+from apps.services.webhook_service import WebhookService
+
+# Sadece bu alanları güncelleyen kayıtlar (örn. görüntüleme sayacı) cache'leri geçersiz kılmaz
+COUNTER_ONLY_FIELDS = frozenset({'view_count', 'sale_count', 'updated_at', 'search_vector'})
+
+
+def _is_counter_only_update(kwargs):
+    """save(update_fields=[...]) sadece sayaç alanlarını mı güncelliyor?"""
+    update_fields = kwargs.get('update_fields')
+    return bool(update_fields) and set(update_fields) <= COUNTER_ONLY_FIELDS
+
 
 @receiver([post_save, post_delete], sender=User)
 def clear_user_cache(sender, instance, **kwargs):
     """
-    Kullanıcı güncellendiğinde veya silindiğinde yetki cache'ini temizle.
+    Kullanıcı güncellendiğinde veya silindiğinde yetki ve principal (JWT) cache'ini temizle.
+    Sadece login zamanı güncellenen kayıtlar principal'ı değiştirmez.
+    """
+    if not instance.id:
+        return
+    CacheService.delete_user_permissions(instance.id)
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= PrincipalCacheService.IGNORED_UPDATE_FIELDS:
+        return
+    PrincipalCacheService.invalidate(instance.id)
+    # Silinen / pasifleştirilen kullanıcının gömülü claim'li token'ları da geçersiz
+    if kwargs.get('signal') is post_delete or not instance.is_active:
+        PrincipalCacheService.revoke_user_tokens(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=ProductAttribute)
+def invalidate_facets_for_tenant_model(sender, instance, **kwargs):
+    """
+    Ürün, kategori veya özellik değiştiğinde tenant'ın facet cache'ini geçersiz kıl.
+    """
+    if _is_counter_only_update(kwargs):
+        return
+    if instance.tenant_id:
+        CacheService.invalidate_facets(instance.tenant_id)
+
+
+@receiver([post_save, post_delete], sender=ProductAttributeValue)
+@receiver([post_save, post_delete], sender=ProductAttributeMapping)
+def invalidate_facets_for_attribute_model(sender, instance, **kwargs):
+    """
+    Özellik değeri veya ürün-özellik eşleştirmesi değiştiğinde facet cache'ini geçersiz kıl.
+    """
+    tenant_id = ProductAttribute.objects.filter(
+        id=instance.attribute_id
+    ).values_list('tenant_id', flat=True).first()
+    if tenant_id:
+        CacheService.invalidate_facets(tenant_id)
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def invalidate_facets_for_product_categories(sender, instance, action, **kwargs):
+    """
+    Ürün-kategori ilişkisi değiştiğinde facet, kategori ağacı ve public response cache'ini geçersiz kıl.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        CacheService.invalidate_facets(instance.tenant_id)
+        CacheService.delete_category_tree(instance.tenant_id)
+        CacheService.invalidate_storefront(instance.tenant_id)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_tree_for_tenant_model(sender, instance, **kwargs):
+    """
+    Kategori değiştiğinde veya ürün değiştiğinde (ürün sayıları) kategori ağacı cache'ini geçersiz kıl.
+    """
+    if _is_counter_only_update(kwargs):
+        return
+    if instance.tenant_id:
+        CacheService.delete_category_tree(instance.tenant_id)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Brand)
+def invalidate_storefront_for_tenant_model(sender, instance, **kwargs):
+    """
+    Ürün, kategori veya marka değiştiğinde tenant'ın public response cache'ini geçersiz kıl.
+    """
+    if _is_counter_only_update(kwargs):
+        return
+    if instance.tenant_id:
+        CacheService.invalidate_storefront(instance.tenant_id)
+
+
+@receiver([post_save, post_delete], sender=ProductVariant)
+@receiver([post_save, post_delete], sender=ProductImage)
+def invalidate_storefront_for_product_child(sender, instance, **kwargs):
+    """
+    Varyant veya görsel değiştiğinde ürünün tenant'ının public response cache'ini geçersiz kıl.
+    """
+    tenant_id = Product.objects.filter(
+        id=instance.product_id
+    ).values_list('tenant_id', flat=True).first()
+    if tenant_id:
+        CacheService.invalidate_storefront(tenant_id)
+
+
+@receiver(post_save, sender=Product)
+def refresh_listing_for_product(sender, instance, **kwargs):
+    """
+    Ürünün kendi fiyat / stok alanları değiştiğinde listing alanlarını commit sonrası yenile.
+    """
+    if _is_counter_only_update(kwargs):
+        return
+    ProductListingService.schedule_refresh([instance.id])
+
+
+@receiver([post_save, post_delete], sender=ProductVariant)
+@receiver([post_save, post_delete], sender=ProductImage)
+@receiver(post_save, sender=InventoryMovement)
+def refresh_listing_for_product_child(sender, instance, **kwargs):
     """
-    if instance.id:
-        CacheService.delete_user_permissions(instance.id)
+    Varyant, görsel veya stok hareketi değiştiğinde ürünün listing alanlarını commit sonrası yenile.
+    """
+    ProductListingService.schedule_refresh([instance.product_id])
+
+
+@receiver(post_save, sender=ProductImage)
+def process_new_product_image(sender, instance, created, **kwargs):
+    """
+    Yeni görselin boyut varyantlarını commit sonrası üret (hazır varyant kopyalanmadıysa).
+    """
+    if created:
+        ImageProcessingService.schedule_processing([instance])
+
+
+@receiver(post_save, sender=Tenant)
+def invalidate_storefront_for_tenant(sender, instance, **kwargs):
+    """
+    Tenant ayarları (para birimi, karşılaştırma fiyatı gösterimi vb.) değiştiğinde cache'i geçersiz kıl.
+    """
+    CacheService.invalidate_storefront(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Tenant)
+@receiver([post_save, post_delete], sender=Domain)
+def invalidate_tenant_resolution_cache(sender, instance, **kwargs):
+    """
+    Tenant veya domain değiştiğinde tenant çözümleme cache'ini tüm worker'larda geçersiz kıl.
+    Commit sonrası çalışır; aksi halde commit'ten önce gelen istek eski kaydı tekrar cache'ler.
+    """
+    transaction.on_commit(TenantCacheService.invalidate)
+
+
+@receiver([post_save, post_delete], sender=Tax)
+def invalidate_tax_rate_cache(sender, instance, **kwargs):
+    """
+    Vergi tanımı değiştiğinde sepet hesaplamasında kullanılan aktif vergi oranı cache'ini sil.
+    """
+    if instance.tenant_id:
+        CartTotalsService.invalidate_tax_rate(instance.tenant_id)
+
+
+@receiver([post_save, post_delete], sender=Webhook)
+def invalidate_webhook_subscriptions(sender, instance, **kwargs):
+    """
+    Webhook eklendiğinde/değiştiğinde tenant'ın abone olunan event tipleri cache'ini sil.
+    """
+    if instance.tenant_id:
+        WebhookService.invalidate_subscriptions(instance.tenant_id)
+
+
+@receiver(post_save, sender=Product)
+def dispatch_product_saved_webhook(sender, instance, created, **kwargs):
+    """
+    Ürün oluşturulduğunda / güncellendiğinde / soft delete edildiğinde webhook event'i üret.
+    """
+    if _is_counter_only_update(kwargs) or not instance.tenant_id:
+        return
+    if instance.is_deleted:
+        event_type = WebhookService.EVENT_PRODUCT_DELETED
+    elif created:
+        event_type = WebhookService.EVENT_PRODUCT_CREATED
+    else:
+        event_type = WebhookService.EVENT_PRODUCT_UPDATED
+    WebhookService.dispatch(instance.tenant_id, event_type, WebhookService.product_payload(instance))
+
+
+@receiver(post_delete, sender=Product)
+def dispatch_product_deleted_webhook(sender, instance, **kwargs):
+    """
+    Ürün kalıcı olarak silindiğinde webhook event'i üret.
+    """
+    if instance.tenant_id:
+        WebhookService.dispatch(
+            instance.tenant_id, WebhookService.EVENT_PRODUCT_DELETED, WebhookService.product_payload(instance)
+        )
+
+
+@receiver(post_delete, sender=Order)
+def mark_analytics_day_for_deleted_order(sender, instance, **kwargs):
+    """
+    Hard delete edilen siparişin gününü analytics rollup'ında yeniden hesaplat.
+    """
+    from apps.services.analytics_rollup_service import AnalyticsRollupService
+
+    AnalyticsRollupService.mark_day_dirty(instance.tenant_id, instance.created_at)
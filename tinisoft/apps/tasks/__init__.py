@@ -6,7 +6,14 @@ from .excel_import_task import (
     upload_images_from_excel_task
 )
 from .product_task import update_all_products_price_with_vat
-from .activity_task import create_activity_log_task
+from .activity_task import create_activity_log_task, flush_activity_logs_task, sweep_activity_logs_task
+from .export_task import export_products_xlsx_task
+from .webhook_task import dispatch_webhook_events_task, deliver_webhook_task
+from .shipment_task import sync_shipment_statuses_task, sync_tenant_shipments_task
+from .analytics_task import rollup_analytics_task, rollup_tenant_analytics_task, flush_analytics_events_task
+from .partition_task import maintain_partitions_task
+from .customer_task import reconcile_customer_statistics_task, reconcile_tenant_customer_statistics_task
+from .image_task import process_product_image_task
 
 __all__ = [
     'trigger_frontend_build',
@@ -17,4 +24,18 @@ __all__ = [
     'upload_images_from_excel_task',
     'update_all_products_price_with_vat',
     'create_activity_log_task',
+    'flush_activity_logs_task',
+    'sweep_activity_logs_task',
+    'export_products_xlsx_task',
+    'dispatch_webhook_events_task',
+    'deliver_webhook_task',
+    'sync_shipment_statuses_task',
+    'sync_tenant_shipments_task',
+    'rollup_analytics_task',
+    'rollup_tenant_analytics_task',
+    'flush_analytics_events_task',
+    'maintain_partitions_task',
+    'reconcile_customer_statistics_task',
+    'reconcile_tenant_customer_statistics_task',
+    'process_product_image_task',
 ]
@@ -2,49 +2,68 @@
 Celery tasks for activity logging.
 """
 from celery import shared_task
-from apps.models import ActivityLog, Tenant
+from django.core.cache import cache
+from apps.services.activity_log_service import ActivityLogService
 import logging
 
 logger = logging.getLogger(__name__)
 
+FLUSH_LOCK_TIMEOUT = 5 * 60
+SWEEP_LOCK_TIMEOUT = 30 * 60
+
+
 @shared_task
 def create_activity_log_task(tenant_id, user_id, action, description, content_type=None, object_id=None, changes=None, ip_address=None):
     """
-    Asenkron olarak işlem logu oluşturur. (Tenant-Aware)
+    Tek bir işlem logunu yazar. (Tenant-Aware)
+    Loglar normalde ActivityLogService kuyruğu ile toplu yazılır; bu task kuyruktaki
+    eski mesajlar ve tekil kullanım için korunur. Saklama limiti periyodik temizlikte uygulanır.
     """
     try:
-        from apps.models import Tenant, ActivityLog, User
-        
-        # 1. Tenant'ı bul (Veri izolasyonu için şart)
-        tenant = Tenant.objects.get(id=tenant_id)
-        
-        # 2. Logu oluştur (user_id üzerinden direkt bağlantı daha hızlı)
-        log_entry = ActivityLog.objects.create(
-            tenant=tenant,
+        entry = ActivityLogService.build_entry(
+            tenant_id=tenant_id,
             user_id=user_id,
             action=action,
             description=description,
             content_type=content_type,
-            object_id=str(object_id) if object_id else None,
-            changes=changes or {},
+            object_id=object_id,
+            changes=changes,
             ip_address=ip_address
         )
-        
-        # 3. Limit Kontrolü ve Temizlik (Arka planda dükkanın log kapasitesini koru)
-        LIMIT = 1000
-        count = ActivityLog.objects.filter(tenant=tenant).count()
-        
-        if count > LIMIT:
-            to_delete_count = count - LIMIT
-            old_log_ids = ActivityLog.objects.filter(
-                tenant=tenant
-            ).order_by('created_at')[:to_delete_count].values_list('id', flat=True)
-            
-            ActivityLog.objects.filter(id__in=list(old_log_ids)).delete()
-            logger.info(f"Cleaned up {to_delete_count} old logs for tenant: {tenant.slug}")
-            
-        return str(log_entry.id)
-        
+        return ActivityLogService.write_entries([entry])
     except Exception as e:
         logger.error(f"Async ActivityLog logging failed: {str(e)}")
         return None
+
+
+@shared_task(ignore_result=True)
+def flush_activity_logs_task():
+    """
+    Redis kuyruğundaki işlem loglarını toplu yaz (bulk_create).
+    Celery beat ile birkaç saniyede bir çalışır; çalıştırmalar üst üste binmez.
+    """
+    lock_key = 'activity_log_flush_lock'
+    if not cache.add(lock_key, 1, FLUSH_LOCK_TIMEOUT):
+        return 0
+    try:
+        return ActivityLogService.flush()
+    finally:
+        cache.delete(lock_key)
+
+
+@shared_task
+def sweep_activity_logs_task():
+    """
+    Son temizlikten beri log yazılan tenant'lar için saklama limitini uygula.
+    Celery beat ile periyodik çalışır (CELERY_BEAT_SCHEDULE).
+    """
+    lock_key = 'activity_log_sweep_lock'
+    if not cache.add(lock_key, 1, SWEEP_LOCK_TIMEOUT):
+        return {'success': True, 'skipped': True}
+    try:
+        stats = ActivityLogService.sweep()
+        if stats['deleted']:
+            logger.info(f"[ACTIVITY_LOG] Retention sweep: {stats['deleted']} log(s) deleted for {stats['tenants']} tenant(s)")
+        return {'success': True, **stats}
+    finally:
+        cache.delete(lock_key)
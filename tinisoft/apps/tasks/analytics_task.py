@@ -0,0 +1,77 @@
+"""
+Analytics Celery tasks - Günlük rollup'ların artımlı güncellenmesi (Celery beat).
+"""
+from celery import shared_task
+from django.core.cache import cache
+from apps.services.analytics_rollup_service import AnalyticsRollupService
+from apps.services.analytics_ingest_service import AnalyticsIngestService
+from core.db_router import set_tenant_schema, clear_tenant_schema
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_LOCK_TIMEOUT = 30 * 60
+FLUSH_LOCK_TIMEOUT = 5 * 60
+
+
+@shared_task(ignore_result=True)
+def flush_analytics_events_task():
+    """
+    Redis kuyruğundaki analytics event'lerini toplu yaz (bulk_create).
+    Celery beat ile birkaç saniyede bir çalışır; çalıştırmalar üst üste binmez.
+    """
+    lock_key = 'analytics_flush_lock'
+    if not cache.add(lock_key, 1, FLUSH_LOCK_TIMEOUT):
+        return 0
+    try:
+        written = AnalyticsIngestService.flush()
+        if written:
+            logger.info(f"[ANALYTICS] Flushed {written} event(s)")
+        return written
+    finally:
+        cache.delete(lock_key)
+
+
+@shared_task
+def rollup_analytics_task():
+    """
+    Aktif her tenant için rollup task'ı kuyruğa ekle.
+    Celery beat ile periyodik çalışır (CELERY_BEAT_SCHEDULE).
+    """
+    from apps.models import Tenant
+
+    queued = 0
+    for tenant_id in Tenant.objects.filter(status='active', is_deleted=False).values_list('id', flat=True):
+        rollup_tenant_analytics_task.delay(str(tenant_id))
+        queued += 1
+    return {'success': True, 'queued': queued}
+
+
+@shared_task
+def rollup_tenant_analytics_task(tenant_id):
+    """
+    Tenant'ın watermark'tan bu yana değişen günlerinin rollup'ını güncelle.
+    Aynı tenant için eşzamanlı iki çalıştırma olmaz (cache kilidi).
+    """
+    from apps.models import Tenant
+
+    lock_key = f'analytics_rollup_lock:{tenant_id}'
+    if not cache.add(lock_key, 1, ROLLUP_LOCK_TIMEOUT):
+        logger.info(f"[ANALYTICS_ROLLUP] Rollup already running for tenant {tenant_id}, skipping")
+        return {'success': True, 'skipped': True}
+
+    set_tenant_schema(f'tenant_{tenant_id}')
+    try:
+        try:
+            tenant = Tenant.objects.get(id=tenant_id)
+        except Tenant.DoesNotExist:
+            logger.error(f"Tenant not found: {tenant_id}")
+            return {'success': False, 'error': f'Tenant not found: {tenant_id}'}
+
+        days = AnalyticsRollupService.rollup_tenant(tenant)
+        if days:
+            logger.info(f"[ANALYTICS_ROLLUP] Tenant {tenant.slug}: {len(days)} day(s) recomputed")
+        return {'success': True, 'tenant_id': str(tenant_id), 'days': [day.isoformat() for day in days]}
+    finally:
+        clear_tenant_schema()
+        cache.delete(lock_key)
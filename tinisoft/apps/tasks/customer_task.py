@@ -0,0 +1,59 @@
+"""
+Customer Celery tasks - Müşteri istatistiklerinin gece reconciliation'ı (Celery beat).
+"""
+from celery import shared_task
+from django.core.cache import cache
+from apps.services.customer_service import CustomerService
+from core.db_router import set_tenant_schema, clear_tenant_schema
+import logging
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_LOCK_TIMEOUT = 60 * 60
+
+
+@shared_task
+def reconcile_customer_statistics_task():
+    """
+    Aktif her tenant için müşteri istatistikleri reconciliation task'ı kuyruğa ekle.
+    Celery beat ile her gece çalışır (CELERY_BEAT_SCHEDULE).
+    """
+    from apps.models import Tenant
+
+    queued = 0
+    for tenant_id in Tenant.objects.filter(status='active', is_deleted=False).values_list('id', flat=True):
+        reconcile_tenant_customer_statistics_task.delay(str(tenant_id))
+        queued += 1
+    return {'success': True, 'queued': queued}
+
+
+@shared_task
+def reconcile_tenant_customer_statistics_task(tenant_id):
+    """
+    Tenant'ın müşteri istatistiklerini siparişlerden yeniden hesapla, sapanları düzelt.
+    Aynı tenant için eşzamanlı iki çalıştırma olmaz (cache kilidi).
+    """
+    from apps.models import Tenant
+
+    lock_key = f'customer_stats_reconcile_lock:{tenant_id}'
+    if not cache.add(lock_key, 1, RECONCILE_LOCK_TIMEOUT):
+        logger.info(f"[CUSTOMER_STATS] Reconciliation already running for tenant {tenant_id}, skipping")
+        return {'success': True, 'skipped': True}
+
+    set_tenant_schema(f'tenant_{tenant_id}')
+    try:
+        try:
+            tenant = Tenant.objects.get(id=tenant_id)
+        except Tenant.DoesNotExist:
+            logger.error(f"Tenant not found: {tenant_id}")
+            return {'success': False, 'error': f'Tenant not found: {tenant_id}'}
+
+        stats = CustomerService.reconcile_tenant(tenant)
+        if stats['fixed']:
+            logger.warning(
+                f"[CUSTOMER_STATS] Tenant {tenant.slug}: {stats['fixed']}/{stats['checked']} customer(s) corrected"
+            )
+        return {'success': True, 'tenant_id': str(tenant_id), **stats}
+    finally:
+        clear_tenant_schema()
+        cache.delete(lock_key)
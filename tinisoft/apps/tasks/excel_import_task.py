@@ -10,21 +10,21 @@ from core.db_router import set_tenant_schema
 import logging
 import pandas as pd
 import os
-from django.db import transaction
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True, max_retries=3)
-def import_products_from_excel_task(self, file_path, tenant_id, user_id=None, batch_size=100):
+def import_products_from_excel_task(self, file_path, tenant_id, user_id=None, batch_size=500, update_existing=False):
     """
-    Excel'den ürünleri paralel olarak import et (Celery task).
+    Excel'den ürünleri toplu olarak import et (Celery task).
     
     Args:
         file_path: Excel dosya yolu
         tenant_id: Tenant ID
         user_id: User ID (opsiyonel)
-        batch_size: Her batch'te kaç ürün işlenecek (default: 100)
+        batch_size: Tek transaction'da yazılacak ürün sayısı (default: 500)
+        update_existing: SKU'su mevcut ürünle eşleşen satırlar o ürünü güncellesin (default: False)
     
     Returns:
         dict: Import sonuçları
@@ -48,44 +48,35 @@ def import_products_from_excel_task(self, file_path, tenant_id, user_id=None, ba
         
         # Local filesystem'den dosyayı oku
         df = pd.read_excel(file_path, engine='openpyxl')
-        df.columns = df.columns.str.lower().str.strip()
         
         total_rows = len(df)
         logger.info(f"Starting Excel import: {total_rows} rows for tenant {tenant.name}")
         
-        # Batch'ler halinde işle
-        imported_count = 0
-        failed_count = 0
-        errors = []
-        products_created = []
-        
-        # Batch'lere böl
-        for batch_start in range(0, total_rows, batch_size):
-            batch_end = min(batch_start + batch_size, total_rows)
-            batch_df = df.iloc[batch_start:batch_end]
-            
-            logger.info(f"Processing batch {batch_start // batch_size + 1}: rows {batch_start + 1}-{batch_end}")
-            
-            # Batch'i işle
-            batch_results = _process_batch(batch_df, tenant, user, batch_start)
-            
-            imported_count += batch_results['imported_count']
-            failed_count += batch_results['failed_count']
-            errors.extend(batch_results['errors'])
-            products_created.extend(batch_results['products'])
-            
+        def report_progress(processed, total, imported, failed):
             # Progress update (Celery task için)
             self.update_state(
                 state='PROGRESS',
                 meta={
-                    'current': batch_end,
-                    'total': total_rows,
-                    'imported': imported_count,
-                    'failed': failed_count,
-                    'progress': int((batch_end / total_rows) * 100)
+                    'current': processed,
+                    'total': total,
+                    'imported': imported,
+                    'failed': failed,
+                    'progress': int((processed / total) * 100) if total else 100
                 }
             )
         
+        # Toplu import (chunk başına tek transaction, bulk_create / bulk_update)
+        import_result = ExcelImportService.bulk_import_dataframe(
+            df, tenant, user=user,
+            chunk_size=batch_size,
+            progress_callback=report_progress,
+            update_existing=update_existing
+        )
+        imported_count = import_result['imported_count']
+        failed_count = import_result['failed_count']
+        errors = import_result['errors']
+        products_created = import_result['products']
+        
         # Geçici dosyayı local filesystem'den sil
         if os.path.exists(file_path):
             try:
@@ -124,57 +115,6 @@ def import_products_from_excel_task(self, file_path, tenant_id, user_id=None, ba
             raise
 
 
-def _process_batch(batch_df, tenant, user, row_offset):
-    """
-    Bir batch'i işle (transaction içinde).
-    
-    Args:
-        batch_df: DataFrame (batch)
-        tenant: Tenant instance
-        user: User instance
-        row_offset: Satır offset (hata mesajları için)
-    
-    Returns:
-        dict: Batch sonuçları
-    """
-    imported_count = 0
-    failed_count = 0
-    errors = []
-    products = []
-    
-    try:
-        with transaction.atomic():
-            # Her satırı işle
-            for idx, row in batch_df.iterrows():
-                try:
-                    # Excel satırını product data'ya çevir
-                    product_data = ExcelImportService._map_row_to_product_data(row, tenant)
-                    
-                    # Product oluştur
-                    product = ExcelImportService._create_product(product_data, tenant, user)
-                    products.append(product)
-                    imported_count += 1
-                
-                except Exception as e:
-                    failed_count += 1
-                    row_num = row_offset + idx + 2  # +2 çünkü Excel'de header var ve 0-based index
-                    error_msg = f"Satır {row_num}: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(f"Product import error at row {row_num}: {str(e)}")
-    
-    except Exception as e:
-        logger.error(f"Batch processing error: {str(e)}")
-        failed_count += len(batch_df)
-        errors.append(f"Batch hatası: {str(e)}")
-    
-    return {
-        'imported_count': imported_count,
-        'failed_count': failed_count,
-        'errors': errors,
-        'products': products
-    }
-
-
 @shared_task
 def import_products_from_excel_async(file_path, tenant_id, user_id=None):
     """
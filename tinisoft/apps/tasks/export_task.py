@@ -0,0 +1,40 @@
+"""
+Product export Celery task - Büyük kataloglar için XLSX export.
+"""
+from celery import shared_task
+from apps.models import Tenant
+from apps.services.product_export_service import ProductExportService
+from core.db_router import set_tenant_schema, clear_tenant_schema
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def export_products_xlsx_task(self, tenant_id, product_ids=None):
+    """
+    Ürünleri XLSX dosyasına export et (openpyxl write-only, server-side cursor).
+    Dosya local temp_exports dizinine yazılır, bulk_export_download view'ı ile indirilir.
+    
+    Args:
+        tenant_id: Tenant ID
+        product_ids: Export edilecek ürün ID'leri (boş = tümü)
+    
+    Returns:
+        dict: Export sonucu
+    """
+    tenant = Tenant.objects.get(id=tenant_id, is_deleted=False)
+    set_tenant_schema(f'tenant_{tenant.id}')
+    try:
+        self.update_state(state='PROGRESS', meta={'tenant_id': str(tenant.id)})
+        file_path, row_count = ProductExportService.write_xlsx(tenant, product_ids)
+    finally:
+        clear_tenant_schema()
+    
+    return {
+        'success': True,
+        'tenant_id': str(tenant.id),
+        'file_name': os.path.basename(file_path),
+        'row_count': row_count,
+    }
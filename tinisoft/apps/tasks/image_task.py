@@ -0,0 +1,45 @@
+"""
+Image Celery tasks - Ürün görseli varyant üretimi (IMAGE_PROCESSING_QUEUE kuyruğu).
+"""
+from celery import shared_task
+from django.core.cache import cache
+from apps.services.image_processing_service import ImageProcessingService
+from core.db_router import set_tenant_schema, clear_tenant_schema
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROCESS_LOCK_TIMEOUT = 10 * 60
+
+
+@shared_task
+def process_product_image_task(tenant_id, image_id):
+    """
+    Görselin thumbnail / listing / zoom varyantlarını üret.
+    Aynı görsel için eşzamanlı iki çalıştırma olmaz (cache kilidi).
+    """
+    from apps.models import ProductImage
+
+    lock_key = f'product_image_process_lock:{image_id}'
+    if not cache.add(lock_key, 1, PROCESS_LOCK_TIMEOUT):
+        logger.info(f"[IMAGE_PROCESSING] Image {image_id} already being processed, skipping")
+        return {'success': True, 'skipped': True}
+
+    set_tenant_schema(f'tenant_{tenant_id}')
+    try:
+        image = ProductImage.objects.filter(id=image_id, is_deleted=False).first()
+        if image is None:
+            logger.warning(f"[IMAGE_PROCESSING] Image not found: {image_id}")
+            return {'success': False, 'error': f'Image not found: {image_id}'}
+        if image.processing_status != ProductImage.ProcessingStatus.PENDING:
+            return {'success': True, 'skipped': True, 'status': image.processing_status}
+
+        processing_status = ImageProcessingService.process_image(image, tenant_id)
+        return {
+            'success': processing_status != ProductImage.ProcessingStatus.FAILED,
+            'image_id': str(image_id),
+            'status': processing_status,
+        }
+    finally:
+        clear_tenant_schema()
+        cache.delete(lock_key)
@@ -0,0 +1,38 @@
+"""
+Partition Celery tasks - Aylık partition bakımı (Celery beat).
+"""
+from celery import shared_task
+from django.core.cache import cache
+from apps.services.partition_service import PartitionService
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAINTENANCE_LOCK_TIMEOUT = 60 * 60
+
+
+@shared_task
+def maintain_partitions_task():
+    """
+    Tüm schema'larda gelecek ayların partition'larını oluştur ve
+    saklama süresi dolan partition'ları sil / arşivle.
+    """
+    lock_key = 'partition_maintenance_lock'
+    if not cache.add(lock_key, 1, MAINTENANCE_LOCK_TIMEOUT):
+        logger.info("[PARTITION] Maintenance already running, skipping")
+        return {'success': True, 'skipped': True}
+    try:
+        stats = PartitionService.maintain()
+        if stats['skipped']:
+            logger.warning(
+                f"[PARTITION] {len(stats['skipped'])} table(s) not partitioned yet "
+                f"(run manage_partitions --convert): {', '.join(stats['skipped'][:10])}"
+            )
+        return {
+            'success': True,
+            'created': len(stats['created']),
+            'expired': len(stats['expired']),
+            'skipped': len(stats['skipped']),
+        }
+    finally:
+        cache.delete(lock_key)
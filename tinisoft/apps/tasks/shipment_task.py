@@ -0,0 +1,62 @@
+"""
+Shipment Celery tasks - Kargo durumlarının periyodik senkronizasyonu (Celery beat).
+"""
+from celery import shared_task
+from django.core.cache import cache
+from apps.services.shipment_sync_service import ShipmentSyncService
+from core.db_router import set_tenant_schema, clear_tenant_schema
+import logging
+
+logger = logging.getLogger(__name__)
+
+SYNC_LOCK_TIMEOUT = 15 * 60  # Takılan bir çalıştırma kilidi en fazla 15 dakika tutar
+
+
+@shared_task
+def sync_shipment_statuses_task():
+    """
+    Aras Kargo entegrasyonu aktif olan her tenant için senkronizasyon task'ı kuyruğa ekle.
+    Celery beat ile periyodik çalışır (CELERY_BEAT_SCHEDULE).
+    """
+    from apps.models import IntegrationProvider
+
+    tenant_ids = IntegrationProvider.objects.filter(
+        provider_type=IntegrationProvider.ProviderType.ARAS,
+        status__in=[IntegrationProvider.Status.ACTIVE, IntegrationProvider.Status.TEST_MODE],
+        is_deleted=False,
+        tenant__status='active',
+    ).values_list('tenant_id', flat=True).distinct()
+
+    queued = 0
+    for tenant_id in tenant_ids:
+        sync_tenant_shipments_task.delay(str(tenant_id))
+        queued += 1
+    return {'success': True, 'queued': queued}
+
+
+@shared_task
+def sync_tenant_shipments_task(tenant_id):
+    """
+    Tenant'ın yoklama zamanı gelmiş gönderilerini senkronize et.
+    Aynı tenant için eşzamanlı iki çalıştırma olmaz (cache kilidi).
+    """
+    from apps.models import Tenant
+
+    lock_key = f'shipment_sync_lock:{tenant_id}'
+    if not cache.add(lock_key, 1, SYNC_LOCK_TIMEOUT):
+        logger.info(f"[SHIPMENT_SYNC] Sync already running for tenant {tenant_id}, skipping")
+        return {'success': True, 'skipped': True}
+
+    set_tenant_schema(f'tenant_{tenant_id}')
+    try:
+        try:
+            tenant = Tenant.objects.get(id=tenant_id)
+        except Tenant.DoesNotExist:
+            logger.error(f"Tenant not found: {tenant_id}")
+            return {'success': False, 'error': f'Tenant not found: {tenant_id}'}
+
+        stats = ShipmentSyncService.sync_tenant(tenant)
+        return {'success': True, 'tenant_id': str(tenant_id), **stats}
+    finally:
+        clear_tenant_schema()
+        cache.delete(lock_key)
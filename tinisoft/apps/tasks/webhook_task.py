@@ -0,0 +1,104 @@
+"""
+Webhook Celery tasks - Event'lerin webhook'lara asenkron teslimi.
+"""
+from celery import shared_task
+from apps.services.webhook_service import WebhookService
+from core.db_router import set_tenant_schema, clear_tenant_schema
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def dispatch_webhook_events_task(tenant_id, events):
+    """
+    Event'leri abone olan aktif webhook'lara dağıt (webhook başına ayrı teslim task'ı).
+    
+    Args:
+        tenant_id: Tenant ID
+        events: WebhookService.build_event ile oluşturulmuş event listesi
+    """
+    from apps.models import Webhook
+    
+    set_tenant_schema(f'tenant_{tenant_id}')
+    try:
+        webhooks = Webhook.objects.filter(
+            tenant_id=tenant_id,
+            status=Webhook.WebhookStatus.ACTIVE,
+            is_deleted=False,
+        ).values_list('id', 'events')
+        
+        queued = 0
+        for webhook_id, subscriptions in webhooks:
+            subscriptions = set(subscriptions or [])
+            webhook_events = [event for event in events if WebhookService.matches(subscriptions, event['type'])]
+            if webhook_events:
+                deliver_webhook_task.delay(tenant_id, str(webhook_id), webhook_events)
+                queued += 1
+    finally:
+        clear_tenant_schema()
+    
+    return {'tenant_id': tenant_id, 'events': len(events), 'webhooks': queued}
+
+
+@shared_task
+def deliver_webhook_task(tenant_id, webhook_id, events, attempt=0):
+    """
+    Event'leri tek bir webhook'a teslim et.
+    
+    - Endpoint başına eşzamanlılık limiti doluysa kısa süre sonra tekrar kuyruğa alınır
+      (deneme hakkından düşmez)
+    - Başarısız event'ler exponential backoff ile MAX_ATTEMPTS'e kadar tekrar denenir
+    
+    Args:
+        tenant_id: Tenant ID
+        webhook_id: Webhook ID
+        events: Event listesi
+        attempt: Kaçıncı tekrar denemesi (0 = ilk)
+    """
+    from apps.models import Webhook
+    
+    if not WebhookService.acquire_slot(webhook_id):
+        deliver_webhook_task.apply_async(
+            args=[tenant_id, webhook_id, events],
+            kwargs={'attempt': attempt},
+            countdown=WebhookService.BUSY_RETRY_DELAY,
+        )
+        return {'webhook_id': webhook_id, 'status': 'busy'}
+    
+    set_tenant_schema(f'tenant_{tenant_id}')
+    try:
+        webhook = Webhook.objects.filter(
+            id=webhook_id,
+            status=Webhook.WebhookStatus.ACTIVE,
+            is_deleted=False,
+        ).first()
+        if webhook is None:
+            return {'webhook_id': webhook_id, 'status': 'inactive'}
+        
+        failed_events = WebhookService.deliver(webhook, events, attempt=attempt)
+    finally:
+        clear_tenant_schema()
+        WebhookService.release_slot(webhook_id)
+    
+    if failed_events:
+        if attempt + 1 < WebhookService.MAX_ATTEMPTS:
+            countdown = WebhookService.get_retry_delay(attempt)
+            logger.warning(
+                f"[WEBHOOK] {len(failed_events)} event(s) failed for webhook {webhook_id}, "
+                f"retrying in {countdown}s (attempt {attempt + 1}/{WebhookService.MAX_ATTEMPTS - 1})"
+            )
+            deliver_webhook_task.apply_async(
+                args=[tenant_id, webhook_id, failed_events],
+                kwargs={'attempt': attempt + 1},
+                countdown=countdown,
+            )
+        else:
+            logger.error(f"[WEBHOOK] Giving up {len(failed_events)} event(s) for webhook {webhook_id} after {attempt + 1} attempts")
+    
+    return {
+        'webhook_id': webhook_id,
+        'status': 'delivered',
+        'delivered': len(events) - len(failed_events),
+        'failed': len(failed_events),
+    }
@@ -0,0 +1,181 @@
+"""
+Aras Kargo SOAP istemcisi testleri (sahte SOAP sunucusu ile, DB gerektirmez).
+
+Çalıştırma:
+    python manage.py test apps.tests.test_aras_cargo_service
+"""
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.models import IntegrationProvider, Order
+from apps.services.aras_cargo_service import ArasCargoService
+
+
+RESPONSE_TEMPLATE = (
+    '<?xml version="1.0" encoding="utf-8"?>'
+    '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"><s:Body>'
+    '<GetQueryDSResponse xmlns="http://tempuri.org/">'
+    '<status>{status}</status><status_code>{status_code}</status_code>'
+    '<tracking_number>{tracking_number}</tracking_number>'
+    '</GetQueryDSResponse></s:Body></s:Envelope>'
+)
+
+
+class FakeSoapHandler(BaseHTTPRequestHandler):
+    """IntegrationCode'a göre sabit kargo cevabı dönen keep-alive'lı SOAP endpoint'i."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+        server = self.server
+        with server.lock:
+            server.requests.append(self.headers.get('SOAPAction'))
+            server.connections.add(self.client_address)
+        match = re.search(r'&lt;IntegrationCode&gt;(.*?)&lt;/IntegrationCode&gt;', body)
+        code = match.group(1) if match else ''
+        if code in server.failing_codes:
+            payload, status = b'<error/>', 500
+        else:
+            payload = RESPONSE_TEMPLATE.format(
+                status='TESLİM EDİLDİ' if code in server.delivered_codes else 'YOLDA',
+                status_code='7',
+                tracking_number=f'TRK{code}',
+            ).encode('utf-8')
+            status = 200
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeSoapServerMixin:
+    """Test sınıfı boyunca çalışan sahte SOAP sunucusu ve ona bağlı entegrasyon."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeSoapHandler)
+        cls.server.daemon_threads = True
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.endpoint = f'http://127.0.0.1:{cls.server.server_address[1]}/ArasCargoIntegrationService.svc'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.connections = set()
+        self.server.failing_codes = set()
+        self.server.delivered_codes = set()
+        ArasCargoService._sessions = {}
+        ArasCargoService._sessions_pid = None
+
+        self.tenant = SimpleNamespace(slug='test-tenant')
+        self.integration = IntegrationProvider(
+            id=uuid.uuid4(),
+            provider_type=IntegrationProvider.ProviderType.ARAS,
+            status=IntegrationProvider.Status.TEST_MODE,
+            test_endpoint=self.endpoint,
+            config={'query': {'username': 'user', 'password': 'secret', 'customer_code': '123'}},
+        )
+        patchers = [
+            mock.patch.object(ArasCargoService, 'get_integration', return_value=self.integration),
+            mock.patch.object(IntegrationProvider, 'save'),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def make_orders(self, count, **fields):
+        return [
+            Order(id=uuid.uuid4(), order_number=f'ORD{index:04d}', tracking_number='', **fields)
+            for index in range(count)
+        ]
+
+
+class ArasCargoSessionTests(FakeSoapServerMixin, SimpleTestCase):
+    """Paylaşılan session ve connection pool."""
+
+    def test_session_is_shared_per_integration(self):
+        session = ArasCargoService.get_session(self.integration)
+        self.assertIs(ArasCargoService.get_session(self.integration), session)
+
+        other = IntegrationProvider(id=uuid.uuid4())
+        self.assertIsNot(ArasCargoService.get_session(other), session)
+
+    def test_sequential_requests_reuse_connection(self):
+        for index in range(5):
+            result = ArasCargoService.track_shipment(self.tenant, f'ORD{index}')
+            self.assertTrue(result['success'])
+            self.assertEqual(result['tracking_number'], f'TRKORD{index}')
+
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertEqual(len(self.server.connections), 1)
+        self.assertEqual(self.server.requests[0], 'http://tempuri.org/GetQueryDS')
+
+    def test_session_is_recreated_after_fork(self):
+        session = ArasCargoService.get_session(self.integration)
+        ArasCargoService._sessions_pid = -1  # Farklı bir process'te olunmuş gibi
+        self.assertIsNot(ArasCargoService.get_session(self.integration), session)
+
+
+class ArasCargoBulkTrackingTests(FakeSoapServerMixin, SimpleTestCase):
+    """track_shipments_bulk: sınırlı eşzamanlılık ve tek bulk_update."""
+
+    def test_bulk_tracking_persists_with_single_bulk_update(self):
+        orders = self.make_orders(20)
+        self.server.failing_codes = {'ORD0003'}
+
+        with mock.patch.object(Order.objects, 'bulk_update') as bulk_update:
+            response = ArasCargoService.track_shipments_bulk(self.tenant, orders, max_workers=4)
+
+        self.assertTrue(response['success'])
+        self.assertEqual(response['updated'], 19)
+        self.assertEqual(response['failed'], 1)
+        self.assertEqual(len(self.server.requests), 20)
+        # Worker sayısından fazla connection açılmaz
+        self.assertLessEqual(len(self.server.connections), 4)
+
+        bulk_update.assert_called_once()
+        updated_orders, fields = bulk_update.call_args[0]
+        self.assertEqual(len(updated_orders), 19)
+        self.assertEqual(
+            fields, ['cargo_status', 'cargo_status_code', 'cargo_checked_at', 'tracking_number']
+        )
+        first = orders[0]
+        self.assertEqual(first.cargo_status, 'YOLDA')
+        self.assertEqual(first.tracking_number, 'TRKORD0000')
+        self.assertEqual(orders[3].tracking_number, '')
+
+        # Entegrasyon kaydı bir kez güncellenir, hata mesajı korunur
+        IntegrationProvider.save.assert_called_once_with(update_fields=['last_used_at', 'last_error'])
+        self.assertIn('500', self.integration.last_error)
+
+    def test_bulk_tracking_without_persist_leaves_orders_untouched(self):
+        orders = self.make_orders(3)
+
+        with mock.patch.object(Order.objects, 'bulk_update') as bulk_update:
+            response = ArasCargoService.track_shipments_bulk(self.tenant, orders, persist=False)
+
+        bulk_update.assert_not_called()
+        self.assertEqual(response['updated'], 3)
+        self.assertEqual(set(response['results']), {str(order.id) for order in orders})
+        self.assertEqual(orders[0].cargo_status, '')
+
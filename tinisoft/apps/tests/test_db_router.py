@@ -0,0 +1,68 @@
+"""
+search_path execute wrapper testleri (PostgreSQL gerektirir).
+
+Çalıştırma:
+    python manage.py test apps.tests.test_db_router
+"""
+from django.db import connection, transaction
+from django.test import TransactionTestCase, skipUnlessDBFeature
+
+from core.db_router import clear_tenant_schema, set_tenant_schema
+
+SCHEMA = 'router_test_tenant'
+
+
+class RolledBack(Exception):
+    pass
+
+
+@skipUnlessDBFeature('can_rollback_ddl')
+class SearchPathWrapperTests(TransactionTestCase):
+    """Savepoint / transaction rollback'i geri alınan SET'i wrapper cache'inde bırakmamalı."""
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{SCHEMA}"')
+        self.addCleanup(self.drop_schema)
+        self.addCleanup(clear_tenant_schema)
+
+    def drop_schema(self):
+        clear_tenant_schema()
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP SCHEMA IF EXISTS "{SCHEMA}" CASCADE')
+
+    def current_search_path(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW search_path')
+            return cursor.fetchone()[0]
+
+    def test_set_inside_rolled_back_savepoint_is_reissued(self):
+        set_tenant_schema('public')
+        self.current_search_path()
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    set_tenant_schema(SCHEMA)
+                    self.assertIn(SCHEMA, self.current_search_path())
+                    raise RolledBack
+            except RolledBack:
+                pass
+            # Savepoint rollback'i SET'i geri aldı; aynı schema için tekrar gönderilmeli
+            self.assertIn(SCHEMA, self.current_search_path())
+
+    def test_set_inside_rolled_back_transaction_is_reissued(self):
+        set_tenant_schema('public')
+        self.current_search_path()
+
+        try:
+            with transaction.atomic():
+                set_tenant_schema(SCHEMA)
+                self.assertIn(SCHEMA, self.current_search_path())
+                raise RolledBack
+        except RolledBack:
+            pass
+
+        self.assertIn(SCHEMA, self.current_search_path())
+        set_tenant_schema('public')
+        self.assertEqual(self.current_search_path(), 'public')
@@ -0,0 +1,48 @@
+"""
+Domain yönetim view testleri.
+
+Çalıştırma:
+    python manage.py test apps.tests.test_domain_views
+"""
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.models import Domain, Tenant, User
+from apps.services.tenant_cache_service import TenantCacheService
+from apps.views.domain import list_domains
+
+
+class CreatePrimaryDomainTests(TestCase):
+    """Yeni primary domain eski primary'yi düşürür; çözümleme cache'i commit sonrası temizlenir."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(username='owner', email='owner@example.com', role='tenant_owner')
+        cls.tenant = Tenant.objects.create(name='Domain', slug='domain', subdomain='domain', owner=cls.owner)
+        cls.owner.tenant = cls.tenant
+        cls.owner.save(update_fields=['tenant'])
+        cls.old_primary = Domain.objects.create(
+            tenant=cls.tenant, domain_name='old.example.com', is_primary=True, verification_status='verified',
+        )
+
+    def create_domain(self, **data):
+        request = APIRequestFactory().post('/api/domains/', data, format='json')
+        force_authenticate(request, user=self.owner)
+        return list_domains(request)
+
+    def test_demoted_primary_invalidates_cache_after_commit(self):
+        with mock.patch.object(TenantCacheService, 'invalidate') as invalidate:
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.create_domain(domain_name='new.example.com', is_primary=True)
+            invalidate.assert_not_called()  # Commit'ten önce eski kayıt tekrar cache'lenebilirdi
+
+            for callback in callbacks:
+                callback()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(invalidate.called)
+        self.old_primary.refresh_from_db()
+        self.assertFalse(self.old_primary.is_primary)
+        self.assertTrue(Domain.objects.get(domain_name='new.example.com').is_primary)
@@ -0,0 +1,352 @@
+"""
+Ürün görseli işleme pipeline'ı testleri.
+
+Çalıştırma:
+    python manage.py test apps.tests.test_image_processing_service
+"""
+import io
+import shutil
+import socket
+import tempfile
+import threading
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+
+from apps.models import Product, ProductImage, Tenant, User
+from apps.services.image_processing_service import ImageProcessingService
+
+VARIANT_SIZES = {'thumbnail': 50, 'listing': 120, 'zoom': 300}
+
+
+def make_image(size=(400, 300), image_format='JPEG', color=(200, 30, 30)):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def make_animated_gif():
+    from PIL import Image
+
+    frames = [Image.new('RGB', (40, 40), color) for color in ((255, 0, 0), (0, 255, 0))]
+    buffer = io.BytesIO()
+    frames[0].save(buffer, 'GIF', save_all=True, append_images=frames[1:], duration=100, loop=0)
+    return buffer.getvalue()
+
+
+class TempStorageMixin:
+    """Her test için geçici FileSystemStorage (R2 yerine)."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        # Django 4.2'de STORAGES OPTIONS'ı DEFAULT_FILE_STORAGE uyumluluğu yüzünden yok sayılıyor;
+        # konum MEDIA_ROOT ile verilir
+        storage_settings = override_settings(
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+            },
+            MEDIA_ROOT=media_root,
+            MEDIA_URL='/media/',
+            IMAGE_VARIANT_SIZES=VARIANT_SIZES,
+        )
+        storage_settings.enable()
+        self.addCleanup(storage_settings.disable)
+
+
+class BuildVariantsTests(TempStorageMixin, SimpleTestCase):
+    """Boyut varyantları: her boyut için WebP + JPEG, küçük görseller büyütülmez."""
+
+    def test_variants_have_expected_sizes_and_formats(self):
+        from PIL import Image
+
+        data = make_image((400, 300))
+        variants = ImageProcessingService.build_variants('tenant', ImageProcessingService.compute_hash(data), data)
+
+        self.assertEqual(set(variants), set(VARIANT_SIZES))
+        self.assertEqual((variants['thumbnail']['width'], variants['thumbnail']['height']), (50, 38))
+        self.assertEqual((variants['listing']['width'], variants['listing']['height']), (120, 90))
+        self.assertEqual((variants['zoom']['width'], variants['zoom']['height']), (300, 225))
+        for name, variant in variants.items():
+            for key, image_format in (('webp', 'WEBP'), ('jpeg', 'JPEG')):
+                path = variant[key][len('/media/'):]
+                with default_storage.open(path, 'rb') as f, Image.open(f) as stored:
+                    self.assertEqual(stored.format, image_format)
+                    self.assertEqual(stored.size, (variant['width'], variant['height']))
+
+    def test_small_image_is_not_upscaled(self):
+        data = make_image((80, 40), image_format='PNG')
+        variants = ImageProcessingService.build_variants('tenant', ImageProcessingService.compute_hash(data), data)
+
+        self.assertEqual((variants['zoom']['width'], variants['zoom']['height']), (80, 40))
+        self.assertEqual((variants['listing']['width'], variants['listing']['height']), (80, 40))
+
+    def test_animated_image_is_not_converted(self):
+        data = make_animated_gif()
+        self.assertIsNone(
+            ImageProcessingService.build_variants('tenant', ImageProcessingService.compute_hash(data), data)
+        )
+
+
+class ImagePipelineTests(TempStorageMixin, TestCase):
+    """Yükleme tekrar tespiti ve işlenmeyen biçimler."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(username='owner', email='owner@example.com', role='tenant_owner')
+        cls.tenant = Tenant.objects.create(name='Görsel', slug='gorsel', subdomain='gorsel', owner=owner)
+        cls.product = Product.objects.create(tenant=cls.tenant, name='Ürün', slug='urun', price=Decimal('10.00'))
+        cls.other_product = Product.objects.create(
+            tenant=cls.tenant, name='Diğer', slug='diger', price=Decimal('10.00'),
+        )
+
+    def test_same_content_returns_existing_image(self):
+        data = make_image()
+        first, created = ImageProcessingService.add_product_image(self.product, data, 'a.jpg')
+        second, created_again = ImageProcessingService.add_product_image(self.product, data, 'copy-of-a.jpg')
+
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(second.id, first.id)
+        self.assertEqual(ProductImage.objects.filter(product=self.product).count(), 1)
+        self.assertTrue(default_storage.exists(first.variants['original']['path']))
+
+    def test_processed_variants_are_reused_within_tenant(self):
+        data = make_image()
+        image, _ = ImageProcessingService.add_product_image(self.product, data, 'a.jpg')
+        self.assertEqual(ImageProcessingService.process_image(image, self.tenant.id), ProductImage.ProcessingStatus.READY)
+
+        copy, created = ImageProcessingService.add_product_image(self.other_product, data, 'a.jpg')
+
+        self.assertTrue(created)
+        self.assertEqual(copy.processing_status, ProductImage.ProcessingStatus.READY)
+        image.refresh_from_db()
+        self.assertEqual(copy.variants['listing'], image.variants['listing'])
+
+    def test_svg_is_skipped(self):
+        svg = b'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"></svg>'
+        image, _ = ImageProcessingService.add_product_image(self.product, svg, 'logo.svg')
+
+        status = ImageProcessingService.process_image(image, self.tenant.id)
+
+        self.assertEqual(status, ProductImage.ProcessingStatus.SKIPPED)
+        image.refresh_from_db()
+        self.assertEqual(set(image.variants), {'original'})
+
+    def test_animated_gif_is_skipped(self):
+        image, _ = ImageProcessingService.add_product_image(self.product, make_animated_gif(), 'anim.gif')
+
+        status = ImageProcessingService.process_image(image, self.tenant.id)
+
+        self.assertEqual(status, ProductImage.ProcessingStatus.SKIPPED)
+        image.refresh_from_db()
+        self.assertEqual(set(image.variants), {'original'})
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentUploadTests(TempStorageMixin, TransactionTestCase):
+    """Aynı içeriğin aynı ürüne eşzamanlı yüklenmesi tek kayıt açmalı."""
+
+    THREADS = 6
+
+    def setUp(self):
+        super().setUp()
+        owner = User.objects.create(username='owner', email='owner@example.com', role='tenant_owner')
+        tenant = Tenant.objects.create(name='Görsel', slug='gorsel', subdomain='gorsel', owner=owner)
+        self.product = Product.objects.create(tenant=tenant, name='Ürün', slug='urun', price=Decimal('10.00'))
+
+    def test_concurrent_uploads_create_single_image(self):
+        data = make_image()
+        barrier = threading.Barrier(self.THREADS)
+        lock = threading.Lock()
+        results, errors = [], []
+
+        def upload(index):
+            try:
+                barrier.wait()
+                image, created = ImageProcessingService.add_product_image(self.product, data, f'{index}.jpg')
+                with lock:
+                    results.append((image.id, created))
+            except Exception as e:
+                with lock:
+                    errors.append(f'{type(e).__name__}: {e}')
+            finally:
+                connection.close()  # Thread'in kendi connection'ı
+
+        threads = [threading.Thread(target=upload, args=(index,)) for index in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sum(created for _, created in results), 1)
+        self.assertEqual(len({image_id for image_id, _ in results}), 1)
+        self.assertEqual(ProductImage.objects.filter(product=self.product).count(), 1)
+
+
+class FakeImageHandler(BaseHTTPRequestHandler):
+    """Yola göre görsel, yönlendirme veya büyük gövde dönen sunucu."""
+
+    def do_GET(self):
+        self.server.hosts.append(self.headers.get('Host'))
+        if self.path.startswith('/redirect'):
+            self.send_response(302)
+            self.send_header('Location', self.server.redirect_to)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path == '/large-declared':
+            body = b'x' * 2048
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path == '/large-undeclared':
+            # Content-Length yok: sınır akış sırasında uygulanmalı
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+            self.end_headers()
+            for _ in range(8):
+                self.wfile.write(b'x' * 512)
+            return
+        body = self.server.image
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(IMAGE_MAX_DOWNLOAD_BYTES=1024, IMAGE_DOWNLOAD_TIMEOUT=5)
+class DownloadTests(SimpleTestCase):
+    """Harici görsel indirme: iç ağ koruması, IP sabitleme ve boyut sınırı."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeImageHandler)
+        cls.server.daemon_threads = True
+        cls.server.image = make_image((10, 10), image_format='PNG')
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.port = cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.server.hosts = []
+        self.server.redirect_to = ''
+
+    def allow_test_server(self):
+        """Sadece test sunucusunun loopback adresine izin ver (diğer iç adresler yine reddedilir)."""
+        real_check = ImageProcessingService._is_public_address
+        patcher = mock.patch.object(
+            ImageProcessingService, '_is_public_address',
+            side_effect=lambda ip: str(ip) == '127.0.0.1' or real_check(ip),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def resolve_to(self, mapping):
+        """
+        Host adlarını sabit adreslere çözen getaddrinfo (diğer adlar gerçek çözümlemeye gider).
+        Değer liste ise her çözümlemede sıradaki adres döner (DNS rebinding).
+
+        Returns:
+            list: Çözümlenen host adları (sırasıyla)
+        """
+        real_getaddrinfo = socket.getaddrinfo
+        resolved = []
+
+        def getaddrinfo(host, port, *args, **kwargs):
+            if host not in mapping:
+                return real_getaddrinfo(host, port, *args, **kwargs)
+            resolved.append(host)
+            address = mapping[host]
+            if isinstance(address, list):
+                address = address[min(len(resolved), len(address)) - 1]
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (address, port))]
+
+        patcher = mock.patch('socket.getaddrinfo', side_effect=getaddrinfo)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return resolved
+
+    def test_private_addresses_are_rejected(self):
+        for url in (
+            f'http://127.0.0.1:{self.port}/image.png',
+            'http://169.254.169.254/latest/meta-data/',
+            'http://10.0.0.5/image.png',
+            'http://[::1]/image.png',
+            'ftp://example.com/image.png',
+        ):
+            with self.subTest(url=url), self.assertRaises(ValueError):
+                ImageProcessingService._download(url)
+        self.assertEqual(self.server.hosts, [])
+
+    def test_hostname_resolving_to_private_address_is_rejected(self):
+        self.resolve_to({'internal.example.com': '192.168.1.10'})
+        with self.assertRaises(ValueError):
+            ImageProcessingService._download('http://internal.example.com/image.png')
+
+    def test_download_connects_to_validated_address(self):
+        self.allow_test_server()
+        self.resolve_to({'cdn.example.com': '127.0.0.1'})
+
+        data, content_type = ImageProcessingService._download(f'http://cdn.example.com:{self.port}/image.png')
+
+        self.assertEqual(data, self.server.image)
+        self.assertEqual(content_type, 'image/png')
+        # Bağlantı çözülmüş IP'ye yapılır, Host başlığı orijinal host adıdır
+        self.assertEqual(self.server.hosts, [f'cdn.example.com:{self.port}'])
+
+    def test_dns_rebinding_cannot_change_connected_address(self):
+        self.allow_test_server()
+        # İlk çözümleme doğrulanan adres, sonrakiler iç ağ adresi
+        resolved = self.resolve_to({'cdn.example.com': ['127.0.0.1', '10.0.0.5']})
+
+        data, _ = ImageProcessingService._download(f'http://cdn.example.com:{self.port}/image.png')
+
+        self.assertEqual(data, self.server.image)
+        self.assertEqual(resolved, ['cdn.example.com'])  # Bağlantı sırasında host tekrar çözülmez
+
+    def test_redirect_to_private_address_is_rejected(self):
+        self.allow_test_server()
+        self.server.redirect_to = 'http://169.254.169.254/latest/meta-data/'
+
+        with self.assertRaises(ValueError):
+            ImageProcessingService._download(f'http://127.0.0.1:{self.port}/redirect')
+        self.assertEqual(len(self.server.hosts), 1)
+
+    def test_redirect_to_public_address_is_followed(self):
+        self.allow_test_server()
+        self.server.redirect_to = f'http://127.0.0.1:{self.port}/image.png'
+
+        data, _ = ImageProcessingService._download(f'http://127.0.0.1:{self.port}/redirect')
+
+        self.assertEqual(data, self.server.image)
+
+    def test_oversized_downloads_are_rejected(self):
+        self.allow_test_server()
+        for path in ('/large-declared', '/large-undeclared'):
+            with self.subTest(path=path), self.assertRaisesMessage(ValueError, 'boyutu sınırı'):
+                ImageProcessingService._download(f'http://127.0.0.1:{self.port}{path}')
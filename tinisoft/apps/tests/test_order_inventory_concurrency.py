@@ -0,0 +1,93 @@
+"""
+Eşzamanlı sipariş stok düşümü testleri (PostgreSQL gerektirir - select_for_update).
+
+Çalıştırma:
+    python manage.py test apps.tests.test_order_inventory_concurrency
+"""
+import threading
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+
+from apps.models import Cart, CartItem, InventoryMovement, Order, Product, Tenant, User
+from apps.services.order_service import OrderService
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class OrderInventoryConcurrencyTests(TransactionTestCase):
+    """Aynı SKU'ya eşzamanlı siparişler: satır kilidi overselling'i engellemeli."""
+
+    STOCK = 5
+    THREADS = 12
+
+    def setUp(self):
+        owner = User.objects.create(username='owner', email='owner@example.com', role='tenant_owner')
+        self.tenant = Tenant.objects.create(
+            name='Concurrency', slug='concurrency', subdomain='concurrency', owner=owner,
+        )
+        self.product = Product.objects.create(
+            tenant=self.tenant,
+            name='Sınırlı stok',
+            slug='sinirli-stok',
+            sku='LIMITED-1',
+            price=Decimal('50.00'),
+            status='active',
+            track_inventory=True,
+            inventory_quantity=self.STOCK,
+            virtual_stock_quantity=0,
+            allow_backorder=False,
+        )
+        # Her müşterinin kendi sepeti; hepsi stoğun tükenmediğini görerek başlar
+        self.carts = []
+        for index in range(self.THREADS):
+            cart = Cart.objects.create(tenant=self.tenant, session_id=f'session-{index}')
+            CartItem.objects.create(cart=cart, product=self.product, quantity=1)
+            self.carts.append(cart)
+
+    def place_orders_concurrently(self):
+        barrier = threading.Barrier(self.THREADS)
+        lock = threading.Lock()
+        outcomes = {'succeeded': 0, 'rejected': 0, 'errors': []}
+
+        def place_order(cart):
+            try:
+                barrier.wait()  # Tüm siparişler aynı anda
+                OrderService.create_order_from_cart(
+                    cart,
+                    customer_email=f'{cart.session_id}@example.com',
+                    customer_first_name='Test',
+                    customer_last_name='Müşteri',
+                )
+                outcome = 'succeeded'
+            except ValueError:
+                outcome = 'rejected'  # Yetersiz stok: beklenen ret
+            except Exception as e:
+                with lock:
+                    outcomes['errors'].append(f'{type(e).__name__}: {e}')
+                return
+            finally:
+                connection.close()  # Thread'in kendi connection'ı
+            with lock:
+                outcomes[outcome] += 1
+
+        threads = [threading.Thread(target=place_order, args=(cart,)) for cart in self.carts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_exactly_stock_orders_succeed(self):
+        outcomes = self.place_orders_concurrently()
+
+        self.assertEqual(outcomes['errors'], [])  # Deadlock / beklenmeyen hata yok
+        self.assertEqual(outcomes['succeeded'], self.STOCK)
+        self.assertEqual(outcomes['rejected'], self.THREADS - self.STOCK)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.inventory_quantity, 0)
+        self.assertEqual(Order.objects.filter(tenant=self.tenant).count(), self.STOCK)
+        movements = InventoryMovement.objects.filter(product=self.product)
+        self.assertEqual(movements.count(), self.STOCK)
+        self.assertFalse(movements.filter(new_quantity__lt=0).exists())
@@ -0,0 +1,67 @@
+"""
+Keyset (cursor) sayfalama testleri.
+
+Çalıştırma:
+    python manage.py test apps.tests.test_pagination
+"""
+from decimal import Decimal
+from urllib.parse import parse_qs, urlparse
+
+from django.db.models import F
+from django.test import TestCase
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.models import Product, Tenant, User
+from apps.utils.pagination import KeysetPaginationMixin
+
+
+class KeysetPagination(KeysetPaginationMixin, PageNumberPagination):
+    page_size = 2
+
+
+class AnnotatedOrderingTests(TestCase):
+    """NULL dönebilen annotation'a göre sıralamada hiçbir satır atlanmamalı."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(username='owner', email='owner@example.com', role='tenant_owner')
+        tenant = Tenant.objects.create(name='Keyset', slug='keyset', subdomain='keyset', owner=owner)
+        cls.products = [
+            Product.objects.create(
+                tenant=tenant,
+                name=f'Ürün {index}',
+                slug=f'urun-{index}',
+                price=Decimal('10.00'),
+                compare_at_price=None if index % 2 else Decimal(index),
+            )
+            for index in range(7)
+        ]
+        cls.queryset = Product.objects.filter(tenant=tenant).annotate(sort_key=F('compare_at_price'))
+
+    def collect_pages(self, ordering):
+        """Tüm sayfaları next linkleriyle dolaş."""
+        paginator = KeysetPagination()
+        params = {'pagination': 'cursor'}
+        pages = []
+        while True:
+            request = Request(APIRequestFactory().get('/api/products/', params))
+            rows = paginator.paginate_queryset(self.queryset.order_by(ordering), request)
+            self.assertTrue(paginator.keyset_mode)
+            pages.append([row.id for row in rows])
+            link = paginator.get_next_link()
+            if link is None:
+                return pages
+            params = {'cursor': parse_qs(urlparse(link).query)['cursor'][0]}
+
+    def test_every_row_is_returned_once(self):
+        expected = {product.id for product in self.products}
+        for ordering in ('sort_key', '-sort_key'):
+            with self.subTest(ordering=ordering):
+                ids = [row_id for page in self.collect_pages(ordering) for row_id in page]
+                self.assertEqual(len(ids), len(expected))
+                self.assertEqual(set(ids), expected)
+                # id aynı yönde son sıralama anahtarı olarak eklenir
+                tiebreaker = '-id' if ordering.startswith('-') else 'id'
+                self.assertEqual(ids, list(self.queryset.order_by(ordering, tiebreaker).values_list('id', flat=True)))
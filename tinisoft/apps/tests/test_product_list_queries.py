@@ -0,0 +1,106 @@
+"""
+Ürün listesi serileştirme sorgu bütçesi testleri (PostgreSQL gerektirir).
+
+Çalıştırma:
+    python manage.py test apps.tests.test_product_list_queries
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.models import Brand, Category, Product, ProductImage, ProductVariant, Tenant, User
+from apps.serializers.product import ProductListSerializer
+
+
+class ProductListQueryBudgetTests(TestCase):
+    """ProductListSerializer(many=True) sayfa başına sabit sayıda sorgu çalıştırmalı."""
+
+    # setup_eager_loading ile bir sayfa: ürünler (+tenant, brand_item JOIN), görseller, kategoriler,
+    # varyant grubu ürünleri, depo domain'i (primary domain yoksa 2 sorgu; tenant başına bir kez)
+    QUERY_BUDGET = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(username='owner', email='owner@example.com', role='tenant_owner')
+        cls.tenant = Tenant.objects.create(
+            name='Query Budget', slug='query-budget', subdomain='query-budget', owner=owner,
+        )
+        cls.owner = owner
+        cls.brand = Brand.objects.create(tenant=cls.tenant, name='Marka', slug='marka')
+        cls.categories = [
+            Category.objects.create(tenant=cls.tenant, name=f'Kategori {index}', slug=f'kategori-{index}')
+            for index in range(2)
+        ]
+
+    def create_products(self, count):
+        start = Product.objects.filter(tenant=self.tenant).count()
+        with self.captureOnCommitCallbacks(execute=True):  # Listing alanları commit sonrası doldurulur
+            for index in range(start, start + count):
+                product = Product.objects.create(
+                    tenant=self.tenant,
+                    name=f'Ürün {index}',
+                    slug=f'urun-{index}',
+                    sku=f'SKU-{index}',
+                    variant_group_sku=f'GRP-{index % 3}',
+                    price=Decimal('100.00'),
+                    status='active',
+                    inventory_quantity=5,
+                    brand_item=self.brand,
+                    is_variant_product=index % 2 == 0,
+                )
+                product.categories.set(self.categories)
+                for position in range(2):
+                    ProductImage.objects.create(
+                        product=product,
+                        image_url=f'https://cdn.example.com/{index}-{position}.jpg',
+                        position=position,
+                        is_primary=position == 0,
+                    )
+                if product.is_variant_product:
+                    for price in ('90.00', '120.00'):
+                        ProductVariant.objects.create(
+                            product=product, name=f'Varyant {price}', price=Decimal(price), inventory_quantity=3,
+                        )
+
+    def serialize_page(self):
+        """product_list_create (GET) ile aynı queryset ve serializer akışı."""
+        request = RequestFactory().get('/api/products/')
+        request.user = self.owner
+        queryset = ProductListSerializer.setup_eager_loading(
+            Product.objects.filter(tenant=self.tenant, is_deleted=False).order_by('-created_at')
+        )
+        with CaptureQueriesContext(connection) as context:
+            data = ProductListSerializer(queryset[:100], many=True, context={'request': request}).data
+        return data, len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.create_products(2)
+        small_page, small_queries = self.serialize_page()
+
+        self.create_products(12)
+        large_page, large_queries = self.serialize_page()
+
+        self.assertEqual(len(small_page), 2)
+        self.assertEqual(len(large_page), 14)
+        self.assertEqual(small_queries, large_queries)
+
+    def test_page_stays_within_query_budget(self):
+        self.create_products(10)
+        request = RequestFactory().get('/api/products/')
+        request.user = self.owner
+        queryset = ProductListSerializer.setup_eager_loading(
+            Product.objects.filter(tenant=self.tenant, is_deleted=False).order_by('-created_at')
+        )
+
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            data = ProductListSerializer(queryset, many=True, context={'request': request}).data
+
+        row = next(item for item in data if item['slug'] == 'urun-0')
+        self.assertEqual(row['primary_image'], 'https://cdn.example.com/0-0.jpg')
+        self.assertEqual(len(row['images']), 2)
+        self.assertEqual(sorted(row['category_names']), ['Kategori 0', 'Kategori 1'])
+        self.assertEqual(row['brand_name'], 'Marka')
+        self.assertEqual((row['min_price'], row['max_price']), (Decimal('90.00'), Decimal('120.00')))
+        self.assertTrue(row['variant_group_products'])
@@ -0,0 +1,48 @@
+"""
+Arama servisi testleri.
+
+Çalıştırma:
+    python manage.py test apps.tests.test_search_service
+"""
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.services import search_service
+from apps.services.search_service import SearchService
+
+
+class FullTextAvailabilityTests(SimpleTestCase):
+    """Kurulu değil sonucu kısa süre cache'lenmeli; kurulum sonradan fark edilmeli."""
+
+    def setUp(self):
+        self.addCleanup(mock.patch.stopall)
+        mock.patch.multiple(search_service, _full_text_available=None, _full_text_checked_at=0.0).start()
+        self.connection = mock.patch.object(search_service, 'connection').start()
+        self.connection.vendor = 'postgresql'
+        self.cursor = self.connection.cursor.return_value.__enter__.return_value
+        self.clock = mock.patch.object(search_service.time, 'monotonic', return_value=1000.0).start()
+
+    def installed(self, value):
+        self.cursor.fetchone.return_value = (value,)
+
+    def test_negative_result_is_rechecked_after_interval(self):
+        self.installed(False)
+        self.assertFalse(SearchService.is_full_text_available())
+
+        self.installed(True)
+        self.clock.return_value += search_service.FULL_TEXT_RECHECK_INTERVAL - 1
+        self.assertFalse(SearchService.is_full_text_available())
+        self.assertEqual(self.cursor.execute.call_count, 1)
+
+        self.clock.return_value += 2
+        self.assertTrue(SearchService.is_full_text_available())
+        self.assertEqual(self.cursor.execute.call_count, 2)
+
+    def test_positive_result_is_kept(self):
+        self.installed(True)
+        self.assertTrue(SearchService.is_full_text_available())
+
+        self.clock.return_value += 10 * search_service.FULL_TEXT_RECHECK_INTERVAL
+        self.assertTrue(SearchService.is_full_text_available())
+        self.assertEqual(self.cursor.execute.call_count, 1)
@@ -0,0 +1,56 @@
+"""
+Kargo durumu senkronizasyonu testleri (sahte SOAP sunucusu ile, DB gerektirmez).
+
+Çalıştırma:
+    python manage.py test apps.tests.test_shipment_sync_service
+"""
+from contextlib import nullcontext
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.models import Order
+from apps.services.shipment_sync_service import ShipmentSyncService
+from apps.tests.test_aras_cargo_service import FakeSoapServerMixin
+
+
+class ShipmentSyncBulkUpdateTests(FakeSoapServerMixin, SimpleTestCase):
+    """ShipmentSyncService.sync_tenant: değişen kargo alanlarının toplu yazımı."""
+
+    def test_sync_writes_only_cargo_fields_and_collects_transitions(self):
+        orders = self.make_orders(4, status=Order.OrderStatus.PROCESSING)
+        unchanged = orders[2]
+        self.server.delivered_codes = {'ORD0001'}
+        self.server.failing_codes = {'ORD0003'}
+        # Cevabı değişmemiş gönderi: hash önceki sorgudan
+        unchanged.cargo_status_hash = ShipmentSyncService.compute_hash({
+            'status': 'YOLDA', 'status_code': '7', 'tracking_number': 'TRKORD0002', 'events': [],
+        })
+
+        queryset = mock.MagicMock()
+        with mock.patch.object(ShipmentSyncService, 'get_due_orders', return_value=orders), \
+                mock.patch('apps.services.shipment_sync_service.transaction.atomic', return_value=nullcontext()), \
+                mock.patch.object(Order.objects, 'filter', return_value=queryset) as order_filter, \
+                mock.patch.object(Order.objects, 'bulk_update') as bulk_update, \
+                mock.patch.object(ShipmentSyncService, '_apply_transition', return_value=True) as apply_transition:
+            stats = ShipmentSyncService.sync_tenant(self.tenant)
+
+        self.assertEqual(stats, {'checked': 4, 'changed': 2, 'unchanged': 1, 'failed': 1, 'transitions': 2})
+
+        # track_shipments_bulk persist=False ile çağrılır: tek bulk_update sync'in kendisinden
+        bulk_update.assert_called_once()
+        changed_orders, fields = bulk_update.call_args[0]
+        self.assertEqual([order.id for order in changed_orders], [orders[0].id, orders[1].id])
+        self.assertNotIn('status', fields)
+        self.assertNotIn('tracking_number', fields)
+
+        # Takip numarası sadece boşsa yazılır; sorgulanan ama değişmeyenlerin checked_at'i güncellenir
+        order_filter.assert_any_call(id=orders[0].id, tracking_number='')
+        order_filter.assert_any_call(id__in=[unchanged.id, orders[3].id])
+
+        apply_transition.assert_has_calls([
+            mock.call(orders[0].id, Order.OrderStatus.SHIPPED, mock.ANY),
+            mock.call(orders[1].id, Order.OrderStatus.DELIVERED, mock.ANY),
+        ])
+        # Siparişin kendisi bulk_update ile ilerletilmez
+        self.assertEqual(orders[1].status, Order.OrderStatus.PROCESSING)
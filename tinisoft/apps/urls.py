@@ -29,8 +29,8 @@ from apps.views.product_image_delete import (
 )
 from apps.views.product_image_from_excel import upload_images_from_excel_paths
 from apps.views.order import order_list_create, order_detail, order_track, order_delete, order_delete_all
-from apps.views.aras_cargo import aras_create_shipment, aras_track_shipment, aras_print_label, aras_cancel_shipment
-from apps.views.aras_cargo import aras_create_shipment, aras_track_shipment, aras_print_label, aras_cancel_shipment
+from apps.views.aras_cargo import aras_create_shipment, aras_track_shipment, aras_track_shipments_bulk, aras_print_label, aras_cancel_shipment
+from apps.views.aras_cargo import aras_create_shipment, aras_track_shipment, aras_track_shipments_bulk, aras_print_label, aras_cancel_shipment
 from apps.views.cart import (
     cart_detail, add_to_cart, cart_item_detail,
     update_shipping_method, apply_coupon, merge_cart
@@ -51,7 +51,7 @@ from apps.views.search import search_products, search_suggestions, filter_option
 from apps.views.bulk import (
     bulk_update_products, bulk_delete_products,
     bulk_update_order_status, bulk_export_products,
-    bulk_create_products
+    bulk_export_download, bulk_create_products
 )
 from apps.views.loyalty import loyalty_program, my_loyalty_points, loyalty_transactions
 from apps.views.review import review_list, review_create, review_list_all, review_detail, review_helpful
@@ -223,6 +223,7 @@ urlpatterns = [
     path('orders/<uuid:order_id>/delete/', order_delete, name='order_delete'),  # DELETE: Hard delete order
     
     # Aras Kargo API
+    path('aras/track/bulk/', aras_track_shipments_bulk, name='aras_track_shipments_bulk'),  # POST: Toplu gönderi takip
     path('aras/track/<str:tracking_number>/', aras_track_shipment, name='aras_track_shipment'),  # GET: Gönderi takip
     path('aras/label/<str:tracking_number>/', aras_print_label, name='aras_print_label'),  # GET: Etiket yazdır
     path('aras/cancel/<str:tracking_number>/', aras_cancel_shipment, name='aras_cancel_shipment'),  # POST: Gönderi iptal
@@ -281,6 +282,7 @@ urlpatterns = [
     path('bulk/products/update/', bulk_update_products, name='bulk_update_products'),  # POST: Bulk update products
     path('bulk/products/delete/', bulk_delete_products, name='bulk_delete_products'),  # POST: Bulk delete products
     path('bulk/products/export/', bulk_export_products, name='bulk_export_products'),  # POST: Bulk export products
+    path('bulk/products/export/<str:task_id>/', bulk_export_download, name='bulk_export_download'),  # GET: XLSX export durumu / indir
     path('bulk/orders/update-status/', bulk_update_order_status, name='bulk_update_order_status'),  # POST: Bulk update order status
     
     # Sadakat puanları
@@ -0,0 +1,17 @@
+"""
+IP adresi yardımcıları.
+"""
+import ipaddress
+
+
+def clean_ip_address(value):
+    """
+    İstemciden gelen IP değerini doğrula (X-Forwarded-For, CF-Connecting-IP gibi başlıklar
+    istemci kontrolündedir). GenericIPAddressField'a yazılabilir normalize değer veya None döner.
+    """
+    if not value:
+        return None
+    try:
+        return str(ipaddress.ip_address(str(value).strip()))
+    except ValueError:
+        return None
@@ -3,15 +3,13 @@ JWT token utilities.
 Token oluşturma ve doğrulama işlemleri.
 """
 import jwt
+import uuid
 from datetime import datetime, timedelta
 from django.conf import settings
-from django.contrib.auth import get_user_model
 import logging
 
 logger = logging.getLogger(__name__)
 
-User = get_user_model()
-
 
 def get_jwt_secret_key():
     """JWT secret key'i al. SECRET_KEY kullanılır."""
@@ -28,6 +26,11 @@ def get_jwt_expiration_hours():
     return getattr(settings, 'JWT_EXPIRATION_HOURS', 24)
 
 
+def is_jwt_principal_embedded():
+    """Yetki claim'leri (rol, tenant, personel yetkileri) token'a gömülsün mü?"""
+    return getattr(settings, 'JWT_EMBED_PRINCIPAL', False)
+
+
 def generate_jwt_token(user):
     """
     Kullanıcı için JWT token oluştur.
@@ -45,11 +48,15 @@ def generate_jwt_token(user):
             'email': user.email,
             'username': user.username,
             'role': user.role if hasattr(user, 'role') else None,
-            'tenant_id': str(user.tenant.id) if user.tenant else None,
+            'tenant_id': str(user.tenant_id) if user.tenant_id else None,
             'is_owner': user.is_owner if hasattr(user, 'is_owner') else False,
+            'jti': uuid.uuid4().hex,  # Token kimliği (revocation listesi için)
             'iat': datetime.utcnow(),  # Issued at
             'exp': datetime.utcnow() + timedelta(hours=get_jwt_expiration_hours()),  # Expiration
         }
+        if is_jwt_principal_embedded():
+            from apps.services.principal_cache_service import PrincipalCacheService
+            payload['principal'] = PrincipalCacheService.get_claims(user)
         
         # Token oluştur
         token = jwt.encode(
@@ -70,6 +77,10 @@ def verify_jwt_token(token):
     """
     JWT token'ı doğrula ve user'ı döndür.
     
+    User DB'den değil principal cache'inden (process içi LRU + Redis) gelir.
+    JWT_EMBED_PRINCIPAL açıksa önce revocation listesi kontrol edilir; kullanıcı
+    token üretildikten sonra değişmediyse user doğrudan token claim'lerinden oluşturulur.
+    
     Args:
         token: JWT token string
     
@@ -90,19 +101,29 @@ def verify_jwt_token(token):
             logger.warning("JWT token missing user_id")
             return None, None
         
-        try:
-            user = User.objects.get(id=user_id)
-            
-            # User aktif mi kontrol et
-            if not user.is_active:
-                logger.warning(f"User {user.email} is not active")
+        from apps.services.principal_cache_service import PrincipalCacheService
+        
+        user = None
+        if is_jwt_principal_embedded():
+            state = PrincipalCacheService.get_token_state(payload)
+            if PrincipalCacheService.is_token_revoked(payload, state):
+                logger.warning(f"Revoked JWT token used for user: {user_id}")
                 return None, None
-            
-            return user, payload
-            
-        except User.DoesNotExist:
+            if PrincipalCacheService.is_token_current(payload, state):
+                user = PrincipalCacheService.from_claims(payload)
+        
+        if user is None:
+            user = PrincipalCacheService.get(user_id)
+        if user is None:
             logger.warning(f"User not found: {user_id}")
             return None, None
+        
+        # User aktif mi kontrol et
+        if not user.is_active:
+            logger.warning(f"User {user.email} is not active")
+            return None, None
+        
+        return user, payload
             
     except jwt.ExpiredSignatureError:
         logger.warning("JWT token expired")
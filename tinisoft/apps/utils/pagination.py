@@ -0,0 +1,290 @@
+"""
+Pagination yardımcıları - Keyset (cursor) sayfalama ve tahmini toplam sayı.
+
+PageNumberPagination OFFSET ile çalışır ve her sayfada ayrıca COUNT(*) çalıştırır; derin
+sayfalar (crawler, sonsuz kaydırma) tam tablo taraması kadar yavaşlar. KeysetPaginationMixin
+mevcut pagination sınıflarına opt-in iki mod ekler:
+
+- ?pagination=cursor  -> Keyset sayfalama. Sıralama alanları + id üzerinden "son görülen
+  satırdan sonrası" sorgulanır (OFFSET / COUNT yok). Yanıttaki next / previous linkleri
+  opak ?cursor=... değeri taşır.
+- ?count=estimated    -> Toplam sayı COUNT(*) yerine planner tahmininden (pg_class.reltuples
+  ve kolon istatistikleri) alınır. Her iki modda da kullanılabilir.
+
+Parametre verilmezse davranış eskisiyle aynıdır (sayfa numarası + kesin sayı).
+"""
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+from collections import OrderedDict
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import OrderBy
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Tahmin bu değerin altındaysa kesin COUNT zaten ucuzdur (ve küçük sonuçlarda tahmin sapması büyüktür)
+ESTIMATE_EXACT_THRESHOLD = 1000
+
+
+def estimate_count(queryset, exact_threshold=ESTIMATE_EXACT_THRESHOLD):
+    """
+    Queryset'in satır sayısını PostgreSQL planner tahmininden al (EXPLAIN, sorgu çalıştırılmaz).
+    Planner tahmini pg_class.reltuples ve pg_statistic üzerinden filtre seçiciliğini hesaplar.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+    if estimate < exact_threshold:
+        return queryset.count()
+    return estimate
+
+
+class EstimatedCountPaginator(DjangoPaginator):
+    """
+    Toplam sayıyı tahminden alan Django paginator'ı.
+    Tahmin gerçek sayıdan küçük olabileceği için sayfa numarası üst sınırla doğrulanmaz ve
+    sayfa dilimi sayıya göre kırpılmaz.
+    """
+
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise InvalidPage('Sayfa numarası geçersiz.')
+        if number < 1:
+            raise InvalidPage('Sayfa numarası 1\'den küçük olamaz.')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+class KeysetPaginationMixin:
+    """
+    PageNumberPagination alt sınıflarına keyset (cursor) modu ve tahmini sayı ekler.
+
+    Kullanım:
+        class ProductPagination(KeysetPaginationMixin, PageNumberPagination): ...
+    """
+
+    cursor_query_param = 'cursor'
+    pagination_mode_query_param = 'pagination'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Geçersiz cursor.'
+
+    # ------------------------------------------------------------------
+    # Giriş noktası
+    # ------------------------------------------------------------------
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.keyset_mode = False
+        self.estimated_count = request.query_params.get(self.count_query_param) == 'estimated'
+        self._keyset_count = None
+
+        if self._is_keyset_request(request):
+            ordering = self._get_keyset_ordering(queryset)
+            if ordering is not None:
+                self.keyset_mode = True
+                return self._paginate_keyset(queryset, request, ordering)
+            # Keyset'e uygun olmayan sıralama (ilişki alanı, ifade, rastgele) - sayfa numarasına düş
+
+        if self.estimated_count:
+            self.django_paginator_class = EstimatedCountPaginator
+        return super().paginate_queryset(queryset, request, view=view)
+
+    def _is_keyset_request(self, request):
+        return (
+            request.query_params.get(self.pagination_mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    @property
+    def total_count(self):
+        """Toplam kayıt sayısı (keyset modunda sadece ?count=estimated ile, aksi halde None)."""
+        if self.keyset_mode:
+            return self._keyset_count
+        return self.page.paginator.count
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', self._keyset_count),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.keyset_mode:
+            return super().get_next_link()
+        if self._next_values is None:
+            return None
+        return self._build_cursor_link(self._next_values, reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset_mode:
+            return super().get_previous_link()
+        if self._previous_values is None:
+            return None
+        return self._build_cursor_link(self._previous_values, reverse=True)
+
+    # ------------------------------------------------------------------
+    # Keyset
+    # ------------------------------------------------------------------
+
+    def _get_keyset_ordering(self, queryset):
+        """
+        Queryset sıralamasını [(alan, azalan_mı, nullable), ...] olarak çöz, sona id ekle.
+        Keyset'e uygun değilse None.
+        """
+        query = queryset.query
+        ordering = list(query.order_by)
+        if not ordering and query.default_ordering:
+            ordering = list(queryset.model._meta.ordering)
+
+        opts = queryset.model._meta
+        pk_name = opts.pk.name
+        resolved = []
+        for item in ordering:
+            if isinstance(item, str):
+                if item == '?':
+                    return None
+                descending = item.startswith('-')
+                name = item.lstrip('-+')
+            elif isinstance(item, OrderBy) and isinstance(item.expression, F) and not (item.nulls_first or item.nulls_last):
+                descending = item.descending
+                name = item.expression.name
+            else:
+                return None
+            if name == 'pk':
+                name = pk_name
+
+            if name in query.annotations:
+                # İfadenin NULL dönüp dönmeyeceği bilinmez (örn. search_rank, Max(...)) - nullable kabul edilir
+                nullable = True
+            else:
+                if '__' in name:
+                    return None
+                try:
+                    field = opts.get_field(name)
+                except FieldDoesNotExist:
+                    return None
+                # İlişki adına göre sıralama ilişkili modelin ordering'ini kullanır - desteklenmez
+                if field.is_relation or not getattr(field, 'concrete', False):
+                    return None
+                nullable = field.null
+            resolved.append((name, descending, nullable))
+            if name == pk_name:
+                break
+
+        if not any(name == pk_name for name, _, _ in resolved):
+            resolved.append((pk_name, resolved[-1][1] if resolved else False, False))
+        return resolved
+
+    def _paginate_keyset(self, queryset, request, ordering):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        cursor = self._decode_cursor(request, len(ordering))
+        reverse = cursor['r'] if cursor else False
+
+        # Geri giderken sıralama ters çevrilir (PostgreSQL'de NULL yerleşimi de birlikte döner)
+        effective = [(name, descending != reverse, nullable) for name, descending, nullable in ordering]
+        queryset = queryset.order_by(*[('-' if descending else '') + name for name, descending, _ in effective])
+
+        if self.estimated_count:
+            self._keyset_count = estimate_count(queryset)
+
+        if cursor:
+            queryset = queryset.filter(self._build_after_q(effective, cursor['v']))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next = True if reverse else has_more
+        has_previous = has_more if reverse else cursor is not None
+        self._next_values = self._row_values(rows[-1], ordering) if rows and has_next else None
+        self._previous_values = self._row_values(rows[0], ordering) if rows and has_previous else None
+        return rows
+
+    @staticmethod
+    def _build_after_q(ordering, values):
+        """
+        (a, b, id) > (x, y, z) karşılaştırmasını alan yönlerine göre Q'ya çevir:
+        a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)
+        NULL yerleşimi PostgreSQL varsayılanıdır: artan sıralamada sonda, azalanda başta.
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending, nullable), value in zip(ordering, values):
+            if value is None:
+                after = Q(**{f'{name}__isnull': False}) if descending else Q(pk__in=[])
+                same = Q(**{f'{name}__isnull': True})
+            else:
+                after = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+                if nullable and not descending:
+                    after |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+            condition |= equal & after
+            equal &= same
+        return condition
+
+    @staticmethod
+    def _row_values(row, ordering):
+        return [KeysetPaginationMixin._encode_value(getattr(row, name)) for name, _, _ in ordering]
+
+    @staticmethod
+    def _encode_value(value):
+        # Mikro saniye korunur (DjangoJSONEncoder milisaniyeye kırpar, keyset kayar)
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, (decimal.Decimal, uuid.UUID)):
+            return str(value)
+        return value
+
+    def _build_cursor_link(self, values, reverse):
+        payload = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        url = remove_query_param(url, self.pagination_mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def _decode_cursor(self, request, expected_length):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+            values = payload['v']
+            reverse = bool(payload.get('r'))
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != expected_length:
+            # Sıralama parametresi değişmiş veya cursor bozuk
+            raise NotFound(self.invalid_cursor_message)
+        return {'v': values, 'r': reverse}
@@ -16,7 +16,7 @@ from .customer import customer_list, customer_detail, update_customer_statistics
 from .inventory import inventory_movement_list_create, inventory_movement_detail
 from .bulk import (
     bulk_update_products, bulk_delete_products,
-    bulk_update_order_status, bulk_export_products
+    bulk_update_order_status, bulk_export_products, bulk_export_download
 )
 from .search import search_products, search_suggestions, filter_options
 from .loyalty import loyalty_program, my_loyalty_points, loyalty_transactions
@@ -54,6 +54,7 @@ __all__ = [
     'bulk_delete_products',
     'bulk_update_order_status',
     'bulk_export_products',
+    'bulk_export_download',
     'search_products',
     'search_suggestions',
     'filter_options',
@@ -6,22 +6,22 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q, Sum, Count, Avg
-from django.utils import timezone
-from datetime import timedelta
-from decimal import Decimal
-from apps.models import AnalyticsEvent, SalesReport, ProductAnalytics, Order, OrderItem
+from django.db.models import Q
+from apps.models import AnalyticsEvent, SalesReport, ProductAnalytics
 from apps.serializers.analytics import (
-    AnalyticsEventSerializer, AnalyticsEventCreateSerializer,
+    AnalyticsEventSerializer,
     SalesReportSerializer, ProductAnalyticsSerializer
 )
+from apps.services.analytics_rollup_service import AnalyticsRollupService
+from apps.services.analytics_ingest_service import AnalyticsIngestService, AnalyticsBackpressure
 from core.middleware import get_tenant_from_request
+from apps.utils.pagination import KeysetPaginationMixin
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class AnalyticsPagination(PageNumberPagination):
+class AnalyticsPagination(KeysetPaginationMixin, PageNumberPagination):
     page_size = 50
     page_size_query_param = 'page_size'
     max_page_size = 200
@@ -31,7 +31,10 @@ class AnalyticsPagination(PageNumberPagination):
 @permission_classes([AllowAny])  # Public endpoint - analytics tracking için
 def analytics_event_create(request):
     """
-    Analytics event oluştur (public endpoint).
+    Analytics event(ler)i kaydet (public endpoint).
+    
+    Event'ler DB'ye istek sırasında yazılmaz; kuyruğa alınır ve arka planda toplu yazılır.
+    Tek event, event listesi veya {"events": [...]} gönderilebilir (en fazla 100).
     
     POST: /api/analytics/events/
     """
@@ -42,54 +45,45 @@ def analytics_event_create(request):
             'message': 'Tenant bulunamadı.',
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    serializer = AnalyticsEventCreateSerializer(data=request.data)
-    
-    if serializer.is_valid():
-        # IP adresini al
-        ip_address = None
-        if request:
-            x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-            if x_forwarded_for:
-                ip_address = x_forwarded_for.split(',')[0]
-            else:
-                ip_address = request.META.get('REMOTE_ADDR')
-        
-        # User agent
-        user_agent = request.META.get('HTTP_USER_AGENT', '')
-        
-        # Referrer
-        referrer = request.META.get('HTTP_REFERER', '')
-        
-        # URL
-        url = request.build_absolute_uri()
-        
-        # Customer bilgisi
-        customer = None
-        if request.user.is_authenticated:
-            customer = request.user
-        
-        event = AnalyticsEvent.objects.create(
-            tenant=tenant,
-            customer=customer,
-            session_id=serializer.validated_data.get('session_id', ''),
-            event_type=serializer.validated_data['event_type'],
-            event_data=serializer.validated_data.get('event_data', {}),
-            ip_address=ip_address or serializer.validated_data.get('ip_address'),
-            user_agent=user_agent or serializer.validated_data.get('user_agent', ''),
-            referrer=referrer or serializer.validated_data.get('referrer', ''),
-            url=url or serializer.validated_data.get('url', ''),
-        )
-        
+    events, errors = AnalyticsIngestService.parse_events(request.data)
+    if not events:
         return Response({
-            'success': True,
-            'message': 'Event kaydedildi.',
-            'event': AnalyticsEventSerializer(event).data,
-        }, status=status.HTTP_201_CREATED)
+            'success': False,
+            'errors': errors,
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # IP adresini al
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        ip_address = x_forwarded_for.split(',')[0].strip()
+    else:
+        ip_address = request.META.get('REMOTE_ADDR')
+    
+    # İstekten gelen ortak alanlar (event'te referrer / url varsa o kullanılır)
+    context = {
+        'customer_id': str(request.user.id) if request.user.is_authenticated else None,
+        'ip_address': ip_address,
+        'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+        'referrer': request.META.get('HTTP_REFERER', '')[:1000],
+        'url': request.build_absolute_uri()[:1000],
+    }
+    
+    try:
+        result = AnalyticsIngestService.enqueue(tenant, events, context)
+    except AnalyticsBackpressure:
+        response = Response({
+            'success': False,
+            'message': 'Event kuyruğu dolu, lütfen daha sonra tekrar deneyin.',
+        }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        response['Retry-After'] = '30'
+        return response
     
     return Response({
-        'success': False,
-        'errors': serializer.errors,
-    }, status=status.HTTP_400_BAD_REQUEST)
+        'success': True,
+        'accepted': result['accepted'],
+        'sampled_out': result['sampled_out'],
+        'errors': errors,
+    }, status=status.HTTP_202_ACCEPTED)
 
 
 @api_view(['GET'])
@@ -181,73 +175,18 @@ def analytics_dashboard(request):
             'message': 'Bu işlem için yetkiniz yok.',
         }, status=status.HTTP_403_FORBIDDEN)
     
-    # Tarih aralığı (varsayılan: son 30 gün)
-    days = int(request.query_params.get('days', 30))
-    date_from = timezone.now() - timedelta(days=days)
-    
-    # Toplam siparişler
-    total_orders = Order.objects.filter(
-        tenant=tenant,
-        created_at__gte=date_from,
-        is_deleted=False
-    ).count()
-    
-    # Toplam gelir
-    total_revenue = Order.objects.filter(
-        tenant=tenant,
-        created_at__gte=date_from,
-        status__in=['delivered'],
-        is_deleted=False
-    ).aggregate(Sum('total'))['total__sum'] or Decimal('0.00')
-    
-    # Ortalama sipariş değeri
-    avg_order_value = Order.objects.filter(
-        tenant=tenant,
-        created_at__gte=date_from,
-        status__in=['delivered'],
-        is_deleted=False
-    ).aggregate(Avg('total'))['total__avg'] or Decimal('0.00')
-    
-    # Toplam ürün satışı
-    total_products_sold = OrderItem.objects.filter(
-        order__tenant=tenant,
-        order__created_at__gte=date_from,
-        order__status__in=['delivered'],
-        order__is_deleted=False
-    ).aggregate(Sum('quantity'))['quantity__sum'] or 0
-    
-    # Yeni müşteriler
-    new_customers = Order.objects.filter(
-        tenant=tenant,
-        created_at__gte=date_from,
-        is_deleted=False
-    ).values('customer_email').distinct().count()
-    
-    # Event istatistikleri
-    event_stats = AnalyticsEvent.objects.filter(
-        tenant=tenant,
-        created_at__gte=date_from
-    ).values('event_type').annotate(count=Count('id')).order_by('-count')
+    # Tarih aralığı (varsayılan: son 30 gün, bugün dahil)
+    try:
+        days = max(1, min(int(request.query_params.get('days', 30)), 3650))
+    except (TypeError, ValueError):
+        days = 30
+    
+    # Geçmiş günler günlük rollup'lardan, bugün canlı hesaplanır
+    dashboard = AnalyticsRollupService.get_dashboard(tenant, days)
     
     return Response({
         'success': True,
-        'dashboard': {
-            'period': {
-                'days': days,
-                'date_from': date_from,
-                'date_to': timezone.now(),
-            },
-            'orders': {
-                'total': total_orders,
-                'total_revenue': str(total_revenue),
-                'average_order_value': str(avg_order_value),
-                'total_products_sold': total_products_sold,
-            },
-            'customers': {
-                'new_customers': new_customers,
-            },
-            'events': list(event_stats),
-        },
+        'dashboard': dashboard,
     })
 
 
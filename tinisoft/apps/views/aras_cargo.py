@@ -2,6 +2,7 @@
 Aras Kargo API endpoints.
 Integration modelinden API bilgilerini alır ve kullanır.
 """
+from django.core.exceptions import ValidationError
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
@@ -13,6 +14,8 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+MAX_BULK_TRACK_ORDERS = 500
+
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -181,6 +184,75 @@ def aras_track_shipment(request, tracking_number):
         }, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def aras_track_shipments_bulk(request):
+    """
+    Birden fazla siparişin kargo durumunu tek istekte güncelle (Aras Kargo).
+    
+    POST: /api/aras/track/bulk/
+    Body: {"order_ids": ["uuid1", "uuid2", ...]}
+    """
+    tenant = get_tenant_from_request(request)
+    if not tenant:
+        return Response({
+            'success': False,
+            'message': 'Tenant bulunamadı.',
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Sadece tenant owner veya owner
+    if not (request.user.is_owner or (request.user.is_tenant_owner and request.user.tenant == tenant)):
+        return Response({
+            'success': False,
+            'message': 'Bu işlem için yetkiniz yok.',
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    order_ids = request.data.get('order_ids') or []
+    if not isinstance(order_ids, list) or not order_ids:
+        return Response({
+            'success': False,
+            'message': 'order_ids listesi gereklidir.',
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(order_ids) > MAX_BULK_TRACK_ORDERS:
+        return Response({
+            'success': False,
+            'message': f'Tek istekte en fazla {MAX_BULK_TRACK_ORDERS} sipariş sorgulanabilir.',
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        orders = list(Order.objects.filter(tenant=tenant, id__in=order_ids, is_deleted=False))
+    except (ValueError, ValidationError):
+        return Response({
+            'success': False,
+            'message': 'Geçersiz sipariş ID.',
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    result = ArasCargoService.track_shipments_bulk(tenant, orders)
+    if not result.get('success'):
+        return Response({
+            'success': False,
+            'message': result.get('error', 'Takip bilgisi alınamadı.'),
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'success': True,
+        'updated': result['updated'],
+        'failed': result['failed'],
+        'orders': [
+            {
+                'id': str(order.id),
+                'order_number': order.order_number,
+                'tracking_number': order.tracking_number,
+                'cargo_status': order.cargo_status,
+                'cargo_status_code': order.cargo_status_code,
+                'cargo_checked_at': order.cargo_checked_at,
+                'error': result['results'][str(order.id)].get('error', ''),
+            }
+            for order in orders
+        ],
+    })
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def aras_print_label(request, tracking_number):
@@ -7,13 +7,21 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db import transaction
+from django.http import StreamingHttpResponse, FileResponse
+from django.utils import timezone
 from apps.models import Product, Category, Order
 from apps.permissions import IsTenantOwnerOfObject
+from apps.services.product_listing_service import ProductListingService
 from core.middleware import get_tenant_from_request
+from core.db_router import get_tenant_schema
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Toplu güncellemede ürünün listing_* alanlarını etkileyen alanlar (ProductListingService)
+LISTING_SOURCE_FIELDS = frozenset({'price', 'track_inventory', 'inventory_quantity'})
+
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -204,7 +212,14 @@ def bulk_update_products(request):
                     is_deleted=False,
                 )
             
+            # Fiyat / stok alanları listing kolonlarını etkiler; update() signal tetiklemez
+            refresh_ids = None
+            if LISTING_SOURCE_FIELDS & filtered_updates.keys():
+                refresh_ids = list(products.values_list('id', flat=True))
+            
             updated_count = products.update(**filtered_updates)
+            if refresh_ids:
+                ProductListingService.schedule_refresh(refresh_ids)
             
             logger.info(f"Bulk update: {updated_count} products updated by {request.user.email}")
             
@@ -365,13 +380,17 @@ def bulk_update_order_status(request):
 @permission_classes([IsAuthenticated])
 def bulk_export_products(request):
     """
-    Toplu ürün export (CSV/JSON).
+    Toplu ürün export (CSV/NDJSON/XLSX/JSON).
     
     POST: /api/bulk/products/export/
     Body: {
         "product_ids": ["uuid1", "uuid2", ...],  # Boş = tümü
-        "format": "csv"  # csv veya json
+        "format": "csv"  # csv, ndjson, xlsx veya json
     }
+    
+    - csv / ndjson: Dosya stream edilir (bellek kullanımı katalog boyutundan bağımsız)
+    - xlsx: Celery task başlatılır, task_id ile /api/bulk/products/export/{task_id}/ üzerinden indirilir
+    - json: ProductListSerializer çıktısı (küçük seçimler için)
     """
     tenant = get_tenant_from_request(request)
     if not tenant:
@@ -388,9 +407,39 @@ def bulk_export_products(request):
         }, status=status.HTTP_403_FORBIDDEN)
     
     product_ids = request.data.get('product_ids', [])
-    export_format = request.data.get('format', 'json')
+    export_format = str(request.data.get('format', 'json')).lower()
     
     try:
+        from apps.services.product_export_service import ProductExportService
+        
+        if export_format in ('csv', 'ndjson'):
+            timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+            if export_format == 'csv':
+                stream = ProductExportService.stream_csv(tenant, product_ids, schema_name=get_tenant_schema())
+                content_type = 'text/csv; charset=utf-8'
+            else:
+                stream = ProductExportService.stream_ndjson(tenant, product_ids, schema_name=get_tenant_schema())
+                content_type = 'application/x-ndjson; charset=utf-8'
+            response = StreamingHttpResponse(stream, content_type=content_type)
+            response['Content-Disposition'] = f'attachment; filename="products_{timestamp}.{export_format}"'
+            logger.info(f"Bulk export ({export_format}) streamed by {request.user.email} for tenant {tenant.id}")
+            return response
+        
+        if export_format == 'xlsx':
+            from apps.tasks.export_task import export_products_xlsx_task
+            task = export_products_xlsx_task.delay(
+                tenant_id=str(tenant.id),
+                product_ids=[str(product_id) for product_id in product_ids] or None,
+            )
+            return Response({
+                'success': True,
+                'message': 'XLSX export başlatıldı. Task ID ile dosyayı indirebilirsiniz.',
+                'task_id': task.id,
+                'status': 'PENDING',
+                'format': export_format,
+                'download_url': f'/api/bulk/products/export/{task.id}/',
+            }, status=status.HTTP_202_ACCEPTED)
+        
         products = Product.objects.filter(
             tenant=tenant,
             is_deleted=False,
@@ -399,16 +448,15 @@ def bulk_export_products(request):
         if product_ids:
             products = products.filter(id__in=product_ids)
         
-        # TODO: CSV/JSON export implementasyonu
-        # Şimdilik sadece JSON döndür
         from apps.serializers.product import ProductListSerializer
         serializer = ProductListSerializer(products, many=True)
+        data = serializer.data
         
         return Response({
             'success': True,
-            'message': f'{products.count()} ürün export edildi.',
+            'message': f'{len(data)} ürün export edildi.',
             'format': export_format,
-            'data': serializer.data,
+            'data': data,
         })
     except Exception as e:
         logger.error(f"Bulk export error: {e}")
@@ -417,3 +465,67 @@ def bulk_export_products(request):
             'message': f'Export hatası: {str(e)}',
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def bulk_export_download(request, task_id):
+    """
+    XLSX export task durumunu döndür; tamamlandıysa dosyayı indir.
+    
+    GET: /api/bulk/products/export/{task_id}/
+    """
+    tenant = get_tenant_from_request(request)
+    if not tenant:
+        return Response({
+            'success': False,
+            'message': 'Tenant bulunamadı.',
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Permission kontrolü
+    if not (request.user.is_owner or (request.user.is_tenant_owner and request.user.tenant == tenant)):
+        return Response({
+            'success': False,
+            'message': 'Bu işlem için yetkiniz yok.',
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    from celery.result import AsyncResult
+    from apps.services.product_export_service import ProductExportService
+    
+    task_result = AsyncResult(task_id)
+    if task_result.state == 'FAILURE':
+        return Response({
+            'success': False,
+            'status': 'FAILURE',
+            'message': 'Export işlemi başarısız oldu.',
+            'error': str(task_result.info),
+        }, status=status.HTTP_200_OK)
+    
+    if task_result.state != 'SUCCESS':
+        return Response({
+            'success': True,
+            'status': task_result.state,
+            'message': 'Export işlemi devam ediyor...',
+        }, status=status.HTTP_200_OK)
+    
+    result = task_result.result or {}
+    # Başka tenant'ın export dosyası indirilemez
+    if result.get('tenant_id') != str(tenant.id):
+        return Response({
+            'success': False,
+            'message': 'Export bulunamadı.',
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    file_name = os.path.basename(result.get('file_name', ''))
+    file_path = os.path.join(ProductExportService.get_export_dir(tenant.id), file_name)
+    if not file_name or not os.path.exists(file_path):
+        return Response({
+            'success': False,
+            'message': 'Export dosyası bulunamadı veya süresi doldu.',
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    return FileResponse(
+        open(file_path, 'rb'),
+        as_attachment=True,
+        filename=file_name,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
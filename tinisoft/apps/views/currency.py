@@ -8,6 +8,7 @@ from rest_framework.response import Response
 from apps.models import Currency
 from apps.serializers.currency import CurrencySerializer
 from apps.services.currency_service import CurrencyService
+from apps.services.tenant_cache_service import TenantCacheService
 from core.middleware import get_tenant_from_request
 import logging
 
@@ -34,7 +35,7 @@ def currency_list(request):
         if tenant_slug:
             try:
                 from apps.models import Tenant
-                tenant = Tenant.objects.get(slug=tenant_slug, is_deleted=False)
+                tenant = TenantCacheService.get(slug=tenant_slug)
             except Tenant.DoesNotExist:
                 return Response({
                     'success': False,
@@ -43,7 +44,7 @@ def currency_list(request):
         elif tenant_id:
             try:
                 from apps.models import Tenant
-                tenant = Tenant.objects.get(id=tenant_id, is_deleted=False)
+                tenant = TenantCacheService.get(id=tenant_id)
             except Tenant.DoesNotExist:
                 return Response({
                     'success': False,
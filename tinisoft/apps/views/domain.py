@@ -2,6 +2,7 @@
 Domain management views.
 Domain doğrulama ve yönetim işlemleri.
 """
+from django.db import transaction
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -9,6 +10,7 @@ from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from apps.models import Domain, Tenant
 from apps.services.domain_service import DomainService
+from apps.services.tenant_cache_service import TenantCacheService
 from apps.tasks.domain_task import verify_domain_dns_task, deploy_domain_task
 from apps.permissions import IsTenantOwnerOfObject, IsOwnerOrTenantOwner
 import logging
@@ -415,25 +417,28 @@ def create_domain(request):
             'error_code': 'DOMAIN_EXISTS',
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Primary domain kontrolü
-    if is_primary:
-        # Mevcut primary domain'i kaldır
-        Domain.objects.filter(tenant=tenant, is_primary=True).update(is_primary=False)
-    
-    # Domain oluştur
-    domain = Domain.objects.create(
-        tenant=tenant,
-        domain_name=domain_name,
-        is_primary=is_primary,
-        is_custom=True,  # Custom domain
-        verification_status='pending',
-        ssl_enabled=ssl_enabled,
-    )
-    
-    # Verification code oluştur
-    domain.verification_code = DomainService.generate_verification_code()
-    domain.save()
-    
+    with transaction.atomic():
+        # Primary domain kontrolü
+        if is_primary:
+            # Mevcut primary domain'i kaldır. Queryset update() signal tetiklemediği için
+            # eski primary domain'lerin çözümleme cache'i commit sonrası açıkça temizlenir.
+            if Domain.objects.filter(tenant=tenant, is_primary=True).update(is_primary=False):
+                transaction.on_commit(TenantCacheService.invalidate)
+
+        # Domain oluştur
+        domain = Domain.objects.create(
+            tenant=tenant,
+            domain_name=domain_name,
+            is_primary=is_primary,
+            is_custom=True,  # Custom domain
+            verification_status='pending',
+            ssl_enabled=ssl_enabled,
+        )
+
+        # Verification code oluştur
+        domain.verification_code = DomainService.generate_verification_code()
+        domain.save()
+
     logger.info(f"Domain created: {domain.domain_name} for tenant: {tenant.name}")
     
     return Response({
@@ -13,12 +13,13 @@ from apps.services.order_service import OrderService
 from apps.services.customer_service import CustomerService
 from apps.permissions import IsTenantOwnerOfObject, HasStaffPermission
 from core.middleware import get_tenant_from_request
+from apps.utils.pagination import KeysetPaginationMixin
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class OrderPagination(PageNumberPagination):
+class OrderPagination(KeysetPaginationMixin, PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -125,7 +126,7 @@ def order_list_create(request):
                     serializer = OrderListSerializer(page, many=True)
                     logger.info(
                         f"[ORDERS] GET /api/orders/ | 200 | "
-                        f"Count: {len(page)}/{paginator.page.paginator.count} | "
+                        f"Count: {len(page)}/{paginator.total_count} | "
                         f"Tenant: {tenant.name}"
                     )
                     return paginator.get_paginated_response(serializer.data)
@@ -635,8 +636,10 @@ def order_detail(request, order_id):
                 }, status=status.HTTP_400_BAD_REQUEST)
             
             old_payment_status = order.payment_status
+            was_counted = CustomerService.is_counted(order)
             order.payment_status = new_payment_status
             order.save()
+            CustomerService.record_order_change(order, was_counted)
             
             logger.info(
                 f"Order {order.order_number} payment status changed: "
@@ -6,7 +6,6 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django.http import HttpResponse
-from django.db import connection
 from django.conf import settings
 from apps.models import Payment, Order, Tenant, IntegrationProvider
 from apps.serializers.payment import PaymentSerializer, CreatePaymentSerializer
@@ -90,9 +89,8 @@ def get_tenant_frontend_url(tenant=None, tenant_slug=None):
     if tenant_slug:
         try:
             # Public schema'da bu slug'a ait tenant'ı bul
+            # search_path ilk sorguda db_router wrapper'ı tarafından uygulanır
             clear_tenant_schema()
-            with connection.cursor() as cursor:
-                cursor.execute('SET search_path TO public;')
             
             # Slug normal (tireli) olabilir
             tenant_obj = Tenant.objects.filter(
@@ -147,8 +145,6 @@ def force_tenant_schema_from_order_number(order_number: str):
     
     # Tenant public schema'da, önce public schema'ya geç
     clear_tenant_schema()
-    with connection.cursor() as cursor:
-        cursor.execute('SET search_path TO public;')
     
     # Slug ile tenant bul (public schema'da)
     tenant = Tenant.objects.filter(slug__iexact=tenant_slug, is_deleted=False).first()
@@ -174,8 +170,6 @@ def force_tenant_schema_from_order_number(order_number: str):
     # Schema'yı set et (tenant-specific schema'ya geç)
     schema = f"tenant_{tenant.subdomain}"
     set_tenant_schema(schema)
-    with connection.cursor() as cursor:
-        cursor.execute(f'SET search_path TO "{schema}", public;')
     
     logger.info(f"Tenant schema set to {schema} from order number {order_number} (slug: {tenant_slug})")
     return tenant
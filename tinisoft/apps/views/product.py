@@ -6,15 +6,20 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q
+from django.db.models import Q, F
 from apps.models import Product, Category
 from apps.serializers.product import (
     ProductListSerializer, ProductDetailSerializer,
     CategorySerializer
 )
 from apps.permissions import IsTenantOwnerOfObject, HasStaffPermission
+from apps.services.cache_service import CacheService
+from apps.services.category_tree_service import CategoryTreeService
+from apps.services.product_listing_service import ProductListingService
+from apps.services.tenant_cache_service import TenantCacheService
 from django.core.exceptions import ValidationError
 from core.middleware import get_tenant_from_request
+from apps.utils.pagination import KeysetPaginationMixin
 import logging
 
 logger = logging.getLogger(__name__)
@@ -45,7 +50,7 @@ def get_client_ip(request):
     return request.META.get('REMOTE_ADDR')
 
 
-class ProductPagination(PageNumberPagination):
+class ProductPagination(KeysetPaginationMixin, PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -133,8 +138,8 @@ def product_list_create(request):
         
         queryset = queryset.order_by(ordering)
         
-        # Optimization
-        queryset = queryset.prefetch_related('images', 'categories', 'variants')
+        # Optimization - görseller, kategoriler ve varyant fiyatları sayfa başına sabit sorguyla
+        queryset = ProductListSerializer.setup_eager_loading(queryset)
         
         # Pagination
         paginator = ProductPagination()
@@ -143,7 +148,7 @@ def product_list_create(request):
         if page is not None:
             serializer = ProductListSerializer(page, many=True, context={'request': request})
             response = paginator.get_paginated_response(serializer.data)
-            logger.info(f"[PRODUCTS] GET /api/products/ | 200 | Count: {len(page)}/{paginator.page.paginator.count}")
+            logger.info(f"[PRODUCTS] GET /api/products/ | 200 | Count: {len(page)}/{paginator.total_count}")
             return response
         
         serializer = ProductListSerializer(queryset, many=True, context={'request': request})
@@ -356,7 +361,7 @@ def product_list_public(request, tenant_slug=None):
         if tenant_slug:
             try:
                 from apps.models import Tenant
-                tenant = Tenant.objects.get(slug=tenant_slug, is_deleted=False)
+                tenant = TenantCacheService.get(slug=tenant_slug)
             except Tenant.DoesNotExist:
                 return Response({
                     'success': False,
@@ -369,7 +374,7 @@ def product_list_public(request, tenant_slug=None):
             if tenant_slug_param:
                 try:
                     from apps.models import Tenant
-                    tenant = Tenant.objects.get(slug=tenant_slug_param, is_deleted=False)
+                    tenant = TenantCacheService.get(slug=tenant_slug_param)
                 except Tenant.DoesNotExist:
                     return Response({
                         'success': False,
@@ -382,7 +387,7 @@ def product_list_public(request, tenant_slug=None):
             if tenant_id_param:
                 try:
                     from apps.models import Tenant
-                    tenant = Tenant.objects.get(id=tenant_id_param, is_deleted=False)
+                    tenant = TenantCacheService.get(id=tenant_id_param)
                 except Tenant.DoesNotExist:
                     return Response({
                         'success': False,
@@ -395,7 +400,7 @@ def product_list_public(request, tenant_slug=None):
             if tenant_slug_header:
                 try:
                     from apps.models import Tenant
-                    tenant = Tenant.objects.get(slug=tenant_slug_header, is_deleted=False)
+                    tenant = TenantCacheService.get(slug=tenant_slug_header)
                 except Tenant.DoesNotExist:
                     return Response({
                         'success': False,
@@ -408,7 +413,7 @@ def product_list_public(request, tenant_slug=None):
             if tenant_id_header:
                 try:
                     from apps.models import Tenant
-                    tenant = Tenant.objects.get(id=tenant_id_header, is_deleted=False)
+                    tenant = TenantCacheService.get(id=tenant_id_header)
                 except Tenant.DoesNotExist:
                     return Response({
                         'success': False,
@@ -435,6 +440,14 @@ def product_list_public(request, tenant_slug=None):
         
         logger.info(f"[PRODUCTS] Tenant found: {tenant.name} ({tenant.slug})")
         
+        # Response cache (public istekler - ürün/kategori değişince versiyon ile invalidate edilir)
+        cache_key = CacheService.get_storefront_cache_key(tenant.id, request, 'product_list_public')
+        if cache_key:
+            cached_data = CacheService.get_storefront_response(tenant.id, cache_key)
+            if cached_data is not None:
+                logger.info(f"[PRODUCTS] GET /api/public/products/ | 200 | Cache HIT | Tenant: {tenant.slug}")
+                return Response(cached_data, headers={'X-Cache': 'HIT'})
+        
         queryset = Product.objects.filter(
             tenant=tenant,
             is_deleted=False,
@@ -479,22 +492,8 @@ def product_list_public(request, tenant_slug=None):
                     category = None
             
             if category:
-                # Alt kategorileri de dahil et (recursive)
-                def get_all_category_ids(cat):
-                    """Kategori ve tüm alt kategorilerinin ID'lerini döndür"""
-                    category_ids = [cat.id]
-                    children = Category.objects.filter(
-                        parent=cat,
-                        tenant=tenant,
-                        is_deleted=False,
-                        is_active=True
-                    )
-                    for child in children:
-                        category_ids.extend(get_all_category_ids(child))
-                    return category_ids
-                
-                # Kategori ve tüm alt kategorilerinin ID'lerini al
-                all_category_ids = get_all_category_ids(category)
+                # Kategori ve tüm aktif alt kategorilerinin ID'leri (materialized path, tek sorgu)
+                all_category_ids = CategoryTreeService.get_descendant_ids(category)
                 
                 # Bu kategorilerdeki ürünleri filtrele
                 queryset = queryset.filter(
@@ -542,10 +541,14 @@ def product_list_public(request, tenant_slug=None):
             logger.warning(f"Invalid ordering parameter: {ordering}, using default: -created_at")
             ordering = '-created_at'
         
-        queryset = queryset.order_by(ordering)
+        if ordering in ('price', '-price'):
+            # Varyantlı ürünlerde varyantların min fiyatına göre (indeksli denormalize kolon)
+            queryset = ProductListingService.order_by_price(queryset, descending=ordering == '-price')
+        else:
+            queryset = queryset.order_by(ordering)
         
-        # Optimization
-        queryset = queryset.prefetch_related('images', 'categories', 'variants')
+        # Optimization - görseller, kategoriler ve varyant fiyatları sayfa başına sabit sorguyla
+        queryset = ProductListSerializer.setup_eager_loading(queryset)
         
         # Pagination
         paginator = ProductPagination()
@@ -554,15 +557,21 @@ def product_list_public(request, tenant_slug=None):
         if page is not None:
             serializer = ProductListSerializer(page, many=True, context={'request': request})
             response = paginator.get_paginated_response(serializer.data)
-            logger.info(f"[PRODUCTS] GET /api/public/products/ | 200 | IP: {get_client_ip(request)} | Count: {len(page)}/{paginator.page.paginator.count} | Tenant: {tenant.slug}")
+            if cache_key:
+                CacheService.set_storefront_response(cache_key, response.data)
+                response['X-Cache'] = 'MISS'
+            logger.info(f"[PRODUCTS] GET /api/public/products/ | 200 | IP: {get_client_ip(request)} | Count: {len(page)}/{paginator.total_count} | Tenant: {tenant.slug}")
             return response
         
         serializer = ProductListSerializer(queryset, many=True, context={'request': request})
         logger.info(f"[PRODUCTS] GET /api/public/products/ | 200 | IP: {get_client_ip(request)} | Count: {queryset.count()} | Tenant: {tenant.slug}")
-        return Response({
+        response_data = {
             'success': True,
             'products': serializer.data,
-        })
+        }
+        if cache_key:
+            CacheService.set_storefront_response(cache_key, response_data)
+        return Response(response_data, headers={'X-Cache': 'MISS'} if cache_key else None)
     
     except Exception as e:
         logger.error(
@@ -712,7 +721,7 @@ def product_detail_public(request, urun_slug=None, tenant_slug=None, product_slu
     if tenant_slug:
         try:
             from apps.models import Tenant
-            tenant = Tenant.objects.get(slug=tenant_slug, is_deleted=False)
+            tenant = TenantCacheService.get(slug=tenant_slug)
         except Tenant.DoesNotExist:
             return Response({
                 'success': False,
@@ -725,7 +734,7 @@ def product_detail_public(request, urun_slug=None, tenant_slug=None, product_slu
         if tenant_slug_param:
             try:
                 from apps.models import Tenant
-                tenant = Tenant.objects.get(slug=tenant_slug_param, is_deleted=False)
+                tenant = TenantCacheService.get(slug=tenant_slug_param)
             except Tenant.DoesNotExist:
                 return Response({
                     'success': False,
@@ -738,7 +747,7 @@ def product_detail_public(request, urun_slug=None, tenant_slug=None, product_slu
         if tenant_id_param:
             try:
                 from apps.models import Tenant
-                tenant = Tenant.objects.get(id=tenant_id_param, is_deleted=False)
+                tenant = TenantCacheService.get(id=tenant_id_param)
             except Tenant.DoesNotExist:
                 return Response({
                     'success': False,
@@ -751,7 +760,7 @@ def product_detail_public(request, urun_slug=None, tenant_slug=None, product_slu
         if tenant_slug_header:
             try:
                 from apps.models import Tenant
-                tenant = Tenant.objects.get(slug=tenant_slug_header, is_deleted=False)
+                tenant = TenantCacheService.get(slug=tenant_slug_header)
             except Tenant.DoesNotExist:
                 return Response({
                     'success': False,
@@ -764,7 +773,7 @@ def product_detail_public(request, urun_slug=None, tenant_slug=None, product_slu
         if tenant_id_header:
             try:
                 from apps.models import Tenant
-                tenant = Tenant.objects.get(id=tenant_id_header, is_deleted=False)
+                tenant = TenantCacheService.get(id=tenant_id_header)
             except Tenant.DoesNotExist:
                 return Response({
                     'success': False,
@@ -782,6 +791,19 @@ def product_detail_public(request, urun_slug=None, tenant_slug=None, product_slu
     from urllib.parse import unquote
     decoded_slug = unquote(product_slug)
     
+    # Response cache (public istekler) - hit durumunda sadece görüntüleme sayısı artırılır
+    cache_key = CacheService.get_storefront_cache_key(tenant.id, request, 'product_detail_public')
+    if cache_key:
+        cached = CacheService.get_storefront_response(tenant.id, cache_key)
+        if cached is not None:
+            Product.objects.filter(id=cached['product_id']).update(view_count=F('view_count') + 1)
+            logger.info(
+                f"[PRODUCTS] GET /api/public/products/{product_slug}/ - SUCCESS (Cache HIT) | "
+                f"Tenant: {tenant.name} ({tenant.id}) | "
+                f"ProductID: {cached['product_id']}"
+            )
+            return Response(cached['data'], headers={'X-Cache': 'HIT'})
+    
     try:
         product = Product.objects.prefetch_related(
             'images',
@@ -842,10 +864,13 @@ def product_detail_public(request, urun_slug=None, tenant_slug=None, product_slu
         f"ViewCount: {product.view_count} | "
         f"Status: {status.HTTP_200_OK}"
     )
-    return Response({
+    response_data = {
         'success': True,
         'product': serializer.data,
-    })
+    }
+    if cache_key:
+        CacheService.set_storefront_response(cache_key, {'product_id': str(product.id), 'data': response_data})
+    return Response(response_data, headers={'X-Cache': 'MISS'} if cache_key else None)
 
 
 @api_view(['DELETE'])
@@ -925,11 +950,9 @@ def category_list_create(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     if request.method == 'GET':
-        queryset = Category.objects.filter(tenant=tenant, is_deleted=False, parent=None)
-        serializer = CategorySerializer(queryset, many=True)
         return Response({
             'success': True,
-            'categories': serializer.data,
+            'categories': CategoryTreeService.get_tree(tenant.id),
         })
     
     elif request.method == 'POST':
@@ -984,7 +1007,7 @@ def category_list_public(request, tenant_slug=None):
     if tenant_slug:
         try:
             from apps.models import Tenant
-            tenant = Tenant.objects.get(slug=tenant_slug, is_deleted=False)
+            tenant = TenantCacheService.get(slug=tenant_slug)
         except Tenant.DoesNotExist:
             return Response({
                 'success': False,
@@ -997,7 +1020,7 @@ def category_list_public(request, tenant_slug=None):
         if tenant_slug_param:
             try:
                 from apps.models import Tenant
-                tenant = Tenant.objects.get(slug=tenant_slug_param, is_deleted=False)
+                tenant = TenantCacheService.get(slug=tenant_slug_param)
             except Tenant.DoesNotExist:
                 return Response({
                     'success': False,
@@ -1010,7 +1033,7 @@ def category_list_public(request, tenant_slug=None):
         if tenant_id_param:
             try:
                 from apps.models import Tenant
-                tenant = Tenant.objects.get(id=tenant_id_param, is_deleted=False)
+                tenant = TenantCacheService.get(id=tenant_id_param)
             except Tenant.DoesNotExist:
                 return Response({
                     'success': False,
@@ -1023,7 +1046,7 @@ def category_list_public(request, tenant_slug=None):
         if tenant_slug_header:
             try:
                 from apps.models import Tenant
-                tenant = Tenant.objects.get(slug=tenant_slug_header, is_deleted=False)
+                tenant = TenantCacheService.get(slug=tenant_slug_header)
             except Tenant.DoesNotExist:
                 return Response({
                     'success': False,
@@ -1036,7 +1059,7 @@ def category_list_public(request, tenant_slug=None):
         if tenant_id_header:
             try:
                 from apps.models import Tenant
-                tenant = Tenant.objects.get(id=tenant_id_header, is_deleted=False)
+                tenant = TenantCacheService.get(id=tenant_id_header)
             except Tenant.DoesNotExist:
                 return Response({
                     'success': False,
@@ -1054,21 +1077,27 @@ def category_list_public(request, tenant_slug=None):
             'hint': 'Örnek: /api/public/categories/?tenant_slug=magaza-adi veya Header: X-Tenant-Slug: magaza-adi',
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Sadece aktif kategorileri getir (ana kategoriler - parent=None)
-    queryset = Category.objects.filter(
-        tenant=tenant,
-        is_deleted=False,
-        parent=None,
-        is_active=True
-    ).order_by('name')
+    # Response cache (public istekler)
+    cache_key = CacheService.get_storefront_cache_key(tenant.id, request, 'category_list_public')
+    if cache_key:
+        cached_data = CacheService.get_storefront_response(tenant.id, cache_key)
+        if cached_data is not None:
+            return Response(cached_data, headers={'X-Cache': 'HIT'})
     
-    serializer = CategorySerializer(queryset, many=True, context={'request': request})
-    logger.info(f"[CATEGORIES] GET /api/public/categories/ | 200 | Count: {queryset.count()} | Tenant: {tenant.name}")
+    # Sadece aktif kategorileri getir (ana kategoriler - parent=None), cache'lenmiş ağaçtan
+    categories = sorted(
+        (category for category in CategoryTreeService.get_tree(tenant.id) if category['is_active']),
+        key=lambda category: category['name'],
+    )
+    logger.info(f"[CATEGORIES] GET /api/public/categories/ | 200 | Count: {len(categories)} | Tenant: {tenant.name}")
     
-    return Response({
+    response_data = {
         'success': True,
-        'categories': serializer.data,
-    })
+        'categories': categories,
+    }
+    if cache_key:
+        CacheService.set_storefront_response(cache_key, response_data)
+    return Response(response_data, headers={'X-Cache': 'MISS'} if cache_key else None)
 
 
 @api_view(['GET', 'PATCH', 'DELETE'])
@@ -7,9 +7,9 @@ from rest_framework.decorators import api_view, permission_classes, parser_class
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.core.files.storage import default_storage
 from django.utils.text import slugify
-from apps.models import Product, ProductImage
+from apps.models import Product
+from apps.services.image_processing_service import ImageProcessingService
 from core.middleware import get_tenant_from_request
 import logging
 import os
@@ -114,32 +114,26 @@ def upload_product_image_by_slug(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        # Dosyayı kaydet - Tenant bazlı klasör yapısı: {tenant_id}/products/{product_id}/{filename}
-        file_path = f'{str(tenant.id)}/products/{product.id}/{image_file.name}'
-        saved_path = default_storage.save(file_path, image_file)
-        file_url = default_storage.url(saved_path)
-        
-        # ProductImage oluştur
-        # Position: mevcut görsellerin sayısı (0-based)
-        position = existing_images_count
-        is_primary = (position == 0)  # İlk görsel primary
-        
-        product_image = ProductImage.objects.create(
-            product=product,
-            image_url=file_url,
-            alt_text=product.name,
-            position=position,
-            is_primary=is_primary
+        # İçerik hash'ine göre kaydet; aynı görsel üründe zaten varsa yeni kayıt açılmaz.
+        # Position: mevcut görsellerin sayısı (0-based), ilk görsel primary
+        product_image, created = ImageProcessingService.add_product_image(
+            product,
+            image_file.read(),
+            image_file.name,
+            position=existing_images_count,
         )
         
         return Response({
             'success': True,
-            'message': 'Görsel başarıyla yüklendi.',
+            'message': 'Görsel başarıyla yüklendi.' if created else 'Bu görsel üründe zaten mevcut.',
+            'duplicate': not created,
             'image': {
                 'id': str(product_image.id),
                 'image_url': product_image.image_url,
                 'position': product_image.position,
                 'is_primary': product_image.is_primary,
+                'variants': product_image.variants,
+                'processing_status': product_image.processing_status,
             },
             'product': {
                 'id': str(product.id),
@@ -245,21 +239,12 @@ def bulk_upload_product_images(request):
                 })
                 continue
             
-            # Dosyayı kaydet
-            file_path = f'products/{product.id}/{image_file.name}'
-            saved_path = default_storage.save(file_path, image_file)
-            file_url = default_storage.url(saved_path)
-            
-            # ProductImage oluştur
-            position = existing_images_count
-            is_primary = (position == 0)
-            
-            product_image = ProductImage.objects.create(
-                product=product,
-                image_url=file_url,
-                alt_text=product.name,
-                position=position,
-                is_primary=is_primary
+            # İçerik hash'ine göre kaydet (aynı görsel üründe varsa tekrar eklenmez)
+            product_image, created = ImageProcessingService.add_product_image(
+                product,
+                image_file.read(),
+                image_file.name,
+                position=existing_images_count,
             )
             
             results['success_count'] += 1
@@ -269,6 +254,7 @@ def bulk_upload_product_images(request):
                 'product_name': product.name,
                 'image_url': product_image.image_url,
                 'position': product_image.position,
+                'duplicate': not created,
             })
         
         except Exception as e:
@@ -357,31 +343,26 @@ def upload_product_image_by_sku(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        # Dosyayı kaydet - Tenant bazlı klasör yapısı: {tenant_id}/products/{product_id}/{filename}
-        file_path = f'{str(tenant.id)}/products/{product.id}/{image_file.name}'
-        saved_path = default_storage.save(file_path, image_file)
-        file_url = default_storage.url(saved_path)
-        
-        # ProductImage oluştur
-        position = existing_images_count
-        is_primary = (position == 0)
-        
-        product_image = ProductImage.objects.create(
-            product=product,
-            image_url=file_url,
-            alt_text=product.name,
-            position=position,
-            is_primary=is_primary
+        # İçerik hash'ine göre kaydet; aynı görsel üründe zaten varsa yeni kayıt açılmaz.
+        # Position: mevcut görsellerin sayısı (0-based), ilk görsel primary
+        product_image, created = ImageProcessingService.add_product_image(
+            product,
+            image_file.read(),
+            image_file.name,
+            position=existing_images_count,
         )
         
         return Response({
             'success': True,
-            'message': 'Görsel başarıyla yüklendi.',
+            'message': 'Görsel başarıyla yüklendi.' if created else 'Bu görsel üründe zaten mevcut.',
+            'duplicate': not created,
             'image': {
                 'id': str(product_image.id),
                 'image_url': product_image.image_url,
                 'position': product_image.position,
                 'is_primary': product_image.is_primary,
+                'variants': product_image.variants,
+                'processing_status': product_image.processing_status,
             },
             'product': {
                 'id': str(product.id),
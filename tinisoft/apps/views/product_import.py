@@ -32,7 +32,8 @@ def import_products_from_excel(request):
     Content-Type: multipart/form-data
     Body: {
         "file": <excel_file>,
-        "async": true  // Opsiyonel, async işlem için (default: false, 1000+ satır için otomatik async)
+        "async": true,  // Opsiyonel, async işlem için (default: false, 1000+ satır için otomatik async)
+        "update_existing": true  // Opsiyonel, SKU'su eşleşen mevcut ürünleri güncelle (default: false, her satır yeni ürün)
     }
     """
     tenant = get_tenant_from_request(request)
@@ -77,6 +78,7 @@ def import_products_from_excel(request):
     
     # Async işlem kontrolü
     use_async = request.data.get('async', False)
+    update_existing = str(request.data.get('update_existing', '')).lower() in ('1', 'true', 'yes')
     
     # Dosya boyutuna göre otomatik async (1000+ satır için)
     try:
@@ -125,7 +127,8 @@ def import_products_from_excel(request):
                 file_path=temp_file_path,  # Storage path
                 tenant_id=str(tenant.id),
                 user_id=str(request.user.id) if request.user else None,
-                batch_size=100  # Her batch'te 100 ürün
+                batch_size=500,  # Her transaction'da 500 ürün
+                update_existing=update_existing
             )
             
             return Response({
@@ -143,7 +146,8 @@ def import_products_from_excel(request):
             result = ExcelImportService.import_products_from_excel(
                 file_path=temp_file_path,  # Storage path
                 tenant=tenant,
-                user=request.user
+                user=request.user,
+                update_existing=update_existing
             )
             
             if result['success']:
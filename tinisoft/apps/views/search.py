@@ -9,12 +9,13 @@ from rest_framework.pagination import PageNumberPagination
 from apps.serializers.product import ProductListSerializer
 from apps.services.search_service import SearchService
 from core.middleware import get_tenant_from_request
+from apps.utils.pagination import KeysetPaginationMixin
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class SearchPagination(PageNumberPagination):
+class SearchPagination(KeysetPaginationMixin, PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -41,7 +42,8 @@ def search_products(request):
         - is_featured: Öne çıkan (true/false)
         - is_new: Yeni (true/false)
         - is_bestseller: Çok satan (true/false)
-        - ordering: Sıralama (price_asc, price_desc, newest, popularity, name_asc, name_desc)
+        - ordering: Sıralama (relevance, price_asc, price_desc, newest, popularity, name_asc, name_desc)
+          relevance: Full-text arama skoruna göre (q ile birlikte kullanılır)
         - page: Sayfa numarası
         - page_size: Sayfa boyutu
     """
@@ -130,6 +132,8 @@ def search_products(request):
             ordering=ordering,
         )
         
+        products = ProductListSerializer.setup_eager_loading(products)
+        
         # Pagination
         paginator = SearchPagination()
         page = paginator.paginate_queryset(products, request)
@@ -206,6 +210,7 @@ def search_suggestions(request):
 def filter_options(request):
     """
     Filtreleme seçeneklerini getir.
+    Özellik değerleri, markalar ve fiyat aralıkları ürün sayılarıyla (count) döner.
     
     GET: /api/search/filter-options/
     Query params:
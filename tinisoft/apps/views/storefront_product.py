@@ -6,6 +6,9 @@ from rest_framework import status
 from django.db.models import Q
 from apps.models import Product, Category, Tenant
 from apps.serializers.storefront_product import ProductStorefrontListSerializer, ProductStorefrontDetailSerializer
+from apps.services.cache_service import CacheService
+from apps.services.product_listing_service import ProductListingService
+from apps.services.tenant_cache_service import TenantCacheService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -33,13 +36,13 @@ def get_tenant_from_request_or_header(request):
     tenant = None
     if tenant_id:
         try:
-            tenant = Tenant.objects.get(id=tenant_id, is_deleted=False)
+            tenant = TenantCacheService.get(id=tenant_id)
         except Tenant.DoesNotExist:
             pass
             
     if not tenant and tenant_slug_header:
         try:
-            tenant = Tenant.objects.get(slug=tenant_slug_header, is_deleted=False)
+            tenant = TenantCacheService.get(slug=tenant_slug_header)
         except Tenant.DoesNotExist:
             pass
             
@@ -48,7 +51,7 @@ def get_tenant_from_request_or_header(request):
         t_slug = request.query_params.get('tenant_slug')
         if t_slug:
             try:
-                tenant = Tenant.objects.get(slug=t_slug, is_deleted=False)
+                tenant = TenantCacheService.get(slug=t_slug)
             except Tenant.DoesNotExist:
                 pass
 
@@ -64,6 +67,13 @@ def storefront_product_list(request):
     if not tenant:
         return Response({'message': 'Tenant header (X-Tenant-Id) required'}, status=400)
 
+    # Response cache (public istekler)
+    cache_key = CacheService.get_storefront_cache_key(tenant.id, request, 'storefront_product_list')
+    if cache_key:
+        cached_data = CacheService.get_storefront_response(tenant.id, cache_key)
+        if cached_data is not None:
+            return Response(cached_data, headers={'X-Cache': 'HIT'})
+
     queryset = Product.objects.select_related('tenant').filter(
         tenant=tenant, 
         is_deleted=False, 
@@ -91,9 +101,9 @@ def storefront_product_list(request):
     sort_param = request.query_params.get('sort')
     if sort_param:
         if sort_param == 'price-asc':
-            queryset = queryset.order_by('price')
+            queryset = ProductListingService.order_by_price(queryset)
         elif sort_param == 'price-desc':
-            queryset = queryset.order_by('-price')
+            queryset = ProductListingService.order_by_price(queryset, descending=True)
         elif sort_param == 'created-desc':
             queryset = queryset.order_by('-created_at')
         elif sort_param == 'created-asc':
@@ -109,16 +119,22 @@ def storefront_product_list(request):
         # Update displayCurrency based on tenant
         response = paginator.get_paginated_response(serializer.data)
         response.data['displayCurrency'] = tenant.currency or 'TRY'
+        if cache_key:
+            CacheService.set_storefront_response(cache_key, response.data)
+            response['X-Cache'] = 'MISS'
         return response
 
     serializer = ProductStorefrontListSerializer(queryset, many=True)
-    return Response({
+    response_data = {
         'items': serializer.data,
         'totalCount': queryset.count(),
         'page': 1,
         'pageSize': queryset.count(),
         'displayCurrency': tenant.currency or 'TRY'
-    })
+    }
+    if cache_key:
+        CacheService.set_storefront_response(cache_key, response_data)
+    return Response(response_data, headers={'X-Cache': 'MISS'} if cache_key else None)
 
 
 @api_view(['GET'])
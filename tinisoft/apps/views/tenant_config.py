@@ -5,6 +5,7 @@ from rest_framework import status
 from apps.permissions import IsTenantOwner, IsTenantUser
 from apps.models.website import WebsiteTemplate
 from apps.serializers.website import AdminWebsiteTemplateSerializer
+from apps.services.activity_log_service import ActivityLogService
 
 class TenantSettingsView(APIView):
     """
@@ -40,6 +41,9 @@ class TenantSettingsView(APIView):
                 "warehouse_qr_mode": tenant.warehouse_qr_mode,
                 "warehouse_pin": tenant.warehouse_pin,
                 "warehouse_custom_url": tenant.warehouse_custom_url,
+            },
+            "activity_log": {
+                "retention_limit": tenant.activity_log_retention_limit,
             }
         }
         return Response(data)
@@ -51,6 +55,18 @@ class TenantSettingsView(APIView):
         
         data = request.data
         
+        # İşlem logu limiti önce doğrulanır (geçersizse hiçbir ayar kaydedilmez)
+        retention_limit = None
+        if isinstance(data.get('activity_log'), dict) and 'retention_limit' in data['activity_log']:
+            try:
+                retention_limit = int(data['activity_log']['retention_limit'])
+            except (TypeError, ValueError):
+                retention_limit = 0
+            if not ActivityLogService.MIN_LIMIT <= retention_limit <= ActivityLogService.MAX_LIMIT:
+                return Response({
+                    "message": f"Log limiti {ActivityLogService.MIN_LIMIT} ile {ActivityLogService.MAX_LIMIT} arasında olmalı"
+                }, status=status.HTTP_400_BAD_REQUEST)
+        
         # Site Kimliği
         if 'site_identity' in data:
             identity = data['site_identity']
@@ -83,6 +99,13 @@ class TenantSettingsView(APIView):
             if 'warehouse_pin' in warehouse: tenant.warehouse_pin = warehouse['warehouse_pin']
             if 'warehouse_custom_url' in warehouse: tenant.warehouse_custom_url = warehouse['warehouse_custom_url']
             tenant.save()
+            
+        # İşlem Logu Ayarları
+        if retention_limit is not None:
+            tenant.activity_log_retention_limit = retention_limit
+            tenant.save(update_fields=['activity_log_retention_limit', 'updated_at'])
+            # Limit düşürüldüyse bir sonraki temizlikte uygulanır
+            ActivityLogService.mark_dirty([tenant.id])
 
         template.save()
         return Response({"message": "Ayarlar güncellendi"})
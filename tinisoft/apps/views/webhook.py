@@ -6,14 +6,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q
+from django.db.models import F, Q
 from django.utils import timezone
-import requests
-import time
-import hmac
-import hashlib
-import json
 from apps.models import Webhook, WebhookEvent
+from apps.services.webhook_service import WebhookService
 from apps.serializers.webhook import (
     WebhookSerializer, WebhookCreateSerializer,
     WebhookEventSerializer, WebhookTestSerializer
@@ -30,15 +26,6 @@ class WebhookPagination(PageNumberPagination):
     max_page_size = 100
 
 
-def generate_webhook_signature(secret_key, payload):
-    """Webhook signature oluştur."""
-    return hmac.new(
-        secret_key.encode('utf-8'),
-        json.dumps(payload, sort_keys=True).encode('utf-8'),
-        hashlib.sha256
-    ).hexdigest()
-
-
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def webhook_list_create(request):
@@ -223,91 +210,43 @@ def webhook_test(request, webhook_id):
     payload = serializer.validated_data['payload']
     event_type = serializer.validated_data['event_type']
     
-    # Signature oluştur
-    signature = generate_webhook_signature(webhook.secret_key, payload)
+    # Webhook gönder (pooled session, gönderilen body ile aynı byte'lar imzalanır)
+    result = WebhookService.send(webhook, event_type, payload)
     
-    # Headers
-    headers = {
-        'Content-Type': 'application/json',
-        'X-Webhook-Signature': signature,
-        'X-Webhook-Event': event_type,
-    }
+    # Event kaydı
+    webhook_event = WebhookEvent.objects.create(
+        webhook=webhook,
+        event_type=event_type,
+        payload=payload,
+        request_url=webhook.url,
+        request_method='POST',
+        **result
+    )
     
-    # Webhook gönder
-    start_time = time.time()
-    try:
-        response = requests.post(
-            webhook.url,
-            json=payload,
-            headers=headers,
-            timeout=10
-        )
-        response_time_ms = int((time.time() - start_time) * 1000)
-        
-        is_success = 200 <= response.status_code < 300
-        
-        # Event kaydı
-        webhook_event = WebhookEvent.objects.create(
-            webhook=webhook,
-            event_type=event_type,
-            payload=payload,
-            request_url=webhook.url,
-            request_method='POST',
-            request_headers=headers,
-            request_body=json.dumps(payload),
-            response_status=response.status_code,
-            response_body=response.text[:1000],  # İlk 1000 karakter
-            response_time_ms=response_time_ms,
-            is_success=is_success,
-        )
-        
-        # İstatistikleri güncelle
-        if is_success:
-            webhook.success_count += 1
-        else:
-            webhook.failure_count += 1
-        webhook.last_triggered_at = timezone.now()
-        webhook.save()
-        
-        return Response({
-            'success': True,
-            'message': 'Webhook test edildi.',
-            'result': {
-                'status_code': response.status_code,
-                'response_time_ms': response_time_ms,
-                'is_success': is_success,
-                'event': WebhookEventSerializer(webhook_event).data,
-            },
-        })
+    # İstatistikleri güncelle (atomik)
+    Webhook.objects.filter(id=webhook.id).update(
+        success_count=F('success_count') + (1 if result['is_success'] else 0),
+        failure_count=F('failure_count') + (0 if result['is_success'] else 1),
+        last_triggered_at=timezone.now(),
+    )
     
-    except requests.exceptions.RequestException as e:
-        response_time_ms = int((time.time() - start_time) * 1000)
-        
-        # Event kaydı
-        webhook_event = WebhookEvent.objects.create(
-            webhook=webhook,
-            event_type=event_type,
-            payload=payload,
-            request_url=webhook.url,
-            request_method='POST',
-            request_headers=headers,
-            request_body=json.dumps(payload),
-            response_status=None,
-            response_body='',
-            response_time_ms=response_time_ms,
-            is_success=False,
-            error_message=str(e),
-        )
-        
-        webhook.failure_count += 1
-        webhook.last_triggered_at = timezone.now()
-        webhook.save()
-        
+    if result['response_status'] is None:
         return Response({
             'success': False,
-            'message': f'Webhook gönderilemedi: {str(e)}',
+            'message': f"Webhook gönderilemedi: {result['error_message']}",
             'event': WebhookEventSerializer(webhook_event).data,
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    return Response({
+        'success': True,
+        'message': 'Webhook test edildi.',
+        'result': {
+            'status_code': result['response_status'],
+            'response_time_ms': result['response_time_ms'],
+            'is_success': result['is_success'],
+            'event': WebhookEventSerializer(webhook_event).data,
+        },
+    })
 
 
 @api_view(['GET'])
@@ -3,10 +3,19 @@ Database router for multi-tenant schema routing.
 Her tenant için ayrı schema kullanılacak ama tek PostgreSQL veritabanı.
 """
 from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
 from threading import local
+import re
 
 _thread_locals = local()
 
+# Connection açılırken OPTIONS ile verilen search_path (örn. -c search_path=public)
+_OPTIONS_SEARCH_PATH_RE = re.compile(r'search_path=([^\s,]+)')
+
+# SET search_path istatistikleri (process bazlı - benchmark ve log için)
+_search_path_stats = {'set': 0, 'skipped': 0}
+
 
 def set_tenant_schema(schema_name):
     """Thread-local olarak tenant schema'sını ayarla."""
@@ -24,6 +33,65 @@ def clear_tenant_schema():
         delattr(_thread_locals, 'schema')
 
 
+def _search_path_sql(schema_name):
+    if schema_name == 'public':
+        return 'SET search_path TO public;'
+    return f'SET search_path TO "{schema_name}", public;'
+
+
+def search_path_execute_wrapper(execute, sql, params, many, context):
+    """
+    Her sorgudan önce connection'ın search_path'ini thread-local schema ile eşle.
+    
+    Connection başına aktif schema takip edilir; aynıysa SET gönderilmez.
+    Böylece schema ilk sorguda (lazy) uygulanır ve aynı tenant'ın ardışık
+    isteklerinde (CONN_MAX_AGE ile yeniden kullanılan connection) ek round-trip olmaz.
+    
+    Atomic blok içinde yapılan SET transaction veya savepoint rollback'i ile geri
+    alınabilir ve bu wrapper'dan görülemez; bu yüzden atomic blok içinde SET her
+    sorguda tekrar gönderilir ve sadece blok dışındaki SET'ler takip edilir.
+    """
+    db = context['connection']
+    schema_name = get_tenant_schema()
+    in_atomic_block = db.in_atomic_block
+    
+    if in_atomic_block or getattr(db, '_search_path_schema', None) != schema_name:
+        # CursorWrapper'ı değil ham cursor'ı kullan (wrapper'lar tekrar çalışmasın)
+        context['cursor'].cursor.execute(_search_path_sql(schema_name))
+        # Atomic blok içindeki SET'in kalıcılığı bilinmez; blok dışında tekrar gönderilir
+        db._search_path_schema = None if in_atomic_block else schema_name
+        _search_path_stats['set'] += 1
+    else:
+        _search_path_stats['skipped'] += 1
+    
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_search_path_wrapper(sender, connection, **kwargs):
+    """
+    Yeni açılan PostgreSQL connection'ına search_path wrapper'ını ekle.
+    Başlangıç search_path'i OPTIONS'tan okunur (connection açılırken zaten uygulanmış).
+    """
+    if connection.vendor != 'postgresql':
+        return
+    options = connection.settings_dict.get('OPTIONS', {}).get('options', '')
+    match = _OPTIONS_SEARCH_PATH_RE.search(options)
+    connection._search_path_schema = match.group(1) if match else None
+    if search_path_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(search_path_execute_wrapper)
+
+
+def get_search_path_stats():
+    """Process başlangıcından beri gönderilen / atlanan SET search_path sayıları."""
+    return dict(_search_path_stats)
+
+
+def reset_search_path_stats():
+    _search_path_stats['set'] = 0
+    _search_path_stats['skipped'] = 0
+
+
 class TenantDatabaseRouter:
     """
     Multi-tenant database router.
@@ -32,26 +32,23 @@ def migrate_tenant_schema(schema_name):
     Tenant schema'sına migration uygula.
     Tenant-specific modeller için tablolar oluşturulur.
     """
-    from django.db import connection
     from django.core.management import call_command
-    from core.db_router import set_tenant_schema
-    import os
+    from core.db_router import set_tenant_schema, clear_tenant_schema
     
-    # Schema'yı set et
+    # Schema'yı set et - search_path her sorgudan önce db_router wrapper'ı ile uygulanır
     set_tenant_schema(schema_name)
-    
-    # Search path'i tenant schema'sına ayarla
-    with connection.cursor() as cursor:
-        # Search path'i geçici olarak değiştir
-        cursor.execute(f'SET search_path TO "{schema_name}", public;')
+    try:
+        # Migration'ları uygula
+        # Tenant-specific modeller için tablolar oluşturulur
+        call_command('migrate', verbosity=1, interactive=False)
         
-        try:
-            # Migration'ları uygula
-            # Tenant-specific modeller için tablolar oluşturulur
-            call_command('migrate', verbosity=1, interactive=False)
-        finally:
-            # Search path'i geri al
-            cursor.execute('SET search_path TO public;')
+        # Append-only tabloları (analytics_events, activity_logs, inventory_movements)
+        # aylık partition'lı yapıya çevir - yeni schema'da tablolar boş, işlem anlık
+        from apps.services.partition_service import PartitionService
+        PartitionService.convert_schema(schema_name)
+    finally:
+        # Search path'i geri al (sonraki sorguda public'e döner)
+        clear_tenant_schema()
 
 
 def get_current_schema():
@@ -3,7 +3,6 @@ Multi-tenant middleware.
 Request'ten tenant bilgisini alıp database router'a iletir.
 """
 from django.utils.deprecation import MiddlewareMixin
-from django.db import connection
 from core.db_router import set_tenant_schema, clear_tenant_schema, get_tenant_schema
 
 
@@ -48,43 +47,17 @@ class TenantMiddleware(MiddlewareMixin):
                 }, status=403)
             
             # Tenant schema adını oluştur
-            tenant_schema = f'tenant_{tenant.id}'
-            set_tenant_schema(tenant_schema)
-            
-            # Connection wrapper ile her sorgudan önce search_path'i ayarla
-            self._setup_search_path(tenant_schema)
+            # search_path ilk sorguda ve sadece connection'daki schema farklıysa uygulanır
+            # (core.db_router.search_path_execute_wrapper)
+            set_tenant_schema(f'tenant_{tenant.id}')
         else:
             # API endpoint'leri için public schema (api.tinisoft.com.tr)
             set_tenant_schema('public')
-            self._setup_search_path('public')
-    
-    def _setup_search_path(self, schema_name):
-        """Connection'da search_path'i ayarla."""
-        # Connection'ı aç ve search_path'i ayarla
-        # Her sorgudan önce bu ayar geçerli olacak (connection pooling ile)
-        connection.ensure_connection()
-        
-        # Connection'ın thread-local'ına schema'yı kaydet
-        if not hasattr(connection, '_tenant_schema'):
-            connection._tenant_schema = None
-        
-        # Eğer schema değiştiyse search_path'i güncelle
-        if connection._tenant_schema != schema_name:
-            with connection.cursor() as cursor:
-                cursor.execute(f'SET search_path TO "{schema_name}", public;')
-            connection._tenant_schema = schema_name
     
     def process_response(self, request, response):
         """Response döndürülmeden önce schema'yı temizle."""
-        from django.db import connection
-        
-        # Search path'i public'e geri al
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute('SET search_path TO public;')
-        except:
-            pass
-        
+        # Connection'a SET search_path gönderilmez; sonraki sorgu thread-local
+        # schema'ya göre (gerekirse) kendisi ayarlar.
         clear_tenant_schema()
         return response
     
@@ -126,47 +99,22 @@ def get_tenant_from_request(request):
     if cached_tenant:
         return cached_tenant
 
-    from apps.models import Tenant, Domain
-    from apps.services.cache_service import CacheService
+    from apps.models import Tenant
+    from apps.services.tenant_cache_service import TenantCacheService
     
     host = request.get_host()
     
-    # 2. Redis Cache Kontrolü
-    # Not: Cache'de sadece ID veya basit veri saklamak daha güvenlidir ama 
-    # şimdilik model instance'ını Django'nun cache'i (pickle) üzerinden alıyoruz.
-    tenant = CacheService.get_tenant_by_host(host)
+    # 2. Subdomain / custom domain (process içi LRU -> Redis -> DB)
+    tenant = TenantCacheService.get_by_host(host)
     if tenant:
         request.tenant = tenant
         return tenant
-
-    # 3. Veritabanı Sorguları (Sadece cache'de yoksa çalışır)
-    # Subdomain kontrolü
-    if '.tinisoft.com.tr' in host:
-        subdomain = host.split('.')[0]
-        try:
-            tenant = Tenant.objects.get(subdomain=subdomain, is_deleted=False)
-            CacheService.set_tenant_by_host(host, tenant)
-            request.tenant = tenant
-            return tenant
-        except Tenant.DoesNotExist:
-            pass
-    
-    # Custom domain kontrolü
-    try:
-        domain = Domain.objects.filter(domain_name=host, is_deleted=False).select_related('tenant').first()
-        if domain:
-            tenant = domain.tenant
-            CacheService.set_tenant_by_host(host, tenant)
-            request.tenant = tenant
-            return tenant
-    except:
-        pass
     
     # Header'dan tenant ID/Slug (Panel kullanımı için)
     tenant_id = request.headers.get('X-Tenant-ID')
     if tenant_id:
         try:
-            tenant = Tenant.objects.get(id=tenant_id, is_deleted=False)
+            tenant = TenantCacheService.get(id=tenant_id)
             request.tenant = tenant
             return tenant
         except Tenant.DoesNotExist:
@@ -177,7 +125,7 @@ def get_tenant_from_request(request):
     tenant_slug = request.headers.get('X-Tenant-Slug')
     if tenant_slug:
         try:
-            tenant = Tenant.objects.get(slug=tenant_slug, is_deleted=False)
+            tenant = TenantCacheService.get(slug=tenant_slug)
             request.tenant = tenant
             return tenant
         except Tenant.DoesNotExist:
@@ -4,6 +4,7 @@ Django settings for Tinisoft project.
 import os
 from pathlib import Path
 import environ
+from celery.schedules import crontab
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party
     'rest_framework',
@@ -205,6 +207,20 @@ else:
     MEDIA_URL = '/media/'
     MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Ürün görseli işleme (ImageProcessingService) - boyut adı -> en uzun kenar (px)
+IMAGE_VARIANT_SIZES = {
+    'thumbnail': env.int('IMAGE_THUMBNAIL_SIZE', default=200),
+    'listing': env.int('IMAGE_LISTING_SIZE', default=600),
+    'zoom': env.int('IMAGE_ZOOM_SIZE', default=1600),
+}
+IMAGE_WEBP_QUALITY = env.int('IMAGE_WEBP_QUALITY', default=80)
+IMAGE_JPEG_QUALITY = env.int('IMAGE_JPEG_QUALITY', default=85)
+IMAGE_PROCESSING_THREADS = env.int('IMAGE_PROCESSING_THREADS', default=3)
+IMAGE_DOWNLOAD_TIMEOUT = env.int('IMAGE_DOWNLOAD_TIMEOUT', default=20)
+IMAGE_MAX_DOWNLOAD_BYTES = env.int('IMAGE_MAX_DOWNLOAD_BYTES', default=20 * 1024 * 1024)
+# Ayrı worker için: IMAGE_PROCESSING_QUEUE=images + celery -A tinisoft worker -Q images
+IMAGE_PROCESSING_QUEUE = env('IMAGE_PROCESSING_QUEUE', default='celery')
+
 # File Upload Limits (413 hatası için)
 # Excel dosyaları için yüksek limit (4000+ ürün için)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100 MB (10 MB'dan artırıldı)
@@ -239,6 +255,9 @@ REST_FRAMEWORK = {
 
 # JWT Settings
 JWT_EXPIRATION_HOURS = env.int('JWT_EXPIRATION_HOURS', default=24)  # Token geçerlilik süresi (saat)
+# Yetki claim'lerini token'a göm (kullanıcı değişmediyse istek başına principal cache'ine de gidilmez;
+# iptal edilen token'lar Redis revocation listesinden kontrol edilir)
+JWT_EMBED_PRINCIPAL = env.bool('JWT_EMBED_PRINCIPAL', default=False)
 
 # API Base URL (Backend domain - Kuveyt callback için)
 # Kuveyt'e gönderilecek OkUrl ve FailUrl'ler bu domain'i kullanır
@@ -305,6 +324,67 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Celery Beat - periyodik task'lar
+CELERY_BEAT_SCHEDULE = {
+    # Terminal olmayan gönderilerin kargo durumunu senkronize et
+    'sync-shipment-statuses': {
+        'task': 'apps.tasks.shipment_task.sync_shipment_statuses_task',
+        'schedule': env.int('SHIPMENT_SYNC_INTERVAL', default=15 * 60),
+    },
+    # Günlük satış / ürün analytics rollup'larını artımlı güncelle
+    'rollup-analytics': {
+        'task': 'apps.tasks.analytics_task.rollup_analytics_task',
+        'schedule': env.int('ANALYTICS_ROLLUP_INTERVAL', default=10 * 60),
+    },
+    # Redis'te tamponlanan analytics event'lerini toplu yaz
+    'flush-analytics-events': {
+        'task': 'apps.tasks.analytics_task.flush_analytics_events_task',
+        'schedule': env.int('ANALYTICS_FLUSH_INTERVAL', default=5),
+    },
+    # Kuyruktaki işlem loglarını toplu yaz
+    'flush-activity-logs': {
+        'task': 'apps.tasks.activity_task.flush_activity_logs_task',
+        'schedule': env.int('ACTIVITY_LOG_FLUSH_INTERVAL', default=5),
+    },
+    # Tenant işlem logu saklama limitini uygula
+    'sweep-activity-logs': {
+        'task': 'apps.tasks.activity_task.sweep_activity_logs_task',
+        'schedule': env.int('ACTIVITY_LOG_SWEEP_INTERVAL', default=10 * 60),
+    },
+    # Müşteri istatistiklerini siparişlerden yeniden hesapla, sapmaları düzelt (her gece)
+    'reconcile-customer-statistics': {
+        'task': 'apps.tasks.customer_task.reconcile_customer_statistics_task',
+        'schedule': crontab(hour=env.int('CUSTOMER_STATS_RECONCILE_HOUR', default=3), minute=30),
+    },
+    # Aylık partition'ları önceden oluştur, süresi dolanları sil / arşivle
+    'maintain-partitions': {
+        'task': 'apps.tasks.partition_task.maintain_partitions_task',
+        'schedule': env.int('PARTITION_MAINTENANCE_INTERVAL', default=24 * 60 * 60),
+    },
+}
+
+# Analytics event ingestion (tenant başına limitler)
+ANALYTICS_EVENTS_PER_MINUTE = env.int('ANALYTICS_EVENTS_PER_MINUTE', default=6000)
+ANALYTICS_OVERFLOW_SAMPLE_RATE = env.float('ANALYTICS_OVERFLOW_SAMPLE_RATE', default=0.1)
+ANALYTICS_MAX_BACKLOG_PER_TENANT = env.int('ANALYTICS_MAX_BACKLOG_PER_TENANT', default=100000)
+
+# Aylık partition'lı tablolar (months=0: süresiz sakla; action: drop | archive)
+PARTITION_PREMAKE_MONTHS = env.int('PARTITION_PREMAKE_MONTHS', default=3)
+PARTITION_RETENTION = {
+    'analytics_events': {
+        'months': env.int('ANALYTICS_EVENT_RETENTION_MONTHS', default=13),
+        'action': 'drop',
+    },
+    'activity_logs': {
+        'months': env.int('ACTIVITY_LOG_RETENTION_MONTHS', default=12),
+        'action': 'drop',
+    },
+    'inventory_movements': {
+        'months': env.int('INVENTORY_MOVEMENT_RETENTION_MONTHS', default=24),
+        'action': env('INVENTORY_MOVEMENT_RETENTION_ACTION', default='archive'),
+    },
+}
+
 # Redis Cache
 CACHES = {
     'default': {